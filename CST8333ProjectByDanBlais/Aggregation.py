@@ -0,0 +1,239 @@
+#This module groups the rows of a PipelineTable by the values of one column and summarizes a numeric column over each
+#group, giving the count, sum, mean, minimum and maximum of the group, such as the total throughput of each Product.
+#The columns are read from the typed arrays of the table: the rows of each group are picked out with C level passes
+#over the group codes, or by sorting the rows by group when there are many groups, so a column of millions of rows is
+#summarized without building a Python object per row. The rows of a SQLitePipelineTable are summarized by a GROUP BY
+#query instead, and the rows of other tables, such as a LazyPipelineTable, are summed into the totals of their group
+#as they are read. Docstring comments in reST style.
+
+#Author: Dan Blais - 040826486
+#Subject: CST8333
+
+from array import array
+import itertools as it
+import math
+import PipelineTable as columnar
+import SQLitePipelineTable as database
+
+#The statistics of a group which can be charted, in the order they are offered.
+STATISTICS = ("sum", "mean", "count", "min", "max")
+#Largest number of groups whose rows are picked out with one bytes.translate pass each. More groups are sorted instead.
+MASK_GROUP_LIMIT = 32
+#Number of rows read and encoded at once when copying the rows of a table without typed columns.
+COPY_BATCH_SIZE = 4096
+
+class GroupSummary:
+    '''
+    Defines the summary of the numeric values of a group of rows. Empty and non-numeric cells are not counted.
+
+    :attribute label: The value of the grouping column shared by the rows of the group.
+    :attribute count: The number of numeric values of the group.
+    :attribute sum: The sum of the values.
+    :attribute min: The smallest value, or None if the group has no values.
+    :attribute max: The largest value, or None if the group has no values.
+    '''
+    __slots__ = ("label", "count", "sum", "min", "max")
+
+    def __init__(self, label, values):
+        '''
+        Initializes a GroupSummary object.
+
+        :param label: The value of the grouping column shared by the rows of the group.
+        :param values: A list of the numeric values of the group.
+        '''
+        self.label = label
+        self.count = len(values)
+        self.sum = math.fsum(values)
+        self.min = min(values) if values else None
+        self.max = max(values) if values else None
+
+    @classmethod
+    def fromTotals(cls, label, count, sum, minimum, maximum):
+        '''
+        Builds a GroupSummary from totals computed elsewhere, such as by a GROUP BY query.
+
+        :param label: The value of the grouping column shared by the rows of the group.
+        :param count: The number of numeric values of the group.
+        :param sum: The sum of the values.
+        :param minimum: The smallest value, or None if the group has no values.
+        :param maximum: The largest value, or None if the group has no values.
+        :returns: The GroupSummary object.
+        '''
+        summary = cls(label, [])
+        summary.count = count
+        summary.sum = sum
+        summary.min = minimum
+        summary.max = maximum
+        return summary
+
+    @property
+    def mean(self):
+        '''The mean of the values, or None if the group has no values.'''
+        return self.sum / self.count if self.count else None
+
+    def statistic(self, name):
+        '''
+        Gets one statistic of the group.
+
+        :param name: The name of the statistic, one of STATISTICS.
+        :returns: The statistic, or None if the group has no values.
+        '''
+        return getattr(self, name)
+
+def aggregate(table, groupColumn, valueColumn, rowStart=0, rowEnd=None):
+    '''
+    Groups rows by the value of a column and summarizes the numeric values of another column over each group. Rows
+    whose grouping cell is empty are left out.
+
+    :param table: The PipelineTable holding the rows, a SQLitePipelineTable, or any table with rowValues, such as a
+                  LazyPipelineTable.
+    :param groupColumn: The index of the column to group by.
+    :param valueColumn: The index of the column to summarize.
+    :param rowStart: The index of the first row to include.
+    :param rowEnd: The index after the last row to include, or None to include the rows to the end of the table.
+    :returns: A list of a GroupSummary per group with rows in the range, ordered by the code of the group, by the
+              value of the group for a SQLitePipelineTable, or by the first row of the group for other tables.
+    '''
+    rowEnd = len(table) if rowEnd is None else min(rowEnd, len(table))
+    rowStart = min(rowStart, rowEnd)
+
+    if isinstance(table, database.SQLitePipelineTable):
+        totals = table.groupTotals(groupColumn, valueColumn, rowStart, rowEnd)
+        return [GroupSummary.fromTotals(*groupTotals) for groupTotals in totals]
+
+    if not isinstance(table, columnar.PipelineTable):
+        return streamTotals(table, groupColumn, valueColumn, rowStart, rowEnd)
+
+    codes, labels = groupCodes(table, groupColumn, rowStart, rowEnd)
+    values = numericValues(table, valueColumn, rowStart, rowEnd)
+    summaries = []
+
+    if len(labels) <= MASK_GROUP_LIMIT:
+        byteCodes = array("B", codes).tobytes()
+
+        for code in sorted(set(byteCodes)):
+            mask = bytearray(256)
+            mask[code] = 1
+            groupValues = it.compress(values, byteCodes.translate(mask))
+            summaries.append(GroupSummary(labels[code], list(it.filterfalse(math.isnan, groupValues))))
+    else:
+        order = sorted(range(len(codes)), key=codes.__getitem__)
+
+        for code, rows in it.groupby(order, codes.__getitem__):
+            summaries.append(GroupSummary(labels[code], list(it.filterfalse(math.isnan, map(values.__getitem__, rows)))))
+
+    return [summary for summary in summaries if summary.label != ""]
+
+def streamTotals(table, groupColumn, valueColumn, rowStart, rowEnd):
+    '''
+    Summarizes a range of rows of a table without typed columns, such as a LazyPipelineTable, reading the rows one at
+    a time and adding each value to the count, sum, minimum and maximum of its group. Values are numeric as in
+    numericValues: those of float and int columns, and those of category columns which parse as numbers.
+
+    :param table: The table holding the rows.
+    :param groupColumn: The index of the column to group by.
+    :param valueColumn: The index of the column to summarize.
+    :param rowStart: The index of the first row to include.
+    :param rowEnd: The index after the last row to include.
+    :returns: A list of a GroupSummary per group with rows in the range, ordered by the first row of the group.
+    '''
+    numeric = columnar.COLUMN_KINDS[valueColumn] in ("float", "int", "category")
+    totals = {}
+
+    for position in range(rowStart, rowEnd):
+        values = table.rowValues(position)
+        groupTotals = totals.get(values[groupColumn])
+
+        if groupTotals is None:
+            groupTotals = totals[values[groupColumn]] = [0, 0.0, None, None]
+
+        try:
+            number = float(values[valueColumn]) if numeric else math.nan
+        except ValueError:
+            continue
+
+        if not math.isnan(number):
+            groupTotals[0] += 1
+            groupTotals[1] += number
+            groupTotals[2] = number if groupTotals[2] is None else min(groupTotals[2], number)
+            groupTotals[3] = number if groupTotals[3] is None else max(groupTotals[3], number)
+
+    return [GroupSummary.fromTotals(label, *groupTotals) for label, groupTotals in totals.items() if label != ""]
+
+def copyRows(table, rowStart, rowEnd):
+    '''
+    Copies a range of rows of a table without typed columns, such as a LazyPipelineTable, to a PipelineTable,
+    encoding COPY_BATCH_SIZE rows at a time column by column.
+
+    :param table: The table holding the rows.
+    :param rowStart: The index of the first row to copy.
+    :param rowEnd: The index after the last row to copy.
+    :returns: A PipelineTable holding the rows.
+    '''
+    copy = columnar.PipelineTable()
+
+    for batchStart in range(rowStart, rowEnd, COPY_BATCH_SIZE):
+        batchEnd = min(batchStart + COPY_BATCH_SIZE, rowEnd)
+        copy.extendValues(list(map(table.rowValues, range(batchStart, batchEnd))), batchStart)
+    return copy
+
+def groupCodes(table, columnIndex, rowStart, rowEnd):
+    '''
+    Codes the rows of a range by the value of a column. Category columns reuse the codes stored by the table, and
+    other columns are coded by their distinct stored values, with floats compared by their bits.
+
+    :param table: The PipelineTable holding the rows.
+    :param columnIndex: The index of the column.
+    :param rowStart: The index of the first row.
+    :param rowEnd: The index after the last row.
+    :returns: A tuple of a typed array of the code of each row in the range, and a list of the value of each code.
+              Codes without rows in the range may be included.
+    '''
+    buffer = table.columnBuffer(columnIndex)[rowStart:rowEnd]
+
+    if columnar.COLUMN_KINDS[columnIndex] == "category":
+        return buffer, list(table.categoryValues(columnIndex))
+
+    if buffer.typecode == "d":
+        keys = array("q")
+        keys.frombytes(buffer.tobytes())
+    else:
+        keys = buffer
+
+    distinct = dict.fromkeys(keys)
+    codeOf = {key: code for code, key in enumerate(distinct)}
+    stored = array(buffer.typecode)
+    stored.frombytes(array(keys.typecode, distinct).tobytes())
+    return array("I", map(codeOf.__getitem__, keys)), list(map(table.decoder(columnIndex), stored))
+
+def numericValues(table, columnIndex, rowStart, rowEnd):
+    '''
+    Gets the values of a column over a range of rows as floats, with NaN for empty cells and for cells which are not
+    numbers, such as dates and text which does not parse as a number.
+
+    :param table: The PipelineTable holding the rows.
+    :param columnIndex: The index of the column.
+    :param rowStart: The index of the first row.
+    :param rowEnd: The index after the last row.
+    :returns: A typed array of one float per row.
+    '''
+    kind = columnar.COLUMN_KINDS[columnIndex]
+    buffer = table.columnBuffer(columnIndex)[rowStart:rowEnd]
+
+    if kind == "float":
+        return buffer
+    elif kind == "int":
+        if columnar.EMPTY_INT in buffer:
+            return array("d", (math.nan if number == columnar.EMPTY_INT else number for number in buffer))
+        return array("d", buffer)
+    elif kind == "category":
+        numbers = []
+
+        for value in table.categoryValues(columnIndex):
+            try:
+                numbers.append(float(value))
+            except ValueError:
+                numbers.append(math.nan)
+        return array("d", map(numbers.__getitem__, buffer))
+
+    return array("d", [math.nan]) * len(buffer)
@@ -18,7 +18,11 @@
 #[2] "Tkinter Documentation," TkDocs, [Online]. Available: https://tkdocs.com/index.html. [Accessed: 25-Sep-2024].
 
 import tkinter as tk
-from tkinter import PhotoImage, ttk, Menu, filedialog
+from tkinter import PhotoImage, ttk, Menu, filedialog, messagebox
+import ColumnSchema as schema
+
+#The image file and subsample factor of each icon, decoded the first time the icon is shown.
+ICONS = {"search": ("res/search.png", 4), "first": ("res/first.png", 4), "close": ("res/close.png", 5)}
 
 class ProgramWindow:
     '''
@@ -42,12 +46,32 @@ class ProgramWindow:
     :attribute saveFileAsCallback: Callback for saving the file with a new name.
     :attribute resizeSearchBoxCallback: Callback for resizing the search box.
     :attribute openRowDetailsCallback: Callback for viewing details of a row.
+    :attribute generatePieChartCallback: Callback for generating a pie chart.
+    :attribute cancelLoadCallback: Callback for cancelling a file load in progress.
+    :attribute scrollTableCallback: Callback for scrolling the rows of the table.
+    :attribute tableScrolledCallback: Callback receiving the scroll position of the table items.
+    :attribute renderTableCallback: Callback for rendering the rows scrolled into view.
+    :attribute changeDisplayedRowsCallback: Callback for changing the range of displayed rows.
+    :attribute toggleCacheCallback: Callback for turning the cache of parsed files on or off.
+    :attribute undoCallback: Callback for undoing the last edit.
+    :attribute redoCallback: Callback for redoing the last undone edit.
+    :attribute deleteSearchMatchesCallback: Callback for deleting every row matching the search.
+    :attribute sortTableCallback: Callback for sorting the table by a column.
+    :attribute showInstrumentationCallback: Callback for showing the performance statistics.
+    :attribute saveInstrumentationCallback: Callback for saving the performance statistics to a file.
+    :attribute toggleDatabaseCallback: Callback for turning the storage of rows in a SQLite database on or off.
+    :attribute openFolderCallback: Callback for opening a folder of csv files as one dataset.
+    :attribute _icons: A dictionary of the icons decoded so far, by name.
     '''
     
     def __init__(self, fileOpenCallback, addDataCallback, editDataCallback, deleteRowCallback, 
                  searchTableCallback, showSearchCallback, toggleButtonCallback, openContextMenuCallback,
                  openTextInputCallback, reloadDataFromFileCallback, saveFileCallback, saveFileAsCallback,
-                 resizeSearchBoxCallback, openRowDetailsCallback, generatePieChartCallback):
+                 resizeSearchBoxCallback, openRowDetailsCallback, generatePieChartCallback, cancelLoadCallback,
+                 scrollTableCallback, tableScrolledCallback, renderTableCallback, changeDisplayedRowsCallback,
+                 toggleCacheCallback, undoCallback, redoCallback, deleteSearchMatchesCallback,
+                 sortTableCallback, showInstrumentationCallback, saveInstrumentationCallback, toggleDatabaseCallback,
+                 openFolderCallback):
         '''
         Initializes the ProgramWindow class.
 
@@ -67,6 +91,21 @@ class ProgramWindow:
         :param saveFileAsCallback: Callback for saving the file with a new name.
         :param resizeSearchBoxCallback: Callback for resizing the search box.
         :param openRowDetailsCallback: Callback for viewing details of a row.
+        :param generatePieChartCallback: Callback for generating a pie chart.
+        :param cancelLoadCallback: Callback for cancelling a file load in progress.
+        :param scrollTableCallback: Callback for scrolling the rows of the table.
+        :param tableScrolledCallback: Callback receiving the scroll position of the table items.
+        :param renderTableCallback: Callback for rendering the rows scrolled into view.
+        :param changeDisplayedRowsCallback: Callback for changing the range of displayed rows.
+        :param toggleCacheCallback: Callback for turning the cache of parsed files on or off.
+        :param undoCallback: Callback for undoing the last edit.
+        :param redoCallback: Callback for redoing the last undone edit.
+        :param deleteSearchMatchesCallback: Callback for deleting every row matching the search.
+        :param sortTableCallback: Callback for sorting the table by a column.
+        :param showInstrumentationCallback: Callback for showing the performance statistics.
+        :param saveInstrumentationCallback: Callback for saving the performance statistics to a file.
+        :param toggleDatabaseCallback: Callback for turning the storage of rows in a SQLite database on or off.
+        :param openFolderCallback: Callback for opening a folder of csv files as one dataset.
         '''
         super().__init__()
         self._fileOpenCallback = fileOpenCallback
@@ -84,6 +123,21 @@ class ProgramWindow:
         self._resizeSearchBoxCallback = resizeSearchBoxCallback
         self._openRowDetailsCallback = openRowDetailsCallback
         self._generatePieChartCallback = generatePieChartCallback
+        self._cancelLoadCallback = cancelLoadCallback
+        self._scrollTableCallback = scrollTableCallback
+        self._tableScrolledCallback = tableScrolledCallback
+        self._renderTableCallback = renderTableCallback
+        self._changeDisplayedRowsCallback = changeDisplayedRowsCallback
+        self._toggleCacheCallback = toggleCacheCallback
+        self._undoCallback = undoCallback
+        self._redoCallback = redoCallback
+        self._deleteSearchMatchesCallback = deleteSearchMatchesCallback
+        self._sortTableCallback = sortTableCallback
+        self._showInstrumentationCallback = showInstrumentationCallback
+        self._saveInstrumentationCallback = saveInstrumentationCallback
+        self._toggleDatabaseCallback = toggleDatabaseCallback
+        self._openFolderCallback = openFolderCallback
+        self._icons = {}
         
         self.setupWindow()
 
@@ -91,8 +145,8 @@ class ProgramWindow:
         '''
         Sets up the main window and initializes UI components.
 
-        Configures the window title, size, menu bar, and initial labels. Also binds search, reload, and overwrite
-        callbacks to hotkeys.
+        Configures the window title, size, menu bar, and initial labels. Also binds search, reload, overwrite, undo
+        and redo callbacks to hotkeys. Undo and redo are left to a text field which has the focus.
         '''
         self.root = tk.Tk()
         self.root.title('CSV File Manager - By Dan Blais')
@@ -101,6 +155,8 @@ class ProgramWindow:
         self.root.bind("<Control-f>", lambda event: self._showSearchCallback())
         self.root.bind("<Control-r>", lambda event: self._reloadDataFromFileCallback())
         self.root.bind("<Control-s>", lambda event: self._saveFileCallback())
+        self.root.bind("<Control-z>", lambda event: self.editHotkey(event, self._undoCallback))
+        self.root.bind("<Control-y>", lambda event: self.editHotkey(event, self._redoCallback))
         
         self.appBar = Menu(self.root)
         self.root.config(menu=self.appBar)
@@ -109,15 +165,49 @@ class ProgramWindow:
                                                    "File > Open to open an existing .csv file.") 
         self.startLabel.pack(expand=True)
         
-        self.searchImg = PhotoImage(file="res/search.png").subsample(4)
-        self.firstImg = PhotoImage(file="res/first.png").subsample(4)
-        self.closeImg = PhotoImage(file="res/close.png").subsample(5)
-        
         self.buildFileMenu(self.appBar) 
         self.buildViewMenu(self.appBar)
         self.buildDataMenu(self.appBar)
         self.buildHelpMenu(self.appBar)
         
+    def icon(self, name):
+        '''
+        Gets an icon, decoding its image file the first time it is shown so the window opens without waiting for
+        the images.
+
+        :param name: The name of the icon, one of the keys of ICONS.
+        :returns: The PhotoImage of the icon.
+        '''
+        if name not in self._icons:
+            file, factor = ICONS[name]
+            self._icons[name] = PhotoImage(file=file).subsample(factor)
+        return self._icons[name]
+
+    @property
+    def searchImg(self):
+        '''The icon of the search button in find all mode.'''
+        return self.icon("search")
+
+    @property
+    def firstImg(self):
+        '''The icon of the search button in find first mode.'''
+        return self.icon("first")
+
+    @property
+    def closeImg(self):
+        '''The icon of the button closing the search box.'''
+        return self.icon("close")
+
+    def editHotkey(self, event, callback):
+        '''
+        Runs an undo or redo callback for a hotkey, unless the key was pressed in a text field.
+
+        :param event: The key event.
+        :param callback: The undo or redo callback.
+        '''
+        if event.widget.winfo_class() not in ("Entry", "TEntry"):
+            callback()
+
     def buildFileMenu(self, appBar):
         '''
         Builds the File menu in the application menu bar.
@@ -127,6 +217,7 @@ class ProgramWindow:
         self.fileMenu = Menu(appBar, tearoff=0)
         self.fileMenu.add_command(label='New', state=tk.DISABLED) #Not implemented yet.
         self.fileMenu.add_command(label='Open', command=lambda: self._fileOpenCallback())
+        self.fileMenu.add_command(label='Open Folder...', command=lambda: self._openFolderCallback())
         self.fileMenu.add_command(label='Save', command=lambda: self._saveFileCallback(), state=tk.DISABLED)
         self.fileMenu.add_command(label='Save As...', command=lambda: self._saveFileAsCallback(), state=tk.DISABLED)
         self.fileMenu.add_command(label='Quit', command=lambda: self.root.quit())
@@ -140,6 +231,7 @@ class ProgramWindow:
         '''
         self.viewMenu = Menu(appBar, tearoff=0)
         self.viewMenu.add_command(label='Dark Mode', state=tk.DISABLED) #Not implemented yet.
+        self.viewMenu.add_command(label='Performance Statistics', command=lambda: self._showInstrumentationCallback())
         self.appBar.add_cascade(label='View', menu=self.viewMenu)
         
     def buildDataMenu(self, appBar):
@@ -151,7 +243,16 @@ class ProgramWindow:
         self.dataMenu = Menu(appBar, tearoff=0)
         self.dataMenu.add_command(label='Reload Data from File', command=lambda: self._reloadDataFromFileCallback(), state=tk.DISABLED)
         self.dataMenu.add_command(label='Generate Chart', command=lambda: self.buildChartPopup(), state=tk.DISABLED)
-        self.dataMenu.add_command(label='Change Displayed Rows', state=tk.DISABLED) #Not implemented yet.
+        self.dataMenu.add_command(label='Change Displayed Rows', command=lambda: self.buildDisplayedRowsPopup(), state=tk.DISABLED)
+        self.dataMenu.add_command(label='Undo', command=lambda: self._undoCallback(), state=tk.DISABLED)
+        self.dataMenu.add_command(label='Redo', command=lambda: self._redoCallback(), state=tk.DISABLED)
+        self.dataMenu.add_separator()
+        self.cacheFiles = tk.BooleanVar(value=True)
+        self.dataMenu.add_checkbutton(label='Cache Parsed Files', variable=self.cacheFiles,
+                                      command=lambda: self._toggleCacheCallback(self.cacheFiles.get()))
+        self.storeInDatabase = tk.BooleanVar(value=False)
+        self.dataMenu.add_checkbutton(label='Store Rows in SQLite', variable=self.storeInDatabase,
+                                      command=lambda: self._toggleDatabaseCallback(self.storeInDatabase.get()))
         self.appBar.add_cascade(label='Data', menu=self.dataMenu)
         
     def buildHelpMenu(self, appBar):
@@ -165,22 +266,47 @@ class ProgramWindow:
                                                                                              "While cell edit is open to save changes.\n\nEscape: While cell edit open" 
                                                                                              "to cancel edit\n\nRight-click: On a row to open context menu.\n\nCtrl+f: To search," 
                                                                                              "click the search icon to toggle between find first and find all mode.\n\nCtrl+r: "
-                                                                                             "To reload data from file.\n\nCtrl+s: To save and overwrite file."))
+                                                                                             "To reload data from file.\n\nCtrl+s: To save and overwrite file.\n\nCtrl+z: To undo "
+                                                                                             "the last edit.\n\nCtrl+y: To redo the last undone edit."))
         
         self.helpMenu.add_command(label='Usage Guide', command=lambda: self.buildInfoBox("Usage Guide", "This program allows for the creation of new .csv files (unimplemented),\n" 
                                                                                          "and the management of existing .csv files.\n\n--Opening Files--\n\n    To begin, open an "
                                                                                          "existing .csv file by selecting File > Open. After selecting a file, a table containing the " 
-                                                                                         "contents of the\n    file will open. Once a file is open a table containing a specified number "
-                                                                                         "of rows will be displayed, populated with the .csv\n    data. \n\n--Editing Rows--\n\n    Double-clicking "
+                                                                                         "contents of the\n    file will open. Once a file is open a table containing all of the rows "
+                                                                                         "will be displayed, populated with the .csv\n    data. Data > Change Displayed Rows "
+                                                                                         "limits the table to a range of rows. Clicking a column heading sorts the rows\n    by the column, "
+                                                                                         "clicking it again sorts them in descending order, and a third click or a click on "
+                                                                                         "the Row heading\n    restores the file order. Data > Cache Parsed Files keeps a copy of each parsed file "
+                                                                                         "so an unchanged file reopens without being parsed again.\n    "
+                                                                                         "Data > Store Rows in SQLite keeps the rows of the next file opened in a "
+                                                                                         "local database instead of in memory,\n    for files too large to fit in memory. "
+                                                                                         "File > Open Folder... opens every .csv file of a folder as one table, such as\n    "
+                                                                                         "one file per pipeline, and the row details show the file of each row."
+                                                                                         "\n\n--Editing Rows--\n\n    Double-clicking "
                                                                                          "a cell will allow a cell value to be edited. Pressing Escape will cancel editing, while pressing Enter "
-                                                                                         "will confirm\n    the update. \n\n--Adding and Deleting a Row--\n\n    Right-clicking a row will dispay a "
-                                                                                         "context menu providing options such as inserting new rows, and deleting rows."
+                                                                                         "will confirm\n    the update. Data > Undo and Data > Redo step back and forth through the edits. Edits "
+                                                                                         "which were not saved are\n    offered to be restored when the file is opened again."
+                                                                                         "\n\n--Adding and Deleting a Row--\n\n    Right-clicking a row will dispay a "
+                                                                                         "context menu providing options such as inserting new rows, and deleting rows. Ctrl-click or "
+                                                                                         "Shift-click\n    rows to delete several at once, or choose Delete Search Matches to delete every row "
+                                                                                         "matching a find all search."
                                                                                          "\n\n--Selecting Rows--\n\n    Ctrl+f will display a search field which will allow two kinds"
                                                                                          "of searching. The default is find all, where all rows containing values\n    matching the search query are"
-                                                                                         "highlighted. Clicking the magnifying glass icon will toggle find first mode. In this "
-                                                                                         "mode, the first\n    row containing a matching Row Id is highlighted. \n\n--Reloading and Saving Data--\n\n    "
+                                                                                         "highlighted. A search can also be a filter query on the columns, such as\n    "
+                                                                                         "Throughput > 50 and Product = \"domestic heavy\" and Date between 2015-01-01 and 2018-12-31, "
+                                                                                         "using =, !=, <, <=, >, >=,\n    between, contains, and, or, not and parentheses. "
+                                                                                         "Clicking the magnifying glass icon will toggle find first mode. In this "
+                                                                                         "mode, the first\n    row containing a matching Row Id is highlighted, or else the first row with a cell "
+                                                                                         "equal to the search query. \n\n--Reloading and Saving Data--\n\n    "
                                                                                          "The toolbar contains other options, some of which have hotkeys (see: Program Hotkeys). Other options include: "
-                                                                                         "Reloading\n    data from the .csv file, and 'overwrite' and 'save as' options."))
+                                                                                         "Reloading\n    data from the .csv file, and 'overwrite' and 'save as' options. "
+                                                                                         "Saving as a .pcol file stores the rows in a compressed\n    columnar file, "
+                                                                                         "which is smaller and opens much faster than a .csv file."
+                                                                                         "\n\n--Performance Statistics--\n\n    When the program is started with the "
+                                                                                         "PIPELINE_INSTRUMENT environment variable set to on, View > Performance\n    "
+                                                                                         "Statistics shows the calls, rows and latency of loading, searching, editing, "
+                                                                                         "charting and saving,\n    and how long the window stopped responding. The "
+                                                                                         "statistics can be saved as JSON or csv."))
         self.appBar.add_cascade(label='Help', menu=self.helpMenu)
         
     def buildCSVTable(self):
@@ -188,35 +314,23 @@ class ProgramWindow:
         Builds the CSV table in the application window.
 
         Initializes the Treeview widget to display the CSV data and sets up
-        the necessary scrollbars and context menu.
-
-        '''
-        self.table = ttk.Treeview(self.root, columns=("Date", "Month", "Year", "Company", "Pipeline", "Key Point", "Latitude", "Longitude",
-                         "Direction of Flow", "Trade Type", "Product", "Throughput", "Committed Volumes",
-                         "Uncommitted Volumes", "Nameplate Capacity", "Available Capacity", "Reason For Variance"))
-        
-        self.table.heading("#0", text="Row")
-        self.table.heading("Date", text="Date")
-        self.table.heading("Month", text="Month")
-        self.table.heading("Year", text="Year")
-        self.table.heading("Company", text="Company")
-        self.table.heading("Pipeline", text="Pipeline")
-        self.table.heading("Key Point", text="Key Point")
-        self.table.heading("Latitude", text="Latitude")
-        self.table.heading("Longitude", text="Longitude")
-        self.table.heading("Direction of Flow", text="Direction of Flow")
-        self.table.heading("Trade Type", text="Trade Type")
-        self.table.heading("Product", text="Product")
-        self.table.heading("Throughput", text="Throughput")
-        self.table.heading("Committed Volumes", text="Committed Volumes")
-        self.table.heading("Uncommitted Volumes", text="Uncommitted Volumes")
-        self.table.heading("Nameplate Capacity", text="Nameplate Capacity")
-        self.table.heading("Available Capacity", text="Available Capacity")
-        self.table.heading("Reason For Variance", text="Reason For Variance")
-        
-        self.scrollVert = ttk.Scrollbar(self.root, orient='vertical', command=self.table.yview)
+        the necessary scrollbars and context menu. The Treeview only holds the rows
+        scrolled into view, so the vertical scrollbar, the mouse wheel and the page keys
+        scroll through the controller rather than the Treeview itself. Clicking a column
+        heading sorts the table by the column, and clicking the Row heading unsorts it.
+
+        '''
+        self.table = ttk.Treeview(self.root, columns=tuple(column.heading for column in schema.COLUMNS))
+        
+        self.table.heading("#0", text="Row", command=lambda: self._sortTableCallback(None))
+
+        for column in schema.COLUMNS:
+            self.table.heading(column.heading, text=column.heading,
+                               command=lambda columnIndex=column.index: self._sortTableCallback(columnIndex))
+        
+        self.scrollVert = ttk.Scrollbar(self.root, orient='vertical', command=lambda *args: self._scrollTableCallback(*args))
         self.scrollHor = ttk.Scrollbar(self.root, orient='horizontal', command=self.table.xview)
-        self.table.configure(yscrollcommand=self.scrollVert.set)
+        self.table.configure(yscrollcommand=lambda first, last: self._tableScrolledCallback(first, last))
         self.table.configure(xscrollcommand=self.scrollHor.set)
         self.scrollVert.pack(side="right", fill="y")
         self.scrollHor.pack(side="bottom", fill="x")
@@ -231,15 +345,57 @@ class ProgramWindow:
         self.contextMenu.add_command(label="Add Row Above", command=lambda: self._addDataCallback("above"))
         self.contextMenu.add_command(label="Add Row Below", command=lambda: self._addDataCallback("below"))
         self.contextMenu.add_separator()
-        self.contextMenu.add_command(label="Delete Row(s)", command=lambda: self._deleteRowCallback()) #Single delete impemented, multi-delete not implemented yet
+        self.contextMenu.add_command(label="Delete Row(s)", command=lambda: self._deleteRowCallback())
+        self.contextMenu.add_command(label="Delete Search Matches", command=lambda: self._deleteSearchMatchesCallback())
         
         self.table.bind("<Double-1>", lambda event: self._openTextInputCallback(event))
         self.table.bind("<Button-3>", lambda event: self._openContextMenuCallback(event))
+        self.table.bind("<MouseWheel>", lambda event: self.scrollWheel(-1 if event.delta > 0 else 1))
+        self.table.bind("<Button-4>", lambda event: self.scrollWheel(-1))
+        self.table.bind("<Button-5>", lambda event: self.scrollWheel(1))
+        self.table.bind("<Prior>", lambda event: self._scrollTableCallback("scroll", -1, "pages"))
+        self.table.bind("<Next>", lambda event: self._scrollTableCallback("scroll", 1, "pages"))
+        self.table.bind("<Configure>", lambda event: self._renderTableCallback())
         
         self.table.tag_configure("hidden", foreground="lightgray")
         
         self.table.pack(side="top", fill="both", expand=True)
         
+    def markSortedColumn(self, columnIndex, descending):
+        '''
+        Marks the heading of the column the table is sorted by with an arrow pointing in the sort direction.
+
+        :param columnIndex: The index of the sorted column, or None if the table is not sorted.
+        :param descending: Whether the column is sorted from the largest value.
+        '''
+        for column in schema.COLUMNS:
+            arrow = ""
+
+            if column.index == columnIndex:
+                arrow = " \u25bc" if descending else " \u25b2"
+
+            self.table.heading(column.heading, text=column.heading + arrow)
+
+    def scrollWheel(self, direction):
+        '''
+        Scrolls the table by a few rows for one notch of the mouse wheel.
+
+        :param direction: -1 to scroll up, 1 to scroll down.
+        :returns: "break", so the Treeview does not also scroll its own items.
+        '''
+        self._scrollTableCallback("scroll", direction * 3, "units")
+        return "break"
+        
+    def visibleRowCount(self):
+        '''
+        Gets the number of rows which fit in the table at its current height.
+
+        :returns: The number of visible rows, at least 1.
+        '''
+        rowHeight = ttk.Style().lookup("Treeview", "rowheight") or 20
+        headingHeight = int(rowHeight) + 5
+        return max(1, (self.table.winfo_height() - headingHeight) // int(rowHeight))
+        
     def buildSearchBox(self):
         '''
         Builds the search box for filtering table entries.
@@ -259,6 +415,98 @@ class ProgramWindow:
         self.searchBox.bind("<KeyRelease>", lambda event: self._searchTableCallback())
         self.searchBox.bind("<Escape>", lambda event: self._showSearchCallback())  
         self.root.bind("<Configure>", lambda event: self._resizeSearchBoxCallback())
+        self.searchError = tk.Label(self.searchFrame, fg="red", anchor="w", justify=tk.LEFT)
+
+    def showSearchError(self, message):
+        '''
+        Shows an error under the search box, such as a filter query which is not valid, or hides it.
+
+        :param message: The text of the error, or None to hide it.
+        '''
+        if not hasattr(self, "searchError"):
+            return
+
+        if message is None:
+            self.searchError.pack_forget()
+        else:
+            self.searchError.config(text=message, wraplength=max(self.searchFrame.winfo_width() - 10, 100))
+            self.searchError.pack(side=tk.BOTTOM, fill=tk.X, before=self.searchButton)
+        
+    def buildLoadProgress(self):
+        '''
+        Builds the load progress bar shown at the bottom of the window while a file is being loaded.
+
+        Initializes a frame containing a label, a determinate progress bar and a button which
+        cancels the load. Any progress bar left from a previous load is replaced.
+        '''
+        self.destroyLoadProgress()
+        self.loadFrame = tk.Frame(self.root, bd=1, relief="groove")
+        self.loadLabel = tk.Label(self.loadFrame, text="Loading...")
+        self.loadLabel.pack(side=tk.LEFT, padx=5)
+        self.loadCancelButton = tk.Button(self.loadFrame, text="Cancel", command=lambda: self._cancelLoadCallback())
+        self.loadCancelButton.pack(side=tk.RIGHT, padx=5, pady=2)
+        self.loadProgress = ttk.Progressbar(self.loadFrame, orient="horizontal", mode="determinate", maximum=1.0)
+        self.loadProgress.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        
+        if hasattr(self, "scrollVert"):
+            self.loadFrame.pack(side="bottom", fill="x", before=self.scrollVert)
+        else:
+            self.loadFrame.pack(side="bottom", fill="x")
+        
+    def updateLoadProgress(self, fraction):
+        '''
+        Updates the load progress bar.
+
+        :param fraction: The fraction of the file loaded so far, between 0 and 1.
+        '''
+        if hasattr(self, "loadFrame"):
+            self.loadProgress["value"] = fraction
+            self.loadLabel.config(text=f"Loading... {fraction:.0%}")
+            
+    def destroyLoadProgress(self):
+        '''
+        Removes the load progress bar from the window, if it is shown.
+        '''
+        if hasattr(self, "loadFrame"):
+            self.loadFrame.destroy()
+            del self.loadFrame
+        
+    def buildSaveProgress(self):
+        '''
+        Builds the save progress bar shown at the bottom of the window while a file is being saved.
+
+        Initializes a frame containing a label and a determinate progress bar. Any progress bar left from a
+        previous save is replaced.
+        '''
+        self.destroySaveProgress()
+        self.saveFrame = tk.Frame(self.root, bd=1, relief="groove")
+        self.saveLabel = tk.Label(self.saveFrame, text="Saving...")
+        self.saveLabel.pack(side=tk.LEFT, padx=5)
+        self.saveProgress = ttk.Progressbar(self.saveFrame, orient="horizontal", mode="determinate", maximum=1.0)
+        self.saveProgress.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5, pady=2)
+        
+        if hasattr(self, "scrollVert"):
+            self.saveFrame.pack(side="bottom", fill="x", before=self.scrollVert)
+        else:
+            self.saveFrame.pack(side="bottom", fill="x")
+        
+    def updateSaveProgress(self, fraction):
+        '''
+        Updates the save progress bar.
+
+        :param fraction: The fraction of the rows written so far, between 0 and 1.
+        '''
+        if hasattr(self, "saveFrame"):
+            self.saveProgress["value"] = fraction
+            self.saveLabel.config(text=f"Saving... {fraction:.0%}")
+            
+    def destroySaveProgress(self):
+        '''
+        Removes the save progress bar from the window, if it is shown.
+        '''
+        if hasattr(self, "saveFrame"):
+            self.saveFrame.destroy()
+            del self.saveFrame
         
     def buildTextEditBox(self, rowId, cellColumn, cellText):
         '''
@@ -295,16 +543,86 @@ class ProgramWindow:
         self.infoButton = tk.Button(self.infoBox, text="OK", command=lambda: self.infoBox.destroy())
         self.infoButton.pack(pady=(0, 10))
         
+    def buildConfirmBox(self, title, text):
+        '''
+        Builds a box asking the user to confirm an action, and waits for the answer.
+
+        :param title: The title of the confirmation box.
+        :param text: The question to be displayed in the confirmation box.
+        :returns: True if the user answered yes, otherwise False.
+        '''
+        return messagebox.askyesno(title, text, parent=self.root)
+
+    def buildDisplayedRowsPopup(self):
+        '''
+        Builds a popup window for choosing the range of rows displayed in the table. Provides a button which
+        calls back to the controller class to display the chosen rows when clicked.
+        '''
+        self.displayedRowsPopup = tk.Toplevel(self.root)
+        self.displayedRowsPopup.title("Change Displayed Rows")
+        self.displayedRowsPopup.geometry("300x200")
+        
+        self.rowStartLabel = tk.Label(self.displayedRowsPopup, text="First Row")
+        self.rowStartLabel.pack()
+        self.rowStartEntry = tk.Entry(self.displayedRowsPopup)
+        self.rowStartEntry.insert(0, "0")
+        self.rowStartEntry.pack(pady=10)
+        
+        self.rowEndLabel = tk.Label(self.displayedRowsPopup, text="End Row (blank to display all rows)")
+        self.rowEndLabel.pack()
+        self.rowEndEntry = tk.Entry(self.displayedRowsPopup)
+        self.rowEndEntry.pack(pady=10)
+        
+        self.displayRowsButton = tk.Button(self.displayedRowsPopup, text="Display Rows", 
+                                           command=lambda: self._changeDisplayedRowsCallback(self.rowStartEntry.get(), self.rowEndEntry.get()))
+        self.displayRowsButton.pack(pady=10)
+        
+    def buildInstrumentationPopup(self, summaries):
+        '''
+        Builds a popup window listing the performance statistics of each instrumented operation. Provides buttons
+        which call back to the controller class to refresh the statistics or save them to a file.
+
+        :param summaries: A list of the summary dictionary of each operation, as returned by Recorder.summaries.
+        '''
+        columns = ("Operation", "Calls", "Rows", "Mean ms", "p50 ms", "p95 ms", "Max ms")
+
+        self.instrumentationPopup = tk.Toplevel(self.root)
+        self.instrumentationPopup.title("Performance Statistics")
+        self.instrumentationPopup.geometry("640x300")
+
+        self.instrumentationTable = ttk.Treeview(self.instrumentationPopup, columns=columns, show="headings")
+
+        for column in columns:
+            self.instrumentationTable.heading(column, text=column)
+            self.instrumentationTable.column(column, width=140 if column == "Operation" else 80, anchor="w")
+
+        for summary in summaries:
+            self.instrumentationTable.insert("", tk.END, values=(summary["name"], summary["count"], summary["rows"],
+                                                                 f"{summary['meanMs']:.2f}", f"{summary['p50Ms']:.2f}",
+                                                                 f"{summary['p95Ms']:.2f}", f"{summary['maxMs']:.2f}"))
+        self.instrumentationTable.pack(fill="both", expand=True, padx=10, pady=10)
+
+        self.instrumentationButtons = tk.Frame(self.instrumentationPopup)
+        self.instrumentationButtons.pack(pady=(0, 10))
+        self.refreshInstrumentationButton = tk.Button(self.instrumentationButtons, text="Refresh",
+                                                      command=lambda: (self.instrumentationPopup.destroy(),
+                                                                       self._showInstrumentationCallback()))
+        self.refreshInstrumentationButton.pack(side=tk.LEFT, padx=5)
+        self.saveInstrumentationButton = tk.Button(self.instrumentationButtons, text="Save...",
+                                                   command=lambda: self._saveInstrumentationCallback())
+        self.saveInstrumentationButton.pack(side=tk.LEFT, padx=5)
+
     def buildChartPopup(self):
         '''
-        Builds a popup window for selecting two columns from a loaded dataset. Provides a button which
-        calls back to the controller class to generate a pie chart when clicked.
+        Builds a popup window for selecting two columns from a loaded dataset and the statistic of the numerical
+        column charted for each category. Provides a button which calls back to the controller class to generate a
+        pie chart when clicked.
         '''
         columns = self.table["columns"]
         
         self.chartPopup = tk.Toplevel(self.root)
         self.chartPopup.title("Generate Pie Chart")
-        self.chartPopup.geometry("300x200")
+        self.chartPopup.geometry("300x270")
         
         self.categoricalCol = tk.StringVar(self.chartPopup)
         self.categoricalCol.set(columns[0])
@@ -320,6 +638,14 @@ class ProgramWindow:
         self.numericalColMenu = ttk.Combobox(self.chartPopup, textvariable=self.numericalCol, values=columns)
         self.numericalColMenu.pack(pady=10)
 
+        self.chartStatistic = tk.StringVar(self.chartPopup)
+        self.chartStatistic.set("Sum")
+        self.statisticLabel = tk.Label(self.chartPopup, text="Statistic")
+        self.statisticLabel.pack()
+        self.statisticMenu = ttk.Combobox(self.chartPopup, textvariable=self.chartStatistic,
+                                          values=("Sum", "Mean", "Count", "Min", "Max"), state="readonly")
+        self.statisticMenu.pack(pady=10)
+
         self.generateButton = tk.Button(self.chartPopup, text="Generate Chart", command=lambda: self._generatePieChartCallback())
         self.generateButton.pack(pady=10)
 
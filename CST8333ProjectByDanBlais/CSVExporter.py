@@ -0,0 +1,270 @@
+#This module writes the rows of a PipelineTable or LazyPipelineTable to a csv file. Rows are written in batches with
+#csv.writer.writerows to a temporary file with a large write buffer next to the target file, which is flushed to disk
+#and then renamed over the target, so an interrupted save never leaves a partly written file in place of the original.
+#When a table is saved over the file it was read from, the unchanged records can be copied from the file as byte
+#ranges and only the edited and inserted rows written again. Docstring comments in reST style.
+
+#Author: Dan Blais - 040826486
+#Subject: CST8333
+
+import csv
+import io
+import locale
+import operator
+import os
+import shutil
+import ColumnSchema as schema
+import PipelineTable as columnar
+import LazyPipelineTable as lazy
+
+#The header row written at the start of every saved file.
+HEADERS = tuple(column.header for column in schema.COLUMNS)
+#Number of rows built and written at once.
+EXPORT_BATCH_SIZE = 10000
+#Size in bytes of the write buffer of the temporary file.
+WRITE_BUFFER_BYTES = 1024 * 1024
+#Number of bytes copied at once from the source file when copying unchanged records without copy_file_range.
+COPY_CHUNK_BYTES = 16 * 1024 * 1024
+
+def rowBatches(table, batchSize=EXPORT_BATCH_SIZE, rowStart=0, rowEnd=None):
+    '''
+    Builds the rows of a table in batches. The batches of a PipelineTable are decoded column by column.
+
+    :param table: The PipelineTable or LazyPipelineTable holding the rows.
+    :param batchSize: The number of rows in each batch.
+    :param rowStart: The index of the first row.
+    :param rowEnd: The index after the last row, or None to build the rows to the end of the table.
+    :returns: A generator of lists of row value tuples.
+    '''
+    rowEnd = len(table) if rowEnd is None else rowEnd
+
+    for batchStart in range(rowStart, rowEnd, batchSize):
+        batchEnd = min(batchStart + batchSize, rowEnd)
+
+        if isinstance(table, columnar.PipelineTable):
+            yield table.rowValuesRange(batchStart, batchEnd)
+        else:
+            yield [table.rowValues(position) for position in range(batchStart, batchEnd)]
+
+def createTemporaryFile(file):
+    '''
+    Creates a temporary file with a unique name next to a target file, so two saves of the same file never write to
+    the same temporary file. The temporary file gets the permissions of the target file if it exists, and otherwise
+    those of a new file.
+
+    :param file: A string representing the path of the target file.
+    :returns: A tuple of the open file descriptor and the path of the temporary file.
+    :raises OSError: If the file cannot be created.
+    '''
+    #Imported here rather than at startup, as most sessions open a file long before they save one.
+    import tempfile
+
+    directory, name = os.path.split(os.path.abspath(file))
+    handle, temporaryPath = tempfile.mkstemp(dir=directory, prefix=name + ".", suffix=".tmp")
+
+    try:
+        if os.path.exists(file):
+            shutil.copymode(file, temporaryPath)
+        else:
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(temporaryPath, 0o666 & ~umask)
+    except BaseException:
+        os.close(handle)
+        os.remove(temporaryPath)
+        raise
+
+    return handle, temporaryPath
+
+def writeTemporaryFile(table, file, progress=None):
+    '''
+    Writes the rows of a table to a temporary file next to a target file, and flushes it to disk. The temporary
+    file gets the permissions of the target file if it exists, and is removed if writing fails.
+
+    :param table: The PipelineTable or LazyPipelineTable holding the rows. It must not change while it is written.
+    :param file: A string representing the path of the target file.
+    :param progress: An optional function called with the fraction of the rows written after each batch.
+    :returns: The path of the temporary file.
+    :raises OSError: If the file cannot be written.
+    '''
+    handle, temporaryPath = createTemporaryFile(file)
+
+    try:
+        with open(handle, "w", newline="", buffering=WRITE_BUFFER_BYTES) as saveFile:
+            dataWriter = csv.writer(saveFile, quoting=csv.QUOTE_MINIMAL)
+            dataWriter.writerow(HEADERS)
+            written = 0
+
+            for batch in rowBatches(table, EXPORT_BATCH_SIZE):
+                dataWriter.writerows(batch)
+                written += len(batch)
+
+                if progress is not None:
+                    progress(written / len(table))
+
+            saveFile.flush()
+            os.fsync(saveFile.fileno())
+    except BaseException:
+        if os.path.exists(temporaryPath):
+            os.remove(temporaryPath)
+        raise
+
+    return temporaryPath
+
+def recordRuns(records):
+    '''
+    Splits the rows of a table into runs of rows holding consecutive records of the source file and runs of
+    changed rows. The breaks between runs are found with C level passes over the records, so the number of runs
+    and the Python work depend on the number of edits rather than the number of rows.
+
+    :param records: A typed array of the index of the source record of each row, negative for changed rows.
+    :returns: A generator of tuples of the index of the first row of a run, the index after its last row, and the
+              index of the source record of its first row, or -1 for a run of changed rows.
+    '''
+    breaks = bytes(map(operator.ne, records[1:], map((1).__add__, records[:-1]))) + b"\1"
+    changedStart = None
+    runStart = 0
+
+    while runStart < len(records):
+        runEnd = breaks.find(b"\1", runStart) + 1
+        record = records[runStart]
+
+        if record < 0:
+            changedEnd = min(runEnd, runStart - record)
+
+            if changedStart is None:
+                changedStart = runStart
+
+            if changedEnd == runEnd:
+                runStart = runEnd
+                continue
+
+            runStart = changedEnd
+            record = 0
+
+        if changedStart is not None:
+            yield changedStart, runStart, -1
+            changedStart = None
+
+        yield runStart, runEnd, record
+        runStart = runEnd
+
+    if changedStart is not None:
+        yield changedStart, len(records), -1
+
+def indexFile(file):
+    '''
+    Finds the byte offset of every record of a csv file.
+
+    :param file: A string representing the path of the csv file.
+    :returns: A typed array of the byte offset of the start of each record, followed by the end of the last record.
+    '''
+    table = lazy.LazyPipelineTable(file)
+
+    try:
+        for progress in table.indexRecords():
+            pass
+        return table.boundaries
+    finally:
+        table.close()
+
+def copyRange(source, saveFile, start, end):
+    '''
+    Copies a byte range of the source file to the end of the saved file, inside the kernel with copy_file_range
+    where it is available and otherwise in large chunks.
+
+    :param source: The source file, opened for reading in binary mode.
+    :param saveFile: The unbuffered saved file, opened for writing in binary mode.
+    :param start: The offset of the first byte to copy.
+    :param end: The offset after the last byte to copy.
+    '''
+    if hasattr(os, "copy_file_range"):
+        try:
+            while start < end:
+                copied = os.copy_file_range(source.fileno(), saveFile.fileno(), end - start, start)
+
+                if not copied:
+                    break
+                start += copied
+        except OSError:
+            pass
+
+    source.seek(start)
+
+    while start < end:
+        chunk = source.read(min(COPY_CHUNK_BYTES, end - start))
+
+        if not chunk:
+            raise OSError("source file is shorter than its record index")
+        saveFile.write(chunk)
+        start += len(chunk)
+
+def writeSplicedFile(table, file, recordCount, boundaries=None, progress=None):
+    '''
+    Writes the rows of a table read from a csv file to a temporary file next to it, copying the header and the
+    unchanged records from the file as byte ranges and writing only the edited and inserted rows again, with the
+    line breaks of the file. If the file does not hold exactly the records the table was read from, which happens
+    when rows failed to parse, every row is written instead.
+
+    :param table: The PipelineTable or LazyPipelineTable holding the rows, with its source records tracked. It must
+                  not change while it is written.
+    :param file: A string representing the path of the csv file the table was read from.
+    :param recordCount: The number of records the table was read from.
+    :param boundaries: The record offsets of the file if they are known, as returned by indexFile.
+    :param progress: An optional function called with the fraction of the rows written after each run of rows.
+    :returns: The path of the temporary file.
+    :raises OSError: If the file cannot be written.
+    '''
+    boundaries = indexFile(file) if boundaries is None else boundaries
+
+    if len(boundaries) - 1 != recordCount:
+        return writeTemporaryFile(table, file, progress)
+
+    records = table.sourceRecords()
+    encoding = locale.getpreferredencoding(False)
+    handle, temporaryPath = createTemporaryFile(file)
+
+    try:
+        with open(handle, "wb", buffering=0) as saveFile, open(file, "rb") as source:
+            source.seek(max(boundaries[0] - 2, 0))
+            terminator = "\r\n" if source.read(2) == b"\r\n" else "\n"
+            copyRange(source, saveFile, 0, boundaries[0])
+            lineOpen = False
+
+            for rowStart, rowEnd, record in recordRuns(records):
+                if lineOpen:
+                    saveFile.write(terminator.encode(encoding))
+
+                if record < 0:
+                    for batch in rowBatches(table, EXPORT_BATCH_SIZE, rowStart, rowEnd):
+                        text = io.StringIO()
+                        csv.writer(text, quoting=csv.QUOTE_MINIMAL, lineterminator=terminator).writerows(batch)
+                        saveFile.write(text.getvalue().encode(encoding))
+                    lineOpen = False
+                else:
+                    start, end = boundaries[record], boundaries[record + rowEnd - rowStart]
+                    copyRange(source, saveFile, start, end)
+                    source.seek(end - 1)
+                    lineOpen = end > start and source.read(1) != b"\n"
+
+                if progress is not None:
+                    progress(rowEnd / len(records))
+
+            os.fsync(saveFile.fileno())
+    except BaseException:
+        if os.path.exists(temporaryPath):
+            os.remove(temporaryPath)
+        raise
+
+    return temporaryPath
+
+def exportTable(table, file, progress=None):
+    '''
+    Saves the rows of a table to a csv file, replacing the file only once every row has been written.
+
+    :param table: The PipelineTable or LazyPipelineTable holding the rows. It must not change while it is written.
+    :param file: A string representing the path of the csv file.
+    :param progress: An optional function called with the fraction of the rows written after each batch.
+    :raises OSError: If the file cannot be written.
+    '''
+    os.replace(writeTemporaryFile(table, file, progress), file)
@@ -0,0 +1,149 @@
+#This module defines the converters which turn the text of the cells of a Pipeline Throughput and Capacity Data csv file
+#into typed values. Each column has a precompiled converter, dates are parsed once per distinct date string, and whole
+#columns can be converted in bulk, which lets the conversions run in C wherever a column has no empty cells.
+#Docstring comments in reST style.
+
+#Author: Dan Blais - 040826486
+#Subject: CST8333
+
+from array import array
+from datetime import date, datetime
+from functools import lru_cache
+import math
+
+#The value stored for an empty cell of a whole number column. Date columns store 0 and decimal columns store NaN.
+EMPTY_INT = -2**31
+
+#The largest whole number which can be stored. The smallest is one above EMPTY_INT.
+INT_MAX = 2**31 - 1
+
+@lru_cache(maxsize=4096)
+def parseDate(text):
+    '''
+    Parses a date in the format 'YYYY-MM-DD'. The dataset holds only a few hundred distinct monthly dates, so
+    results are cached by date string.
+
+    :param text: The text of the cell.
+    :returns: A date, or an empty string for an empty cell.
+    :raises ValueError: If the text is not a date in the format 'YYYY-MM-DD'.
+    '''
+    if not text:
+        return ""
+    if len(text) == 10 and text[4] == text[7] == "-" and text.replace("-", "").isdigit():
+        return date.fromisoformat(text)
+    return datetime.strptime(text, "%Y-%m-%d").date()
+
+@lru_cache(maxsize=4096)
+def parseDateOrdinal(text):
+    '''
+    Parses a date in the format 'YYYY-MM-DD' to its day ordinal, the form in which dates are stored. Results are
+    cached by date string.
+
+    :param text: The text of the cell.
+    :returns: The day ordinal of the date, or 0 for an empty cell.
+    :raises ValueError: If the text is not a date in the format 'YYYY-MM-DD'.
+    '''
+    return parseDate(text).toordinal() if text else 0
+
+def parseInt(text):
+    '''
+    Parses a whole number.
+
+    :param text: The text of the cell.
+    :returns: An int, or an empty string for an empty cell.
+    :raises ValueError: If the text is not a whole number.
+    '''
+    return int(text) if text else ""
+
+def storedInt(value):
+    '''
+    Converts a value to a whole number which can be stored in a whole number column.
+
+    :param value: The value, typed or as text.
+    :returns: The int.
+    :raises ValueError: If the value is not a whole number, or is outside the range of a stored int, which also
+                        holds for the number stored as EMPTY_INT.
+    '''
+    number = int(value)
+
+    if not EMPTY_INT < number <= INT_MAX:
+        raise ValueError(f"whole number {value} is out of range")
+    return number
+
+def parseFloat(text):
+    '''
+    Parses a decimal number.
+
+    :param text: The text of the cell.
+    :returns: A float, or an empty string for an empty cell.
+    :raises ValueError: If the text is not a number.
+    '''
+    return float(text) if text else ""
+
+def parseText(text):
+    '''
+    Keeps the text of a text cell as it is.
+
+    :param text: The text of the cell.
+    :returns: The text.
+    '''
+    return text
+
+#The converter of each column, in CSV column order.
+CONVERTERS = (parseDate, parseInt, parseInt, parseText, parseText, parseText, parseFloat, parseFloat,
+              parseText, parseText, parseText, parseFloat, parseFloat, parseFloat, parseFloat, parseFloat, parseText)
+
+def convertRow(row):
+    '''
+    Converts the cells of a csv row to typed values.
+
+    :param row: A sequence of the cell texts of the row, in CSV column order.
+    :returns: A tuple of typed values, with empty cells as empty strings.
+    :raises ValueError: If a cell cannot be converted to the type of its column.
+    '''
+    return tuple(convert(text) for convert, text in zip(CONVERTERS, row))
+
+def encodeDates(texts):
+    '''
+    Converts a column of date texts straight to stored day ordinals.
+
+    :param texts: A sequence of cell texts.
+    :returns: An array('i') of day ordinals, with 0 for empty cells.
+    :raises ValueError: If a cell is not a date in the format 'YYYY-MM-DD'.
+    '''
+    return array("i", map(parseDateOrdinal, texts))
+
+def encodeInts(texts):
+    '''
+    Converts a column of whole number texts straight to stored ints.
+
+    :param texts: A sequence of cell texts.
+    :returns: An array('i') of ints, with EMPTY_INT for empty cells.
+    :raises ValueError: If a cell is not a whole number or is out of range.
+    '''
+    if "" in texts:
+        return array("i", [storedInt(text) if text else EMPTY_INT for text in texts])
+
+    try:
+        numbers = array("i", map(int, texts))
+    except OverflowError as e:
+        raise ValueError(e) from None
+
+    if EMPTY_INT in numbers:
+        raise ValueError(f"whole number {EMPTY_INT} is out of range")
+    return numbers
+
+def encodeFloats(texts):
+    '''
+    Converts a column of decimal number texts straight to stored floats.
+
+    :param texts: A sequence of cell texts.
+    :returns: An array('d') of floats, with NaN for empty cells.
+    :raises ValueError: If a cell is not a number.
+    '''
+    if "" not in texts:
+        return array("d", map(float, texts))
+    return array("d", [float(text) if text else math.nan for text in texts])
+
+#The bulk encoder of each numeric or date column, keyed by the kind of the column.
+KIND_ENCODERS = {"date": encodeDates, "int": encodeInts, "float": encodeFloats}
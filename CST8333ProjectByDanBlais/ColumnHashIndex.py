@@ -0,0 +1,261 @@
+#This module defines a ColumnHashIndex object, which maps each distinct value of a column of a PipelineTable to the rows
+#holding it, such as each Key Point or Date to its rows. The rows of a value are then found with one dictionary lookup
+#instead of a pass over the column, which makes exact match lookups instant on large tables. Edits made to the table
+#after the index is built are replayed from the change log of the table, so an edit costs a shift of the indexes of the
+#rows after it instead of sorting the column again. Docstring comments in reST style.
+
+#Author: Dan Blais - 040826486
+#Subject: CST8333
+
+from array import array
+import bisect
+import itertools as it
+import PipelineTable as columnar
+
+class ColumnHashIndex:
+    '''
+    Defines a hash index over one column of a PipelineTable. The index is built when first used, and updated from
+    the change log of the table when rows have been edited, added or removed since. It is only built again when the
+    change log no longer holds every change. Category columns are matched on their text ignoring case, and other
+    columns on their stored value, so "2010-07-01" finds the rows dated July 1, 2010.
+
+    :attribute _table: The PipelineTable being indexed.
+    :attribute _columnIndex: The index of the indexed column.
+    :attribute _groups: A dictionary mapping each key of the column to a typed array of the indexes of its rows in
+                        ascending order, or None when the column is not indexed yet.
+    :attribute _version: The edit count and length of the table when the column was indexed.
+    '''
+
+    def __init__(self, table, columnIndex):
+        '''
+        Initializes a ColumnHashIndex object.
+
+        :param table: The PipelineTable to index.
+        :param columnIndex: The index of the column to index.
+        '''
+        self._table = table
+        self._columnIndex = columnIndex
+        self._groups = None
+        self._version = None
+
+    @property
+    def table(self):
+        '''The PipelineTable being indexed.'''
+        return self._table
+
+    def refresh(self):
+        '''
+        Indexes the column if it is not indexed yet, or updates the index if rows of the table changed since it was
+        indexed. Cells set in other columns leave the index unchanged.
+        '''
+        version = (self._table.editCount, len(self._table))
+
+        if self._groups is not None and version == self._version:
+            return
+
+        changes = None if self._groups is None else self._table.changesSince(*self._version)
+
+        if changes is None:
+            self.build()
+        else:
+            rowCount = self._version[1]
+
+            for change in changes:
+                rowCount = self.applyChange(change, rowCount)
+
+            buffer = self._table.columnBuffer(self._columnIndex)
+
+            for position in range(rowCount, len(buffer)):
+                self.addRow(self.storedKey(buffer[position]), position)
+
+        self._version = version
+
+    def build(self):
+        '''
+        Indexes the whole column. The rows are sorted by their stored value, which keeps rows with the same value in
+        ascending order, and then grouped.
+        '''
+        buffer = self._table.columnBuffer(self._columnIndex)
+        keys = self.storedKeys(buffer)
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        groups = {key: array("I", rows) for key, rows in it.groupby(order, keys.__getitem__)}
+
+        if columnar.COLUMN_KINDS[self._columnIndex] == "category":
+            texts = {}
+
+            for code, value in enumerate(self._table.categoryValues(self._columnIndex)):
+                if code in groups:
+                    texts.setdefault(value.lower(), []).append(groups[code])
+
+            groups = {text: rows[0] if len(rows) == 1 else array("I", sorted(it.chain(*rows)))
+                      for text, rows in texts.items()}
+
+        self._groups = groups
+
+    def applyChange(self, change, rowCount):
+        '''
+        Updates the index for a change made to the table. Inserted and removed rows shift the indexes of the rows
+        after them in every group, and the inserted rows are added to their groups.
+
+        :param change: The change, as described by PipelineTable.changesSince.
+        :param rowCount: The number of rows of the table before the change.
+        :returns: The number of rows of the table after the change.
+        '''
+        if change[0] == "set":
+            position, columnIndex, oldValue, newValue = change[1:]
+
+            if columnIndex == self._columnIndex:
+                self.removeRow(self.storedKey(oldValue), position)
+                self.addRow(self.storedKey(newValue), position)
+            return rowCount
+
+        positions = change[1]
+
+        if change[0] == "insert":
+            boundaries = [position - number for number, position in enumerate(positions)]
+
+            for key, rows in self._groups.items():
+                self._groups[key] = shiftRows(rows, boundaries, 1, False)
+
+            for position, value in zip(positions, change[2][self._columnIndex]):
+                self.addRow(self.storedKey(value), position)
+            return rowCount + len(positions)
+
+        for key, rows in list(self._groups.items()):
+            rows = shiftRows(rows, positions, -1, True)
+
+            if rows:
+                self._groups[key] = rows
+            else:
+                del self._groups[key]
+        return rowCount - len(positions)
+
+    def addRow(self, key, position):
+        '''
+        Adds a row to the group of a key, keeping the group in ascending order.
+
+        :param key: The key of the row.
+        :param position: The index of the row.
+        '''
+        rows = self._groups.get(key)
+
+        if rows is None:
+            self._groups[key] = array("I", [position])
+        else:
+            bisect.insort(rows, position)
+
+    def removeRow(self, key, position):
+        '''
+        Removes a row from the group of a key, dropping the group when it is left empty.
+
+        :param key: The key of the row.
+        :param position: The index of the row.
+        '''
+        rows = self._groups.get(key)
+
+        if rows is None:
+            return
+
+        index = bisect.bisect_left(rows, position)
+
+        if index < len(rows) and rows[index] == position:
+            del rows[index]
+
+            if not rows:
+                del self._groups[key]
+
+    def storedKey(self, stored):
+        '''
+        Converts a stored value of the column to its key in the index.
+
+        :param stored: The value as stored in the column.
+        :returns: The key: the lowercase text of a category code, the bits of a float, or else the stored value.
+        '''
+        kind = columnar.COLUMN_KINDS[self._columnIndex]
+
+        if kind == "category":
+            return self._table.categoryValues(self._columnIndex)[stored].lower()
+        elif kind == "float":
+            return self.storedKeys(array("d", [stored]))[0]
+        return stored
+
+    def storedKeys(self, buffer):
+        '''
+        Gets the keys of the rows of the column. Floats are keyed by their bits so that every empty NaN cell gets
+        the same key, and other columns are keyed by their stored value.
+
+        :param buffer: The typed array storing the column.
+        :returns: A typed array of the key of each row.
+        '''
+        if buffer.typecode == "d":
+            keys = array("q")
+            keys.frombytes(buffer.tobytes())
+            return keys
+        return buffer
+
+    def valueKey(self, value):
+        '''
+        Converts a value to its key in the index.
+
+        :param value: The value, typed or as text.
+        :returns: The key, or None if the value cannot be stored in the column, is empty, or is a text which no cell
+                  of a category column holds, so the column need not be indexed to look it up.
+        '''
+        kind = columnar.COLUMN_KINDS[self._columnIndex]
+
+        if kind == "category":
+            text = str(value).lower()
+
+            if any(category.lower() == text for category in self._table.categoryValues(self._columnIndex)):
+                return text
+            return None
+
+        try:
+            stored = self._table.encoder(self._columnIndex)(value)
+
+            if kind == "date" and stored == 0 or kind == "int" and stored == columnar.EMPTY_INT or stored != stored:
+                return None
+            return self.storedKey(stored)
+        except (ValueError, TypeError, OverflowError):
+            return None
+
+    def positions(self, value):
+        '''
+        Finds the rows whose cell in the column equals a value.
+
+        :param value: The value to look up, typed or as text. Category values are matched ignoring case.
+        :returns: A typed array of the indexes of the matching rows in ascending order, empty if there are none.
+        '''
+        key = self.valueKey(value)
+
+        if key is None:
+            return array("I")
+
+        self.refresh()
+        return self._groups.get(key, array("I"))
+
+def shiftRows(rows, boundaries, step, dropBoundaries):
+    '''
+    Shifts the ascending indexes of the rows of a group past the rows inserted or removed before them. The rows past
+    each boundary are shifted by one more step than the rows before it, a run of rows at a time.
+
+    :param rows: A typed array of the ascending indexes of the rows.
+    :param boundaries: The ascending indexes, before the change, at which rows were inserted or removed.
+    :param step: 1 for inserted rows, or -1 for removed rows.
+    :param dropBoundaries: Whether the rows at the boundaries are removed rows, which are dropped from the group.
+    :returns: A typed array of the shifted indexes, which is the given array when no row is shifted.
+    '''
+    if not rows or rows[-1] < boundaries[0]:
+        return rows
+
+    runs = [rows[:bisect.bisect_left(rows, boundaries[0])]]
+
+    for number, boundary in enumerate(boundaries):
+        start = bisect.bisect_left(rows, boundary)
+
+        if dropBoundaries and start < len(rows) and rows[start] == boundary:
+            start += 1
+
+        end = bisect.bisect_left(rows, boundaries[number + 1]) if number + 1 < len(boundaries) else len(rows)
+        runs.append(array("I", map(((number + 1) * step).__add__, rows[start:end])))
+    return array("I", it.chain(*runs))
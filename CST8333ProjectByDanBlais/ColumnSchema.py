@@ -0,0 +1,97 @@
+#This module defines the schema of the Pipeline Throughput and Capacity Data dataset: one Column object per column of
+#the csv file, giving the PipelineData attribute name, the csv header, the table heading, the kind of value and the
+#converter of the column. The tables, the exporter and the window take their columns from this schema, so every
+#part of the program agrees on the order and the types of the columns. Docstring comments in reST style.
+
+#Author: Dan Blais - 040826486
+#Subject: CST8333
+
+import ColumnConverters as converters
+
+#The kind of value held by a column, keyed by the converter of the column.
+CONVERTER_KINDS = {converters.parseDate: "date", converters.parseInt: "int", converters.parseFloat: "float",
+                   converters.parseText: "text"}
+
+#The PipelineData attribute name, csv header and table heading of each column, in CSV column order.
+COLUMN_LABELS = (("date", "Date", "Date"),
+                 ("month", "Month", "Month"),
+                 ("year", "Year", "Year"),
+                 ("company", "Company", "Company"),
+                 ("pipeline", "Pipeline", "Pipeline"),
+                 ("keyPoint", "Key Point", "Key Point"),
+                 ("latitude", "Latitude", "Latitude"),
+                 ("longitude", "Longitude", "Longitude"),
+                 ("directionOfFlow", "Direction Of Flow", "Direction of Flow"),
+                 ("tradeType", "Trade Type", "Trade Type"),
+                 ("product", "Product", "Product"),
+                 ("throughput", "Throughput (1000 m3/d)", "Throughput"),
+                 ("committedVolumes", "Committed Volumes (1000 m3/d)", "Committed Volumes"),
+                 ("uncommittedVolumes", "Uncommitted Volumes (1000 m3/d)", "Uncommitted Volumes"),
+                 ("nameplateCapacity", "Nameplate Capacity (1000 m3/d)", "Nameplate Capacity"),
+                 ("availableCapacity", "Available Capacity (1000 m3/d)", "Available Capacity"),
+                 ("reasonForVariance", "Reason For Variance", "Reason For Variance"))
+
+class Column:
+    '''
+    Defines one column of the dataset.
+
+    :attribute index: The position of the column in a csv row.
+    :attribute name: The PipelineData attribute holding the value of the column.
+    :attribute header: The header of the column in a csv file.
+    :attribute heading: The heading of the column in the table of the window.
+    :attribute kind: The kind of value of the column: "date", "int", "float" or "text".
+    :attribute converter: The function converting the text of a cell of the column to its value.
+    '''
+    __slots__ = ("index", "name", "header", "heading", "kind", "converter")
+
+    def __init__(self, index, name, header, heading, converter):
+        '''
+        Initializes a Column object.
+
+        :param index: The position of the column in a csv row.
+        :param name: The PipelineData attribute holding the value of the column.
+        :param header: The header of the column in a csv file.
+        :param heading: The heading of the column in the table of the window.
+        :param converter: The function of ColumnConverters converting the text of a cell of the column.
+        '''
+        self.index = index
+        self.name = name
+        self.header = header
+        self.heading = heading
+        self.kind = CONVERTER_KINDS[converter]
+        self.converter = converter
+
+    def convert(self, text):
+        '''
+        Converts the text of a cell of the column to its value.
+
+        :param text: The text of the cell.
+        :returns: The value, or an empty string for an empty cell.
+        :raises ValueError: If the text cannot be converted to the kind of the column.
+        '''
+        return self.converter(text)
+
+    def __repr__(self):
+        '''
+        The representation function for defining how a Column object is formatted as a text string.
+
+        :returns: A string representation of a Column object.
+        '''
+        return f"Column({self.index}, {self.name!r}, {self.kind!r})"
+
+#The columns of the dataset, in CSV column order.
+COLUMNS = tuple(Column(index, name, header, heading, converter)
+                for index, ((name, header, heading), converter) in enumerate(zip(COLUMN_LABELS, converters.CONVERTERS)))
+
+#The index of each column, keyed by its PipelineData attribute name.
+COLUMN_INDEXES = {column.name: column.index for column in COLUMNS}
+
+def columnNamed(name):
+    '''
+    Looks up a column by its PipelineData attribute name.
+
+    :param name: The attribute name of the column.
+    :returns: The Column object.
+    :raises KeyError: If no column has the name.
+    '''
+    return COLUMNS[COLUMN_INDEXES[name]]
@@ -0,0 +1,333 @@
+#This module reads and writes Pipeline Throughput and Capacity Data in columnar binary files, which are smaller than csv
+#files and load without parsing. The native .pcol format needs only the standard library. It stores the typed column
+#arrays of a PipelineTable as they are held in memory: dates as day ordinals, numbers as machine integers and floats,
+#and text as category codes with the dictionary of distinct values of each column. Each column is split into blocks
+#compressed by zlib. A JSON footer at the end of the file gives the type and the blocks of each column, so the file
+#is written in one pass, as Parquet files are. Parquet files can also be read and written when the optional pyarrow
+#package is installed. The format of a file is chosen by its extension; any other extension is a csv file.
+#Docstring comments in reST style.
+
+#Author: Dan Blais - 040826486
+#Subject: CST8333
+
+from array import array
+import importlib.util
+import json
+import math
+import os
+import struct
+import sys
+import zlib
+import ColumnSchema as schema
+import PipelineTable as columnar
+import Aggregation as aggregation
+import CSVExporter as exporter
+
+#The extension of files in the native columnar format.
+NATIVE_EXTENSION = ".pcol"
+#The extension of Parquet files.
+PARQUET_EXTENSION = ".parquet"
+#Whether the optional pyarrow package needed for Parquet files is installed.
+PARQUET_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+#The bytes starting and ending every native file.
+MAGIC = b"PIPECOLS"
+#Version of the native layout. Files of another version are rejected.
+FORMAT_VERSION = 1
+#Number of uncompressed bytes of a column in each compressed block.
+BLOCK_BYTES = 1024 * 1024
+#The zlib compression level of the blocks, from 1 (fastest) to 9 (smallest).
+COMPRESSION_LEVEL = 6
+#Number of rows converted at once when writing a Parquet file.
+PARQUET_BATCH_SIZE = 65536
+
+def fileFormat(file):
+    '''
+    Gets the format of a file from its extension.
+
+    :param file: A string representing the path of the file.
+    :returns: "native" for a .pcol file, "parquet" for a .parquet file, and otherwise "csv".
+    '''
+    extension = os.path.splitext(file)[1].lower()
+
+    if extension == NATIVE_EXTENSION:
+        return "native"
+    elif extension == PARQUET_EXTENSION:
+        return "parquet"
+    return "csv"
+
+def isColumnarFile(file):
+    '''
+    Tells whether a file is in a columnar format rather than csv, from its extension.
+
+    :param file: A string representing the path of the file.
+    :returns: True for .pcol and .parquet files.
+    '''
+    return fileFormat(file) != "csv"
+
+def fileTypes():
+    '''
+    Gets the file types of the open and save dialogs, listing Parquet files only when pyarrow is installed.
+
+    :returns: A list of tuples of the description and the patterns of each file type, with every readable type first.
+    '''
+    types = [('CSV Files', '*.csv'), ('Columnar Files', '*' + NATIVE_EXTENSION)]
+
+    if PARQUET_AVAILABLE:
+        types.append(('Parquet Files', '*' + PARQUET_EXTENSION))
+    return [('Pipeline Data Files', ' '.join(patterns for description, patterns in types))] + types
+
+def readTable(file):
+    '''
+    Reads a columnar file into a PipelineTable. The rows get row ids from 0 in file order, as when a csv file is read.
+
+    :param file: A string representing the path of the file.
+    :returns: A PipelineTable holding the rows of the file.
+    :raises OSError: If the file cannot be read.
+    :raises ValueError: If the file is not a valid file of its format, or Parquet files cannot be read.
+    '''
+    if fileFormat(file) == "parquet":
+        return readParquet(file)
+    return readNative(file)
+
+def writeTemporaryFile(table, file, progress=None):
+    '''
+    Writes the rows of a table in the columnar format of a target file to a temporary file next to it, and flushes
+    it to disk. The temporary file gets the permissions of the target file if it exists, and is removed if writing
+    fails.
+
+    :param table: The PipelineTable or LazyPipelineTable holding the rows. It must not change while it is written.
+    :param file: A string representing the path of the target file.
+    :param progress: An optional function called with the fraction of the file written as the columns are written.
+    :returns: The path of the temporary file.
+    :raises OSError: If the file cannot be written.
+    :raises ValueError: If Parquet files cannot be written.
+    '''
+    if not isinstance(table, columnar.PipelineTable):
+        table = aggregation.copyRows(table, 0, len(table))
+
+    handle, temporaryPath = exporter.createTemporaryFile(file)
+    os.close(handle)
+
+    try:
+        if fileFormat(file) == "parquet":
+            writeParquet(table, temporaryPath, progress)
+        else:
+            writeNative(table, temporaryPath, progress)
+    except BaseException:
+        if os.path.exists(temporaryPath):
+            os.remove(temporaryPath)
+        raise
+
+    return temporaryPath
+
+def exportTable(table, file, progress=None):
+    '''
+    Saves the rows of a table to a columnar file, replacing the file only once every column has been written.
+
+    :param table: The PipelineTable or LazyPipelineTable holding the rows. It must not change while it is written.
+    :param file: A string representing the path of the file, whose extension gives its format.
+    :param progress: An optional function called with the fraction of the file written as the columns are written.
+    :raises OSError: If the file cannot be written.
+    :raises ValueError: If Parquet files cannot be written.
+    '''
+    os.replace(writeTemporaryFile(table, file, progress), file)
+
+def writeNative(table, file, progress=None):
+    '''
+    Writes the columns of a PipelineTable to a file in the native format: MAGIC, the compressed blocks of each
+    column, the JSON footer, the length of the footer as 8 bytes and MAGIC again.
+
+    :param table: The PipelineTable holding the rows.
+    :param file: A string representing the path of the file.
+    :param progress: An optional function called with the fraction of the columns written after each column.
+    :raises OSError: If the file cannot be written.
+    '''
+    columns, rowIds, categoryValues = table.__getstate__()
+    layout = []
+
+    with open(file, "wb") as output:
+        output.write(MAGIC)
+        offset = len(MAGIC)
+
+        for columnIndex, column in enumerate(columns):
+            data = memoryview(column.tobytes())
+            blocks = []
+
+            for start in range(0, len(data), BLOCK_BYTES):
+                block = zlib.compress(data[start:start + BLOCK_BYTES], COMPRESSION_LEVEL)
+                output.write(block)
+                blocks.append({"offset": offset, "length": len(block)})
+                offset += len(block)
+
+            layout.append({"name": schema.COLUMNS[columnIndex].name, "typecode": column.typecode,
+                           "blocks": blocks})
+
+            if progress is not None:
+                progress((columnIndex + 1) / len(columns))
+
+        footer = json.dumps({"version": FORMAT_VERSION, "byteorder": sys.byteorder, "rows": len(rowIds),
+                             "columns": layout, "categories": categoryValues}).encode()
+        output.write(footer)
+        output.write(struct.pack("<Q", len(footer)))
+        output.write(MAGIC)
+        output.flush()
+        os.fsync(output.fileno())
+
+def readNative(file):
+    '''
+    Reads a file in the native format into a PipelineTable, decompressing each column into its typed array.
+
+    :param file: A string representing the path of the file.
+    :returns: A PipelineTable holding the rows of the file.
+    :raises OSError: If the file cannot be read.
+    :raises ValueError: If the file is not a valid native file of the current version for the columns of the schema.
+    '''
+    with open(file, "rb") as source:
+        data = source.read()
+
+    if len(data) < 2 * len(MAGIC) + 8 or data[:len(MAGIC)] != MAGIC or data[-len(MAGIC):] != MAGIC:
+        raise ValueError(f"{file} is not a columnar pipeline data file")
+
+    footerEnd = len(data) - len(MAGIC) - 8
+    footerLength, = struct.unpack_from("<Q", data, footerEnd)
+    footer = json.loads(data[footerEnd - footerLength:footerEnd])
+
+    if footer.get("version") != FORMAT_VERSION:
+        raise ValueError(f"{file} is a columnar file of an unsupported version")
+
+    names = [column["name"] for column in footer["columns"]]
+    typecodes = [column["typecode"] for column in footer["columns"]]
+
+    if names != [column.name for column in schema.COLUMNS] or \
+            typecodes != [columnar.KIND_TYPECODES[kind] for kind in columnar.COLUMN_KINDS]:
+        raise ValueError(f"{file} does not hold the columns of the pipeline data schema")
+
+    columns = []
+
+    with memoryview(data) as view:
+        for column in footer["columns"]:
+            values = array(column["typecode"])
+
+            for block in column["blocks"]:
+                try:
+                    values.frombytes(zlib.decompress(view[block["offset"]:block["offset"] + block["length"]]))
+                except zlib.error as e:
+                    raise ValueError(f"{file} has a damaged block: {e}") from None
+
+            if footer["byteorder"] != sys.byteorder:
+                values.byteswap()
+
+            if len(values) != footer["rows"]:
+                raise ValueError(f"{file} has columns of different lengths")
+
+            columns.append(values)
+
+    return columnar.PipelineTable.fromState((columns, array("q", range(footer["rows"])), footer["categories"]))
+
+def importParquet():
+    '''
+    Imports the optional pyarrow package for reading and writing Parquet files.
+
+    :returns: A tuple of the pyarrow and pyarrow.parquet modules.
+    :raises ValueError: If pyarrow is not installed.
+    '''
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ValueError(f"Parquet files need the pyarrow package, which is not installed. Save as a "
+                         f"{NATIVE_EXTENSION} file instead.") from None
+
+    return pyarrow, pyarrow.parquet
+
+def parquetArray(pyarrow, table, columnIndex, rowStart, rowEnd):
+    '''
+    Converts a range of a column of a PipelineTable to a pyarrow array, with empty cells as nulls and text as a
+    dictionary array sharing the category values of the column.
+
+    :param pyarrow: The pyarrow module.
+    :param table: The PipelineTable holding the rows.
+    :param columnIndex: The index of the column.
+    :param rowStart: The index of the first row.
+    :param rowEnd: The index after the last row.
+    :returns: The pyarrow array.
+    '''
+    kind = columnar.COLUMN_KINDS[columnIndex]
+    buffer = table.columnBuffer(columnIndex)[rowStart:rowEnd]
+
+    if kind == "date":
+        return pyarrow.array([table.decoder(columnIndex)(ordinal) or None for ordinal in buffer], pyarrow.date32())
+    elif kind == "int":
+        return pyarrow.array([None if number == columnar.EMPTY_INT else number for number in buffer], pyarrow.int32())
+    elif kind == "float":
+        return pyarrow.array([None if math.isnan(number) else number for number in buffer], pyarrow.float64())
+    return pyarrow.DictionaryArray.from_arrays(pyarrow.array(buffer, pyarrow.uint32()),
+                                               pyarrow.array(table.categoryValues(columnIndex), pyarrow.string()))
+
+def writeParquet(table, file, progress=None):
+    '''
+    Writes the rows of a PipelineTable to a Parquet file with pyarrow, one row group per PARQUET_BATCH_SIZE rows.
+    The columns are named by their csv headers.
+
+    :param table: The PipelineTable holding the rows.
+    :param file: A string representing the path of the file.
+    :param progress: An optional function called with the fraction of the rows written after each row group.
+    :raises ValueError: If pyarrow is not installed.
+    '''
+    pyarrow, parquet = importParquet()
+    names = [column.header for column in schema.COLUMNS]
+    writer = None
+
+    try:
+        for rowStart in range(0, len(table) or 1, PARQUET_BATCH_SIZE):
+            rowEnd = min(rowStart + PARQUET_BATCH_SIZE, len(table))
+            batch = pyarrow.Table.from_arrays([parquetArray(pyarrow, table, column.index, rowStart, rowEnd)
+                                               for column in schema.COLUMNS], names=names)
+
+            if writer is None:
+                writer = parquet.ParquetWriter(file, batch.schema, compression="zstd")
+            writer.write_table(batch)
+
+            if progress is not None and len(table):
+                progress(rowEnd / len(table))
+    finally:
+        if writer is not None:
+            writer.close()
+
+def readParquet(file):
+    '''
+    Reads a Parquet file with pyarrow into a PipelineTable. The columns are found by their csv headers, and nulls
+    are read as empty cells.
+
+    :param file: A string representing the path of the file.
+    :returns: A PipelineTable holding the rows of the file.
+    :raises ValueError: If pyarrow is not installed, or the file lacks a column of the schema.
+    '''
+    pyarrow, parquet = importParquet()
+    source = parquet.read_table(file)
+    columns = []
+    categoryValues = []
+
+    for column in schema.COLUMNS:
+        if column.header not in source.column_names:
+            raise ValueError(f"{file} has no {column.header} column")
+
+        values = source.column(column.header).to_pylist()
+        kind = columnar.COLUMN_KINDS[column.index]
+
+        if kind == "date":
+            columns.append(array("i", (0 if value is None else value.toordinal() for value in values)))
+        elif kind == "int":
+            columns.append(array("i", (columnar.EMPTY_INT if value is None else value for value in values)))
+        elif kind == "float":
+            columns.append(array("d", (math.nan if value is None else value for value in values)))
+        else:
+            codes = {}
+            columns.append(array("I", (codes.setdefault("" if value is None else str(value), len(codes))
+                                       for value in values)))
+            categoryValues.append(list(codes))
+            continue
+
+        categoryValues.append(None)
+
+    return columnar.PipelineTable.fromState((columns, array("q", range(source.num_rows)), categoryValues))
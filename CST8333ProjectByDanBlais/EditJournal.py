@@ -0,0 +1,268 @@
+#This module defines an EditJournal object, which keeps a write-ahead log of the edits made to an opened csv file. Each
+#cell edit, row insert and row delete is appended to a journal file next to the csv file as a line of JSON, so the
+#edits made since the last save can be replayed onto the file after a crash. Lines are written and synced to disk on
+#a background thread in batches, so recording an edit costs only a list append. The journal also keeps the undo and
+#redo stacks of the edits. Docstring comments in reST style.
+
+#Author: Dan Blais - 040826486
+#Subject: CST8333
+
+import json
+import os
+import threading
+import time
+
+#Extension added to the path of a csv file to get the path of its journal.
+JOURNAL_EXTENSION = ".journal"
+#Seconds the writer thread waits after an edit for more edits before writing and syncing them together.
+SYNC_INTERVAL = 0.5
+#Version of the journal layout. Journals of another version are ignored.
+FORMAT_VERSION = 2
+
+class EditJournal:
+    '''
+    Defines the journal of the edits made to a csv file since it was loaded or last saved. An edit is a dictionary
+    with an "op" of "set", "insert" or "delete". A set holds the "position" of the row, the "column" index and the
+    "old" and "new" cell texts, while an insert or delete of a batch of rows holds the ascending "positions" of the
+    rows in the table holding them, and the "rowIds" and cell texts "values" of each row.
+
+    :attribute path: The path of the journal file.
+    :attribute _source: The state of the csv file the edits apply to, written in the first line of the journal.
+    :attribute _lines: A list of the lines logged since the journal was started or last saved.
+    :attribute _pending: A list of the lines not yet written to the journal file.
+    :attribute _lock: A lock guarding the pending lines and the journal file.
+    :attribute _wake: An event set when lines are pending.
+    :attribute _closed: Whether the journal is closed.
+    :attribute _undo: A list of the edits which can be undone, the last edit at the end.
+    :attribute _redo: A list of the undone edits which can be redone, the last undone edit at the end.
+    '''
+
+    def __init__(self, file, source):
+        '''
+        Initializes an EditJournal object and starts its writer thread. The journal file is created when the first
+        edit is written.
+
+        :param file: A string representing the path of the csv file.
+        :param source: A JSON compatible value identifying the state of the csv file, such as its size and
+                       modification time. A journal is only replayed onto a file in the same state.
+        '''
+        self.path = file + JOURNAL_EXTENSION
+        self._source = source
+        self._lines = []
+        self._pending = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._undo = []
+        self._redo = []
+
+        threading.Thread(target=self.writeLines, daemon=True).start()
+
+    def record(self, edit):
+        '''
+        Records an edit which was applied to the model, making it the next edit to undo and clearing the edits to redo.
+
+        :param edit: The edit, as a dictionary.
+        '''
+        self._undo.append(edit)
+        self._redo.clear()
+        self.log(edit)
+
+    def log(self, edit):
+        '''
+        Queues an edit to be appended to the journal file by the writer thread.
+
+        :param edit: The edit, as a dictionary.
+        '''
+        line = json.dumps(edit) + "\n"
+
+        with self._lock:
+            self._lines.append(line)
+            self._pending.append(line)
+        self._wake.set()
+
+    def restore(self, edits):
+        '''
+        Puts edits replayed from the journal file on the undo stack. They are not logged again.
+
+        :param edits: A list of the replayed edits, in the order they were made.
+        '''
+        self._undo.extend(edits)
+        self._lines.extend(json.dumps(edit) + "\n" for edit in edits)
+
+    def checkpoint(self):
+        '''
+        Marks the edits logged so far, such as when a save starts, so they can be dropped once the save is done.
+
+        :returns: The number of edits logged since the journal was started or last saved.
+        '''
+        return len(self._lines)
+
+    def nextUndo(self):
+        '''
+        Gets the edit which reverses the last edit, without taking it off the undo stack, so it can be applied to
+        the model before the undo is recorded by undo.
+
+        :returns: The edit which reverses the last edit, or None if there is nothing to undo.
+        '''
+        return inverseEdit(self._undo[-1]) if self._undo else None
+
+    def undo(self):
+        '''
+        Records the undo of the last edit once its inverse, as returned by nextUndo, was applied to the model. The
+        last edit is moved to the redo stack and the inverse edit is logged, so replaying the journal gives the
+        same rows as undoing.
+
+        :returns: The edit which reverses the last edit, or None if there is nothing to undo.
+        '''
+        if not self._undo:
+            return None
+
+        edit = self._undo.pop()
+        self._redo.append(edit)
+        inverse = inverseEdit(edit)
+        self.log(inverse)
+        return inverse
+
+    def nextRedo(self):
+        '''
+        Gets the last undone edit, without taking it off the redo stack, so it can be applied to the model before
+        the redo is recorded by redo.
+
+        :returns: The edit to be applied to the model again, or None if there is nothing to redo.
+        '''
+        return self._redo[-1] if self._redo else None
+
+    def redo(self):
+        '''
+        Records the redo of the last undone edit once it was applied to the model again, moving it back to the undo
+        stack and logging it again.
+
+        :returns: The redone edit, or None if there is nothing to redo.
+        '''
+        if not self._redo:
+            return None
+
+        edit = self._redo.pop()
+        self._undo.append(edit)
+        self.log(edit)
+        return edit
+
+    def writeLines(self):
+        '''
+        Writes the pending lines to the journal file and syncs it to disk, waiting SYNC_INTERVAL seconds after the
+        first pending line so that the edits made in between are synced together. Runs on the writer thread.
+        '''
+        while True:
+            self._wake.wait()
+
+            if not self._closed:
+                time.sleep(SYNC_INTERVAL)
+            self.sync()
+
+            if self._closed:
+                return
+
+    def sync(self):
+        '''
+        Writes the pending lines to the journal file and syncs it to disk. The first line of a new journal file
+        identifies the journal and the state of the csv file.
+        '''
+        with self._lock:
+            self._wake.clear()
+
+            if not self._pending:
+                return
+
+            try:
+                newFile = not os.path.exists(self.path)
+
+                with open(self.path, "a", encoding="utf-8") as journal:
+                    if newFile:
+                        journal.write(json.dumps({"version": FORMAT_VERSION, "source": self._source}) + "\n")
+                    journal.writelines(self._pending)
+                    journal.flush()
+                    os.fsync(journal.fileno())
+            except OSError as e:
+                print(f"Error: {e}")
+
+            self._pending.clear()
+
+    def discard(self, source, checkpoint):
+        '''
+        Drops the edits logged before a checkpoint once they are saved, rewriting the journal file with the edits
+        logged since, which apply to the saved file. The undo and redo stacks are kept.
+
+        :param source: The state of the saved csv file.
+        :param checkpoint: The number of edits which were saved, as returned by checkpoint when the save started.
+        '''
+        with self._lock:
+            self._lines = self._lines[checkpoint:]
+            self._pending = list(self._lines)
+            self._source = source
+
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"Error: {e}")
+
+        if self._pending:
+            self._wake.set()
+
+    def close(self):
+        '''
+        Writes the pending lines and stops the writer thread. The journal file is kept.
+        '''
+        self._closed = True
+        self._wake.set()
+        self.sync()
+
+def readJournal(file, source):
+    '''
+    Reads the edits of the journal of a csv file. A journal left for an earlier state of the file, or which cannot
+    be read, is removed, and a line cut short by a crash ends the edits.
+
+    :param file: A string representing the path of the csv file.
+    :param source: The current state of the csv file, as given to EditJournal.
+    :returns: A list of the edits, empty if there is no journal for the file in this state.
+    '''
+    path = file + JOURNAL_EXTENSION
+    edits = []
+
+    try:
+        with open(path, encoding="utf-8") as journal:
+            header = json.loads(journal.readline())
+
+            if header.get("version") != FORMAT_VERSION or header.get("source") != source:
+                raise ValueError("journal does not match the file")
+
+            for line in journal:
+                try:
+                    edits.append(json.loads(line))
+                except ValueError:
+                    break
+    except FileNotFoundError:
+        return []
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return []
+
+    return edits
+
+def inverseEdit(edit):
+    '''
+    Builds the edit which reverses an edit.
+
+    :param edit: The edit, as a dictionary.
+    :returns: The reversing edit, as a dictionary.
+    '''
+    if edit["op"] == "set":
+        return dict(edit, old=edit["new"], new=edit["old"])
+    return dict(edit, op="delete" if edit["op"] == "insert" else "insert")
@@ -0,0 +1,700 @@
+#This module parses and evaluates filter queries typed in the search box, such as
+#    Throughput > 50 and Product = "domestic heavy" and Date between 2015-01-01 and 2018-12-31
+#A query is parsed once into a tree of expressions, which is evaluated column by column over the typed arrays of a
+#PipelineTable into masks holding one byte per row, instead of converting every cell to text. Range predicates are
+#answered from the sorted order of their column when the table has been sorted by it. The rows of other tables, such
+#as a LazyPipelineTable, are tested one at a time on their values. Docstring comments in reST style.
+
+#Author: Dan Blais - 040826486
+#Subject: CST8333
+
+import itertools as it
+import math
+import re
+import sys
+import ColumnConverters as converters
+import ColumnSchema as schema
+import PipelineTable as columnar
+
+#A token of a query: a quoted text, an operator or parenthesis, or a word such as a column name, number or date.
+TOKEN_PATTERN = re.compile(r'\s*(?:"([^"]*)"|\'([^\']*)\'|(<=|>=|!=|<>|=|<|>|\(|\))|([^\s()<>=!"\']+))')
+
+#The words of the query language.
+KEYWORDS = ("and", "or", "not", "between", "contains")
+
+#The comparison operators, keyed by their text.
+OPERATORS = {"=": "=", "!=": "!=", "<>": "!=", "<": "<", "<=": "<=", ">": ">", ">=": ">="}
+
+#The method of the compared value which tests a cell for each comparison operator, with the cell as its argument.
+REFLECTED_METHODS = {"=": "__eq__", "!=": "__ne__", "<": "__gt__", "<=": "__ge__", ">": "__lt__", ">=": "__le__"}
+
+#Each column of the schema, keyed by its lowercase attribute name, table heading and csv header.
+COLUMN_LOOKUP = {label.lower(): column for column in schema.COLUMNS for label in (column.name, column.heading, column.header)}
+
+#The largest number of words in a column name.
+COLUMN_NAME_WORDS = max(len(label.split()) for label in COLUMN_LOOKUP)
+
+#A range predicate is answered from the sorted order of its column when it matches at most this fraction of the
+#rows, since marking each matching row costs more than scanning the column for large matches.
+INDEX_MATCH_FRACTION = 0.1
+
+class Comparison:
+    '''
+    Defines a comparison of the cells of a column with a value, such as Throughput > 50 or Product = condensate. Text
+    is compared ignoring case. Empty cells only match a comparison with an empty value, which can only be = or !=.
+
+    :attribute column: The Column of the schema being compared.
+    :attribute operator: The comparison operator: "=", "!=", "<", "<=", ">" or ">=".
+    :attribute value: The converted value compared with, or an empty string.
+    '''
+
+    def __init__(self, column, operator, value):
+        '''
+        Initializes a Comparison object.
+
+        :param column: The Column of the schema being compared.
+        :param operator: The comparison operator.
+        :param value: The converted value compared with, or an empty string.
+        '''
+        self.column = column
+        self.operator = operator
+        self.value = value
+
+    def mask(self, table, rowStart, rowEnd, sortIndex=None):
+        '''
+        Evaluates the comparison over a range of rows.
+
+        :param table: The PipelineTable holding the rows.
+        :param rowStart: The index of the first row.
+        :param rowEnd: The index after the last row.
+        :param sortIndex: An optional SortIndex of the table, used for range comparisons.
+        :returns: A bytes object holding 1 for each row of the range which matches and 0 for the others.
+        '''
+        columnIndex = self.column.index
+
+        if self.value == "":
+            empty = emptyMask(table, columnIndex, rowStart, rowEnd)
+            return empty if self.operator == "=" else notMask(empty)
+
+        if columnar.COLUMN_KINDS[columnIndex] == "category":
+            text = str(self.value).lower()
+            compare = getattr(text, REFLECTED_METHODS[self.operator])
+            return categoryMask(table, columnIndex, rowStart, rowEnd, lambda value: value != "" and compare(value.lower()))
+
+        stored = table.encoder(columnIndex)(self.value)
+
+        if self.operator != "!=":
+            bounds = {"=": (stored, stored, True, True), "<": (None, stored, True, False), "<=": (None, stored, True, True),
+                      ">": (stored, None, False, True), ">=": (stored, None, True, True)}[self.operator]
+            mask = indexedMask(sortIndex, columnIndex, rowStart, rowEnd, *bounds)
+
+            if mask is not None:
+                return mask
+
+        mask = bytes(map(getattr(stored, REFLECTED_METHODS[self.operator]), table.columnBuffer(columnIndex)[rowStart:rowEnd]))
+
+        if self.operator == "!=" or self.operator in ("<", "<=") and columnar.COLUMN_KINDS[columnIndex] != "float":
+            mask = andMasks([mask, notMask(emptyMask(table, columnIndex, rowStart, rowEnd))])
+        return mask
+
+    def matches(self, values):
+        '''
+        Tests the comparison on the values of a row.
+
+        :param values: The values of the row in column order, with empty cells as empty strings.
+        :returns: Whether the row matches.
+        '''
+        cell = values[self.column.index]
+
+        if self.value == "":
+            return (cell == "") == (self.operator == "=")
+
+        if cell == "":
+            return False
+
+        if columnar.COLUMN_KINDS[self.column.index] == "category":
+            return getattr(str(self.value).lower(), REFLECTED_METHODS[self.operator])(str(cell).lower())
+        return getattr(self.value, REFLECTED_METHODS[self.operator])(cell) is True
+
+class Between:
+    '''
+    Defines a test of whether the cells of a column lie in a range including its ends, such as
+    Date between 2015-01-01 and 2018-12-31. Empty cells never match.
+
+    :attribute column: The Column of the schema being tested.
+    :attribute low: The converted lowest value of the range.
+    :attribute high: The converted highest value of the range.
+    '''
+
+    def __init__(self, column, low, high):
+        '''
+        Initializes a Between object.
+
+        :param column: The Column of the schema being tested.
+        :param low: The converted lowest value of the range.
+        :param high: The converted highest value of the range.
+        '''
+        self.column = column
+        self.low = low
+        self.high = high
+
+    def mask(self, table, rowStart, rowEnd, sortIndex=None):
+        '''
+        Evaluates the test over a range of rows. Empty cells are stored below every value of date and int columns
+        and as NaN in float columns, so they fall outside the range without being looked for.
+
+        :param table: The PipelineTable holding the rows.
+        :param rowStart: The index of the first row.
+        :param rowEnd: The index after the last row.
+        :param sortIndex: An optional SortIndex of the table.
+        :returns: A bytes object holding 1 for each row of the range which matches and 0 for the others.
+        '''
+        columnIndex = self.column.index
+
+        if columnar.COLUMN_KINDS[columnIndex] == "category":
+            low, high = str(self.low).lower(), str(self.high).lower()
+            return categoryMask(table, columnIndex, rowStart, rowEnd, lambda value: value != "" and low <= value.lower() <= high)
+
+        encode = table.encoder(columnIndex)
+        low, high = encode(self.low), encode(self.high)
+        mask = indexedMask(sortIndex, columnIndex, rowStart, rowEnd, low, high, True, True)
+
+        if mask is not None:
+            return mask
+
+        values = table.columnBuffer(columnIndex)[rowStart:rowEnd]
+        masks = [bytes(map(low.__le__, values)), bytes(map(high.__ge__, values))]
+        kind = columnar.COLUMN_KINDS[columnIndex]
+
+        if kind != "float" and low <= (0 if kind == "date" else columnar.EMPTY_INT):
+            masks.append(notMask(emptyMask(table, columnIndex, rowStart, rowEnd)))
+        return andMasks(masks)
+
+    def matches(self, values):
+        '''
+        Tests the range on the values of a row.
+
+        :param values: The values of the row in column order, with empty cells as empty strings.
+        :returns: Whether the row matches.
+        '''
+        cell = values[self.column.index]
+
+        if cell == "":
+            return False
+
+        if columnar.COLUMN_KINDS[self.column.index] == "category":
+            return str(self.low).lower() <= str(cell).lower() <= str(self.high).lower()
+        return self.low <= cell <= self.high
+
+class Contains:
+    '''
+    Defines a test of whether the text of the cells of a column contains a text ignoring case, such as
+    Key Point contains manitoba.
+
+    :attribute column: The Column of the schema being tested.
+    :attribute text: The text looked for.
+    '''
+
+    def __init__(self, column, text):
+        '''
+        Initializes a Contains object.
+
+        :param column: The Column of the schema being tested.
+        :param text: The text looked for.
+        '''
+        self.column = column
+        self.text = text
+
+    def mask(self, table, rowStart, rowEnd, sortIndex=None):
+        '''
+        Evaluates the test over a range of rows. Numeric and date cells are tested on their text.
+
+        :param table: The PipelineTable holding the rows.
+        :param rowStart: The index of the first row.
+        :param rowEnd: The index after the last row.
+        :param sortIndex: Unused, as containment cannot use a sorted order.
+        :returns: A bytes object holding 1 for each row of the range which matches and 0 for the others.
+        '''
+        text = self.text.lower()
+        columnIndex = self.column.index
+
+        if columnar.COLUMN_KINDS[columnIndex] == "category":
+            return categoryMask(table, columnIndex, rowStart, rowEnd, lambda value: text in value.lower())
+
+        decode = table.decoder(columnIndex)
+        return bytes(text in str(decode(value)).lower() for value in table.columnBuffer(columnIndex)[rowStart:rowEnd])
+
+    def matches(self, values):
+        '''
+        Tests the containment on the values of a row.
+
+        :param values: The values of the row in column order, with empty cells as empty strings.
+        :returns: Whether the row matches.
+        '''
+        return self.text.lower() in str(values[self.column.index]).lower()
+
+class BooleanExpression:
+    '''
+    Defines a combination of expressions with and or or.
+
+    :attribute operator: "and" or "or".
+    :attribute operands: A list of the combined expressions.
+    '''
+
+    def __init__(self, operator, operands):
+        '''
+        Initializes a BooleanExpression object.
+
+        :param operator: "and" or "or".
+        :param operands: A list of the combined expressions.
+        '''
+        self.operator = operator
+        self.operands = operands
+
+    def mask(self, table, rowStart, rowEnd, sortIndex=None):
+        '''
+        Evaluates the operands over a range of rows and combines their masks.
+
+        :param table: The PipelineTable holding the rows.
+        :param rowStart: The index of the first row.
+        :param rowEnd: The index after the last row.
+        :param sortIndex: An optional SortIndex of the table.
+        :returns: A bytes object holding 1 for each row of the range which matches and 0 for the others.
+        '''
+        masks = [operand.mask(table, rowStart, rowEnd, sortIndex) for operand in self.operands]
+        return andMasks(masks) if self.operator == "and" else orMasks(masks)
+
+    def matches(self, values):
+        '''
+        Tests the operands on the values of a row, stopping at the first which decides the result.
+
+        :param values: The values of the row in column order, with empty cells as empty strings.
+        :returns: Whether the row matches.
+        '''
+        results = (operand.matches(values) for operand in self.operands)
+        return all(results) if self.operator == "and" else any(results)
+
+class Negation:
+    '''
+    Defines the negation of an expression with not.
+
+    :attribute operand: The negated expression.
+    '''
+
+    def __init__(self, operand):
+        '''
+        Initializes a Negation object.
+
+        :param operand: The negated expression.
+        '''
+        self.operand = operand
+
+    def mask(self, table, rowStart, rowEnd, sortIndex=None):
+        '''
+        Evaluates the negated expression over a range of rows.
+
+        :param table: The PipelineTable holding the rows.
+        :param rowStart: The index of the first row.
+        :param rowEnd: The index after the last row.
+        :param sortIndex: An optional SortIndex of the table.
+        :returns: A bytes object holding 1 for each row of the range which matches and 0 for the others.
+        '''
+        return notMask(self.operand.mask(table, rowStart, rowEnd, sortIndex))
+
+    def matches(self, values):
+        '''
+        Tests the negated expression on the values of a row.
+
+        :param values: The values of the row in column order, with empty cells as empty strings.
+        :returns: Whether the row matches.
+        '''
+        return not self.operand.matches(values)
+
+class QueryParser:
+    '''
+    Defines a recursive descent parser of filter queries. "not" binds tighter than "and", which binds tighter than
+    "or", and parentheses group expressions. A value is a quoted text, or the words up to the next keyword or
+    parenthesis.
+
+    :attribute _tokens: A list of the tokens of the query, as tuples of a kind and a text.
+    :attribute _position: The index of the next token to read.
+    '''
+
+    def __init__(self, text):
+        '''
+        Initializes a QueryParser object, splitting the query into tokens.
+
+        :param text: The text of the query.
+        :raises ValueError: If the query holds an unmatched quote.
+        '''
+        self._tokens = []
+        self._position = 0
+        position = 0
+        text = text.rstrip()
+
+        while position < len(text):
+            match = TOKEN_PATTERN.match(text, position)
+
+            if not match or match.end() == position:
+                raise ValueError("unmatched quote in query")
+
+            doubleQuoted, singleQuoted, symbol, word = match.groups()
+
+            if symbol is not None:
+                self._tokens.append(("symbol", symbol))
+            elif word is not None:
+                self._tokens.append(("word", word))
+            else:
+                self._tokens.append(("text", doubleQuoted if doubleQuoted is not None else singleQuoted))
+            position = match.end()
+
+    def parse(self):
+        '''
+        Parses the whole query.
+
+        :returns: The expression tree of the query.
+        :raises ValueError: If the query is not a valid filter query.
+        '''
+        expression = self.parseOr()
+
+        if self._position < len(self._tokens):
+            raise ValueError(f"unexpected {self._tokens[self._position][1]!r} in query")
+        return expression
+
+    def startsPredicate(self):
+        '''
+        Tells whether the query starts as a filter query: with a column name followed by an operator, between or
+        contains, after any not or opening parentheses. The tokens are not read.
+
+        :returns: Whether the query starts with a predicate.
+        '''
+        position = self._position
+
+        try:
+            while self.acceptKeyword("not") or self.peek() == ("symbol", "("):
+                if self.peek() == ("symbol", "("):
+                    self._position += 1
+            self.parseColumn()
+            token = self.peek()
+            return token is not None and (token[0] == "symbol" and token[1] in OPERATORS or
+                                          token[0] == "word" and token[1].lower() in ("between", "contains"))
+        except ValueError:
+            return False
+        finally:
+            self._position = position
+
+    def peek(self):
+        '''
+        Gets the next token without reading it.
+
+        :returns: A tuple of the kind and text of the token, or None at the end of the query.
+        '''
+        return self._tokens[self._position] if self._position < len(self._tokens) else None
+
+    def acceptKeyword(self, keyword):
+        '''
+        Reads the next token if it is a keyword.
+
+        :param keyword: The lowercase keyword.
+        :returns: Whether the token was read.
+        '''
+        token = self.peek()
+
+        if token is not None and token[0] == "word" and token[1].lower() == keyword:
+            self._position += 1
+            return True
+        return False
+
+    def parseOr(self):
+        '''
+        Parses expressions joined by or.
+
+        :returns: The expression.
+        '''
+        operands = [self.parseAnd()]
+
+        while self.acceptKeyword("or"):
+            operands.append(self.parseAnd())
+        return operands[0] if len(operands) == 1 else BooleanExpression("or", operands)
+
+    def parseAnd(self):
+        '''
+        Parses expressions joined by and.
+
+        :returns: The expression.
+        '''
+        operands = [self.parseNot()]
+
+        while self.acceptKeyword("and"):
+            operands.append(self.parseNot())
+        return operands[0] if len(operands) == 1 else BooleanExpression("and", operands)
+
+    def parseNot(self):
+        '''
+        Parses an expression which may be negated with not, or grouped in parentheses.
+
+        :returns: The expression.
+        :raises ValueError: If the expression is not valid.
+        '''
+        if self.acceptKeyword("not"):
+            return Negation(self.parseNot())
+
+        if self.peek() == ("symbol", "("):
+            self._position += 1
+            expression = self.parseOr()
+
+            if self.peek() != ("symbol", ")"):
+                raise ValueError("missing ) in query")
+            self._position += 1
+            return expression
+
+        return self.parsePredicate()
+
+    def parsePredicate(self):
+        '''
+        Parses a comparison, between or contains test of a column.
+
+        :returns: The expression.
+        :raises ValueError: If the predicate is not valid or a value cannot be converted to the type of the column.
+        '''
+        column = self.parseColumn()
+        token = self.peek()
+
+        if token is not None and token[0] == "symbol" and token[1] in OPERATORS:
+            self._position += 1
+            operator = OPERATORS[token[1]]
+            value = self.parseValue(column)
+
+            if value == "" and operator not in ("=", "!="):
+                raise ValueError("an empty value can only be compared with = or !=")
+            return Comparison(column, operator, value)
+
+        if self.acceptKeyword("between"):
+            low = self.parseValue(column)
+
+            if not self.acceptKeyword("and"):
+                raise ValueError("missing and after between")
+            high = self.parseValue(column)
+
+            if low == "" or high == "":
+                raise ValueError("between needs two values")
+            return Between(column, low, high)
+
+        if self.acceptKeyword("contains"):
+            return Contains(column, self.parseText())
+
+        raise ValueError(f"missing operator after {column.heading}")
+
+    def parseColumn(self):
+        '''
+        Parses a column name, the longest run of words naming a column by its attribute name, heading or header,
+        ignoring case.
+
+        :returns: The Column of the schema.
+        :raises ValueError: If the words do not name a column.
+        '''
+        for wordCount in range(COLUMN_NAME_WORDS, 0, -1):
+            tokens = self._tokens[self._position:self._position + wordCount]
+
+            if len(tokens) == wordCount and all(kind == "word" for kind, text in tokens):
+                column = COLUMN_LOOKUP.get(" ".join(text for kind, text in tokens).lower())
+
+                if column is not None:
+                    self._position += wordCount
+                    return column
+
+        raise ValueError("query does not start with a column name")
+
+    def parseText(self):
+        '''
+        Parses a value as text: a quoted text, or the words up to the next keyword, operator or parenthesis.
+
+        :returns: The text, which may be empty.
+        '''
+        token = self.peek()
+
+        if token is not None and token[0] == "text":
+            self._position += 1
+            return token[1]
+
+        words = []
+
+        while True:
+            token = self.peek()
+
+            if token is None or token[0] != "word" or token[1].lower() in KEYWORDS:
+                return " ".join(words)
+            words.append(token[1])
+            self._position += 1
+
+    def parseValue(self, column):
+        '''
+        Parses a value and converts it to the type of a column.
+
+        :param column: The Column of the schema the value is compared with.
+        :returns: The converted value, or an empty string for an empty value.
+        :raises ValueError: If the value cannot be converted to the type of the column, or is a whole number too
+                            large to be stored in it.
+        '''
+        value = column.convert(self.parseText())
+
+        if column.kind == "int" and value != "":
+            converters.storedInt(value)
+        return value
+
+def parseQuery(text):
+    '''
+    Parses a filter query into a tree of expressions.
+
+    :param text: The text of the query.
+    :returns: The expression tree of the query.
+    :raises ValueError: If the text is not a valid filter query.
+    '''
+    return QueryParser(text).parse()
+
+def parseSearch(text):
+    '''
+    Parses the text of a search as a filter query when it starts as one, with a column name followed by an operator,
+    between or contains. Any other text is searched for as text.
+
+    :param text: The text of the search.
+    :returns: The expression tree of the query, or None if the text is searched for as text.
+    :raises ValueError: If the text starts as a filter query but is not a valid one, such as when a value cannot be
+                        converted to the type of its column.
+    '''
+    try:
+        parser = QueryParser(text)
+    except ValueError:
+        quote = min(text.index(quote) for quote in "\"'" if quote in text)
+
+        if QueryParser(text[:quote] + "''").startsPredicate():
+            raise
+        return None
+
+    return parser.parse() if parser.startsPredicate() else None
+
+def matchingRows(expression, table, rowStart, rowEnd, sortIndex=None):
+    '''
+    Finds the rows of a range of a table which match a filter query. The rows of a PipelineTable are evaluated column
+    by column into masks, and the rows of other tables, such as a LazyPipelineTable, one at a time on their values.
+
+    :param expression: The expression tree of the query, as returned by parseQuery.
+    :param table: The table holding the rows.
+    :param rowStart: The index of the first row.
+    :param rowEnd: The index after the last row.
+    :param sortIndex: An optional SortIndex of the table, whose computed sort orders answer range predicates.
+    :returns: A set of the indexes of the matching rows.
+    '''
+    if rowEnd <= rowStart:
+        return set()
+
+    if not isinstance(table, columnar.PipelineTable):
+        return {position for position in range(rowStart, rowEnd) if expression.matches(table.rowValues(position))}
+    return set(it.compress(range(rowStart, rowEnd), expression.mask(table, rowStart, rowEnd, sortIndex)))
+
+def andMasks(masks):
+    '''
+    Combines masks so that a row matches if it matches every mask. The masks are combined as integers, a whole
+    mask at a time.
+
+    :param masks: A list of masks of the same length.
+    :returns: The combined mask.
+    '''
+    combined = int.from_bytes(masks[0], "little")
+
+    for mask in masks[1:]:
+        combined &= int.from_bytes(mask, "little")
+    return combined.to_bytes(len(masks[0]), "little")
+
+def orMasks(masks):
+    '''
+    Combines masks so that a row matches if it matches any mask.
+
+    :param masks: A list of masks of the same length.
+    :returns: The combined mask.
+    '''
+    combined = int.from_bytes(masks[0], "little")
+
+    for mask in masks[1:]:
+        combined |= int.from_bytes(mask, "little")
+    return combined.to_bytes(len(masks[0]), "little")
+
+def notMask(mask):
+    '''
+    Inverts a mask.
+
+    :param mask: The mask.
+    :returns: A mask matching the rows the given mask does not match.
+    '''
+    return mask.translate(bytes([1, 0]) + bytes(254))
+
+def emptyMask(table, columnIndex, rowStart, rowEnd):
+    '''
+    Finds the empty cells of a column over a range of rows.
+
+    :param table: The PipelineTable holding the rows.
+    :param columnIndex: The index of the column.
+    :param rowStart: The index of the first row.
+    :param rowEnd: The index after the last row.
+    :returns: A mask holding 1 for each empty cell.
+    '''
+    kind = columnar.COLUMN_KINDS[columnIndex]
+
+    if kind == "category":
+        return categoryMask(table, columnIndex, rowStart, rowEnd, lambda value: value == "")
+
+    values = table.columnBuffer(columnIndex)[rowStart:rowEnd]
+
+    if kind == "float":
+        return bytes(map(math.isnan, values))
+    return bytes(map((0 if kind == "date" else columnar.EMPTY_INT).__eq__, values))
+
+def categoryMask(table, columnIndex, rowStart, rowEnd, test):
+    '''
+    Evaluates a test of the text of a category column over a range of rows. The test is run once per distinct
+    text, and the rows are then mapped through the results by their codes. When there are at most 256 distinct
+    texts, the low byte of each code is translated to its result in one pass.
+
+    :param table: The PipelineTable holding the rows.
+    :param columnIndex: The index of the category column.
+    :param rowStart: The index of the first row.
+    :param rowEnd: The index after the last row.
+    :param test: A function taking a text and returning whether it matches.
+    :returns: A mask holding 1 for each row whose text matches.
+    '''
+    results = bytes(map(test, table.categoryValues(columnIndex)))
+    codes = table.columnBuffer(columnIndex)[rowStart:rowEnd]
+
+    if len(results) <= 256 and sys.byteorder == "little":
+        return codes.tobytes()[::codes.itemsize].translate(results.ljust(256, b"\0"))
+    return bytes(map(results.__getitem__, codes))
+
+def indexedMask(sortIndex, columnIndex, rowStart, rowEnd, low, high, lowInclusive, highInclusive):
+    '''
+    Answers a range predicate from the sorted order of its column, when the order is already computed and the
+    predicate matches at most INDEX_MATCH_FRACTION of the rows.
+
+    :param sortIndex: The SortIndex of the table, or None.
+    :param columnIndex: The index of the column.
+    :param rowStart: The index of the first row.
+    :param rowEnd: The index after the last row.
+    :param low: The stored lowest value of the range, or None for no lowest value.
+    :param high: The stored highest value of the range, or None for no highest value.
+    :param lowInclusive: Whether the lowest value matches.
+    :param highInclusive: Whether the highest value matches.
+    :returns: A mask holding 1 for each matching row, or None if the column must be scanned.
+    '''
+    if sortIndex is None:
+        return None
+
+    positions = sortIndex.rangePositions(columnIndex, low, high, lowInclusive, highInclusive)
+
+    if positions is None or len(positions) > INDEX_MATCH_FRACTION * len(sortIndex.table):
+        return None
+
+    mask = bytearray(rowEnd - rowStart)
+
+    for position in positions:
+        if rowStart <= position < rowEnd:
+            mask[position - rowStart] = 1
+    return bytes(mask)
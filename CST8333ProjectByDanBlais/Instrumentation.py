@@ -0,0 +1,296 @@
+#This module defines the opt-in instrumentation of the program. Controller methods decorated by timed record their call
+#count, a histogram of their latency and the number of rows they processed, and every call is kept in a ring buffer of
+#the most recent calls. The stalls of the Tk event loop are measured by a heartbeat which records how late each of its
+#callbacks runs; only the stalls long enough to be noticed are also kept in the ring buffer. The statistics are shown by
+#View > Performance Statistics and can be saved as JSON or csv for offline analysis. Recording is turned on by the
+#PIPELINE_INSTRUMENT environment variable, and is decided when the program starts: while it is off, timed returns the
+#methods undecorated so they run without any overhead. The PIPELINE_PROFILE environment variable names a file to write a
+#cProfile capture of the whole session to.
+#Docstring comments in reST style.
+
+#Author: Dan Blais - 040826486
+#Subject: CST8333
+
+import bisect
+import collections
+import csv
+import functools
+import json
+import os
+import threading
+import time
+
+#Environment variable which turns the instrumentation on when set to 1, on, true or yes.
+INSTRUMENT_VARIABLE = "PIPELINE_INSTRUMENT"
+#Environment variable giving the file a cProfile capture of the session is written to.
+PROFILE_VARIABLE = "PIPELINE_PROFILE"
+#Number of the most recent calls kept in the ring buffer.
+EVENT_BUFFER_SIZE = 4096
+#Upper bounds in seconds of the buckets of the latency histograms. Longer calls fall in a last, unbounded bucket.
+LATENCY_BOUNDS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0)
+#Milliseconds between the heartbeats measuring the stalls of the Tk event loop.
+HEARTBEAT_INTERVAL = 50
+#The name the stalls of the Tk event loop are recorded under.
+STALL_NAME = "eventLoopStall"
+#Heartbeats running at least this many seconds late are also kept in the ring buffer of recent calls, so the steady
+#heartbeats of an idle window do not push the controller calls out of it.
+STALL_EVENT_SECONDS = 0.1
+#The columns of a csv dump of the statistics, in order.
+SUMMARY_COLUMNS = ("name", "count", "rows", "meanMs", "p50Ms", "p95Ms", "maxMs", "totalMs")
+
+class OperationStats:
+    '''
+    Defines the statistics of the calls of one operation.
+
+    :attribute name: The name of the operation.
+    :attribute count: The number of calls.
+    :attribute rows: The number of rows processed by the calls reporting rows.
+    :attribute totalSeconds: The total latency of the calls in seconds.
+    :attribute maxSeconds: The longest latency in seconds.
+    :attribute histogram: A list of the number of calls per bucket of LATENCY_BOUNDS, followed by the number of
+                          longer calls.
+    '''
+    __slots__ = ("name", "count", "rows", "totalSeconds", "maxSeconds", "histogram")
+
+    def __init__(self, name):
+        '''
+        Initializes an OperationStats object with no calls.
+
+        :param name: The name of the operation.
+        '''
+        self.name = name
+        self.count = 0
+        self.rows = 0
+        self.totalSeconds = 0.0
+        self.maxSeconds = 0.0
+        self.histogram = [0] * (len(LATENCY_BOUNDS) + 1)
+
+    def add(self, seconds, rows=None):
+        '''
+        Adds a call to the statistics.
+
+        :param seconds: The latency of the call in seconds.
+        :param rows: The number of rows processed by the call, or None if the call does not report rows.
+        '''
+        self.count += 1
+        self.totalSeconds += seconds
+        self.maxSeconds = max(self.maxSeconds, seconds)
+        self.histogram[bisect.bisect_left(LATENCY_BOUNDS, seconds)] += 1
+
+        if rows is not None:
+            self.rows += rows
+
+    def percentile(self, fraction):
+        '''
+        Estimates a percentile of the latency as the upper bound of the histogram bucket holding it.
+
+        :param fraction: The fraction of calls at or below the percentile, such as 0.95.
+        :returns: The estimated latency in seconds, or 0.0 if there are no calls.
+        '''
+        if not self.count:
+            return 0.0
+
+        target = fraction * self.count
+        seen = 0
+
+        for bucket, calls in enumerate(self.histogram):
+            seen += calls
+
+            if calls and seen >= target:
+                return min(LATENCY_BOUNDS[bucket], self.maxSeconds) if bucket < len(LATENCY_BOUNDS) else self.maxSeconds
+
+        return self.maxSeconds
+
+    def summary(self):
+        '''
+        Gets the statistics as a dictionary, with latencies in milliseconds.
+
+        :returns: A dictionary holding the values of SUMMARY_COLUMNS and the histogram.
+        '''
+        mean = self.totalSeconds / self.count if self.count else 0.0
+        return {"name": self.name, "count": self.count, "rows": self.rows, "meanMs": mean * 1000,
+                "p50Ms": self.percentile(0.5) * 1000, "p95Ms": self.percentile(0.95) * 1000,
+                "maxMs": self.maxSeconds * 1000, "totalMs": self.totalSeconds * 1000,
+                "histogram": dict(zip([f"<={bound * 1000:g}ms" for bound in LATENCY_BOUNDS] + ["longer"],
+                                      self.histogram))}
+
+class Recorder:
+    '''
+    Defines the recorder of the calls of the instrumented operations. Calls may be recorded from any thread.
+
+    :attribute enabled: Whether calls are recorded.
+    :attribute events: A deque of the most recent calls, each a tuple of the name, the start time from
+                       time.perf_counter, the latency in seconds and the rows processed or None.
+    :attribute stats: A dictionary of the OperationStats of each operation, by name.
+    :attribute _lock: The lock guarding the statistics.
+    :attribute _heartbeat: The time the next heartbeat of the Tk event loop is due, or None if the loop is not watched.
+    '''
+
+    def __init__(self, enabled=None):
+        '''
+        Initializes a Recorder object.
+
+        :param enabled: Whether calls are recorded. Defaults to off unless the PIPELINE_INSTRUMENT environment variable
+                        turns the instrumentation on.
+        '''
+        if enabled is None:
+            enabled = os.environ.get(INSTRUMENT_VARIABLE, "").strip().lower() in ("1", "on", "true", "yes")
+        self.enabled = enabled
+        self.events = collections.deque(maxlen=EVENT_BUFFER_SIZE)
+        self.stats = {}
+        self._lock = threading.Lock()
+        self._heartbeat = None
+
+    def record(self, name, start, seconds, rows=None, keepEvent=True):
+        '''
+        Records a call of an operation.
+
+        :param name: The name of the operation.
+        :param start: The time the call started, from time.perf_counter.
+        :param seconds: The latency of the call in seconds.
+        :param rows: The number of rows processed by the call, or None if the call does not report rows.
+        :param keepEvent: Whether the call is also kept in the ring buffer of recent calls.
+        '''
+        if keepEvent:
+            self.events.append((name, start, seconds, rows))
+
+        with self._lock:
+            if name not in self.stats:
+                self.stats[name] = OperationStats(name)
+            self.stats[name].add(seconds, rows)
+
+    def timed(self, name=None, rows=None):
+        '''
+        Builds a decorator recording every call of a function, including calls which raise an exception, whose rows
+        are not counted. While the recorder is disabled, the decorator returns the function itself, so it runs without
+        any overhead.
+
+        :param name: The name the calls are recorded under. Defaults to the name of the function.
+        :param rows: An optional function called with the result of the call followed by the positional arguments of
+                     the call, returning the number of rows the call processed.
+        :returns: The decorator.
+        '''
+        def decorator(function):
+            if not self.enabled:
+                return function
+
+            operationName = name or function.__name__
+
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                rowCount = None
+
+                try:
+                    result = function(*args, **kwargs)
+
+                    if rows is not None:
+                        rowCount = rows(result, *args)
+                    return result
+                finally:
+                    self.record(operationName, start, time.perf_counter() - start, rowCount)
+            return wrapper
+        return decorator
+
+    def watchEventLoop(self, root, interval=HEARTBEAT_INTERVAL):
+        '''
+        Starts a heartbeat on the Tk event loop, recording under STALL_NAME how late each heartbeat runs. A heartbeat
+        runs late by as long as the callbacks run before it kept the loop busy. Only heartbeats at least
+        STALL_EVENT_SECONDS late are kept in the ring buffer of recent calls. Does nothing while the recorder is
+        disabled.
+
+        :param root: The Tk root window.
+        :param interval: The milliseconds between heartbeats.
+        '''
+        if not self.enabled:
+            return
+
+        def beat():
+            now = time.perf_counter()
+            late = max(0.0, now - self._heartbeat)
+            self.record(STALL_NAME, self._heartbeat, late, keepEvent=late >= STALL_EVENT_SECONDS)
+            self._heartbeat = now + interval / 1000
+            root.after(interval, beat)
+
+        self._heartbeat = time.perf_counter() + interval / 1000
+        root.after(interval, beat)
+
+    def summaries(self):
+        '''
+        Gets the statistics of every operation, ordered by name.
+
+        :returns: A list of the summary dictionary of each operation.
+        '''
+        with self._lock:
+            return [self.stats[name].summary() for name in sorted(self.stats)]
+
+    def dumpJSON(self, file):
+        '''
+        Writes the statistics and the recent calls to a JSON file.
+
+        :param file: A string representing the path of the file.
+        :raises OSError: If the file cannot be written.
+        '''
+        events = [{"name": name, "start": start, "ms": seconds * 1000, "rows": rows}
+                  for name, start, seconds, rows in list(self.events)]
+
+        with open(file, "w") as output:
+            json.dump({"operations": self.summaries(), "events": events}, output, indent=2)
+
+    def dumpCSV(self, file):
+        '''
+        Writes the statistics to a csv file, one row per operation.
+
+        :param file: A string representing the path of the file.
+        :raises OSError: If the file cannot be written.
+        '''
+        with open(file, "w", newline="") as output:
+            writer = csv.writer(output)
+            writer.writerow(SUMMARY_COLUMNS)
+
+            for summary in self.summaries():
+                writer.writerow([summary[column] for column in SUMMARY_COLUMNS])
+
+    def clear(self):
+        '''
+        Drops every recorded call.
+        '''
+        with self._lock:
+            self.events.clear()
+            self.stats.clear()
+
+#The recorder of the program, shared by every instrumented method.
+RECORDER = Recorder()
+
+def timed(name=None, rows=None):
+    '''
+    Builds a decorator recording every call of a function with the recorder of the program.
+
+    :param name: The name the calls are recorded under. Defaults to the name of the function.
+    :param rows: An optional function called with the result of the call followed by the positional arguments of the
+                 call, returning the number of rows the call processed.
+    :returns: The decorator.
+    '''
+    return RECORDER.timed(name, rows)
+
+def runProfiled(function):
+    '''
+    Runs a function, such as the Tk main loop, under cProfile when the PIPELINE_PROFILE environment variable names a
+    file, then writes the capture to that file. It can be read with python -m pstats.
+
+    :param function: The function to run.
+    :returns: The result of the function.
+    '''
+    file = os.environ.get(PROFILE_VARIABLE)
+
+    if not file:
+        return function()
+
+    import cProfile
+    profile = cProfile.Profile()
+
+    try:
+        return profile.runcall(function)
+    finally:
+        profile.dump_stats(file)
+        print(f"Wrote the profile of the session to {file}")
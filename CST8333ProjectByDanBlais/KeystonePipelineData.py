@@ -1,6 +1,7 @@
 #This module defines a PipelineData object, which represents a row of data in the Pipeline Throughput
 #and Capacity Data datset, provided by the Government of Canada. This project makes use of the CSV library 
-#and the DateTime library. Docstring comments in reST style. 
+#and the DateTime library. Values are stored typed, coerced with the column converters when they are set, and the
+#attributes are kept in slots rather than an instance dictionary. Docstring comments in reST style. 
 
 #Author: Dan Blais - 040826486
 #Subject: CST8333
@@ -10,7 +11,41 @@
 # [1] Government of Canada, Pipeline Throughput and Capacity Data open.canada.ca, 2023. [Online]. 
 # Available: https://open.canada.ca/data/en/dataset/dc343c43-a592-4a27-8ee7-c77df56afb34. [Accessed: 18 Sep. 2024].
 
-from datetime import datetime
+from datetime import date, datetime
+import ColumnConverters as converters
+
+def coerceDate(value):
+    '''
+    Coerces a value to a date.
+
+    :param value: A date, or the text of a date in the format 'YYYY-MM-DD'.
+    :returns: The date, or an empty string for an empty value.
+    :raises ValueError: If the text is not a date in the format 'YYYY-MM-DD'.
+    :raises TypeError: If the value is neither a date nor text.
+    '''
+    if isinstance(value, date):
+        return value
+    return converters.parseDate(value)
+
+def coerceInt(value):
+    '''
+    Coerces a value to a whole number.
+
+    :param value: A number, or its text.
+    :returns: The int, or an empty string for an empty value.
+    :raises ValueError: If the text is not a whole number.
+    '''
+    return converters.parseInt(value) if isinstance(value, str) else int(value)
+
+def coerceFloat(value):
+    '''
+    Coerces a value to a decimal number.
+
+    :param value: A number, or its text.
+    :returns: The float, or an empty string for an empty value.
+    :raises ValueError: If the text is not a number.
+    '''
+    return converters.parseFloat(value) if isinstance(value, str) else float(value)
 
 class PipelineData:
     '''
@@ -36,12 +71,17 @@ class PipelineData:
     :attribute availableCapacity: Remaining capacity for the pipeline. 
     :attribute reasonForVariance: Reasons for variance in capacity or flow. 
     '''
+
+    __slots__ = ("_date", "_month", "_year", "_company", "_pipeline", "_keyPoint", "_latitude", "_longitude",
+                 "_directionOfFlow", "_tradeType", "_product", "_throughput", "_committedVolumes", "_uncommittedVolumes",
+                 "_nameplateCapacity", "_availableCapacity", "_reasonForVariance")
        
     def __init__(self, date : datetime, month : int, year : int, company, pipeline, keyPoint, latitude : float, longitude : float,
                  directionOfFlow, tradeType, product, throughput : float, committedVolumes : float, uncommittedVolumes : float,
                  nameplateCapacity : float, availableCapacity : float, reasonForVariance):
         '''
-        Initializes a PipelineData object.
+        Initializes a PipelineData object. The values may be typed or given as text, and are coerced to the type
+        of their column. An empty string is kept for an empty value.
         
         :param self: A reference to a PipelineData object.
         :param date: The date of a PipelineData object.
@@ -61,23 +101,24 @@ class PipelineData:
         :param nameplateCapacity: Total capacity for the pipeline.
         :param availableCapacity: Remaining capacity for the pipeline. 
         :param reasonForVariance: Reasons for variance in capacity or flow. 
+        :raises ValueError: If a value cannot be coerced to the type of its column.
         '''
-        self._date = date
-        self._month = month
-        self._year = year
+        self._date = coerceDate(date)
+        self._month = coerceInt(month)
+        self._year = coerceInt(year)
         self._company = company
         self._pipeline = pipeline
         self._keyPoint = keyPoint
-        self._latitude = latitude
-        self._longitude = longitude
+        self._latitude = coerceFloat(latitude)
+        self._longitude = coerceFloat(longitude)
         self._directionOfFlow = directionOfFlow
         self._tradeType = tradeType
         self._product = product
-        self._throughput = throughput
-        self._committedVolumes = committedVolumes
-        self._uncommittedVolumes = uncommittedVolumes
-        self._nameplateCapacity = nameplateCapacity
-        self._availableCapacity = availableCapacity
+        self._throughput = coerceFloat(throughput)
+        self._committedVolumes = coerceFloat(committedVolumes)
+        self._uncommittedVolumes = coerceFloat(uncommittedVolumes)
+        self._nameplateCapacity = coerceFloat(nameplateCapacity)
+        self._availableCapacity = coerceFloat(availableCapacity)
         self._reasonForVariance = reasonForVariance
         
     @property
@@ -89,11 +130,10 @@ class PipelineData:
     def date(self, newDate):
         '''Sets the date of the pipeline data.
         
-        :param newDate: New date in the format 'YYYY-MM-DD'.
+        :param newDate: New date, or its text in the format 'YYYY-MM-DD'.
         '''
         try:
-            datetime.strptime(newDate, '%Y-%m-%d').date()
-            self._date = newDate.date()
+            self._date = coerceDate(newDate)
         except Exception as e:
             print(f"Error: {e}") 
 
@@ -111,11 +151,10 @@ class PipelineData:
     def month(self, newMonth):
         '''Sets the month of the pipeline data.
         
-        :param newMonth: New month as an integer.
+        :param newMonth: New month as an integer, or its text.
         '''
         try:
-            int(newMonth)
-            self._month = newMonth
+            self._month = coerceInt(newMonth)
         except Exception as e:
             print(f"Error: {e}")   
 
@@ -133,11 +172,10 @@ class PipelineData:
     def year(self, newYear):
         '''Sets the year of the pipeline data.
         
-        :param newYear: New year as an integer.
+        :param newYear: New year as an integer, or its text.
         '''
         try:
-            int(newYear)
-            self._year = newYear
+            self._year = coerceInt(newYear)
         except Exception as e:
             print(f"Error: {e}") 
         
@@ -209,11 +247,10 @@ class PipelineData:
     def latitude(self, newLatitude):
         '''Sets the latitude of the pipeline.
         
-        :param newLatitude: New latitude as a float.
+        :param newLatitude: New latitude as a float, or its text.
         '''
         try:
-            float(newLatitude)
-            self._latitude = newLatitude
+            self._latitude = coerceFloat(newLatitude)
         except Exception as e:
             print(f"Error: {e}")
 
@@ -231,11 +268,10 @@ class PipelineData:
     def longitude(self, newLongitude):
         '''Sets the longitude of the pipeline.
         
-        :param newLongitude: New longitude as a float.
+        :param newLongitude: New longitude as a float, or its text.
         '''
         try:
-            float(newLongitude)
-            self._longitude = newLongitude
+            self._longitude = coerceFloat(newLongitude)
         except Exception as e:
             print(f"Error: {e}")
 
@@ -307,11 +343,10 @@ class PipelineData:
     def throughput(self, newThroughput):
         '''Sets the throughput of the pipeline.
         
-        :param newThroughput: New throughput as a float.
+        :param newThroughput: New throughput as a float, or its text.
         '''
         try:
-            float(newThroughput)
-            self._throughput = newThroughput
+            self._throughput = coerceFloat(newThroughput)
         except Exception as e:
             print(f"Error: {e}")
 
@@ -329,11 +364,10 @@ class PipelineData:
     def committedVolumes(self, newCommittedVolumes):
         '''Sets the committed volumes of the pipeline.
         
-        :param newCommittedVolumes: New committed volumes as a float.
+        :param newCommittedVolumes: New committed volumes as a float, or its text.
         '''
         try:
-            float(newCommittedVolumes)
-            self._committedVolumes = newCommittedVolumes
+            self._committedVolumes = coerceFloat(newCommittedVolumes)
         except Exception as e:
             print(f"Error: {e}")
 
@@ -351,11 +385,10 @@ class PipelineData:
     def uncommittedVolumes(self, newUncommittedVolumes):
         '''Sets the uncommitted volumes of the pipeline.
         
-        :param newUncommittedVolumes: New uncommitted volumes as a float.
+        :param newUncommittedVolumes: New uncommitted volumes as a float, or its text.
         '''
         try:
-            float(newUncommittedVolumes)
-            self._uncommittedVolumes = newUncommittedVolumes
+            self._uncommittedVolumes = coerceFloat(newUncommittedVolumes)
         except Exception as e:
             print(f"Error: {e}")
 
@@ -373,11 +406,10 @@ class PipelineData:
     def nameplateCapacity(self, newNameplateCapacity):
         '''Sets the nameplate capacity of the pipeline.
         
-        :param newNameplateCapacity: New nameplate capacity as a float.
+        :param newNameplateCapacity: New nameplate capacity as a float, or its text.
         '''
         try:
-            float(newNameplateCapacity)
-            self._nameplateCapacity = newNameplateCapacity
+            self._nameplateCapacity = coerceFloat(newNameplateCapacity)
         except Exception as e:
             print(f"Error: {e}")
 
@@ -395,11 +427,10 @@ class PipelineData:
     def availableCapacity(self, newAvailableCapacity):
         '''Sets the available capacity of the pipeline.
         
-        :param newAvailableCapacity: New available capacity as a float.
+        :param newAvailableCapacity: New available capacity as a float, or its text.
         '''
         try:
-            float(newAvailableCapacity)
-            self._availableCapacity = newAvailableCapacity
+            self._availableCapacity = coerceFloat(newAvailableCapacity)
         except Exception as e:
             print(f"Error: {e}")
 
@@ -426,6 +457,50 @@ class PipelineData:
         '''Deletes the reason for variance of the pipeline.'''
         del self._reasonForVariance
 
+    @classmethod
+    def fromRow(cls, row):
+        '''
+        Builds a PipelineData object from the cells of a csv row, converting each cell to the type of its column
+        and storing the values straight into the slots, without going through the constructor or the setters.
+
+        :param row: A sequence of the cell texts of the row, in CSV column order.
+        :returns: A PipelineData object.
+        :raises ValueError: If a cell cannot be converted to the type of its column.
+        '''
+        (date, month, year, company, pipeline, keyPoint, latitude, longitude, directionOfFlow, tradeType, product,
+         throughput, committedVolumes, uncommittedVolumes, nameplateCapacity, availableCapacity, reasonForVariance) = row
+
+        data = cls.__new__(cls)
+        data._date = converters.parseDate(date)
+        data._month = int(month) if month else ""
+        data._year = int(year) if year else ""
+        data._company = company
+        data._pipeline = pipeline
+        data._keyPoint = keyPoint
+        data._latitude = float(latitude) if latitude else ""
+        data._longitude = float(longitude) if longitude else ""
+        data._directionOfFlow = directionOfFlow
+        data._tradeType = tradeType
+        data._product = product
+        data._throughput = float(throughput) if throughput else ""
+        data._committedVolumes = float(committedVolumes) if committedVolumes else ""
+        data._uncommittedVolumes = float(uncommittedVolumes) if uncommittedVolumes else ""
+        data._nameplateCapacity = float(nameplateCapacity) if nameplateCapacity else ""
+        data._availableCapacity = float(availableCapacity) if availableCapacity else ""
+        data._reasonForVariance = reasonForVariance
+        return data
+
+    def toRow(self):
+        '''
+        Serializes the PipelineData object to the cells of a csv row, as they are written when a file is saved.
+
+        :returns: A list of the cell texts of the row, in CSV column order, with empty strings for empty values.
+        '''
+        return list(map(str, (self._date, self._month, self._year, self._company, self._pipeline, self._keyPoint,
+                              self._latitude, self._longitude, self._directionOfFlow, self._tradeType, self._product,
+                              self._throughput, self._committedVolumes, self._uncommittedVolumes,
+                              self._nameplateCapacity, self._availableCapacity, self._reasonForVariance)))
+
     def __repr__(self):
         '''
         The representation function for defining how a PipelineData object is formatted as a text string.
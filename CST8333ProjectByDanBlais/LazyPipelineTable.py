@@ -0,0 +1,423 @@
+#This module defines a LazyPipelineTable object, which gives access to the rows of a Pipeline Throughput and Capacity Data
+#csv file too large to parse up front. The file is memory mapped and scanned once to build an index of the byte offset
+#of every record, and rows are only parsed when they are read, such as when they are scrolled into view or shown in the
+#row details. Edited and inserted rows are kept in a small PipelineTable overlay. Docstring comments in reST style.
+
+#Author: Dan Blais - 040826486
+#Subject: CST8333
+
+from array import array
+from functools import lru_cache
+import csv
+import itertools as it
+import locale
+import mmap
+import operator
+import os
+import KeystonePipelineData as model
+import ColumnConverters as converters
+import ParallelCSVParser as parser
+import PipelineTable as columnar
+
+#Number of bytes of the file scanned at once when building the record index.
+INDEX_BLOCK_BYTES = 16 * 1024 * 1024
+#Number of parsed rows kept in memory, enough for several screens of rows and the rows around the selection.
+ROW_CACHE_SIZE = 4096
+
+class LazyPipelineTable:
+    '''
+    Defines a table of pipeline data rows read on demand from a memory mapped csv file. The table has the same
+    interface as PipelineTable, so the controller can use either one as its model. Each row refers either to a
+    record of the file or to a row of the overlay table holding edited and inserted rows. Until a row is edited,
+    inserted or removed the rows are the records of the file in order, and no per-row arrays are kept.
+
+    :attribute _file: The path of the csv file.
+    :attribute _data: The mmap of the file, or an empty bytes object for an empty file.
+    :attribute _encoding: The text encoding of the file.
+    :attribute _boundaries: A typed array of the byte offset of the start of each record, followed by the end of the last record.
+    :attribute _rows: None while the rows are the records in file order, otherwise a typed array per row of the record
+                      index, or of the bitwise inverse (~) of the index of the row in the overlay for edited and inserted rows.
+    :attribute _rowIds: None while the row ids are the record indexes, otherwise a typed array of the row id of each row.
+    :attribute _overlay: A PipelineTable holding the edited and inserted rows.
+    :attribute _editCount: The number of edits, inserts and removals made to the table.
+    :attribute _positions: A dictionary mapping the row id of each row to its index, or None until a row is looked up
+                           by row id after the row arrays were created, and again after rows are inserted or removed.
+    :attribute recordValues: A cached function parsing a record of the file to the values of its row.
+    '''
+
+    def __init__(self, file):
+        '''
+        Initializes a LazyPipelineTable object and maps the file. The table has no rows until indexRecords is run.
+
+        :param file: A string representing the path of the csv file.
+        '''
+        self._file = file
+        self._encoding = locale.getpreferredencoding(False)
+        self._boundaries = array("Q")
+        self._rows = None
+        self._rowIds = None
+        self._overlay = columnar.PipelineTable()
+        self._editCount = 0
+        self._positions = None
+        self.recordValues = lru_cache(maxsize=ROW_CACHE_SIZE)(self.parseRecord)
+
+        with open(file, "rb") as dataset:
+            if os.fstat(dataset.fileno()).st_size:
+                self._data = mmap.mmap(dataset.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self._data = b""
+
+    @property
+    def file(self):
+        '''The path of the csv file.'''
+        return self._file
+
+    def indexRecords(self):
+        '''
+        Scans the file to find the byte offset of every record after the header. The file is scanned in blocks of
+        INDEX_BLOCK_BYTES bytes, each split on line breaks in one call. A line break ends a record only when an even
+        number of quotes lies between the start of the record and the line break, so records with line breaks in
+        quoted fields are kept whole. Blank lines at the end of the file are not records. If the scan is stopped
+        early, the table holds the records scanned so far.
+
+        :returns: A generator of the fraction of the file scanned, yielded after each block.
+        '''
+        data = self._data
+        size = len(data)
+        position = parser.findRecordEnd(data, 0, 0) if size else 0
+        boundaries = self._boundaries = array("Q", [position])
+        quoteParity = 0
+
+        while position < size:
+            blockEnd = data.rfind(b"\n", position, min(position + INDEX_BLOCK_BYTES, size)) + 1
+
+            if blockEnd <= position:
+                blockEnd = data.find(b"\n", position + INDEX_BLOCK_BYTES) + 1 or size
+
+            block = data[position:blockEnd]
+            lines = block.split(b"\n")
+            lines.pop()
+            lineEnds = it.accumulate(map((1).__add__, map(len, lines)), initial=position)
+            quoteCounts = it.accumulate(map(operator.methodcaller("count", b'"'), lines), initial=quoteParity)
+            recordEnds = map(operator.not_, map((2).__rmod__, it.islice(quoteCounts, 1, None)))
+            boundaries.extend(it.compress(it.islice(lineEnds, 1, None), recordEnds))
+            quoteParity = (quoteParity + block.count(b'"')) % 2
+            position = blockEnd
+            yield position / size
+
+        if boundaries[-1] < size:
+            boundaries.append(size)
+
+        while len(boundaries) > 1 and not data[boundaries[-2]:boundaries[-1]].strip():
+            boundaries.pop()
+
+    def parseRecord(self, record):
+        '''
+        Parses a record of the file to the values of its row. Cells which cannot be converted to the type of their
+        column are reported and read as empty cells, and missing cells are read as empty cells.
+
+        :param record: The index of the record.
+        :returns: A tuple of the row values, with empty cells as empty strings.
+        '''
+        text = self._data[self._boundaries[record]:self._boundaries[record + 1]].decode(self._encoding)
+        row = next(csv.reader(text.splitlines(True), delimiter=",", quotechar='"'), [])
+
+        try:
+            if len(row) == len(columnar.COLUMN_NAMES):
+                return converters.convertRow(row)
+        except ValueError:
+            pass
+
+        row = row[:len(columnar.COLUMN_NAMES)] + [""] * (len(columnar.COLUMN_NAMES) - len(row))
+        values = []
+
+        for convert, cell in zip(converters.CONVERTERS, row):
+            try:
+                values.append(convert(cell))
+            except ValueError as e:
+                print(f"Error: {e}")
+                values.append("")
+
+        return tuple(values)
+
+    def __len__(self):
+        '''
+        Gets the number of rows in the table.
+
+        :returns: The number of rows.
+        '''
+        if self._rows is not None:
+            return len(self._rows)
+        return max(len(self._boundaries) - 1, 0)
+
+    def __getitem__(self, position):
+        '''
+        Gets a row of the table.
+
+        :param position: The index of the row.
+        :returns: A PipelineRow view of the row.
+        '''
+        position = operator.index(position)
+
+        if not 0 <= position < len(self):
+            raise IndexError("LazyPipelineTable index out of range")
+        return columnar.PipelineRow(self, position)
+
+    def __iter__(self):
+        '''
+        Iterates over the rows of the table.
+
+        :returns: An iterator of PipelineRow views.
+        '''
+        return (columnar.PipelineRow(self, position) for position in range(len(self)))
+
+    def rowReference(self, position):
+        '''
+        Gets what a row refers to.
+
+        :param position: The index of the row.
+        :returns: The record index of a row read from the file, or the bitwise inverse of the overlay index of an
+                  edited or inserted row.
+        '''
+        if self._rows is not None:
+            return self._rows[position]
+        if not 0 <= position < len(self):
+            raise IndexError("LazyPipelineTable index out of range")
+        return position
+
+    def rowValues(self, position):
+        '''
+        Gets the values of a row in column order, parsing the record of the row if it is not cached.
+
+        :param position: The index of the row.
+        :returns: A tuple of the row values, with empty cells as empty strings.
+        '''
+        reference = self.rowReference(position)
+
+        if reference >= 0:
+            return self.recordValues(reference)
+        return self._overlay.rowValues(~reference)
+
+    def rowId(self, position):
+        '''
+        Gets the row id of a row.
+
+        :param position: The index of the row.
+        :returns: The row id.
+        '''
+        if self._rowIds is not None:
+            return self._rowIds[position]
+        return self.rowReference(position)
+
+    @property
+    def rowIds(self):
+        '''The typed array of the row ids of the rows, in table order.'''
+        self.materializeRows()
+        return self._rowIds
+
+    @property
+    def boundaries(self):
+        '''The typed array of the byte offset of the start of each record, followed by the end of the last record.'''
+        return self._boundaries
+
+    def sourceRecords(self):
+        '''
+        Gets the record of the file held by each row, for saving only the changed rows.
+
+        :returns: A typed array of the index of the record of each row read from the file, or a negative number for
+                  rows held in the overlay.
+        '''
+        if self._rows is None:
+            return array("q", range(len(self)))
+        return self._rows
+
+    @property
+    def editCount(self):
+        '''The number of edits, inserts and removals made to the table.'''
+        return self._editCount
+
+    def positionOf(self, rowId):
+        '''
+        Finds the row with a row id. While the rows are the records in file order the row id is the index of the
+        row, and otherwise a dictionary of row positions is built on the first lookup after rows were inserted or
+        removed.
+
+        :param rowId: The row id.
+        :returns: The index of the row, or None if no row has the row id.
+        '''
+        if self._rowIds is None:
+            return rowId if 0 <= rowId < len(self) else None
+
+        if self._positions is None:
+            self._positions = dict(zip(self._rowIds, range(len(self._rowIds))))
+        return self._positions.get(rowId)
+
+    def getValue(self, position, columnIndex):
+        '''
+        Gets a single value of a row.
+
+        :param position: The index of the row.
+        :param columnIndex: The index of the column.
+        :returns: The value, or an empty string for an empty cell.
+        '''
+        return self.rowValues(position)[columnIndex]
+
+    def setValue(self, position, columnIndex, value):
+        '''
+        Sets a single value of a row. A row read from the file is first copied to the overlay, where it stays with
+        its old values if the new value cannot be converted.
+
+        :param position: The index of the row.
+        :param columnIndex: The index of the column.
+        :param value: The new value, either typed or as text. An empty string empties the cell.
+        :raises ValueError: If the value cannot be converted to the type of the column.
+        '''
+        reference = self.rowReference(position)
+
+        if reference >= 0:
+            self.materializeRows()
+            self._overlay.appendRow(self.recordValues(reference), self._rowIds[position])
+            reference = self._rows[position] = ~(len(self._overlay) - 1)
+
+        self._overlay.setValue(~reference, columnIndex, value)
+        self._editCount += 1
+
+    def materializeRows(self):
+        '''
+        Creates the arrays of row references and row ids, which are needed once rows are edited, inserted or removed.
+        '''
+        if self._rows is None:
+            self._rows = array("q", range(len(self)))
+            self._rowIds = array("q", self._rows)
+
+    def append(self, pipelineDataRow, rowId):
+        '''
+        Appends a row given as a PipelineData object.
+
+        :param pipelineDataRow: The PipelineData object or PipelineRow view to append.
+        :param rowId: The row id of the new row.
+        '''
+        self.insert(len(self), pipelineDataRow, rowId)
+
+    def insert(self, position, pipelineDataRow, rowId):
+        '''
+        Inserts a row given as a PipelineData object. The row is stored in the overlay.
+
+        :param position: The index the new row will have.
+        :param pipelineDataRow: The PipelineData object or PipelineRow view to insert.
+        :param rowId: The row id of the new row.
+        :raises ValueError: If a value cannot be converted to the type of its column. The table is left unchanged.
+        '''
+        self._overlay.append(pipelineDataRow, rowId)
+        self.materializeRows()
+        self._rows.insert(position, ~(len(self._overlay) - 1))
+        self._rowIds.insert(position, rowId)
+        self._editCount += 1
+        self._positions = None
+
+    def pop(self, position=-1):
+        '''
+        Removes a row from the table. The file is not changed.
+
+        :param position: The index of the row to remove.
+        :returns: The removed row as a PipelineData object.
+        '''
+        position = operator.index(position)
+
+        if position < 0:
+            position += len(self)
+
+        removed = model.PipelineData(*self.rowValues(position))
+        self.materializeRows()
+        del self._rows[position]
+        del self._rowIds[position]
+        self._editCount += 1
+        self._positions = None
+        return removed
+
+    def insertRows(self, positions, rows, rowIds):
+        '''
+        Inserts a batch of rows in one pass. The rows are stored in the overlay and merged into the row arrays as
+        blocks.
+
+        :param positions: The ascending indexes the new rows will have once they are all inserted.
+        :param rows: A list of the values of each new row in column order, typed or as text.
+        :param rowIds: A list of the row ids of the new rows.
+        :raises ValueError: If a value cannot be converted to the type of its column. The rows are left unchanged.
+        '''
+        if not rows:
+            return
+
+        firstOverlayRow = len(self._overlay)
+
+        for values, rowId in zip(rows, rowIds):
+            self._overlay.appendRow(values, rowId)
+
+        self.materializeRows()
+        references = range(~firstOverlayRow, ~(firstOverlayRow + len(rows)), -1)
+        self._rows = columnar.insertIntoArray(self._rows, positions, references)
+        self._rowIds = columnar.insertIntoArray(self._rowIds, positions, rowIds)
+        self._editCount += 1
+        self._positions = None
+
+    def deleteRows(self, positions):
+        '''
+        Removes a batch of rows in one compaction pass of the row arrays. The file is not changed.
+
+        :param positions: The ascending indexes of the rows to remove.
+        '''
+        if not positions:
+            return
+
+        self.materializeRows()
+        self._rows = columnar.deleteFromArray(self._rows, positions)
+        self._rowIds = columnar.deleteFromArray(self._rowIds, positions)
+        self._editCount += 1
+        self._positions = None
+
+    def clear(self):
+        '''
+        Removes all rows from the table. The file is not changed.
+        '''
+        self._rows = array("q")
+        self._rowIds = array("q")
+        self._editCount += 1
+        self._positions = None
+
+    def copy(self):
+        '''
+        Copies the table, such as to write its rows on another thread while the table is still edited. The copy
+        shares the mapped file and record index, which are not changed once the records are indexed, so it must not
+        be read after the table is closed.
+
+        :returns: A LazyPipelineTable holding copies of the row arrays and of the overlay.
+        '''
+        table = LazyPipelineTable.__new__(LazyPipelineTable)
+        table.__dict__.update(self.__dict__)
+        table._rows = None if self._rows is None else self._rows[:]
+        table._rowIds = None if self._rowIds is None else self._rowIds[:]
+        table._overlay = self._overlay.copy()
+        table._positions = None
+        table.recordValues = lru_cache(maxsize=ROW_CACHE_SIZE)(table.parseRecord)
+        return table
+
+    def nbytes(self):
+        '''
+        Gets the approximate memory used by the table, excluding the cached rows and the mapped file.
+
+        :returns: The size of the record index, the row arrays and the overlay in bytes.
+        '''
+        size = self._boundaries.itemsize * len(self._boundaries) + self._overlay.nbytes()
+
+        if self._rows is not None:
+            size += self._rows.itemsize * len(self._rows) + self._rowIds.itemsize * len(self._rowIds)
+        return size
+
+    def close(self):
+        '''
+        Unmaps the file. The table must not be read afterwards.
+        '''
+        self.recordValues.cache_clear()
+
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
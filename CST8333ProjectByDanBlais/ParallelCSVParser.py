@@ -0,0 +1,163 @@
+#This module defines the parsers which read a Pipeline Throughput and Capacity Data csv file into batches of PipelineTable
+#rows. Small files are parsed serially. Large files are split into byte ranges which end on record boundaries, found by
+#counting quotes so that line breaks inside quoted fields are never taken as the end of a record, and the ranges are
+#parsed by a pool of worker processes. The parsed ranges are returned in file order as compact columnar tables.
+#Docstring comments in reST style.
+
+#Author: Dan Blais - 040826486
+#Subject: CST8333
+
+import csv
+import io
+import itertools as it
+import mmap
+import os
+import PipelineTable as columnar
+
+#Files smaller than this many bytes are parsed serially, as starting worker processes would take longer than parsing.
+PARALLEL_MIN_BYTES = 16 * 1024 * 1024
+#Target number of bytes in each range of a file parsed by a worker process.
+CHUNK_BYTES = 4 * 1024 * 1024
+#Number of rows converted at once by a worker process.
+WORKER_BATCH_SIZE = 5000
+
+def readBatches(file, firstBatchSize, batchSize, workerCount=None):
+    '''
+    Parses a csv file into batches of rows, in file order. Files of at least PARALLEL_MIN_BYTES bytes are parsed
+    by worker processes when more than one CPU is available, and other files are parsed serially. Closing the
+    generator stops the parse and cancels the ranges not yet parsed.
+
+    :param file: A string representing the path of the file.
+    :param firstBatchSize: The number of rows in the first batch of a serial parse.
+    :param batchSize: The number of rows in the following batches of a serial parse.
+    :param workerCount: The number of worker processes. Defaults to the number of CPUs.
+    :returns: A generator of tuples holding a PipelineTable of parsed rows and the fraction of the file read so far.
+    '''
+    workerCount = workerCount or os.cpu_count() or 1
+
+    if workerCount > 1 and os.path.getsize(file) >= PARALLEL_MIN_BYTES:
+        return readBatchesInParallel(file, workerCount)
+    return readBatchesSerially(file, firstBatchSize, batchSize)
+
+def readBatchesSerially(file, firstBatchSize, batchSize):
+    '''
+    Parses a csv file into batches of rows on the calling thread. Rows which cannot be converted are reported
+    and skipped.
+
+    :param file: A string representing the path of the file.
+    :param firstBatchSize: The number of rows in the first batch, kept small so the first rows are shown quickly.
+    :param batchSize: The number of rows in the following batches.
+    :returns: A generator of tuples holding a PipelineTable of parsed rows and the fraction of the file read so far.
+    '''
+    fileSize = os.path.getsize(file) or 1
+
+    with open(file, newline='') as dataset:
+        dataReader = csv.reader(dataset, delimiter=",", quotechar='"')
+        next(dataReader)
+        rows = list(it.islice(dataReader, firstBatchSize))
+
+        while rows:
+            batch = columnar.PipelineTable()
+            batch.extendRows(rows, 0)
+            yield batch, min(dataset.buffer.tell() / fileSize, 1.0)
+            rows = list(it.islice(dataReader, batchSize))
+
+def readBatchesInParallel(file, workerCount):
+    '''
+    Parses a csv file into batches of rows with a pool of worker processes, one batch per range of the file.
+    The batches are yielded in file order as soon as each one and the ones before it are parsed.
+
+    :param file: A string representing the path of the file.
+    :param workerCount: The number of worker processes.
+    :returns: A generator of tuples holding a PipelineTable of parsed rows and the fraction of the file read so far.
+    '''
+    #Imported here rather than at startup, as small files never start worker processes.
+    from concurrent.futures import ProcessPoolExecutor
+
+    fileSize = os.path.getsize(file)
+    ranges = splitRecordRanges(file, CHUNK_BYTES)
+    executor = ProcessPoolExecutor(max_workers=min(workerCount, len(ranges)) or 1)
+
+    try:
+        futures = [executor.submit(parseRange, file, start, end) for start, end in ranges]
+
+        for (start, end), future in zip(ranges, futures):
+            yield future.result(), end / fileSize
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+def findRecordEnd(data, start, position):
+    '''
+    Finds the end of the record holding a position of a csv file. A line break ends a record only when an even
+    number of quotes lies between the start of a record and the line break; otherwise it is inside a quoted field.
+
+    :param data: The bytes of the file, such as an mmap.
+    :param start: The offset of the start of a record at or before the position.
+    :param position: The offset to search from.
+    :returns: The offset just past the line break ending the record, or the size of the data if the record is last.
+    '''
+    quoteCount = data[start:position].count(b'"')
+
+    while True:
+        lineBreak = data.find(b'\n', position)
+
+        if lineBreak == -1:
+            return len(data)
+
+        quoteCount += data[position:lineBreak].count(b'"')
+
+        if quoteCount % 2 == 0:
+            return lineBreak + 1
+        position = lineBreak + 1
+
+def splitRecordRanges(file, chunkBytes):
+    '''
+    Splits the rows of a csv file into byte ranges of about chunkBytes bytes, each starting at the start of a
+    record and ending at the end of a record. The header record is not part of any range.
+
+    :param file: A string representing the path of the file.
+    :param chunkBytes: The target number of bytes in each range.
+    :returns: A list of tuples holding the start and end offsets of each range.
+    '''
+    ranges = []
+
+    with open(file, "rb") as dataset:
+        if os.fstat(dataset.fileno()).st_size == 0:
+            return ranges
+
+        with mmap.mmap(dataset.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            start = findRecordEnd(data, 0, 0)
+
+            while start < len(data):
+                end = findRecordEnd(data, start, min(start + chunkBytes, len(data)))
+                ranges.append((start, end))
+                start = end
+
+    return ranges
+
+def parseRange(file, start, end):
+    '''
+    Parses the records in a byte range of a csv file. This runs in a worker process, so the parsed rows are
+    returned as a PipelineTable, which pickles as its compact column arrays. Rows which cannot be converted are
+    reported and skipped.
+
+    :param file: A string representing the path of the file.
+    :param start: The offset of the start of the first record of the range.
+    :param end: The offset just past the end of the last record of the range.
+    :returns: A PipelineTable of the parsed rows.
+    '''
+    with open(file, "rb") as dataset:
+        dataset.seek(start)
+        text = io.TextIOWrapper(io.BytesIO(dataset.read(end - start)), newline='')
+
+    table = columnar.PipelineTable()
+
+    with text:
+        dataReader = csv.reader(text, delimiter=",", quotechar='"')
+        rows = list(it.islice(dataReader, WORKER_BATCH_SIZE))
+
+        while rows:
+            table.extendRows(rows, len(table))
+            rows = list(it.islice(dataReader, WORKER_BATCH_SIZE))
+
+    return table
@@ -0,0 +1,387 @@
+#This module defines a PipelineDataset object, which opens a folder or glob pattern of Pipeline Throughput and Capacity
+#Data csv files, such as the one file per pipeline published by the Canada Energy Regulator, as one table. The byte
+#ranges of every file are parsed together by one pool of worker processes, so loading all files takes about as long as
+#loading the largest one. The rows of each file form a partition of the table, which remembers the source file of its
+#rows and the range of their dates and the pipelines they name, so filter queries skip the files which cannot match.
+#Docstring comments in reST style.
+
+#Author: Dan Blais - 040826486
+#Subject: CST8333
+
+import bisect
+import glob
+import hashlib
+import os
+from contextlib import closing
+from datetime import date
+import ColumnSchema as schema
+import PipelineTable as columnar
+import ParallelCSVParser as parser
+import FilterQuery as filtering
+
+#The files of a folder opened as a dataset.
+FOLDER_PATTERN = "*.csv"
+#Characters which make a path a glob pattern rather than the path of one file.
+GLOB_CHARACTERS = "*?["
+#The name the edit journal of a folder is named after inside the folder. The journal of a glob pattern is named after
+#a hash of the pattern instead, as the characters of a pattern are not valid in file names on every system.
+JOURNAL_NAME = "dataset"
+#The index of the Date column, whose range is kept per partition.
+DATE_INDEX = schema.COLUMN_INDEXES["date"]
+#The index of the Pipeline column, whose values are kept per partition.
+PIPELINE_INDEX = schema.COLUMN_INDEXES["pipeline"]
+
+class FilePartition:
+    '''
+    Defines the rows of a table read from one file of a dataset, with the metadata used to skip the file when
+    evaluating a filter query.
+
+    :attribute file: A string representing the path of the file.
+    :attribute firstRowId: The row id of the first row of the file, which is also its index while the table is unedited.
+    :attribute rowCount: The number of rows read from the file.
+    :attribute minDate: The earliest date of the rows, or None if every date is empty.
+    :attribute maxDate: The latest date of the rows, or None if every date is empty.
+    :attribute pipelines: A set of the lowercase pipeline names of the rows, with an empty string for empty cells.
+    '''
+    __slots__ = ("file", "firstRowId", "rowCount", "minDate", "maxDate", "pipelines")
+
+    def __init__(self, file, firstRowId):
+        '''
+        Initializes a FilePartition object holding no rows.
+
+        :param file: A string representing the path of the file.
+        :param firstRowId: The row id of the first row of the file.
+        '''
+        self.file = file
+        self.firstRowId = firstRowId
+        self.rowCount = 0
+        self.minDate = None
+        self.maxDate = None
+        self.pipelines = set()
+
+    def extend(self, batch):
+        '''
+        Adds a batch of rows parsed from the file to the partition, widening its metadata.
+
+        :param batch: A PipelineTable of rows parsed from the file.
+        '''
+        dates = batch.columnBuffer(DATE_INDEX)
+        earliest = min(filter(None, dates), default=0)
+
+        if earliest:
+            latest = date.fromordinal(max(dates))
+            earliest = date.fromordinal(earliest)
+            self.minDate = earliest if self.minDate is None else min(self.minDate, earliest)
+            self.maxDate = latest if self.maxDate is None else max(self.maxDate, latest)
+
+        self.pipelines.update(value.lower() for value in batch.categoryValues(PIPELINE_INDEX))
+        self.rowCount += len(batch)
+
+    def mayMatch(self, expression):
+        '''
+        Tells whether some row of the partition may match a filter query, from the metadata of the partition alone.
+        Predicates on the Date and Pipeline columns are tested against the metadata, and any other predicate, and any
+        negated one, may match.
+
+        :param expression: The expression tree of the query, as returned by FilterQuery.parseQuery.
+        :returns: False if no row of the partition can match, or True if some row may match.
+        '''
+        if isinstance(expression, filtering.BooleanExpression):
+            matches = map(self.mayMatch, expression.operands)
+            return all(matches) if expression.operator == "and" else any(matches)
+
+        if isinstance(expression, filtering.Negation) or expression.column.index not in (DATE_INDEX, PIPELINE_INDEX):
+            return True
+
+        if expression.column.index == PIPELINE_INDEX:
+            return any(map(categoryTest(expression), self.pipelines))
+
+        if isinstance(expression, filtering.Between):
+            return self.minDate is not None and expression.low <= self.maxDate and self.minDate <= expression.high
+        if isinstance(expression, filtering.Contains) or expression.value == "":
+            return True
+        if self.minDate is None or expression.operator == "!=":
+            return self.minDate is not None
+
+        value = expression.value
+        return {"=": self.minDate <= value <= self.maxDate, "<": self.minDate < value, "<=": self.minDate <= value,
+                ">": self.maxDate > value, ">=": self.maxDate >= value}[expression.operator]
+
+class PipelineDataset:
+    '''
+    Defines a dataset of csv files loaded as one table, in the order of their sorted paths.
+
+    :attribute path: A string representing the folder or glob pattern of the files.
+    :attribute files: A sorted list of the paths of the csv files of the dataset.
+    :attribute partitions: A list of the FilePartition of each file read, in row order.
+    :attribute rowCount: The number of rows read from every file so far.
+    :attribute _firstRowIds: A list of the first row id of each partition, for finding the partition of a row.
+    :attribute _loadVersion: A tuple of the table the files were loaded into and its edit count once loaded, or None
+                             until the load is done.
+    '''
+
+    def __init__(self, path):
+        '''
+        Initializes a PipelineDataset object, listing the files of a folder or matching a glob pattern.
+
+        :param path: A string representing a folder, whose .csv files are opened, or a glob pattern of csv files.
+        '''
+        self.path = path
+        self.files = datasetFiles(path)
+        self.partitions = []
+        self.rowCount = 0
+        self._firstRowIds = []
+        self._loadVersion = None
+
+    def journalFile(self):
+        '''
+        Gets the path the edit journal of the dataset is named after, in the way the journal of a csv file is named
+        after the file. The journal of a folder is kept inside the folder, and the journal of a glob pattern inside the
+        folder holding the pattern, named after a hash of the pattern.
+
+        :returns: A string representing the path.
+        '''
+        if os.path.isdir(self.path):
+            return os.path.join(self.path, JOURNAL_NAME)
+
+        folder = os.path.dirname(self.path)
+
+        while any(character in folder for character in GLOB_CHARACTERS):
+            folder = os.path.dirname(folder)
+
+        pattern = os.path.normcase(os.path.abspath(self.path))
+        return os.path.join(folder, f"{JOURNAL_NAME}-{hashlib.sha1(pattern.encode()).hexdigest()[:16]}")
+
+    def readBatches(self, firstBatchSize, batchSize, cancel=None, workerCount=None):
+        '''
+        Reads the files of the dataset in batches, recording the partition of each file as its rows are read. When
+        the files hold at least PARALLEL_MIN_BYTES bytes together and more than one CPU is available, the ranges of
+        every file are parsed by one pool of worker processes, and otherwise the files are parsed serially.
+
+        :param firstBatchSize: The number of rows in the first batch of a serial parse.
+        :param batchSize: The number of rows in the following batches of a serial parse.
+        :param cancel: An optional event which stops the read at its next batch when set.
+        :param workerCount: The number of worker processes. Defaults to the number of CPUs.
+        :returns: A generator of tuples holding a PipelineTable of parsed rows and the fraction of the bytes of the
+                  dataset read so far.
+        :raises OSError: If a file cannot be read.
+        '''
+        totalBytes = sum(map(os.path.getsize, self.files)) or 1
+        workerCount = workerCount or os.cpu_count() or 1
+
+        if workerCount > 1 and totalBytes >= parser.PARALLEL_MIN_BYTES:
+            batches = readFilesInParallel(self.files, workerCount)
+        else:
+            batches = readFilesSerially(self.files, firstBatchSize, batchSize)
+
+        with closing(batches):
+            for fileIndex, batch, bytesRead in batches:
+                if cancel is not None and cancel.is_set():
+                    return
+
+                self.recordBatch(self.files[fileIndex], batch)
+                yield batch, min(bytesRead / totalBytes, 1.0)
+
+    def recordBatch(self, file, batch):
+        '''
+        Records a batch of rows read from a file in the partition of the file. The rows are given the row ids
+        following the rows read before them.
+
+        :param file: A string representing the path of the file.
+        :param batch: A PipelineTable of rows parsed from the file.
+        '''
+        if not len(batch):
+            return
+
+        if not self.partitions or self.partitions[-1].file != file:
+            self.partitions.append(FilePartition(file, self.rowCount))
+            self._firstRowIds.append(self.rowCount)
+
+        self.partitions[-1].extend(batch)
+        self.rowCount += len(batch)
+
+    def attach(self, table):
+        '''
+        Marks the load of the dataset into a table as done. The partitions hold the rows of the table in order only
+        if no rows were changed while it was loading, as inserted rows take row ids from the rows still to be loaded,
+        so otherwise the partitions are dropped.
+
+        :param table: The PipelineTable, or SQLitePipelineTable, the files were loaded into.
+        '''
+        if table.editCount == 0 and len(table) == self.rowCount:
+            self._loadVersion = (table, table.editCount)
+        else:
+            self.partitions = []
+            self._firstRowIds = []
+            self._loadVersion = None
+
+    def sourceFile(self, rowId):
+        '''
+        Finds the file a row was read from.
+
+        :param rowId: The row id of the row.
+        :returns: A string representing the path of the file, or an empty string for a row added since the load.
+        '''
+        index = bisect.bisect_right(self._firstRowIds, rowId) - 1
+
+        if index < 0 or rowId >= self.partitions[index].firstRowId + self.partitions[index].rowCount:
+            return ""
+        return self.partitions[index].file
+
+    def candidateRanges(self, expression, table, rowStart, rowEnd):
+        '''
+        Finds the ranges of rows of a table which may match a filter query, skipping the files whose metadata
+        shows that none of their rows can. Files are only skipped while the table holds the rows as loaded.
+
+        :param expression: The expression tree of the query, as returned by FilterQuery.parseQuery.
+        :param table: The table holding the rows.
+        :param rowStart: The index of the first row.
+        :param rowEnd: The index after the last row.
+        :returns: A list of tuples holding the index of the first row and the index after the last row of each range.
+        '''
+        if self._loadVersion != (table, table.editCount) or not isinstance(table, columnar.PipelineTable):
+            return [(rowStart, rowEnd)]
+
+        ranges = []
+
+        for partition in self.partitions:
+            start = max(partition.firstRowId, rowStart)
+            end = min(partition.firstRowId + partition.rowCount, rowEnd)
+
+            if start >= end or not partition.mayMatch(expression):
+                continue
+
+            if ranges and ranges[-1][1] == start:
+                ranges[-1] = (ranges[-1][0], end)
+            else:
+                ranges.append((start, end))
+
+        return ranges
+
+    def matchingRows(self, expression, table, rowStart, rowEnd, sortIndex=None):
+        '''
+        Finds the rows of a range of a PipelineTable which match a filter query, evaluating the query only over the
+        files which may match.
+
+        :param expression: The expression tree of the query, as returned by FilterQuery.parseQuery.
+        :param table: The PipelineTable holding the rows.
+        :param rowStart: The index of the first row.
+        :param rowEnd: The index after the last row.
+        :param sortIndex: An optional SortIndex of the table, whose computed sort orders answer range predicates.
+        :returns: A set of the indexes of the matching rows.
+        '''
+        matches = set()
+
+        for start, end in self.candidateRanges(expression, table, rowStart, rowEnd):
+            matches.update(filtering.matchingRows(expression, table, start, end, sortIndex))
+        return matches
+
+def isDatasetPath(path):
+    '''
+    Tells whether a path names a dataset of several files: a folder or a glob pattern. The path of an existing file is
+    never a pattern, even when its name holds the characters of one.
+
+    :param path: A string representing the path.
+    :returns: True if the path is a folder or a glob pattern.
+    '''
+    if os.path.isfile(path):
+        return False
+    return os.path.isdir(path) or any(character in path for character in GLOB_CHARACTERS)
+
+def datasetFiles(path):
+    '''
+    Lists the csv files of a dataset.
+
+    :param path: A string representing a folder, whose .csv files are listed, or a glob pattern of csv files.
+    :returns: A sorted list of the paths of the files.
+    '''
+    pattern = os.path.join(path, FOLDER_PATTERN) if os.path.isdir(path) else path
+    return sorted(file for file in glob.glob(pattern) if os.path.isfile(file))
+
+def datasetState(path):
+    '''
+    Gets the state of the files of a dataset which tells whether any of them changed, such as since it was loaded.
+
+    :param path: A string representing the folder or glob pattern of the dataset.
+    :returns: A tuple of the total size and the latest modification time in nanoseconds of the files, or two Nones
+              if there are no files.
+    '''
+    states = [os.stat(file) for file in datasetFiles(path)]
+
+    if not states:
+        return None, None
+    return sum(state.st_size for state in states), max(state.st_mtime_ns for state in states)
+
+def categoryTest(expression):
+    '''
+    Builds the test of a predicate on a category column applied to each distinct lowercase text of the column, the
+    same way the predicate tests the rows.
+
+    :param expression: A Comparison, Between or Contains expression on a category column.
+    :returns: A function taking a lowercase text and returning whether it matches.
+    '''
+    if isinstance(expression, filtering.Contains):
+        text = expression.text.lower()
+        return lambda value: text in value
+    if isinstance(expression, filtering.Between):
+        low, high = str(expression.low).lower(), str(expression.high).lower()
+        return lambda value: value != "" and low <= value <= high
+    if expression.value == "":
+        return (lambda value: value == "") if expression.operator == "=" else (lambda value: value != "")
+
+    compare = getattr(str(expression.value).lower(), filtering.REFLECTED_METHODS[expression.operator])
+    return lambda value: value != "" and compare(value)
+
+def readFilesSerially(files, firstBatchSize, batchSize):
+    '''
+    Parses the files of a dataset one after another into batches of rows on the calling thread.
+
+    :param files: A list of the paths of the files.
+    :param firstBatchSize: The number of rows in the first batch of the first file.
+    :param batchSize: The number of rows in the following batches.
+    :returns: A generator of tuples holding the index of the file, a PipelineTable of parsed rows and the number of
+              bytes of the dataset read so far.
+    '''
+    bytesDone = 0
+
+    for fileIndex, file in enumerate(files):
+        fileSize = os.path.getsize(file)
+
+        with closing(parser.readBatchesSerially(file, firstBatchSize if fileIndex == 0 else batchSize,
+                                                batchSize)) as batches:
+            for batch, progress in batches:
+                yield fileIndex, batch, bytesDone + progress * fileSize
+
+        bytesDone += fileSize
+
+def readFilesInParallel(files, workerCount):
+    '''
+    Parses the files of a dataset with one pool of worker processes. Every file is split into byte ranges ending on
+    record boundaries, and the ranges of all files are parsed together, so a pool is never left waiting on the last
+    ranges of one file. The batches are yielded in file order as soon as each one and the ones before it are parsed.
+
+    :param files: A list of the paths of the files.
+    :param workerCount: The number of worker processes.
+    :returns: A generator of tuples holding the index of the file, a PipelineTable of parsed rows and the number of
+              bytes of the dataset read so far.
+    '''
+    #Imported here rather than at startup, as datasets of small files never start worker processes.
+    from concurrent.futures import ProcessPoolExecutor
+
+    ranges = []
+    bytesDone = 0
+
+    for fileIndex, file in enumerate(files):
+        ranges.extend((fileIndex, file, start, end, bytesDone + end)
+                      for start, end in parser.splitRecordRanges(file, parser.CHUNK_BYTES))
+        bytesDone += os.path.getsize(file)
+
+    executor = ProcessPoolExecutor(max_workers=min(workerCount, len(ranges)) or 1)
+
+    try:
+        futures = [executor.submit(parser.parseRange, file, start, end) for fileIndex, file, start, end, done in ranges]
+
+        for (fileIndex, file, start, end, done), future in zip(ranges, futures):
+            yield fileIndex, future.result(), done
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,383 @@
+#This module defines a PipelineEngine object, which loads, filters, summarizes, edits and saves Pipeline Throughput and
+#Capacity Data csv files without a window, such as in batch jobs on servers without a display. The WindowController
+#loads files and applies edits through the functions of this module, so the window and batch jobs share one
+#implementation. Rows can also be stored in a SQLite database instead of in memory, for files larger than the memory of
+#the computer, and a folder or glob pattern of csv files can be loaded as one dataset. Importing this module does not
+#import tkinter or matplotlib. Docstring comments in reST style.
+
+#Author: Dan Blais - 040826486
+#Subject: CST8333
+
+import os
+from contextlib import closing
+import ColumnSchema as schema
+import PipelineTable as columnar
+import ParallelCSVParser as parser
+import LazyPipelineTable as lazy
+import SQLitePipelineTable as database
+import PipelineDataset as datasets
+import SearchIndex as search
+import SortIndex as sorting
+import FilterQuery as filtering
+import Aggregation as aggregation
+import CSVExporter as exporter
+import ColumnarFile as columnFile
+
+#Number of rows in the first batch of a serial parse, kept small so the first screen of rows appears quickly.
+FIRST_BATCH_SIZE = 100
+#Number of rows in every following batch of a serial parse.
+LOAD_BATCH_SIZE = 5000
+
+class PipelineEngine:
+    '''
+    Defines a headless session on a table of pipeline data rows, giving the operations of the window as methods.
+
+    :attribute table: The PipelineTable holding the rows, a LazyPipelineTable for a file read on demand, or a
+                      SQLitePipelineTable for rows stored in a database.
+    :attribute highestId: The row id given to the next new row.
+    :attribute dataset: The PipelineDataset the rows were loaded from, or None when they were loaded from one file.
+    :attribute _searchIndex: The SearchIndex of the table, or None until the table is first searched.
+    :attribute _sortIndex: The SortIndex of the table, or None until the table is first sorted.
+    '''
+
+    def __init__(self, table=None):
+        '''
+        Initializes a PipelineEngine object.
+
+        :param table: An optional PipelineTable holding the rows. Defaults to an empty table.
+        '''
+        self.table = columnar.PipelineTable() if table is None else table
+        self.highestId = max(self.table.rowIds, default=-1) + 1
+        self.dataset = None
+        self._searchIndex = None
+        self._sortIndex = None
+
+    def load(self, file, snapshotCache=None, lazyMinBytes=None, useDatabase=False):
+        '''
+        Loads the rows of a csv file, replacing the rows of the engine. Large files are parsed by worker processes.
+        A folder or glob pattern of csv files is loaded as a PipelineDataset, whose rows are loaded as one table.
+
+        :param file: A string representing the path of the file, or a folder or glob pattern of csv files.
+        :param snapshotCache: An optional SnapshotCache to load an unchanged file from.
+        :param lazyMinBytes: Files of at least this many bytes are read on demand by a LazyPipelineTable instead of
+                             being parsed up front, or None to parse every file up front.
+        :param useDatabase: Whether to store the rows in a SQLitePipelineTable instead of in memory.
+        :returns: The number of rows loaded.
+        :raises OSError: If the file cannot be read, or a folder or glob pattern names no csv files.
+        '''
+        self.table = columnar.PipelineTable()
+        self.highestId = 0
+        self.dataset = datasets.PipelineDataset(file) if datasets.isDatasetPath(file) else None
+        self.clearIndexes()
+
+        if self.dataset is not None and not self.dataset.files:
+            raise FileNotFoundError(f"no csv files match {file}")
+
+        for batch, progress, loadKey in readBatches(file, snapshotCache, lazyMinBytes=lazyMinBytes,
+                                                    useDatabase=useDatabase, dataset=self.dataset):
+            if not isinstance(batch, columnar.PipelineTable):
+                self.table = batch
+                self.highestId = len(batch)
+            else:
+                self.table.extendTable(batch, self.highestId)
+                self.highestId += len(batch)
+
+        if self.dataset is not None:
+            self.dataset.attach(self.table)
+        return len(self.table)
+
+    def clearIndexes(self):
+        '''
+        Drops the search and sort indexes of the table, so they are built again when the table is next searched or
+        sorted, such as to time building them.
+        '''
+        self._searchIndex = None
+        self._sortIndex = None
+
+    def searchIndex(self):
+        '''
+        Gets the search index of the table, creating it for a new table.
+
+        :returns: The SearchIndex of the table, or None if the table does not support indexed search.
+        '''
+        if not isinstance(self.table, columnar.PipelineTable):
+            return None
+
+        if self._searchIndex is None or self._searchIndex.table is not self.table:
+            self._searchIndex = search.SearchIndex(self.table)
+        return self._searchIndex
+
+    def sortIndex(self):
+        '''
+        Gets the sort index of the table, creating it for a new table.
+
+        :returns: The SortIndex of the table, or None if the table does not support sorting.
+        '''
+        if not isinstance(self.table, columnar.PipelineTable):
+            return None
+
+        if self._sortIndex is None or self._sortIndex.table is not self.table:
+            self._sortIndex = sorting.SortIndex(self.table)
+        return self._sortIndex
+
+    def matchingRows(self, query, rowStart=0, rowEnd=None, searchAs=None):
+        '''
+        Finds the rows matching a search, as typed in the search box of the window: a filter query such as
+        Throughput > 50 and Product = condensate, or else a text contained in a cell, ignoring case. A text which
+        starts with a column name and an operator is a filter query, and is not searched for as text when it is not
+        a valid one.
+
+        :param query: The text of the search.
+        :param rowStart: The index of the first row searched.
+        :param rowEnd: The index after the last row searched, or None to search to the end of the table.
+        :param searchAs: "query" to evaluate the text as a filter query, "text" to search for it as text, or None to
+                         decide from the text as the search box does.
+        :returns: A sorted list of the indexes of the matching rows.
+        :raises ValueError: If the text is evaluated as a filter query but is not a valid one.
+        '''
+        query = query.lower()
+        rowEnd = len(self.table) if rowEnd is None else min(rowEnd, len(self.table))
+
+        if searchAs == "query":
+            expression = filtering.parseQuery(query)
+        else:
+            expression = filtering.parseSearch(query) if searchAs is None else None
+
+        if isinstance(self.table, database.SQLitePipelineTable):
+            if expression is not None:
+                return sorted(self.table.filterRows(expression, rowStart, rowEnd))
+            return sorted(self.table.search(query, rowStart, rowEnd))
+        elif expression is not None and self.dataset is not None:
+            return sorted(self.dataset.matchingRows(expression, self.table, rowStart, rowEnd, self.sortIndex()))
+        elif expression is not None:
+            return sorted(filtering.matchingRows(expression, self.table, rowStart, rowEnd, self.sortIndex()))
+
+        index = self.searchIndex()
+
+        if index is None:
+            return [position for position in range(rowStart, rowEnd)
+                    if any(query in str(value).lower() for value in self.table.rowValues(position))]
+        return sorted(index.search(query, rowStart, rowEnd))
+
+    def filtered(self, query, searchAs=None):
+        '''
+        Copies the rows matching a search to a new engine, such as to save them to their own file.
+
+        :param query: The text of the search, as given to matchingRows.
+        :param searchAs: How the text is searched, as given to matchingRows.
+        :returns: A PipelineEngine holding copies of the matching rows.
+        :raises ValueError: If the text is evaluated as a filter query but is not a valid one.
+        '''
+        positions = self.matchingRows(query, searchAs=searchAs)
+
+        if not isinstance(self.table, columnar.PipelineTable):
+            return PipelineEngine(aggregation.copyRows(self.table, 0, len(self.table)).selectRows(positions))
+        return PipelineEngine(self.table.selectRows(positions))
+
+    def aggregate(self, groupColumn, valueColumn):
+        '''
+        Groups the rows by the value of a column and summarizes the numeric values of another column over each group.
+
+        :param groupColumn: The name or index of the column to group by.
+        :param valueColumn: The name or index of the column to summarize.
+        :returns: A list of a GroupSummary per group, ordered by the code of the group.
+        :raises KeyError: If a column name does not name a column.
+        '''
+        return aggregation.aggregate(self.table, columnIndex(groupColumn), columnIndex(valueColumn))
+
+    def applyEdit(self, edit):
+        '''
+        Applies an edit to the table, keeping the next row id above the row ids of inserted rows.
+
+        :param edit: The edit, as a dictionary described by EditJournal.
+        :raises ValueError: If a value cannot be converted to the type of its column. The table is left unchanged.
+        '''
+        applyEdit(self.table, edit)
+
+        if edit["op"] == "insert":
+            self.highestId = max(self.highestId, max(edit["rowIds"], default=-1) + 1)
+
+    def setValue(self, position, column, text):
+        '''
+        Sets a cell of a row.
+
+        :param position: The index of the row.
+        :param column: The name or index of the column.
+        :param text: The new cell text. An empty string empties the cell.
+        :returns: The applied edit, as a dictionary described by EditJournal.
+        :raises ValueError: If the text cannot be converted to the type of the column.
+        '''
+        index = columnIndex(column)
+        edit = {"op": "set", "position": position, "column": index, "old": str(self.table.getValue(position, index)),
+                "new": text}
+        self.applyEdit(edit)
+        return edit
+
+    def insertRows(self, positions, rows):
+        '''
+        Inserts a batch of new rows, giving each row the next row id.
+
+        :param positions: The ascending indexes the new rows will have once they are all inserted.
+        :param rows: A list of the cell texts of each new row in column order.
+        :returns: The applied edit, as a dictionary described by EditJournal.
+        :raises ValueError: If a cell cannot be converted to the type of its column.
+        '''
+        edit = {"op": "insert", "positions": positions, "rowIds": list(range(self.highestId, self.highestId + len(rows))),
+                "values": rows}
+        self.applyEdit(edit)
+        return edit
+
+    def deleteRows(self, positions):
+        '''
+        Deletes a batch of rows.
+
+        :param positions: The ascending indexes of the rows to delete.
+        :returns: The applied edit, as a dictionary described by EditJournal, holding the deleted rows.
+        '''
+        edit = {"op": "delete", "positions": positions, "rowIds": [self.table.rowId(position) for position in positions],
+                "values": rowTexts(self.table, positions)}
+        self.applyEdit(edit)
+        return edit
+
+    def export(self, file, progress=None):
+        '''
+        Saves the rows to a file, replacing the file only once every row has been written. Files with a .pcol or
+        .parquet extension are written in that columnar format, and any other file as csv.
+
+        :param file: A string representing the path of the file.
+        :param progress: An optional function called with the fraction of the rows written after each batch.
+        :raises OSError: If the file cannot be written.
+        :raises ValueError: If Parquet files cannot be written as pyarrow is not installed.
+        '''
+        if columnFile.isColumnarFile(file):
+            columnFile.exportTable(self.table, file, progress)
+        else:
+            exporter.exportTable(self.table, file, progress)
+
+def readBatches(file, snapshotCache=None, cancel=None, lazyMinBytes=None, firstBatchSize=FIRST_BATCH_SIZE,
+                batchSize=LOAD_BATCH_SIZE, useDatabase=False, dataset=None):
+    '''
+    Reads a csv file in batches, so rows can be shown while the rest of the file is still being read. Columnar
+    .pcol and .parquet files, and unchanged csv files with a snapshot, are loaded in a single batch. Otherwise large files are parsed by worker processes and
+    small files on this thread, as decided by ParallelCSVParser.
+
+    Files of at least lazyMinBytes bytes are not parsed up front. Their records are indexed into a LazyPipelineTable,
+    which is yielded once the scan is done or cancelled, and empty batches report the progress of the scan until then.
+    When useDatabase is set, the batches are instead loaded into a SQLitePipelineTable, which is yielded in the same
+    way once the rows are loaded and indexed. When a dataset is given, its files are read instead of the file, by
+    PipelineDataset.readBatches.
+
+    :param file: A string representing the path of the file.
+    :param snapshotCache: An optional SnapshotCache to load an unchanged file from.
+    :param cancel: An optional event which stops the read at its next batch when set.
+    :param lazyMinBytes: The size in bytes from which files are read on demand, or None to parse every file up front.
+    :param firstBatchSize: The number of rows in the first batch of a serial parse.
+    :param batchSize: The number of rows in the following batches of a serial parse.
+    :param useDatabase: Whether to load the rows into a SQLitePipelineTable.
+    :param dataset: An optional PipelineDataset whose files are read as one table.
+    :returns: A generator of tuples holding a PipelineTable of rows, a LazyPipelineTable or a SQLitePipelineTable, the
+              fraction of the file read so far, and the snapshot cache key of the file when it is being parsed, or
+              else None.
+    :raises OSError: If the file cannot be read.
+    :raises ValueError: If a columnar file is not valid, or Parquet files cannot be read as pyarrow is not installed.
+    '''
+    if useDatabase:
+        table = database.SQLitePipelineTable()
+
+        with closing(readBatches(file, snapshotCache, cancel, None, firstBatchSize, batchSize,
+                                 dataset=dataset)) as batches:
+            for batch, progress, loadKey in batches:
+                table.extendTable(batch, len(table))
+                yield columnar.PipelineTable(), progress, None
+
+        table.finishLoad()
+        yield table, 1.0, None
+        return
+
+    if dataset is not None:
+        with closing(dataset.readBatches(firstBatchSize, batchSize, cancel)) as batches:
+            for batch, progress in batches:
+                yield batch, progress, None
+        return
+
+    if columnFile.isColumnarFile(file):
+        yield columnFile.readTable(file), 1.0, None
+        return
+
+    if lazyMinBytes is not None and os.path.getsize(file) >= lazyMinBytes:
+        table = lazy.LazyPipelineTable(file)
+
+        for progress in table.indexRecords():
+            if cancel is not None and cancel.is_set():
+                yield table, progress, None
+                return
+
+            yield columnar.PipelineTable(), progress, None
+
+        yield table, 1.0, None
+        return
+
+    key = None
+
+    if snapshotCache is not None:
+        key = snapshotCache.fileKey(file)
+        snapshot = snapshotCache.load(key)
+
+        if snapshot is not None:
+            yield snapshot, 1.0, None
+            return
+
+    with closing(parser.readBatches(file, firstBatchSize, batchSize)) as batches:
+        for batch, progress in batches:
+            if cancel is not None and cancel.is_set():
+                return
+
+            yield batch, progress, key
+
+def applyEdit(table, edit):
+    '''
+    Applies a cell edit, or a batch insert or delete of rows, to a table.
+
+    :param table: The PipelineTable or LazyPipelineTable holding the rows.
+    :param edit: The edit, as a dictionary described by EditJournal.
+    :raises ValueError: If a value cannot be converted to the type of its column. The table is left unchanged.
+    '''
+    if edit["op"] == "set":
+        table.setValue(edit["position"], edit["column"], edit["new"])
+    elif edit["op"] == "insert":
+        table.insertRows(edit["positions"], edit["values"], edit["rowIds"])
+    else:
+        table.deleteRows(edit["positions"])
+
+def rowTexts(table, positions):
+    '''
+    Gets the cell texts of some rows of a table, as they are recorded in the edit journal. The rows of a
+    PipelineTable are decoded column by column.
+
+    :param table: The PipelineTable or LazyPipelineTable holding the rows.
+    :param positions: A list of the indexes of the rows.
+    :returns: A list of a list of the cell texts per row.
+    '''
+    if isinstance(table, columnar.PipelineTable):
+        rows = table.rowValuesAt(positions)
+    else:
+        rows = map(table.rowValues, positions)
+
+    return [list(map(str, row)) for row in rows]
+
+def columnIndex(column):
+    '''
+    Finds the index of a column from its name, ignoring case: its PipelineData attribute name, table heading or csv
+    header.
+
+    :param column: The name or index of the column.
+    :returns: The index of the column.
+    :raises KeyError: If the name does not name a column.
+    '''
+    if isinstance(column, int):
+        return schema.COLUMNS[column].index
+
+    try:
+        return filtering.COLUMN_LOOKUP[" ".join(column.split()).lower()].index
+    except KeyError:
+        raise KeyError(f"no column named {column!r}") from None
@@ -0,0 +1,774 @@
+#This module defines a PipelineTable object, which stores the rows of the Pipeline Throughput and Capacity Data dataset
+#column by column instead of as one PipelineData object per row. Numeric and date columns are kept in typed arrays and
+#text columns are dictionary encoded, so that a row costs a few dozen bytes instead of a full Python object. Rows are
+#still available through the PipelineData API as lightweight PipelineRow views. Docstring comments in reST style.
+
+#Author: Dan Blais - 040826486
+#Subject: CST8333
+
+from array import array
+from collections import deque
+from datetime import date
+import math
+import operator
+import KeystonePipelineData as model
+import ColumnConverters as converters
+import ColumnSchema as schema
+
+#The PipelineData attribute stored in each column, in CSV column order.
+COLUMN_NAMES = tuple(column.name for column in schema.COLUMNS)
+
+#How each column is stored: dates as day ordinals, whole numbers and decimals in typed arrays, and text as category codes.
+COLUMN_KINDS = tuple("category" if column.kind == "text" else column.kind for column in schema.COLUMNS)
+
+#The array type code used to store each kind of column.
+KIND_TYPECODES = {"date": "i", "int": "i", "float": "d", "category": "I"}
+
+#The value stored in an int column for an empty cell. Date columns store 0 and float columns store NaN.
+EMPTY_INT = converters.EMPTY_INT
+
+#The number of recent edits, inserts and removals kept in the change log of a table, which indexes of the table
+#replay to update themselves instead of being built again.
+CHANGE_LOG_LENGTH = 64
+
+class PipelineTable:
+    '''
+    Defines a columnar table of pipeline data rows. The table behaves like the list of PipelineData objects
+    it replaces: it has a length, can be indexed and iterated to get rows, and supports append, insert, pop
+    and clear. Each row also carries a row id, which stays with the row as rows are inserted and removed.
+
+    :attribute _columns: A list of typed arrays, one per column in COLUMN_NAMES order.
+    :attribute _rowIds: A typed array of the row id of each row.
+    :attribute _categoryValues: A list per column of the distinct text values of a category column, indexed by code.
+    :attribute _categoryCodes: A dictionary per column mapping the text values of a category column to their codes.
+    :attribute _encoders: A function per column converting a value to the form stored in the column.
+    :attribute _decoders: A function per column converting a stored value back to a value.
+    :attribute _editCount: The number of edits, inserts and removals made to the table.
+    :attribute _positions: A dictionary mapping the row id of each row to its index, or None until a row is looked up
+                           by row id. It is kept up to date as rows are appended, inserted and removed, updating only
+                           the rows from the first inserted or removed row on.
+    :attribute _changes: A deque of the most recent edits, inserts and removals, as tuples of the edit count after the
+                         change, the number of rows before it and the change, as described by changesSince.
+    :attribute _sourceRecords: A typed array of the index of the record of the source file held by each unchanged row,
+                               with -1 for edited and inserted rows, or None when the source records are not tracked.
+    '''
+
+    def __init__(self, pipelineDataRows=()):
+        '''
+        Initializes a PipelineTable object.
+
+        :param pipelineDataRows: An optional iterable of PipelineData objects to fill the table with. The rows
+                                 are given row ids counting up from 0.
+        '''
+        self._columns = [array(KIND_TYPECODES[kind]) for kind in COLUMN_KINDS]
+        self._rowIds = array("q")
+        self._categoryValues = [[] if kind == "category" else None for kind in COLUMN_KINDS]
+        self._categoryCodes = [{} if kind == "category" else None for kind in COLUMN_KINDS]
+        self._encoders = [self.buildEncoder(index) for index in range(len(COLUMN_NAMES))]
+        self._decoders = [self.buildDecoder(index) for index in range(len(COLUMN_NAMES))]
+        self._editCount = 0
+        self._positions = None
+        self._changes = deque(maxlen=CHANGE_LOG_LENGTH)
+        self._sourceRecords = None
+
+        for rowId, pipelineDataRow in enumerate(pipelineDataRows):
+            self.append(pipelineDataRow, rowId)
+
+    def buildEncoder(self, columnIndex):
+        '''
+        Builds the function which converts values to the form stored in a column. Empty strings are stored as the
+        empty marker of the column, and text is accepted for numeric and date columns.
+
+        :param columnIndex: The index of the column.
+        :returns: A function taking a value and returning the stored value. It raises ValueError for values
+                  which cannot be converted to the type of the column.
+        '''
+        kind = COLUMN_KINDS[columnIndex]
+
+        if kind == "date":
+            def encode(value):
+                if value == "" or value is None:
+                    return 0
+                if isinstance(value, str):
+                    return converters.parseDateOrdinal(value)
+                return value.toordinal()
+        elif kind == "int":
+            def encode(value):
+                return EMPTY_INT if value == "" or value is None else converters.storedInt(value)
+        elif kind == "float":
+            def encode(value):
+                return math.nan if value == "" or value is None else float(value)
+        else:
+            codes = self._categoryCodes[columnIndex]
+            values = self._categoryValues[columnIndex]
+
+            def encode(value):
+                value = "" if value is None else str(value)
+                code = codes.get(value)
+
+                if code is None:
+                    code = codes[value] = len(values)
+                    values.append(value)
+                return code
+
+        return encode
+
+    def buildDecoder(self, columnIndex):
+        '''
+        Builds the function which converts the values stored in a column back to values. Empty markers are
+        returned as empty strings, the same as the values of empty cells in PipelineData objects.
+
+        :param columnIndex: The index of the column.
+        :returns: A function taking a stored value and returning the value.
+        '''
+        kind = COLUMN_KINDS[columnIndex]
+
+        if kind == "date":
+            return lambda ordinal: date.fromordinal(ordinal) if ordinal else ""
+        elif kind == "int":
+            return lambda number: "" if number == EMPTY_INT else number
+        elif kind == "float":
+            return lambda number: "" if number != number else number
+        else:
+            return self._categoryValues[columnIndex].__getitem__
+
+    def __len__(self):
+        '''
+        Gets the number of rows in the table.
+
+        :returns: The number of rows.
+        '''
+        return len(self._rowIds)
+
+    def __getitem__(self, position):
+        '''
+        Gets a row of the table.
+
+        :param position: The index of the row.
+        :returns: A PipelineRow view of the row.
+        '''
+        position = operator.index(position)
+
+        if not 0 <= position < len(self._rowIds):
+            raise IndexError("PipelineTable index out of range")
+        return PipelineRow(self, position)
+
+    def __iter__(self):
+        '''
+        Iterates over the rows of the table.
+
+        :returns: An iterator of PipelineRow views.
+        '''
+        return (PipelineRow(self, position) for position in range(len(self._rowIds)))
+
+    def rowValues(self, position):
+        '''
+        Gets the values of a row in column order.
+
+        :param position: The index of the row.
+        :returns: A tuple of the row values, with empty cells as empty strings.
+        '''
+        return tuple(decode(column[position]) for decode, column in zip(self._decoders, self._columns))
+
+    def rowValuesRange(self, rowStart, rowEnd):
+        '''
+        Gets the values of a range of rows in column order, decoding the range column by column.
+
+        :param rowStart: The index of the first row.
+        :param rowEnd: The index after the last row.
+        :returns: A list of a tuple of the row values per row, with empty cells as empty strings.
+        '''
+        columns = [map(decode, column[rowStart:rowEnd]) for decode, column in zip(self._decoders, self._columns)]
+        return list(zip(*columns))
+
+    def rowValuesAt(self, positions):
+        '''
+        Gets the values of some rows in column order, decoding the rows column by column.
+
+        :param positions: A list of the indexes of the rows.
+        :returns: A list of a tuple of the row values per row, with empty cells as empty strings.
+        '''
+        columns = [map(decode, map(column.__getitem__, positions)) for decode, column in zip(self._decoders, self._columns)]
+        return list(zip(*columns))
+
+    def rowId(self, position):
+        '''
+        Gets the row id of a row.
+
+        :param position: The index of the row.
+        :returns: The row id.
+        '''
+        return self._rowIds[position]
+
+    @property
+    def rowIds(self):
+        '''The typed array of the row ids of the rows, in table order.'''
+        return self._rowIds
+
+    @property
+    def editCount(self):
+        '''The number of edits, inserts and removals made to the table, which tells whether rows changed since a load.'''
+        return self._editCount
+
+    def changesSince(self, editCount, rowCount):
+        '''
+        Gets the changes made to the table since it had an edit count and a number of rows, for an index of the table
+        to update itself from. Each change is one of:
+            ("set", position, columnIndex, oldValue, newValue) for a cell set from one stored value to another,
+            ("insert", positions, values) for rows inserted at ascending positions, with a list per column of the
+            stored values of the inserted rows,
+            ("delete", positions) for rows removed from ascending positions.
+        Rows appended since the last change are not listed, and follow the rows the changes leave.
+
+        :param editCount: The edit count of the table when the index was last updated.
+        :param rowCount: The number of rows of the table when the index was last updated.
+        :returns: A list of the changes in the order they were made, or None if the change log no longer holds them
+                  all, or rows were appended or the table cleared between them, and the index must be built again.
+        '''
+        changes = [entry for entry in self._changes if entry[0] > editCount]
+
+        if len(changes) != self._editCount - editCount:
+            return None
+
+        for count, rowsBefore, change in changes:
+            if rowsBefore != rowCount:
+                return None
+
+            if change[0] == "insert":
+                rowCount += len(change[1])
+            elif change[0] == "delete":
+                rowCount -= len(change[1])
+
+        if rowCount > len(self._rowIds):
+            return None
+        return [change for count, rowsBefore, change in changes]
+
+    def logChange(self, change, rowsBefore):
+        '''
+        Counts a change made to the table as an edit and adds it to the change log.
+
+        :param change: The change, as described by changesSince.
+        :param rowsBefore: The number of rows of the table before the change.
+        '''
+        self._editCount += 1
+        self._changes.append((self._editCount, rowsBefore, change))
+
+    def trackPositions(self, rowStart):
+        '''
+        Updates the dictionary of row positions, if it is built, for the rows from an index on, such as after rows
+        were inserted or removed there.
+
+        :param rowStart: The index of the first row whose position changed.
+        '''
+        if self._positions is not None:
+            self._positions.update(zip(self._rowIds[rowStart:], range(rowStart, len(self._rowIds))))
+
+    def positionOf(self, rowId):
+        '''
+        Finds the row with a row id. The dictionary of row positions is built on the first lookup and kept up to
+        date afterwards, so later lookups take constant time.
+
+        :param rowId: The row id.
+        :returns: The index of the row, or None if no row has the row id.
+        '''
+        if self._positions is None:
+            self._positions = dict(zip(self._rowIds, range(len(self._rowIds))))
+        return self._positions.get(rowId)
+
+    def trackAppendedRows(self, rowCount):
+        '''
+        Adds rows appended at the end of the table to the dictionary of row positions, if it is built, and marks
+        them as not read from the source file, if the source records are tracked.
+
+        :param rowCount: The number of rows appended.
+        '''
+        if self._positions is not None and rowCount:
+            end = len(self._rowIds)
+            self._positions.update(zip(self._rowIds[end - rowCount:], range(end - rowCount, end)))
+
+        if self._sourceRecords is not None and rowCount:
+            self._sourceRecords.extend(array("q", [-1]) * rowCount)
+
+    def trackSource(self):
+        '''
+        Marks the rows of the table as the records of its source file in order, such as once the file is loaded
+        or saved. From then on each row remembers the record it was read from until it is edited, and inserted rows
+        are marked as not read from the file, so a save can copy the unchanged records from the file.
+        '''
+        self._sourceRecords = array("q", range(len(self._rowIds)))
+
+    def sourceRecords(self):
+        '''
+        Gets the record of the source file held by each row, for saving only the changed rows.
+
+        :returns: A typed array of the index of the source record of each row, or a negative number for rows
+                  which were edited or inserted, or None if the source records are not tracked.
+        '''
+        return self._sourceRecords
+
+    def getValue(self, position, columnIndex):
+        '''
+        Gets a single value of a row.
+
+        :param position: The index of the row.
+        :param columnIndex: The index of the column.
+        :returns: The value, or an empty string for an empty cell.
+        '''
+        return self._decoders[columnIndex](self._columns[columnIndex][position])
+
+    def setValue(self, position, columnIndex, value):
+        '''
+        Sets a single value of a row.
+
+        :param position: The index of the row.
+        :param columnIndex: The index of the column.
+        :param value: The new value, either typed or as text. An empty string empties the cell.
+        :raises ValueError: If the value cannot be converted to the type of the column.
+        '''
+        column = self._columns[columnIndex]
+        oldValue = column[position]
+        column[position] = self._encoders[columnIndex](value)
+        self.logChange(("set", position, columnIndex, oldValue, column[position]), len(self._rowIds))
+
+        if self._sourceRecords is not None:
+            self._sourceRecords[position] = -1
+
+    def decoder(self, columnIndex):
+        '''
+        Gets the function which converts the values stored in a column back to values.
+
+        :param columnIndex: The index of the column.
+        :returns: A function taking a stored value and returning the value, or an empty string for an empty marker.
+        '''
+        return self._decoders[columnIndex]
+
+    def encoder(self, columnIndex):
+        '''
+        Gets the function which converts values to the form stored in a column. The encoder of a category column
+        adds values it has not seen to the category values of the column.
+
+        :param columnIndex: The index of the column.
+        :returns: A function taking a value and returning the stored value. It raises ValueError for values
+                  which cannot be converted to the type of the column.
+        '''
+        return self._encoders[columnIndex]
+
+    def columnBuffer(self, columnIndex):
+        '''
+        Gets the typed array storing a column, for vectorized access. Date columns hold day ordinals with 0 for
+        empty cells, int columns hold EMPTY_INT for empty cells, float columns hold NaN for empty cells and category
+        columns hold codes into categoryValues(). The arrays support the buffer protocol, so they can be wrapped by
+        numpy.frombuffer without copying. The array must not be resized by the caller.
+
+        :param columnIndex: The index of the column.
+        :returns: The typed array of the column.
+        '''
+        return self._columns[columnIndex]
+
+    def categoryValues(self, columnIndex):
+        '''
+        Gets the distinct text values of a category column, indexed by the codes stored in the column.
+
+        :param columnIndex: The index of the column.
+        :returns: A list of text values, or None if the column is not a category column.
+        '''
+        return self._categoryValues[columnIndex]
+
+    def appendRow(self, values, rowId):
+        '''
+        Appends a row given as values in column order, without building a PipelineData object.
+
+        :param values: A sequence of the row values, typed or as text.
+        :param rowId: The row id of the new row.
+        :raises ValueError: If a value cannot be converted to the type of its column. The table is left unchanged.
+        '''
+        encoded = [encode(value) for encode, value in zip(self._encoders, values)]
+
+        for column, value in zip(self._columns, encoded):
+            column.append(value)
+        self._rowIds.append(rowId)
+        self.trackAppendedRows(1)
+
+    def extendValues(self, rows, firstRowId):
+        '''
+        Appends a batch of rows given as values in column order, such as rows read from a LazyPipelineTable,
+        encoding them column by column instead of appending them one row at a time.
+
+        :param rows: A list of rows, each a sequence of the row values, typed or as text.
+        :param firstRowId: The row id of the first appended row. The other rows get the following row ids.
+        :raises ValueError: If a value cannot be converted to the type of its column. The table is left unchanged.
+        '''
+        encodedColumns = [array(column.typecode, map(encode, values))
+                          for column, encode, values in zip(self._columns, self._encoders, zip(*rows))]
+
+        for column, encoded in zip(self._columns, encodedColumns):
+            column.extend(encoded)
+        self._rowIds.extend(range(firstRowId, firstRowId + len(rows)))
+        self.trackAppendedRows(len(rows))
+
+    def extendRows(self, rows, firstRowId):
+        '''
+        Appends a batch of csv rows given as cell texts, converting them column by column. Numeric and date columns
+        are converted by the bulk encoders of ColumnConverters, and category columns are encoded by looking up the
+        codes of the distinct values of the batch. If any row of the batch has the wrong number of cells or a cell
+        which cannot be converted, the batch is appended row by row instead, and the rows which fail are reported
+        and skipped.
+
+        :param rows: A list of rows, each a sequence of cell texts in CSV column order.
+        :param firstRowId: The row id of the first appended row. The other rows get the following row ids.
+        :returns: The number of rows appended.
+        '''
+        try:
+            if any(len(row) != len(COLUMN_NAMES) for row in rows):
+                raise ValueError("row has the wrong number of cells")
+
+            encodedColumns = []
+
+            for columnIndex, texts in enumerate(zip(*rows)):
+                kind = COLUMN_KINDS[columnIndex]
+
+                if kind == "category":
+                    encode = self._encoders[columnIndex]
+                    codes = {text: encode(text) for text in set(texts)}
+                    encodedColumns.append(array(KIND_TYPECODES[kind], map(codes.__getitem__, texts)))
+                else:
+                    encodedColumns.append(converters.KIND_ENCODERS[kind](texts))
+        except (ValueError, OverflowError):
+            return self.extendRowsOneByOne(rows, firstRowId)
+
+        for column, encoded in zip(self._columns, encodedColumns):
+            column.extend(encoded)
+        self._rowIds.extend(range(firstRowId, firstRowId + len(rows)))
+        self.trackAppendedRows(len(rows))
+        return len(rows)
+
+    def extendRowsOneByOne(self, rows, firstRowId):
+        '''
+        Appends a batch of csv rows given as cell texts one row at a time, reporting and skipping rows which have
+        the wrong number of cells or a cell which cannot be converted.
+
+        :param rows: A list of rows, each a sequence of cell texts in CSV column order.
+        :param firstRowId: The row id of the first appended row. The other rows get the following row ids.
+        :returns: The number of rows appended.
+        '''
+        appended = 0
+
+        for row in rows:
+            try:
+                if len(row) != len(COLUMN_NAMES):
+                    raise IndexError("list index out of range")
+                self.appendRow(converters.convertRow(row), firstRowId + appended)
+                appended += 1
+            except Exception as e:
+                print(f"Error: {e}")
+
+        return appended
+
+    def append(self, pipelineDataRow, rowId):
+        '''
+        Appends a row given as a PipelineData object.
+
+        :param pipelineDataRow: The PipelineData object or PipelineRow view to append.
+        :param rowId: The row id of the new row.
+        '''
+        self.insert(len(self._rowIds), pipelineDataRow, rowId)
+
+    def insert(self, position, pipelineDataRow, rowId):
+        '''
+        Inserts a row given as a PipelineData object.
+
+        :param position: The index the new row will have.
+        :param pipelineDataRow: The PipelineData object or PipelineRow view to insert.
+        :param rowId: The row id of the new row.
+        :raises ValueError: If a value cannot be converted to the type of its column. The table is left unchanged.
+        '''
+        encoded = [encode(getattr(pipelineDataRow, name)) for encode, name in zip(self._encoders, COLUMN_NAMES)]
+
+        position = operator.index(position)
+
+        if position < 0:
+            position = max(position + len(self._rowIds), 0)
+        position = min(position, len(self._rowIds))
+
+        for column, value in zip(self._columns, encoded):
+            column.insert(position, value)
+        self._rowIds.insert(position, rowId)
+        self.logChange(("insert", [position], [[value] for value in encoded]), len(self._rowIds) - 1)
+
+        if self._sourceRecords is not None:
+            self._sourceRecords.insert(position, -1)
+        self.trackPositions(position)
+
+    def pop(self, position=-1):
+        '''
+        Removes a row from the table.
+
+        :param position: The index of the row to remove.
+        :returns: The removed row as a PipelineData object.
+        '''
+        position = operator.index(position)
+
+        if position < 0:
+            position += len(self._rowIds)
+
+        removed = model.PipelineData(*self.rowValues(position))
+
+        for column in self._columns:
+            del column[position]
+        rowId = self._rowIds.pop(position)
+        self.logChange(("delete", [position]), len(self._rowIds) + 1)
+
+        if self._sourceRecords is not None:
+            del self._sourceRecords[position]
+
+        if self._positions is not None:
+            self._positions.pop(rowId, None)
+            self.trackPositions(position)
+        return removed
+
+    def insertRows(self, positions, rows, rowIds):
+        '''
+        Inserts a batch of rows in one pass, merging them into each column as blocks instead of shifting the
+        column once per row.
+
+        :param positions: The ascending indexes the new rows will have once they are all inserted.
+        :param rows: A list of the values of each new row in column order, typed or as text.
+        :param rowIds: A list of the row ids of the new rows.
+        :raises ValueError: If a value cannot be converted to the type of its column. The rows are left unchanged.
+        '''
+        if not rows:
+            return
+
+        encoded = [[encode(value) for value in values] for encode, values in zip(self._encoders, zip(*rows))]
+        rowsBefore = len(self._rowIds)
+        self._columns = [insertIntoArray(column, positions, values) for column, values in zip(self._columns, encoded)]
+        self._rowIds = insertIntoArray(self._rowIds, positions, rowIds)
+        self.logChange(("insert", list(positions), encoded), rowsBefore)
+
+        if self._sourceRecords is not None:
+            self._sourceRecords = insertIntoArray(self._sourceRecords, positions, [-1] * len(rows))
+        self.trackPositions(positions[0])
+
+    def deleteRows(self, positions):
+        '''
+        Removes a batch of rows in one compaction pass, copying the runs of kept rows of each column as blocks, so
+        removing many rows costs one pass over the table instead of one shift per row.
+
+        :param positions: The ascending indexes of the rows to remove.
+        '''
+        if not positions:
+            return
+
+        if self._positions is not None:
+            for position in positions:
+                self._positions.pop(self._rowIds[position], None)
+
+        rowsBefore = len(self._rowIds)
+        self._columns = [deleteFromArray(column, positions) for column in self._columns]
+        self._rowIds = deleteFromArray(self._rowIds, positions)
+        self.logChange(("delete", list(positions)), rowsBefore)
+
+        if self._sourceRecords is not None:
+            self._sourceRecords = deleteFromArray(self._sourceRecords, positions)
+        self.trackPositions(positions[0])
+
+    def extendTable(self, other, firstRowId):
+        '''
+        Appends all rows of another table, such as a batch parsed on the loader thread. Typed columns are copied
+        as a block and category codes are translated to the codes of this table.
+
+        :param other: The PipelineTable whose rows are appended.
+        :param firstRowId: The row id of the first appended row. The other rows get the following row ids.
+        '''
+        for columnIndex, (column, otherColumn) in enumerate(zip(self._columns, other._columns)):
+            if COLUMN_KINDS[columnIndex] == "category":
+                encode = self._encoders[columnIndex]
+                codeMap = [encode(value) for value in other._categoryValues[columnIndex]]
+
+                if codeMap == list(range(len(codeMap))):
+                    column.extend(otherColumn)
+                else:
+                    column.extend(array(column.typecode, map(codeMap.__getitem__, otherColumn)))
+            else:
+                column.extend(otherColumn)
+
+        self._rowIds.extend(range(firstRowId, firstRowId + len(other)))
+        self.trackAppendedRows(len(other))
+
+    def __getstate__(self):
+        '''
+        Gets the state of the table for pickling, such as when a table parsed by a worker process is sent back to
+        the loading process. Only the column arrays, row ids and category values are kept; the rest is rebuilt.
+
+        :returns: A tuple of the column arrays, the row ids and the category values of each column.
+        '''
+        return self._columns, self._rowIds, self._categoryValues
+
+    @classmethod
+    def fromState(cls, state):
+        '''
+        Builds a table from stored column arrays, such as those of a snapshot.
+
+        :param state: A tuple of the column arrays, the row ids and the category values of each column, as returned
+                      by __getstate__.
+        :returns: A PipelineTable holding the rows.
+        '''
+        table = cls()
+        table.__setstate__(state)
+        return table
+
+    def copy(self):
+        '''
+        Copies the table, such as to write its rows on another thread while the table is still edited.
+
+        :returns: A PipelineTable holding copies of the rows and row ids.
+        '''
+        categoryValues = [None if values is None else list(values) for values in self._categoryValues]
+        table = PipelineTable.fromState(([column[:] for column in self._columns], self._rowIds[:], categoryValues))
+
+        if self._sourceRecords is not None:
+            table._sourceRecords = self._sourceRecords[:]
+        return table
+
+    def selectRows(self, positions):
+        '''
+        Copies some rows of the table to a new table, such as the rows matching a filter, keeping their row ids.
+        Each column is copied with one pass over the positions.
+
+        :param positions: An iterable of the indexes of the rows, in the order they will have in the new table.
+        :returns: A PipelineTable holding copies of the rows.
+        '''
+        positions = array("I", positions)
+        categoryValues = [None if values is None else list(values) for values in self._categoryValues]
+        columns = [array(column.typecode, map(column.__getitem__, positions)) for column in self._columns]
+        return PipelineTable.fromState((columns, array("q", map(self._rowIds.__getitem__, positions)), categoryValues))
+
+    def __setstate__(self, state):
+        '''
+        Restores the state of an unpickled table.
+
+        :param state: A tuple as returned by __getstate__.
+        '''
+        self.__init__()
+        columns, rowIds, categoryValues = state
+        self._columns = columns
+        self._rowIds = rowIds
+
+        for columnIndex, values in enumerate(categoryValues):
+            if values is not None:
+                self._categoryValues[columnIndex].extend(values)
+                self._categoryCodes[columnIndex].update((value, code) for code, value in enumerate(values))
+
+    def clear(self):
+        '''
+        Removes all rows from the table.
+        '''
+        editCount = self._editCount
+        self.__init__()
+        self._editCount = editCount + 1
+
+    def nbytes(self):
+        '''
+        Gets the approximate memory used by the stored values, excluding the category dictionaries.
+
+        :returns: The size of the column arrays and row ids in bytes.
+        '''
+        return sum(column.itemsize * len(column) for column in self._columns) + self._rowIds.itemsize * len(self._rowIds)
+
+def insertIntoArray(values, positions, inserted):
+    '''
+    Merges new elements into a typed array. New elements forming one block are spliced into the array in place;
+    otherwise a copy is built, copying the runs of elements between the new ones as blocks.
+
+    :param values: The typed array.
+    :param positions: The ascending indexes the new elements will have in the merged array.
+    :param inserted: The new elements, in the order of their positions.
+    :returns: The merged typed array, which is the given array when the new elements form one block.
+    '''
+    if positions[-1] - positions[0] == len(positions) - 1:
+        values[positions[0]:positions[0]] = array(values.typecode, inserted)
+        return values
+
+    merged = array(values.typecode)
+    start = 0
+
+    for count, (position, value) in enumerate(zip(positions, inserted)):
+        end = position - count
+        merged += values[start:end]
+        merged.append(value)
+        start = end
+
+    merged += values[start:]
+    return merged
+
+def deleteFromArray(values, positions):
+    '''
+    Removes the elements at some indexes from a typed array. Elements forming one block are deleted in place;
+    otherwise a copy is built, copying the runs of kept elements as blocks.
+
+    :param values: The typed array.
+    :param positions: The ascending indexes of the elements to remove.
+    :returns: The typed array without the elements, which is the given array when they form one block.
+    '''
+    if positions[-1] - positions[0] == len(positions) - 1:
+        del values[positions[0]:positions[-1] + 1]
+        return values
+
+    kept = array(values.typecode)
+    start = 0
+
+    for position in positions:
+        kept += values[start:position]
+        start = position + 1
+
+    kept += values[start:]
+    return kept
+
+class PipelineRow:
+    '''
+    A lightweight view of a row of a PipelineTable with the same attributes as a PipelineData object. Reading an
+    attribute reads the table, and setting an attribute writes to the table. A view refers to a row by its index,
+    so it should not be kept across inserts or removals of rows above it.
+
+    :attribute _table: The PipelineTable holding the row.
+    :attribute _position: The index of the row in the table.
+    '''
+    __slots__ = ("_table", "_position")
+
+    def __init__(self, table, position):
+        '''
+        Initializes a PipelineRow view.
+
+        :param table: The PipelineTable holding the row.
+        :param position: The index of the row in the table.
+        '''
+        self._table = table
+        self._position = position
+
+    @property
+    def rowId(self):
+        '''The row id of the row.'''
+        return self._table.rowId(self._position)
+
+def buildRowProperty(columnIndex, name):
+    '''
+    Builds the property giving a PipelineRow view the PipelineData attribute of a column. As with PipelineData,
+    a value which cannot be converted to the type of the column is reported and not stored.
+
+    :param columnIndex: The index of the column.
+    :param name: The PipelineData attribute name of the column.
+    :returns: A property reading and writing the column of the viewed row.
+    '''
+    def getValue(row):
+        return row._table.getValue(row._position, columnIndex)
+
+    def setValue(row, value):
+        try:
+            row._table.setValue(row._position, columnIndex, value)
+        except Exception as e:
+            print(f"Error: {e}")
+
+    return property(getValue, setValue, doc=f"The {name} of the pipeline data.")
+
+for columnIndex, name in enumerate(COLUMN_NAMES):
+    setattr(PipelineRow, name, buildRowProperty(columnIndex, name))
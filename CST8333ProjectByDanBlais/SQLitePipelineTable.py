@@ -0,0 +1,787 @@
+#This module defines a SQLitePipelineTable object, which keeps the rows of a Pipeline Throughput and Capacity Data csv
+#file in a local SQLite database instead of in memory, for datasets larger than the memory of the computer. Parsed
+#batches are bulk loaded with executemany in large transactions into a database in WAL mode, and the Date, Key Point
+#and Product columns are indexed once the rows are loaded. The rows scrolled into view are read in windows of rows, and
+#searches, filter queries, sorts and the summaries of charts run as SQL queries, while every edit is a single statement.
+#Only the row ids are kept in memory, giving the order of the rows. Docstring comments in reST style.
+
+#Author: Dan Blais - 040826486
+#Subject: CST8333
+
+from array import array
+from datetime import date
+import bisect
+import itertools as it
+import operator
+import os
+import sqlite3
+import weakref
+import ColumnSchema as schema
+import ColumnConverters as converters
+import FilterQuery as filtering
+import KeystonePipelineData as model
+import PipelineTable as columnar
+import SortIndex as sorting
+
+#Environment variable which stores the rows of loaded files in SQLite when set to 1, on, true or yes.
+DATABASE_VARIABLE = "PIPELINE_DATABASE"
+#The name of the table holding the rows in the database.
+TABLE_NAME = "pipelineRows"
+#The SQL type of each kind of column.
+SQL_TYPES = {"date": "TEXT", "int": "INTEGER", "float": "REAL", "text": "TEXT"}
+#The columns indexed once the rows are loaded, by PipelineData attribute name.
+INDEXED_COLUMNS = ("date", "keyPoint", "product")
+#Number of rows loaded in one transaction.
+LOAD_TRANSACTION_ROWS = 200000
+#Number of rows read at once when a row is not in the window of rows read last.
+ROW_WINDOW_SIZE = 128
+#Number of rows kept in memory from the windows read so far, enough for several screens of rows.
+ROW_CACHE_SIZE = 4096
+#Megabytes of database pages cached in memory by SQLite.
+PAGE_CACHE_MEGABYTES = 64
+#The characters of the text of a float, as Python writes it. A search for any other character skips the float columns.
+FLOAT_CHARACTERS = frozenset("0123456789.-+eainf")
+
+def databaseEnabled():
+    '''
+    Tells whether the PIPELINE_DATABASE environment variable turns on storing the rows of loaded files in SQLite.
+
+    :returns: True if rows are stored in SQLite by default.
+    '''
+    return os.environ.get(DATABASE_VARIABLE, "").strip().lower() in ("1", "on", "true", "yes")
+
+def encodeValue(columnIndex, value):
+    '''
+    Converts a value of a column to the value stored in the database. Dates are stored as their 'YYYY-MM-DD' text,
+    which sorts and compares in date order, and empty cells are stored as NULL.
+
+    :param columnIndex: The index of the column.
+    :param value: The value, either typed or as text. An empty string is an empty cell.
+    :returns: The stored value, or None for an empty cell.
+    :raises ValueError: If the value cannot be converted to the type of the column.
+    '''
+    column = schema.COLUMNS[columnIndex]
+
+    if isinstance(value, str):
+        value = column.convert(value)
+
+    if value == "" or value is None:
+        return None
+    elif column.kind == "date":
+        return value.isoformat()
+    elif column.kind == "float":
+        return float(value)
+    return value
+
+def decodeDate(text):
+    '''
+    Converts a stored date to its value.
+
+    :param text: The stored 'YYYY-MM-DD' text, or None for an empty cell.
+    :returns: A date, or an empty string for an empty cell.
+    '''
+    return "" if text is None else converters.parseDate(text)
+
+def decodeValue(value):
+    '''
+    Converts a stored value of a column other than a date column to its value.
+
+    :param value: The stored value, or None for an empty cell.
+    :returns: The value, or an empty string for an empty cell.
+    '''
+    return "" if value is None else value
+
+#The function converting a stored value of each column back to its value, in CSV column order.
+DECODERS = tuple(decodeDate if column.kind == "date" else decodeValue for column in schema.COLUMNS)
+
+def toNumber(text):
+    '''
+    Reads the text of a cell as a number, for summarizing text columns in SQL as Aggregation does.
+
+    :param text: The stored text, or None for an empty cell.
+    :returns: A float, or None if the text is not a number.
+    '''
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return None
+
+def floatText(value):
+    '''
+    Writes a stored float as Python writes it, for testing the text of float cells in SQL as a PipelineTable does.
+    SQLite writes REAL values with at most 15 significant digits, which differs from Python for some values.
+
+    :param value: The stored float, or None for an empty cell.
+    :returns: The text of the float, or None for an empty cell.
+    '''
+    return None if value is None else str(value)
+
+def lowerText(text):
+    '''
+    Lowers a stored text as Python does, for comparing text in SQL ignoring case as a PipelineTable does. The lower
+    function and LIKE operator of SQLite only lower ASCII letters, so accented capitals would not match their
+    lowercase letters.
+
+    :param text: The stored text, or None for an empty cell.
+    :returns: The lowercase text, or None for an empty cell.
+    '''
+    return None if text is None else text.lower()
+
+def cellCondition(column):
+    '''
+    Builds the SQL expression giving the text of the cells of a column which searches look for a text in, in
+    lowercase for a text column.
+
+    :param column: The Column of the schema.
+    :returns: The SQL expression.
+    '''
+    if column.kind == "text":
+        return f"lowerText({column.name})"
+    return f"floatText({column.name})" if column.kind == "float" else column.name
+
+def storedColumn(table, columnIndex):
+    '''
+    Converts a column of a PipelineTable to the values stored in the database, once per distinct date and text.
+
+    :param table: The PipelineTable holding the column.
+    :param columnIndex: The index of the column.
+    :returns: An iterator of the stored value of each row, with None for empty cells.
+    '''
+    buffer = table.columnBuffer(columnIndex)
+    kind = columnar.COLUMN_KINDS[columnIndex]
+
+    if kind == "category":
+        return map([value or None for value in table.categoryValues(columnIndex)].__getitem__, buffer)
+    elif kind == "date":
+        texts = {ordinal: date.fromordinal(ordinal).isoformat() if ordinal else None for ordinal in set(buffer)}
+        return map(texts.__getitem__, buffer)
+    elif kind == "int":
+        return (None if number == columnar.EMPTY_INT else number for number in buffer)
+    return (None if number != number else number for number in buffer)
+
+def removeDatabase(connection, path):
+    '''
+    Closes the connection of a database and removes its files, including its write-ahead log.
+
+    :param connection: The connection to the database.
+    :param path: The path of the database file.
+    '''
+    connection.close()
+
+    for file in (path, path + "-wal", path + "-shm"):
+        try:
+            os.remove(file)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Error: {e}")
+
+class SQLitePipelineTable:
+    '''
+    Defines a table of pipeline data rows stored in a SQLite database. The table has the same interface as
+    PipelineTable, so the controller can use either one as its model, and adds SQL searches, sorts and summaries.
+    The database is a temporary file which is removed when the table is closed or garbage collected.
+
+    :attribute _path: The path of the database file.
+    :attribute _connection: The connection to the database.
+    :attribute _rowIds: A typed array of the row id of each row in table order. The row id is the key of the row in
+                        the database.
+    :attribute _ascending: Whether the row ids are in ascending order, so a row id is found by bisection and a range of
+                           rows is a range of row ids.
+    :attribute _positions: A dictionary mapping the row id of each row to its index, or None until a row is looked up
+                           by row id while the row ids are not in ascending order.
+    :attribute _editCount: The number of edits, inserts and removals made to the table.
+    :attribute _pendingRows: The number of rows loaded since the last commit of the load.
+    :attribute _window: A dictionary of the values of the rows read so far, keyed by the index of the row.
+    :attribute _orders: A dictionary mapping a column index and a descending flag to a typed array of the indexes of
+                        the rows in sorted order.
+    :attribute _ranks: A dictionary mapping a column index and a descending flag to the inverse of its order.
+    :attribute _ordersVersion: The edit count and length of the table when the orders were computed.
+    :attribute _finalizer: The finalizer removing the database, or None for a copy reading the database of a table.
+    '''
+
+    def __init__(self, directory=None):
+        '''
+        Initializes a SQLitePipelineTable object with a new empty database.
+
+        :param directory: The folder to create the database in. Defaults to the temporary folder.
+        '''
+        #tempfile is only needed once a database is created, so it is not imported at startup.
+        import tempfile
+        descriptor, self._path = tempfile.mkstemp(prefix="csvmanager-", suffix=".sqlite", dir=directory)
+        os.close(descriptor)
+        self._connection = self.connect(self._path)
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA synchronous = OFF")
+        columns = ", ".join(f"{column.name} {SQL_TYPES[column.kind]}" for column in schema.COLUMNS)
+        self._connection.execute(f"CREATE TABLE {TABLE_NAME} (rowId INTEGER PRIMARY KEY, {columns})")
+        self._connection.commit()
+        self._finalizer = weakref.finalize(self, removeDatabase, self._connection, self._path)
+        self._rowIds = array("q")
+        self._ascending = True
+        self._positions = None
+        self._editCount = 0
+        self._pendingRows = 0
+        self._window = {}
+        self._orders = {}
+        self._ranks = {}
+        self._ordersVersion = None
+
+    @staticmethod
+    def connect(path):
+        '''
+        Opens a connection to a database. The connection may be used from another thread than the one opening it,
+        such as the loader thread handing the table to the window, but never from two threads at once.
+
+        :param path: The path of the database file.
+        :returns: The sqlite3 connection.
+        '''
+        connection = sqlite3.connect(path, check_same_thread=False)
+        connection.execute(f"PRAGMA cache_size = {-PAGE_CACHE_MEGABYTES * 1024}")
+        connection.execute("PRAGMA temp_store = MEMORY")
+        connection.create_function("toNumber", 1, toNumber, deterministic=True)
+        connection.create_function("floatText", 1, floatText, deterministic=True)
+        connection.create_function("lowerText", 1, lowerText, deterministic=True)
+        connection.execute("CREATE TEMP TABLE IF NOT EXISTS displayedRows (rowId INTEGER PRIMARY KEY)")
+        return connection
+
+    @property
+    def path(self):
+        '''The path of the database file.'''
+        return self._path
+
+    def extendTable(self, other, firstRowId):
+        '''
+        Appends all rows of a PipelineTable, such as a batch parsed on the loader thread. The rows are inserted
+        with one executemany call, and the load is committed every LOAD_TRANSACTION_ROWS rows.
+
+        :param other: The PipelineTable whose rows are appended.
+        :param firstRowId: The row id of the first appended row. The other rows get the following row ids.
+        '''
+        if not len(other):
+            return
+
+        columns = [storedColumn(other, columnIndex) for columnIndex in range(len(schema.COLUMNS))]
+        rowIds = range(firstRowId, firstRowId + len(other))
+        self._connection.executemany(self.insertStatement(), zip(rowIds, *columns))
+        self._ascending = self._ascending and (not self._rowIds or self._rowIds[-1] < firstRowId)
+        self._rowIds.extend(rowIds)
+        self._pendingRows += len(other)
+
+        if self._pendingRows >= LOAD_TRANSACTION_ROWS:
+            self._connection.commit()
+            self._pendingRows = 0
+
+    def finishLoad(self):
+        '''
+        Commits the rows loaded last and indexes the columns of INDEXED_COLUMNS. Indexing the loaded rows at once is
+        faster than keeping the indexes up to date while loading. Text columns are indexed on their lowercase text,
+        as they are compared and sorted ignoring case.
+        '''
+        self._connection.commit()
+        self._pendingRows = 0
+
+        with self._connection:
+            for name in INDEXED_COLUMNS:
+                key = f"lowerText({name})" if schema.columnNamed(name).kind == "text" else name
+                self._connection.execute(f"CREATE INDEX IF NOT EXISTS {name}Index ON {TABLE_NAME} ({key})")
+
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+
+    @staticmethod
+    def insertStatement():
+        '''
+        Builds the statement inserting a row with its row id.
+
+        :returns: The SQL INSERT statement, taking the row id followed by the stored value of each column.
+        '''
+        return f"INSERT INTO {TABLE_NAME} VALUES ({', '.join('?' * (len(schema.COLUMNS) + 1))})"
+
+    def __len__(self):
+        '''
+        Gets the number of rows in the table.
+
+        :returns: The number of rows.
+        '''
+        return len(self._rowIds)
+
+    def __getitem__(self, position):
+        '''
+        Gets a row of the table.
+
+        :param position: The index of the row.
+        :returns: A PipelineRow view of the row.
+        '''
+        position = operator.index(position)
+
+        if not 0 <= position < len(self):
+            raise IndexError("SQLitePipelineTable index out of range")
+        return columnar.PipelineRow(self, position)
+
+    def __iter__(self):
+        '''
+        Iterates over the rows of the table.
+
+        :returns: An iterator of PipelineRow views.
+        '''
+        return (columnar.PipelineRow(self, position) for position in range(len(self)))
+
+    def rowValues(self, position):
+        '''
+        Gets the values of a row in column order. A row which was not read yet is read together with the rows
+        following it, up to ROW_WINDOW_SIZE rows in one query, so rendering a screen of rows costs a query or two.
+
+        :param position: The index of the row.
+        :returns: A tuple of the row values, with empty cells as empty strings.
+        '''
+        values = self._window.get(position)
+
+        if values is None:
+            if not 0 <= position < len(self):
+                raise IndexError("SQLitePipelineTable index out of range")
+
+            self.readWindow(position, min(position + ROW_WINDOW_SIZE, len(self)))
+            values = self._window[position]
+        return values
+
+    def readWindow(self, rowStart, rowEnd):
+        '''
+        Reads a range of rows into the rows kept in memory, dropping the rows read before once ROW_CACHE_SIZE rows
+        are kept.
+
+        :param rowStart: The index of the first row.
+        :param rowEnd: The index after the last row.
+        '''
+        if len(self._window) + rowEnd - rowStart > ROW_CACHE_SIZE:
+            self._window = {}
+
+        rowIds = self._rowIds[rowStart:rowEnd]
+        cursor = self._connection.execute(f"SELECT * FROM {TABLE_NAME} WHERE rowId IN ({', '.join('?' * len(rowIds))})",
+                                          tuple(rowIds))
+        rows = {row[0]: tuple(decode(value) for decode, value in zip(DECODERS, row[1:])) for row in cursor}
+        self._window.update(zip(range(rowStart, rowEnd), map(rows.__getitem__, rowIds)))
+
+    def rowId(self, position):
+        '''
+        Gets the row id of a row.
+
+        :param position: The index of the row.
+        :returns: The row id.
+        '''
+        return self._rowIds[position]
+
+    @property
+    def rowIds(self):
+        '''The typed array of the row ids of the rows, in table order.'''
+        return self._rowIds
+
+    @property
+    def editCount(self):
+        '''The number of edits, inserts and removals made to the table.'''
+        return self._editCount
+
+    def sourceRecords(self):
+        '''
+        Gets the record of the source file held by each row. The rows of a database are not tied to the records of
+        the file they were loaded from, so every row is written by a save.
+
+        :returns: None, as the source records are not tracked.
+        '''
+        return None
+
+    def positionOf(self, rowId):
+        '''
+        Finds the row with a row id. While the row ids are in ascending order the row is found by bisection, and
+        otherwise a dictionary of row positions is built on the first lookup after rows were inserted or removed.
+
+        :param rowId: The row id.
+        :returns: The index of the row, or None if no row has the row id.
+        '''
+        if self._ascending:
+            position = bisect.bisect_left(self._rowIds, rowId)
+            return position if position < len(self._rowIds) and self._rowIds[position] == rowId else None
+
+        if self._positions is None:
+            self._positions = dict(zip(self._rowIds, range(len(self._rowIds))))
+        return self._positions.get(rowId)
+
+    def getValue(self, position, columnIndex):
+        '''
+        Gets a single value of a row.
+
+        :param position: The index of the row.
+        :param columnIndex: The index of the column.
+        :returns: The value, or an empty string for an empty cell.
+        '''
+        return self.rowValues(position)[columnIndex]
+
+    def changed(self):
+        '''
+        Counts an edit, insert or removal and drops the rows read before it.
+        '''
+        self._editCount += 1
+        self._window = {}
+
+    def setValue(self, position, columnIndex, value):
+        '''
+        Sets a single value of a row with one UPDATE statement.
+
+        :param position: The index of the row.
+        :param columnIndex: The index of the column.
+        :param value: The new value, either typed or as text. An empty string empties the cell.
+        :raises ValueError: If the value cannot be converted to the type of the column.
+        '''
+        stored = encodeValue(columnIndex, value)
+
+        with self._connection:
+            self._connection.execute(f"UPDATE {TABLE_NAME} SET {schema.COLUMNS[columnIndex].name} = ? WHERE rowId = ?",
+                                     (stored, self._rowIds[position]))
+        self.changed()
+
+    def append(self, pipelineDataRow, rowId):
+        '''
+        Appends a row given as a PipelineData object.
+
+        :param pipelineDataRow: The PipelineData object or PipelineRow view to append.
+        :param rowId: The row id of the new row.
+        '''
+        self.insert(len(self), pipelineDataRow, rowId)
+
+    def insert(self, position, pipelineDataRow, rowId):
+        '''
+        Inserts a row given as a PipelineData object.
+
+        :param position: The index the new row will have.
+        :param pipelineDataRow: The PipelineData object or PipelineRow view to insert.
+        :param rowId: The row id of the new row.
+        :raises ValueError: If a value cannot be converted to the type of its column. The table is left unchanged.
+        '''
+        self.insertRows([position], [[getattr(pipelineDataRow, name) for name in columnar.COLUMN_NAMES]], [rowId])
+
+    def pop(self, position=-1):
+        '''
+        Removes a row from the table.
+
+        :param position: The index of the row to remove.
+        :returns: The removed row as a PipelineData object.
+        '''
+        position = operator.index(position)
+
+        if position < 0:
+            position += len(self)
+
+        removed = model.PipelineData(*self.rowValues(position))
+        self.deleteRows([position])
+        return removed
+
+    def insertRows(self, positions, rows, rowIds):
+        '''
+        Inserts a batch of rows, one INSERT statement per row run by executemany in one transaction. The row ids
+        stay in ascending order when each new row id lies between the row ids of its neighbours.
+
+        :param positions: The ascending indexes the new rows will have once they are all inserted.
+        :param rows: A list of the values of each new row in column order, typed or as text.
+        :param rowIds: A list of the row ids of the new rows.
+        :raises ValueError: If a value cannot be converted to the type of its column. The rows are left unchanged.
+        '''
+        if not rows:
+            return
+
+        stored = [[rowId] + [encodeValue(columnIndex, value) for columnIndex, value in enumerate(values)]
+                  for values, rowId in zip(rows, rowIds)]
+
+        with self._connection:
+            self._connection.executemany(self.insertStatement(), stored)
+
+        self._rowIds = columnar.insertIntoArray(self._rowIds, positions, rowIds)
+        self._ascending = self._ascending and all(
+            (position == 0 or self._rowIds[position - 1] < self._rowIds[position]) and
+            (position == len(self._rowIds) - 1 or self._rowIds[position] < self._rowIds[position + 1])
+            for position in positions)
+        self._positions = None
+        self.changed()
+
+    def deleteRows(self, positions):
+        '''
+        Removes a batch of rows, one DELETE statement per row run by executemany in one transaction.
+
+        :param positions: The ascending indexes of the rows to remove.
+        '''
+        if not positions:
+            return
+
+        with self._connection:
+            self._connection.executemany(f"DELETE FROM {TABLE_NAME} WHERE rowId = ?",
+                                         ((self._rowIds[position],) for position in positions))
+
+        self._rowIds = columnar.deleteFromArray(self._rowIds, positions)
+        self._positions = None
+        self.changed()
+
+    def clear(self):
+        '''
+        Removes all rows from the table.
+        '''
+        with self._connection:
+            self._connection.execute(f"DELETE FROM {TABLE_NAME}")
+
+        self._rowIds = array("q")
+        self._ascending = True
+        self._positions = None
+        self.changed()
+
+    def rangeCondition(self, rowStart, rowEnd):
+        '''
+        Builds the SQL condition selecting a range of rows. While the row ids are in ascending order the range is a
+        range of row ids, and otherwise the row ids of the range are copied to a temporary table.
+
+        :param rowStart: The index of the first row.
+        :param rowEnd: The index after the last row.
+        :returns: A tuple of the SQL condition and its parameters.
+        '''
+        rowEnd = min(rowEnd, len(self))
+
+        if rowStart <= 0 and rowEnd == len(self):
+            return "1", ()
+        if rowEnd <= rowStart:
+            return "0", ()
+        if self._ascending:
+            return "rowId BETWEEN ? AND ?", (self._rowIds[rowStart], self._rowIds[rowEnd - 1])
+
+        with self._connection:
+            self._connection.execute("DELETE FROM temp.displayedRows")
+            self._connection.executemany("INSERT INTO temp.displayedRows VALUES (?)",
+                                         zip(self._rowIds[rowStart:rowEnd]))
+        return "rowId IN (SELECT rowId FROM temp.displayedRows)", ()
+
+    def matchingPositions(self, condition, parameters, rowStart, rowEnd):
+        '''
+        Finds the rows of a range matching an SQL condition.
+
+        :param condition: The SQL condition.
+        :param parameters: The parameters of the condition.
+        :param rowStart: The index of the first row.
+        :param rowEnd: The index after the last row.
+        :returns: A set of the indexes of the matching rows.
+        '''
+        rangeCondition, rangeParameters = self.rangeCondition(rowStart, rowEnd)
+        cursor = self._connection.execute(f"SELECT rowId FROM {TABLE_NAME} WHERE ({condition}) AND {rangeCondition}",
+                                          tuple(parameters) + rangeParameters)
+        return set(map(self.positionOf, it.chain.from_iterable(cursor)))
+
+    def search(self, query, rowStart=0, rowEnd=None):
+        '''
+        Finds the rows with a cell containing a text ignoring case, as a search of the SearchIndex of a PipelineTable
+        does, with one query testing the text of every column. Float cells are tested on their text as Python writes
+        it, and are skipped when the text holds a character no float is written with.
+
+        :param query: The lowercase text looked for.
+        :param rowStart: The index of the first row searched.
+        :param rowEnd: The index after the last row searched, or None to search to the end of the table.
+        :returns: A set of the indexes of the matching rows.
+        '''
+        rowEnd = len(self) if rowEnd is None else rowEnd
+        columns = [column for column in schema.COLUMNS if column.kind != "float" or FLOAT_CHARACTERS.issuperset(query)]
+        condition = " OR ".join(f"instr({cellCondition(column)}, ?) > 0" for column in columns)
+        return self.matchingPositions(condition, [query.lower()] * len(columns), rowStart, rowEnd)
+
+    def filterRows(self, expression, rowStart=0, rowEnd=None):
+        '''
+        Finds the rows matching a filter query, translated to an SQL condition. Comparisons of an indexed column
+        are answered from its index.
+
+        :param expression: The expression tree of the query, as returned by FilterQuery.parseQuery.
+        :param rowStart: The index of the first row.
+        :param rowEnd: The index after the last row, or None to filter to the end of the table.
+        :returns: A set of the indexes of the matching rows.
+        '''
+        rowEnd = len(self) if rowEnd is None else rowEnd
+        parameters = []
+        condition = sqlCondition(expression, parameters)
+        return self.matchingPositions(condition, parameters, rowStart, rowEnd)
+
+    def findEqual(self, query, rowStart=0, rowEnd=None):
+        '''
+        Finds the first row with a cell equal to a text, as the ColumnHashIndex objects of a PipelineTable do: text
+        columns are compared ignoring case and the other columns on their value.
+
+        :param query: The lowercase text looked for.
+        :param rowStart: The index of the first row searched.
+        :param rowEnd: The index after the last row searched, or None to search to the end of the table.
+        :returns: The index of the first matching row, or None if no row matches.
+        '''
+        rowEnd = len(self) if rowEnd is None else rowEnd
+        conditions = []
+        parameters = []
+
+        for column in schema.COLUMNS:
+            if column.kind == "text":
+                conditions.append(f"lowerText({column.name}) = ?")
+                parameters.append(query.lower())
+                continue
+
+            try:
+                stored = encodeValue(column.index, query)
+            except ValueError:
+                continue
+
+            if stored is not None:
+                conditions.append(f"{column.name} = ?")
+                parameters.append(stored)
+
+        return min(self.matchingPositions(" OR ".join(conditions), parameters, rowStart, rowEnd), default=None)
+
+    def order(self, columnIndex, descending=False):
+        '''
+        Gets the order of the rows sorted by a column, as the SortIndex of a PipelineTable does, sorted by an SQL
+        query. Empty cells are placed after every value in either direction, text is ordered ignoring case, and rows
+        with equal values are kept in row id order. Orders are kept until rows are edited, added or removed.
+
+        :param columnIndex: The index of the column to sort by.
+        :param descending: Whether the largest values come first.
+        :returns: A typed array of the indexes of the rows in sorted order. The array must not be changed by the caller.
+        '''
+        version = (self._editCount, len(self))
+
+        if version != self._ordersVersion:
+            self._orders.clear()
+            self._ranks.clear()
+            self._ordersVersion = version
+
+        order = self._orders.get((columnIndex, descending))
+
+        if order is None:
+            column = schema.COLUMNS[columnIndex]
+            key = f"lowerText({column.name})" if column.kind == "text" else column.name
+            cursor = self._connection.execute(f"SELECT rowId FROM {TABLE_NAME} ORDER BY {column.name} IS NULL, "
+                                              f"{key} {'DESC' if descending else 'ASC'}, rowId")
+            order = self._orders[(columnIndex, descending)] = array("I", map(self.positionOf,
+                                                                              it.chain.from_iterable(cursor)))
+        return order
+
+    def ranks(self, columnIndex, descending=False):
+        '''
+        Gets the place of each row in its order sorted by a column, as the SortIndex of a PipelineTable does.
+
+        :param columnIndex: The index of the column to sort by.
+        :param descending: Whether the largest values come first.
+        :returns: A typed array holding the index in the sorted order of each row. The array must not be changed by
+                  the caller.
+        '''
+        order = self.order(columnIndex, descending)
+        ranks = self._ranks.get((columnIndex, descending))
+
+        if ranks is None:
+            ranks = self._ranks[(columnIndex, descending)] = sorting.invertOrder(order)
+        return ranks
+
+    def groupTotals(self, groupColumn, valueColumn, rowStart=0, rowEnd=None):
+        '''
+        Groups rows by the value of a column and totals the numeric values of another column over each group with
+        one GROUP BY query. Rows whose grouping cell is empty are left out, and text cells which are not numbers are
+        not counted.
+
+        :param groupColumn: The index of the column to group by.
+        :param valueColumn: The index of the column to summarize.
+        :param rowStart: The index of the first row to include.
+        :param rowEnd: The index after the last row to include, or None to include the rows to the end of the table.
+        :returns: A list of a tuple per group of its label, the count, sum, minimum and maximum of its values, ordered
+                  by label. The minimum and maximum are None for a group without values.
+        '''
+        rowEnd = len(self) if rowEnd is None else rowEnd
+        group = schema.COLUMNS[groupColumn]
+        value = schema.COLUMNS[valueColumn]
+        values = {"int": value.name, "float": value.name, "date": "NULL"}.get(value.kind, f"toNumber({value.name})")
+        rangeCondition, parameters = self.rangeCondition(rowStart, rowEnd)
+        cursor = self._connection.execute(f"SELECT {group.name}, count(value), total(value), min(value), max(value) "
+                                          f"FROM (SELECT {group.name}, {values} AS value FROM {TABLE_NAME} "
+                                          f"WHERE {group.name} IS NOT NULL AND {rangeCondition}) "
+                                          f"GROUP BY {group.name} ORDER BY {group.name}", parameters)
+        decode = DECODERS[groupColumn]
+        return [(decode(label), count, total, minimum, maximum) for label, count, total, minimum, maximum in cursor]
+
+    def copy(self):
+        '''
+        Copies the table, such as to write its rows on another thread while the table is still edited. The copy
+        reads the database through its own connection inside a read transaction, so thanks to WAL mode it keeps
+        seeing the rows as they were when it was copied while the table commits later edits. The copy must not be
+        edited, and must be closed before the table is.
+
+        :returns: A SQLitePipelineTable reading a snapshot of the database.
+        '''
+        table = SQLitePipelineTable.__new__(SQLitePipelineTable)
+        table.__dict__.update(self.__dict__)
+        table._connection = self.connect(self._path)
+        table._connection.isolation_level = None
+        table._connection.execute("BEGIN")
+        table._connection.execute(f"SELECT count(*) FROM {TABLE_NAME}").fetchone()
+        table._rowIds = self._rowIds[:]
+        table._positions = None
+        table._window = {}
+        table._orders = {}
+        table._ranks = {}
+        table._ordersVersion = None
+        table._finalizer = None
+        return table
+
+    def nbytes(self):
+        '''
+        Gets the approximate memory used by the table, excluding the rows read into memory and the page cache of
+        SQLite.
+
+        :returns: The size of the row ids in bytes.
+        '''
+        return self._rowIds.itemsize * len(self._rowIds)
+
+    def close(self):
+        '''
+        Closes the database, removing its files unless the table is a copy. The table must not be read afterwards.
+        '''
+        self._window = {}
+
+        if self._finalizer is not None:
+            self._finalizer()
+        else:
+            self._connection.close()
+
+def sqlCondition(expression, parameters):
+    '''
+    Translates a filter query to an SQL condition with the same matches as evaluating it over a PipelineTable. Text
+    is compared ignoring case, and empty cells, stored as NULL, only match comparisons with an empty value.
+
+    :param expression: The expression tree of the query, as returned by FilterQuery.parseQuery.
+    :param parameters: A list the parameters of the condition are appended to.
+    :returns: The SQL condition.
+    '''
+    if isinstance(expression, filtering.BooleanExpression):
+        joiner = " AND " if expression.operator == "and" else " OR "
+        return "(" + joiner.join(sqlCondition(operand, parameters) for operand in expression.operands) + ")"
+    elif isinstance(expression, filtering.Negation):
+        return f"NOT coalesce({sqlCondition(expression.operand, parameters)}, 0)"
+
+    column = expression.column
+    name = f"lowerText({column.name})" if column.kind == "text" else column.name
+
+    if isinstance(expression, filtering.Contains):
+        parameters.append(expression.text.lower())
+        return f"instr({cellCondition(column)}, ?) > 0"
+    elif isinstance(expression, filtering.Between):
+        parameters.extend(storedBound(column, bound) for bound in (expression.low, expression.high))
+        return f"{name} BETWEEN ? AND ?"
+    elif expression.value == "":
+        return f"{column.name} IS NULL" if expression.operator == "=" else f"{column.name} IS NOT NULL"
+
+    parameters.append(storedBound(column, expression.value))
+    return f"{name} {expression.operator} ?"
+
+def storedBound(column, value):
+    '''
+    Converts a value of a filter query to the value it is compared with in the database.
+
+    :param column: The Column of the schema the value is compared with.
+    :param value: The converted value of the query.
+    :returns: The stored value, in lowercase for a text column.
+    '''
+    if column.kind == "text":
+        return str(value).lower()
+    return encodeValue(column.index, value)
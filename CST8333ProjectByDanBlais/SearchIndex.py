@@ -0,0 +1,176 @@
+#This module defines a SearchIndex object, which finds the rows of a PipelineTable holding a search query in any of their
+#cells. Each column is indexed as the lowercase text of its distinct values plus the code of the distinct value of each
+#row, so a query is first matched against the distinct values and the matching rows are then found with C level passes
+#over the code arrays instead of formatting every cell of every row. When a query grows by one character, only the
+#values and rows matching the previous query are checked again. Docstring comments in reST style.
+
+#Author: Dan Blais - 040826486
+#Subject: CST8333
+
+from array import array
+import itertools as it
+import PipelineTable as columnar
+
+#Largest number of distinct values of a column whose rows are matched with bytes.translate, one byte per row.
+BYTE_CODE_LIMIT = 256
+#When the rows matching the previous query are at most this fraction of all rows, a grown query only checks those rows.
+NARROWING_FRACTION = 0.1
+
+class SearchIndex:
+    '''
+    Defines a search index over the cells of a PipelineTable. The index follows the table: columns are indexed when
+    first searched and indexed again when rows of the table have been edited, added or removed since.
+
+    :attribute _table: The PipelineTable being searched.
+    :attribute _columns: A list per column of the indexed column as a tuple of the row codes and the lowercase text
+                         of each distinct value, or None when the column is not indexed yet.
+    :attribute _byteCodes: A list per column of the row codes as one byte per row, or None for columns with more
+                           than BYTE_CODE_LIMIT distinct values or not indexed yet.
+    :attribute _version: The edit count and length of the table when the columns were indexed.
+    :attribute _lastQuery: The previous query, or None.
+    :attribute _lastCodes: A list per column of the codes of the distinct values holding the previous query.
+    :attribute _lastMatches: The row indexes matching the previous query, as a list.
+    '''
+
+    def __init__(self, table):
+        '''
+        Initializes a SearchIndex object.
+
+        :param table: The PipelineTable to search.
+        '''
+        self._table = table
+        self._columns = [None] * len(columnar.COLUMN_NAMES)
+        self._byteCodes = [None] * len(columnar.COLUMN_NAMES)
+        self._version = None
+        self._lastQuery = None
+        self._lastCodes = None
+        self._lastMatches = None
+
+    @property
+    def table(self):
+        '''The PipelineTable being searched.'''
+        return self._table
+
+    def refresh(self):
+        '''
+        Drops the indexed columns and the previous query if rows of the table changed since they were indexed.
+        '''
+        version = (self._table.editCount, len(self._table))
+
+        if version != self._version:
+            self._columns = [None] * len(columnar.COLUMN_NAMES)
+            self._byteCodes = [None] * len(columnar.COLUMN_NAMES)
+            self._version = version
+            self._lastQuery = None
+
+    def indexColumn(self, columnIndex):
+        '''
+        Indexes a column. Category columns reuse the codes stored by the table. Other columns are coded by their
+        distinct stored values, with floats compared by their bits so that every empty NaN cell gets the same code.
+
+        :param columnIndex: The index of the column.
+        :returns: A tuple of the row codes and the lowercase text of each distinct value.
+        '''
+        if self._columns[columnIndex] is None:
+            buffer = self._table.columnBuffer(columnIndex)
+
+            if columnar.COLUMN_KINDS[columnIndex] == "category":
+                codes = buffer
+                texts = [value.lower() for value in self._table.categoryValues(columnIndex)]
+            else:
+                if buffer.typecode == "d":
+                    keys = array("q")
+                    keys.frombytes(buffer.tobytes())
+                else:
+                    keys = buffer
+
+                distinct = dict.fromkeys(keys)
+                codeOf = {key: code for code, key in enumerate(distinct)}
+                codes = array("I", map(codeOf.__getitem__, keys))
+                stored = array(buffer.typecode)
+                stored.frombytes(array(keys.typecode, distinct).tobytes())
+                decode = self._table.decoder(columnIndex)
+                texts = [str(decode(value)).lower() for value in stored]
+
+            self._columns[columnIndex] = (codes, texts)
+
+            if len(texts) <= BYTE_CODE_LIMIT:
+                self._byteCodes[columnIndex] = array("B", codes).tobytes()
+
+        return self._columns[columnIndex]
+
+    def search(self, query, rowStart=0, rowEnd=None):
+        '''
+        Finds the rows holding a query in the text of any of their cells, ignoring case.
+
+        :param query: The text to search for.
+        :param rowStart: The index of the first row to search.
+        :param rowEnd: The index after the last row to search, or None to search to the end of the table.
+        :returns: A set of the indexes of the matching rows.
+        '''
+        self.refresh()
+        query = query.lower()
+        rowCount = len(self._table)
+        rowEnd = rowCount if rowEnd is None else min(rowEnd, rowCount)
+        narrowing = self._lastQuery is not None and query.startswith(self._lastQuery)
+        matchedCodes = []
+
+        for columnIndex in range(len(self._columns)):
+            codes, texts = self.indexColumn(columnIndex)
+            candidates = self._lastCodes[columnIndex] if narrowing else range(len(texts))
+            matchedCodes.append([code for code in candidates if query in texts[code]])
+
+        if narrowing and len(self._lastMatches) <= rowCount * NARROWING_FRACTION:
+            matches = self.filterRows(self._lastMatches, matchedCodes)
+        else:
+            matches = list(it.compress(range(rowCount), self.rowMask(matchedCodes, rowCount)))
+
+        self._lastQuery = query
+        self._lastCodes = matchedCodes
+        self._lastMatches = matches
+        return {position for position in matches if rowStart <= position < rowEnd}
+
+    def rowMask(self, matchedCodes, rowCount):
+        '''
+        Builds the mask of the rows holding a matched value in any column. Columns with few distinct values are
+        masked with bytes.translate, other columns by mapping a set lookup over their codes, and the column masks
+        are combined as big integers.
+
+        :param matchedCodes: A list per column of the codes of the matched distinct values.
+        :param rowCount: The number of rows of the table.
+        :returns: A bytes object holding 1 for each matching row and 0 for the other rows.
+        '''
+        mask = 0
+
+        for columnIndex, codes in enumerate(matchedCodes):
+            if not codes:
+                continue
+
+            rowCodes, texts = self._columns[columnIndex]
+
+            if len(codes) == len(texts):
+                return b"\1" * rowCount
+
+            if self._byteCodes[columnIndex] is not None:
+                table = bytearray(BYTE_CODE_LIMIT)
+
+                for code in codes:
+                    table[code] = 1
+                columnMask = self._byteCodes[columnIndex].translate(table)
+            else:
+                columnMask = bytes(map(set(codes).__contains__, rowCodes))
+
+            mask |= int.from_bytes(columnMask, "little")
+
+        return mask.to_bytes(rowCount, "little")
+
+    def filterRows(self, rows, matchedCodes):
+        '''
+        Keeps the rows holding a matched value in any column.
+
+        :param rows: The indexes of the rows to check.
+        :param matchedCodes: A list per column of the codes of the matched distinct values.
+        :returns: A list of the indexes of the matching rows.
+        '''
+        columns = [(self._columns[columnIndex][0], set(codes)) for columnIndex, codes in enumerate(matchedCodes) if codes]
+        return [row for row in rows if any(rowCodes[row] in codes for rowCodes, codes in columns)]
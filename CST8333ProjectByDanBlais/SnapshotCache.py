@@ -0,0 +1,293 @@
+#This module defines a SnapshotCache object, which keeps binary snapshots of the parsed columns of csv files so that an
+#unchanged file can be reopened without parsing it again. A snapshot holds the column arrays of a PipelineTable as raw
+#bytes after a small JSON header, and is loaded through a memory map with one copy per column. Snapshots are keyed on
+#the path, size, modification time and a sampled content hash of the csv file, and the least recently used snapshots
+#are removed when the cache grows past its size limit. Docstring comments in reST style.
+
+#Author: Dan Blais - 040826486
+#Subject: CST8333
+
+from array import array
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import PipelineTable as columnar
+
+#Environment variable giving the folder holding the snapshots.
+CACHE_DIR_VARIABLE = "PIPELINE_CACHE_DIR"
+#Environment variable which turns the cache off when set to 0, off, false or no.
+CACHE_ENABLED_VARIABLE = "PIPELINE_CACHE"
+#Default folder holding the snapshots.
+DEFAULT_CACHE_DIR = os.path.join(os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache"),
+                                 "CST8333ProjectByDanBlais", "snapshots")
+#Default limit on the total size of the snapshots in bytes.
+MAX_CACHE_BYTES = 1024 ** 3
+#Number of bytes hashed at each sampled position of a csv file.
+SAMPLE_BYTES = 64 * 1024
+#Number of positions of a csv file which are hashed, spread evenly over the file including its start and end.
+SAMPLE_COUNT = 16
+#The bytes starting every snapshot, followed by the length of the JSON header.
+MAGIC = b"PIPESNAP"
+#Version of the snapshot layout. Snapshots of another version are ignored.
+FORMAT_VERSION = 1
+#Extension of snapshot files.
+SNAPSHOT_EXTENSION = ".snap"
+
+class SnapshotCache:
+    '''
+    Defines a size bounded cache of snapshots of parsed csv files.
+
+    :attribute directory: The folder holding the snapshots.
+    :attribute maxBytes: The limit on the total size of the snapshots in bytes.
+    :attribute enabled: Whether snapshots are loaded and stored.
+    '''
+
+    def __init__(self, directory=None, maxBytes=MAX_CACHE_BYTES, enabled=None):
+        '''
+        Initializes a SnapshotCache object.
+
+        :param directory: The folder holding the snapshots. Defaults to the PIPELINE_CACHE_DIR environment variable,
+                          or to a folder in the user cache folder.
+        :param maxBytes: The limit on the total size of the snapshots in bytes.
+        :param enabled: Whether snapshots are loaded and stored. Defaults to on unless the PIPELINE_CACHE environment
+                        variable turns the cache off.
+        '''
+        self.directory = directory or os.environ.get(CACHE_DIR_VARIABLE) or DEFAULT_CACHE_DIR
+        self.maxBytes = maxBytes
+
+        if enabled is None:
+            enabled = os.environ.get(CACHE_ENABLED_VARIABLE, "").strip().lower() not in ("0", "off", "false", "no")
+        self.enabled = enabled
+
+    def fileKey(self, file):
+        '''
+        Builds the key identifying the current contents of a csv file. The hash covers SAMPLE_COUNT blocks of
+        SAMPLE_BYTES bytes spread over the file, so it is cheap even for large files, while the size and modification
+        time catch any ordinary rewrite of the file.
+
+        :param file: A string representing the path of the csv file.
+        :returns: A dictionary of the absolute path, size, modification time in nanoseconds and hash of the file.
+        '''
+        path = os.path.normcase(os.path.abspath(file))
+        digest = hashlib.blake2b(digest_size=16)
+
+        with open(path, "rb") as dataset:
+            status = os.fstat(dataset.fileno())
+            size = status.st_size
+            digest.update(str(size).encode())
+
+            for sample in range(SAMPLE_COUNT):
+                dataset.seek(max(size - SAMPLE_BYTES, 0) * sample // (SAMPLE_COUNT - 1))
+                digest.update(dataset.read(SAMPLE_BYTES))
+
+        return {"path": path, "size": size, "mtime": status.st_mtime_ns, "hash": digest.hexdigest()}
+
+    def snapshotPath(self, key):
+        '''
+        Gets the path of the snapshot of a csv file. Each csv file has one snapshot, replaced when the file changes.
+
+        :param key: The key of the csv file, as returned by fileKey.
+        :returns: The path of the snapshot.
+        '''
+        name = hashlib.blake2b(key["path"].encode(), digest_size=16).hexdigest()
+        return os.path.join(self.directory, name + SNAPSHOT_EXTENSION)
+
+    def load(self, key):
+        '''
+        Loads the snapshot of a csv file if the cache is enabled and the snapshot matches the key of the file. A
+        snapshot which cannot be read is removed.
+
+        :param key: The key of the csv file, as returned by fileKey.
+        :returns: A PipelineTable of the rows of the file, or None if there is no valid snapshot.
+        '''
+        if not self.enabled:
+            return None
+
+        path = self.snapshotPath(key)
+
+        try:
+            with open(path, "rb") as snapshot, mmap.mmap(snapshot.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                header = self.readHeader(data)
+
+                if header["key"] != key or header["byteorder"] != sys.byteorder:
+                    return None
+
+                with memoryview(data) as view:
+                    columns = [self.readArray(view, header["dataStart"], block) for block in header["columns"]]
+                    rowIds = self.readArray(view, header["dataStart"], header["rowIds"])
+
+            if any(len(column) != len(rowIds) for column in columns):
+                raise ValueError("snapshot columns have different lengths")
+
+            os.utime(path)
+            return columnar.PipelineTable.fromState((columns, rowIds, header["categories"]))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Error: {e}")
+            self.remove(path)
+            return None
+
+    def readHeader(self, data):
+        '''
+        Reads the JSON header of a snapshot.
+
+        :param data: The bytes of the snapshot.
+        :returns: The header as a dictionary, with the offset of the column data added as dataStart.
+        :raises ValueError: If the data is not a snapshot of the current version.
+        '''
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError("not a snapshot file")
+
+        headerLength, = struct.unpack_from("<Q", data, len(MAGIC))
+        start = len(MAGIC) + 8
+        header = json.loads(bytes(data[start:start + headerLength]))
+
+        if header.get("version") != FORMAT_VERSION:
+            raise ValueError("snapshot version is not supported")
+
+        header["dataStart"] = dataStart(headerLength)
+        return header
+
+    def readArray(self, view, dataStart, block):
+        '''
+        Copies a block of a snapshot into a typed array.
+
+        :param view: A memoryview of the snapshot.
+        :param dataStart: The offset of the column data of the snapshot.
+        :param block: A dictionary of the type code, offset from the start of the column data and length in bytes
+                      of the block.
+        :returns: The typed array.
+        '''
+        start = dataStart + block["offset"]
+        values = array(block["typecode"])
+        values.frombytes(view[start:start + block["length"]])
+        return values
+
+    def store(self, key, table, background=False):
+        '''
+        Stores a snapshot of a PipelineTable as the snapshot of a csv file, then removes the least recently used
+        snapshots if the cache is over its size limit. The snapshot is written to a temporary file which then
+        replaces any older snapshot, so a reader never sees a partly written snapshot. Tables too large for the
+        cache are not stored.
+
+        :param key: The key of the csv file, as returned by fileKey.
+        :param table: The PipelineTable holding the parsed rows of the file.
+        :param background: Whether to write the snapshot on a daemon thread. The rows are copied first, so the
+                           table can be edited while the snapshot is written.
+        '''
+        if not self.enabled:
+            return
+
+        columns, rowIds, categoryValues = table.__getstate__()
+        blocks = [column.tobytes() for column in columns] + [rowIds.tobytes()]
+        typecodes = [column.typecode for column in columns] + [rowIds.typecode]
+        categoryValues = [None if values is None else list(values) for values in categoryValues]
+
+        if background:
+            threading.Thread(target=self.storeBlocks, args=(key, blocks, typecodes, categoryValues), daemon=True).start()
+        else:
+            self.storeBlocks(key, blocks, typecodes, categoryValues)
+
+    def storeBlocks(self, key, blocks, typecodes, categoryValues):
+        '''
+        Writes a snapshot from the bytes of its columns.
+
+        :param key: The key of the csv file, as returned by fileKey.
+        :param blocks: A list of the bytes of each column followed by the bytes of the row ids.
+        :param typecodes: A list of the array type code of each block.
+        :param categoryValues: A list per column of the category values of a category column, or None.
+        '''
+        layout = []
+        offset = 0
+
+        for block, typecode in zip(blocks, typecodes):
+            layout.append({"typecode": typecode, "offset": offset, "length": len(block)})
+            offset += len(block) + (-len(block) % 8)
+
+        header = {"version": FORMAT_VERSION, "byteorder": sys.byteorder, "key": key, "columns": layout[:-1],
+                  "rowIds": layout[-1], "categories": categoryValues}
+        headerBytes = json.dumps(header).encode()
+
+        if dataStart(len(headerBytes)) + offset > self.maxBytes:
+            return
+
+        #Imported here rather than at startup, as most sessions open a file before a snapshot is written.
+        import tempfile
+        temporaryPath = None
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            handle, temporaryPath = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+
+            with os.fdopen(handle, "wb") as snapshot:
+                snapshot.write(MAGIC)
+                snapshot.write(struct.pack("<Q", len(headerBytes)))
+                snapshot.write(headerBytes)
+
+                for block in blocks:
+                    snapshot.write(b"\0" * (-snapshot.tell() % 8))
+                    snapshot.write(block)
+
+            os.replace(temporaryPath, self.snapshotPath(key))
+            self.evict()
+        except OSError as e:
+            print(f"Error: {e}")
+
+            if temporaryPath is not None and os.path.exists(temporaryPath):
+                os.remove(temporaryPath)
+
+    def evict(self):
+        '''
+        Removes the least recently used snapshots until the total size of the snapshots is within the size limit.
+        Loading a snapshot marks it as used.
+        '''
+        snapshots = []
+
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(SNAPSHOT_EXTENSION):
+                status = entry.stat()
+                snapshots.append((status.st_mtime_ns, status.st_size, entry.path))
+
+        snapshots.sort()
+        total = sum(size for used, size, path in snapshots)
+
+        for used, size, path in snapshots:
+            if total <= self.maxBytes:
+                break
+            self.remove(path)
+            total -= size
+
+    def remove(self, path):
+        '''
+        Removes a snapshot, ignoring a snapshot which is already gone.
+
+        :param path: The path of the snapshot.
+        '''
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def clear(self):
+        '''
+        Removes every snapshot in the cache.
+        '''
+        if os.path.isdir(self.directory):
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(SNAPSHOT_EXTENSION):
+                    self.remove(entry.path)
+
+def dataStart(headerLength):
+    '''
+    Gets the offset of the column data of a snapshot, which starts at the first multiple of 8 bytes after the header.
+
+    :param headerLength: The length of the JSON header in bytes.
+    :returns: The offset of the column data.
+    '''
+    end = len(MAGIC) + 8 + headerLength
+    return end + (-end % 8)
@@ -0,0 +1,185 @@
+#This module defines a SortIndex object, which orders the rows of a PipelineTable by a column without moving them. The
+#order is a permutation array of row indexes computed from the typed array of the column, so the table shows its rows
+#sorted by reading them through the permutation. Permutations are kept per column and direction until the rows change,
+#which makes switching between sorts instant, together with their inverse, which gives the sorted place of a row.
+#Docstring comments in reST style.
+
+#Author: Dan Blais - 040826486
+#Subject: CST8333
+
+from array import array
+import bisect
+import itertools as it
+import math
+import PipelineTable as columnar
+
+#The sort key given to empty cells of date and int columns, above every stored value so that empty cells sort last.
+EMPTY_KEY = 2**31 - 1
+
+class SortIndex:
+    '''
+    Defines the sort orders of the columns of a PipelineTable. Sorts are stable, so rows with equal values keep their
+    table order in either direction, and empty cells are placed after every value in either direction. Category
+    columns are ordered by their text ignoring case. The orders are dropped when rows of the table have been edited,
+    added or removed since they were computed.
+
+    :attribute _table: The PipelineTable being sorted.
+    :attribute _orders: A dictionary mapping a column index and a descending flag to a typed array of the indexes of
+                        the rows in sorted order.
+    :attribute _ranks: A dictionary mapping a column index and a descending flag to the inverse of its order.
+    :attribute _emptyCounts: A dictionary mapping a column index to the number of empty cells of the column, which
+                             are the last rows of its orders.
+    :attribute _version: The edit count and length of the table when the orders were computed.
+    '''
+
+    def __init__(self, table):
+        '''
+        Initializes a SortIndex object.
+
+        :param table: The PipelineTable to sort.
+        '''
+        self._table = table
+        self._orders = {}
+        self._ranks = {}
+        self._emptyCounts = {}
+        self._version = None
+
+    @property
+    def table(self):
+        '''The PipelineTable being sorted.'''
+        return self._table
+
+    def order(self, columnIndex, descending=False):
+        '''
+        Gets the order of the rows of the table sorted by a column, computing it if the rows changed since it was
+        last computed.
+
+        :param columnIndex: The index of the column to sort by.
+        :param descending: Whether the largest values come first.
+        :returns: A typed array of the indexes of the rows in sorted order. The array must not be changed by the caller.
+        '''
+        self.refresh()
+        order = self._orders.get((columnIndex, descending))
+
+        if order is None:
+            keys, emptyCount = self.sortKeys(columnIndex)
+            self._emptyCounts[columnIndex] = emptyCount
+            rows = sorted(range(len(keys)), key=keys.__getitem__, reverse=descending)
+
+            if descending and emptyCount:
+                rows = rows[emptyCount:] + rows[:emptyCount]
+
+            order = self._orders[(columnIndex, descending)] = array("I", rows)
+        return order
+
+    def ranks(self, columnIndex, descending=False):
+        '''
+        Gets the place of each row of the table in its order sorted by a column, computing it once per order.
+
+        :param columnIndex: The index of the column to sort by.
+        :param descending: Whether the largest values come first.
+        :returns: A typed array holding the index in the sorted order of each row. The array must not be changed by
+                  the caller.
+        '''
+        order = self.order(columnIndex, descending)
+        ranks = self._ranks.get((columnIndex, descending))
+
+        if ranks is None:
+            ranks = self._ranks[(columnIndex, descending)] = invertOrder(order)
+        return ranks
+
+    def refresh(self):
+        '''
+        Drops the computed orders if rows of the table changed since they were computed.
+        '''
+        version = (self._table.editCount, len(self._table))
+
+        if version != self._version:
+            self._orders.clear()
+            self._ranks.clear()
+            self._emptyCounts.clear()
+            self._version = version
+
+    def rangePositions(self, columnIndex, low, high, lowInclusive=True, highInclusive=True):
+        '''
+        Finds the rows whose cell in a date, int or float column lies in a range, by bisecting the ascending order of
+        the column. The order is not computed for the lookup, as a scan of the column is cheaper than sorting it.
+
+        :param columnIndex: The index of the column.
+        :param low: The stored lowest value of the range, or None for no lowest value.
+        :param high: The stored highest value of the range, or None for no highest value.
+        :param lowInclusive: Whether the lowest value is in the range.
+        :param highInclusive: Whether the highest value is in the range.
+        :returns: A typed array of the indexes of the rows in the range in sorted order, or None if the ascending
+                  order of the column is not computed. Empty cells are never in the range.
+        '''
+        self.refresh()
+        order = self._orders.get((columnIndex, False))
+
+        if order is None:
+            return None
+
+        end = len(order) - self._emptyCounts[columnIndex]
+        value = self._table.columnBuffer(columnIndex).__getitem__
+        lowSearch = bisect.bisect_left if lowInclusive else bisect.bisect_right
+        highSearch = bisect.bisect_right if highInclusive else bisect.bisect_left
+        first = 0 if low is None else lowSearch(order, low, 0, end, key=value)
+        last = end if high is None else highSearch(order, high, first, end, key=value)
+        return order[first:last]
+
+    def sortKeys(self, columnIndex):
+        '''
+        Gets the sort key of each row of a column. Date, int and float columns are keyed by their stored value and
+        category columns by the rank of their text ignoring case, with empty cells given a key above every other key.
+        A column without empty cells is keyed by its typed array itself.
+
+        :param columnIndex: The index of the column.
+        :returns: A tuple of a typed array of the key of each row and the number of empty cells.
+        '''
+        buffer = self._table.columnBuffer(columnIndex)
+        kind = columnar.COLUMN_KINDS[columnIndex]
+
+        if kind == "category":
+            values = self._table.categoryValues(columnIndex)
+            texts = {text: rank for rank, text in enumerate(sorted(set(value.lower() for value in values)))}
+            ranks = [texts[value.lower()] for value in values]
+
+            if "" in values:
+                ranks[values.index("")] = len(values)
+
+            keys = array("I", map(ranks.__getitem__, buffer))
+            return keys, keys.count(len(values))
+
+        if kind == "float":
+            empties = list(it.compress(range(len(buffer)), map(math.isnan, buffer)))
+            emptyKey = math.inf
+        else:
+            emptyValue = 0 if kind == "date" else columnar.EMPTY_INT
+            empties = []
+
+            if emptyValue in buffer:
+                empties = [position for position, value in enumerate(buffer) if value == emptyValue]
+            emptyKey = EMPTY_KEY
+
+        if not empties:
+            return buffer, 0
+
+        keys = buffer[:]
+
+        for position in empties:
+            keys[position] = emptyKey
+        return keys, len(empties)
+
+def invertOrder(order, rowStart=0):
+    '''
+    Inverts a sort order of a range of rows, giving the place of each row in the order.
+
+    :param order: A typed array of the indexes of the rows of the range in sorted order.
+    :param rowStart: The index of the first row of the range.
+    :returns: A typed array holding, for each row of the range from rowStart, its index in the order.
+    '''
+    ranks = array("I", [0]) * len(order)
+
+    for rank, position in enumerate(order):
+        ranks[position - rowStart] = rank
+    return ranks
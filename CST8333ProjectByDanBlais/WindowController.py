@@ -15,15 +15,42 @@
 #            Available: https://coderslegacy.com/how-to-make-ttk-treeview-editable-python/. [Accessed: 24-Sep-2024].
 #[2] "Tkinter Documentation," TkDocs, [Online]. Available: https://tkdocs.com/index.html. [Accessed: 25-Sep-2024].
 
-import KeystonePipelineData as model
+import ColumnSchema as schema
+import PipelineTable as columnar
+import PipelineEngine as engine
+import LazyPipelineTable as lazy
+import SQLitePipelineTable as database
+import PipelineDataset as datasets
+import SnapshotCache as snapshots
+import SearchIndex as search
+import ColumnHashIndex as hashing
+import SortIndex as sorting
+import FilterQuery as filtering
+import Aggregation as aggregation
+import CSVExporter as exporter
+import ColumnarFile as columnFile
+import EditJournal as journaling
+import Instrumentation as instrumentation
 import AppWindow as view
 import tkinter as tk
-import itertools as it
-import csv
+from array import array
+import bisect
+import os
+import queue
 import threading
-from datetime import datetime
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+import time
+from contextlib import closing
+
+#Milliseconds between polls of the load queue from the Tk event loop.
+LOAD_POLL_INTERVAL = 20
+#Maximum seconds spent draining the load queue during a single poll, so the window stays responsive.
+LOAD_POLL_BUDGET = 0.02
+#Files of at least this many bytes are indexed and read on demand by a LazyPipelineTable instead of being parsed up front.
+LAZY_MIN_BYTES = 1024 ** 3
+#Milliseconds after the last key typed in the search box before the search runs.
+SEARCH_DEBOUNCE_DELAY = 150
+#Number of rows rendered above and below the visible rows of the table, so keyboard navigation can scroll the table.
+OVERSCAN_ROWS = 5
 
 class WindowController:
     '''
@@ -35,22 +62,97 @@ class WindowController:
     :attribute _highestId: An integer tracking the highest ID used for new rows.
     :attribute _searchOpen: A boolean indicating if the search box is open.
     :attribute _searchButtonToggle: A boolean indicating the state of the search button.
-    :attribute _model: A list of PipelineData objects representing the parsed data.
-    :attribute _file: A string representing the path of the currently opened file.
+    :attribute _model: A PipelineTable holding the parsed data and the row id of each row, a LazyPipelineTable for large
+                       files, or a SQLitePipelineTable when rows are stored in a database.
+    :attribute _file: A string representing the path of the currently opened file, or folder or glob pattern of files.
+    :attribute _dataset: The PipelineDataset of the opened folder or glob pattern of csv files, or None when a single
+                         file is opened.
+    :attribute _loadQueue: A thread-safe queue of parsed row batches pushed by the loader thread.
+    :attribute _cancelLoad: An event which stops the loader thread at its next batch when set.
+    :attribute _pollId: The id of the scheduled load queue poll, or None when no load is running.
+    :attribute _rowStart: The index of the first model row displayed in the table.
+    :attribute _rowEnd: The index after the last model row displayed in the table, or None to display to the end.
+    :attribute _viewStart: The displayed row index of the first row scrolled into view.
+    :attribute _renderTop: The displayed row index of the row shown by the first Treeview item.
+    :attribute _slots: The ids of the Treeview items which are recycled to show the rows scrolled into view.
+    :attribute _slotTags: A dictionary of the tags last given to each Treeview item.
+    :attribute _searchMatches: A set of the model rows matching the current search, or None when not searching.
+    :attribute _searchIndex: The SearchIndex of the model, or None until the model is first searched.
+    :attribute _columnIndexes: A dictionary of the ColumnHashIndex of each column of the model used by find first mode.
+    :attribute _sortIndex: The SortIndex of the model, or None until the model is first sorted.
+    :attribute _sortColumn: The index of the column the displayed rows are sorted by, or None to display them in model order.
+    :attribute _sortDescending: A boolean indicating if the displayed rows are sorted from the largest value.
+    :attribute _displayOrder: A tuple of the sort order of the model, the displayed row range, the sorted model
+                              rows of that range and their inverse, which is None until it is first needed, or None
+                              until a range of rows is sorted.
+    :attribute _searchId: The id of the scheduled search, or None when no search is scheduled.
+    :attribute _filterQuery: A tuple of the last search text and its parsed filter query, None if the text is not
+                             a filter query, or the ValueError raised for a query which is not valid, so a query is
+                             parsed once however often it is searched.
+    :attribute _snapshotCache: The SnapshotCache keeping snapshots of parsed files.
+    :attribute _useDatabase: Whether loaded files are stored in a SQLitePipelineTable instead of in memory.
+    :attribute _loadKey: The snapshot cache key of the file being loaded, or None when the load is not to be cached.
+    :attribute _saveQueue: A thread-safe queue of the progress pushed by the save thread.
+    :attribute _savePollId: The id of the scheduled save queue poll, or None when no save is running.
+    :attribute _saveTarget: A string representing the path of the file being saved to.
+    :attribute _saveVersion: A tuple of the model and its edit count when the save started.
+    :attribute _sourceState: The state of the opened file when it was loaded or last saved, as returned by fileState.
+    :attribute _sourceRecordCount: The number of records of the opened file when the rows of the model are marked as
+                                   its records, or None when every row must be written by a save.
+    :attribute _saveCheckpoint: The number of edits in the edit journal when the save started.
+    :attribute _journal: The EditJournal of the edits made to the opened file, or None until a file is loaded.
     '''
     
     def __init__(self):
         '''
         Initializes the WindowController, setting up the view and initializing attributes.
         '''
+        self._snapshotCache = snapshots.SnapshotCache()
+        self._useDatabase = database.databaseEnabled()
+        self._loadKey = None
         self._view = view.ProgramWindow(self.openFile, self.addData, self.editData, self.deleteData, 
-                                          self.searchTable, self.showHideSearchBox, self.toggleButton, 
+                                          self.scheduleSearch, self.showHideSearchBox, self.toggleButton, 
                                           self.openContextMenu, self.openTextInput, self.reloadDataFromFile,
                                           self.saveFile, self.saveFileAs, self.resizeSearchBox, self.openRowDetails,
-                                          self.generatePieChart)
+                                          self.generatePieChart, self.cancelLoad, self.scrollTable, self.tableScrolled,
+                                          self.renderTable, self.changeDisplayedRows, self.toggleCache,
+                                          self.undoEdit, self.redoEdit, self.deleteSearchMatches, self.sortTable,
+                                          self.showInstrumentation, self.saveInstrumentation, self.toggleDatabase,
+                                          self.openFolder)
+        self._view.cacheFiles.set(self._snapshotCache.enabled)
+        self._view.storeInDatabase.set(self._useDatabase)
+        instrumentation.RECORDER.watchEventLoop(self._view.root)
         self._highestId = 0
         self._searchOpen = False
         self._searchButtonToggle = False
+        self._model = columnar.PipelineTable()
+        self._dataset = None
+        self._loadQueue = queue.Queue()
+        self._cancelLoad = threading.Event()
+        self._pollId = None
+        self._rowStart = 0
+        self._rowEnd = None
+        self._viewStart = 0
+        self._renderTop = 0
+        self._slots = []
+        self._slotTags = {}
+        self._searchMatches = None
+        self._searchIndex = None
+        self._columnIndexes = {}
+        self._sortIndex = None
+        self._sortColumn = None
+        self._sortDescending = False
+        self._displayOrder = None
+        self._searchId = None
+        self._filterQuery = ("", None)
+        self._saveQueue = queue.Queue()
+        self._savePollId = None
+        self._saveTarget = None
+        self._saveVersion = None
+        self._sourceState = None
+        self._sourceRecordCount = None
+        self._saveCheckpoint = 0
+        self._journal = None
         
     @property
     def model(self):
@@ -102,263 +204,879 @@ class WindowController:
         '''
         del self._view    
     
+    @instrumentation.timed(rows=lambda rowCount, *args: rowCount)
     def parseCSV(self, file):
         '''
-        Parses a csv file row by row into a list by creating objects that represent each row, and then appending
-        them to the list. Also validates date and numeric row attributes prior to creating objects.
-   
-        :param file: A string representing the path of the file.
-        :returns: A list of parsed rows, stored as objects.  
+        Reads a csv file in batches with PipelineEngine.readBatches, each a PipelineTable holding the parsed rows. Each
+        batch is pushed onto the load queue together with the fraction of the file read so far, so the view can display
+        rows while the rest of the file is still being parsed. A final (None, 1.0) entry marks the end of the load. The
+        rows of a batch are converted column by column by the converters of ColumnConverters, which also validate the
+        date and numeric row attributes prior to storing rows. Reading stops early when the load is cancelled.
+
+        An unchanged file is loaded from the snapshot cache in a single batch. Otherwise the file is parsed, and its
+        cache key is kept so that finishLoad can store a snapshot. Files of at least LAZY_MIN_BYTES bytes are indexed
+        into a LazyPipelineTable, which is pushed onto the queue to replace the model once the scan is done or cancelled.
+        When rows are stored in a database, the batches are loaded into a SQLitePipelineTable, which replaces the
+        model in the same way. The files of an opened dataset are read together as one table.
+
+        :param file: A string representing the path of the file, or folder or glob pattern of files.
+        :returns: The number of rows read.
         '''
-        pipelineDataList = []
-   
-        try: 
-            with open(file, newline='') as dataset:
-                dataReader = csv.reader(dataset, delimiter=",", quotechar='"')
-                next(dataReader)
-            
-                for row in dataReader: 
-                    
-                    try:
-                        date = datetime.strptime(row[0], "%Y-%m-%d").date() if row[0] else ""
-                        month = int(row[1]) if row[1] else ""
-                        year = int(row[2]) if row[2] else ""
-                        latitude = float(row[6]) if row[6] else ""
-                        longitude = float(row[7]) if row[7] else ""
-                        throughput = float(row[11]) if row[11] else ""
-                        committedVolumes = float(row[12]) if row[12] else ""
-                        uncommittedVolumes = float(row[13]) if row[13] else ""
-                        nameplateCapacity = float(row[14]) if row[14] else ""
-                        availableCapacity = float(row[15]) if row[15] else ""
-                    
-                        pipeData = model.PipelineData(date=date, month=month, 
-                                        year=year, company=row[3], pipeline=row[4], 
-                                        keyPoint=row[5], latitude=latitude, longitude=longitude, 
-                                        directionOfFlow=row[8], tradeType=row[9], product=row[10],
-                                        throughput=throughput, committedVolumes=committedVolumes,
-                                        uncommittedVolumes=uncommittedVolumes, nameplateCapacity=nameplateCapacity,
-                                        availableCapacity=availableCapacity, reasonForVariance=row[16])
-                        
-                        pipelineDataList.append(pipeData)  
-                        
-                    except Exception as e: 
-                        print(f"Error: {e}") 
-                        
-        except Exception as e: 
-           print(f"Error: {e}") 
-       
-        self._model = pipelineDataList
-        
-    def loadData(self, rowStart, rowEnd):
-        '''
-        Loads a range of data into the view table from the model.
-
-        :param rowStart: The starting index of the rows to load.
-        :param rowEnd: The ending index of the rows to load.
-        '''
-        for index, pipelineDataRow in enumerate(it.islice(self._model, rowStart, rowEnd, 1)):
-            self._view.table.insert("", "end", str(index), text=str(index), 
-                                    values=(pipelineDataRow.date, pipelineDataRow.month, pipelineDataRow.year,
-                                            pipelineDataRow.company, pipelineDataRow.pipeline, pipelineDataRow.keyPoint,
-                                            pipelineDataRow.latitude, pipelineDataRow.longitude, pipelineDataRow.directionOfFlow,
-                                            pipelineDataRow.tradeType, pipelineDataRow.product, pipelineDataRow.throughput,
-                                            pipelineDataRow.committedVolumes, pipelineDataRow.uncommittedVolumes, pipelineDataRow.nameplateCapacity,
-                                            pipelineDataRow.availableCapacity, pipelineDataRow.reasonForVariance))
-            self._highestId += 1
-    
+        loadQueue = self._loadQueue
+        cancelLoad = self._cancelLoad
+        rowCount = 0
+
+        try:
+            with closing(engine.readBatches(file, self._snapshotCache, cancelLoad, LAZY_MIN_BYTES,
+                                            useDatabase=self._useDatabase, dataset=self._dataset)) as batches:
+                for batch, progress, loadKey in batches:
+                    self._loadKey = loadKey
+                    loadQueue.put((batch, progress))
+                    rowCount += len(batch)
+        except Exception as e:
+           print(f"Error: {e}")
+
+        if not cancelLoad.is_set():
+            loadQueue.put((None, 1.0))
+        return rowCount
+
+    @instrumentation.timed(rows=lambda result, controller, *args: controller.displayCount())
+    def loadData(self, rowStart, rowEnd=None):
+        '''
+        Displays a range of data from the model in the view table. The table is virtual: only the rows scrolled
+        into view, plus OVERSCAN_ROWS rows above and below them, exist as Treeview items, and the vertical scrollbar
+        is mapped to the full range of displayed rows.
+
+        :param rowStart: The starting index of the rows to display.
+        :param rowEnd: The ending index of the rows to display, or None to display all rows after rowStart.
+        '''
+        self._rowStart = rowStart
+        self._rowEnd = rowEnd
+        self._viewStart = 0
+        self.renderTable()
+
+    def displayCount(self):
+        '''
+        Gets the number of rows displayed in the table.
+
+        :returns: The number of model rows in the displayed range.
+        '''
+        rowEnd = len(self._model) if self._rowEnd is None else min(self._rowEnd, len(self._model))
+        return max(0, rowEnd - self._rowStart)
+
+    def displayedPosition(self, displayIndex):
+        '''
+        Maps the index of a displayed row to the index of its row in the model, through the sort order of the
+        displayed rows when they are sorted.
+
+        :param displayIndex: The index of the row among the displayed rows.
+        :returns: The index of the row in the model.
+        '''
+        order = self.displayOrder()
+
+        if order is not None:
+            return order[displayIndex]
+        return self._rowStart + displayIndex
+
+    def displayIndex(self, position):
+        '''
+        Maps the index of a model row to the index of the row among the displayed rows. Sorted rows are looked up in
+        the inverse of the sort order, which is computed once per order and range.
+
+        :param position: The index of a displayed row in the model.
+        :returns: The index of the row among the displayed rows.
+        '''
+        order = self.displayOrder()
+
+        if order is None:
+            return position - self._rowStart
+
+        if self._rowStart == 0 and len(order) == len(self._model):
+            return self.sortIndex().ranks(self._sortColumn, self._sortDescending)[position]
+
+        if self._displayOrder[3] is None:
+            self._displayOrder = self._displayOrder[:3] + (sorting.invertOrder(order, self._rowStart),)
+        return self._displayOrder[3][position - self._rowStart]
+
+    def displayOrder(self):
+        '''
+        Gets the model rows of the displayed range in the order they are displayed when they are sorted. The sort
+        order of the whole model comes from its SortIndex, and is narrowed to the displayed range once per order
+        and range.
+
+        :returns: A typed array of the indexes of the displayed model rows in sorted order, or None when the
+                  displayed rows are not sorted.
+        '''
+        if self._sortColumn is None:
+            return None
+
+        order = self.sortIndex().order(self._sortColumn, self._sortDescending)
+        rowEnd = self._rowStart + self.displayCount()
+
+        if self._rowStart == 0 and rowEnd == len(order):
+            return order
+
+        if self._displayOrder is None or self._displayOrder[0] is not order or self._displayOrder[1] != (self._rowStart, rowEnd):
+            rows = range(self._rowStart, rowEnd)
+            self._displayOrder = (order, (self._rowStart, rowEnd), array("I", (position for position in order if position in rows)),
+                                  None)
+        return self._displayOrder[2]
+
+    def slotPosition(self, rowId):
+        '''
+        Maps a Treeview item to the index of the model row it currently shows.
+
+        :param rowId: The id of the Treeview item.
+        :returns: The index of the row in the model.
+        '''
+        return self.displayedPosition(self._renderTop + self._view.table.index(rowId))
+
+    def rowValues(self, position):
+        '''
+        Gets the values of a model row in table column order.
+
+        :param position: The index of the row in the model.
+        :returns: A tuple of the row values.
+        '''
+        return self._model.rowValues(position)
+
+    def rowTags(self, position):
+        '''
+        Gets the Treeview tags of a model row, greying out rows which do not match the current search.
+
+        :param position: The index of the row in the model.
+        :returns: A tuple of tags.
+        '''
+        if self._searchMatches is not None and position not in self._searchMatches:
+            return ("hidden",)
+        return ()
+
+    def renderTable(self):
+        '''
+        Renders the rows scrolled into view. Treeview items are created or deleted only when the number of rows
+        which fit in the table changes; otherwise the existing items are recycled by replacing their values. The
+        selection follows the selected model rows, and any open cell edit is closed since its row may move.
+        '''
+        table = self._view.table
+        count = self.displayCount()
+        visible = self._view.visibleRowCount()
+        self._viewStart = max(0, min(self._viewStart, count - visible))
+        top = max(0, self._viewStart - OVERSCAN_ROWS)
+        bottom = min(count, self._viewStart + visible + OVERSCAN_ROWS)
+        selected = {self.slotPosition(rowId) for rowId in table.selection()}
+
+        try:
+            if self._view.textInput:
+                self._view.textInput.destroy()
+        except AttributeError:
+            pass
+
+        while len(self._slots) < bottom - top:
+            self._slots.append(table.insert("", "end"))
+        while len(self._slots) > bottom - top:
+            rowId = self._slots.pop()
+            table.delete(rowId)
+            self._slotTags.pop(rowId, None)
+
+        self._renderTop = top
+        reselect = []
+
+        for offset, rowId in enumerate(self._slots):
+            position = self.displayedPosition(top + offset)
+            tags = self._slotTags[rowId] = self.rowTags(position)
+            table.item(rowId, text=str(self._model.rowId(position)), values=self.rowValues(position), tags=tags)
+
+            if position in selected:
+                reselect.append(rowId)
+
+        table.selection_set(reselect)
+
+        if self._slots:
+            table.yview_moveto((self._viewStart - top) / len(self._slots))
+
+        self.updateScrollbar()
+
+    def retagTable(self):
+        '''
+        Updates the tags of the rows scrolled into view after the search matches change. Only the Treeview items
+        whose tags changed are updated.
+        '''
+        for offset, rowId in enumerate(self._slots):
+            tags = self.rowTags(self.displayedPosition(self._renderTop + offset))
+
+            if tags != self._slotTags.get(rowId):
+                self._view.table.item(rowId, tags=tags)
+                self._slotTags[rowId] = tags
+
+    def updateScrollbar(self):
+        '''
+        Maps the vertical scrollbar to the rows scrolled into view out of all displayed rows.
+        '''
+        count = self.displayCount()
+
+        if count:
+            visible = self._view.visibleRowCount()
+            self._view.scrollVert.set(self._viewStart / count, min(1.0, (self._viewStart + visible) / count))
+        else:
+            self._view.scrollVert.set(0.0, 1.0)
+
+    def scrollTable(self, action, amount, unit=None):
+        '''
+        Scrolls the table, as requested by the vertical scrollbar, the mouse wheel or the page keys.
+
+        :param action: "moveto" to scroll to a fraction of the displayed rows, or "scroll" to scroll by an amount.
+        :param amount: The fraction to scroll to, or the number of units or pages to scroll by.
+        :param unit: "units" or "pages" when scrolling by an amount.
+        '''
+        if action == "moveto":
+            self._viewStart = int(float(amount) * self.displayCount())
+        elif unit == "pages":
+            self._viewStart += int(amount) * self._view.visibleRowCount()
+        else:
+            self._viewStart += int(amount)
+
+        self.renderTable()
+
+    def tableScrolled(self, first, last):
+        '''
+        Receives the scroll position of the Treeview items. When the Treeview scrolls itself, such as when the
+        keyboard moves the selection into the overscan rows, the rows scrolled into view are moved to match and
+        the items are re-rendered.
+
+        :param first: The fraction of the Treeview items above the top of the table.
+        :param last: The fraction of the Treeview items above the bottom of the table.
+        '''
+        if self._slots:
+            viewStart = self._renderTop + round(float(first) * len(self._slots))
+
+            if viewStart != self._viewStart:
+                self._viewStart = viewStart
+                self.renderTable()
+
+    def changeDisplayedRows(self, rowStart, rowEnd):
+        '''
+        Changes the range of model rows displayed in the table, as entered in the Change Displayed Rows popup.
+
+        :param rowStart: The text entered for the first displayed row, blank to display from the first row.
+        :param rowEnd: The text entered for the row after the last displayed row, blank to display to the end.
+        '''
+        try:
+            rowStart = max(0, int(rowStart)) if rowStart.strip() else 0
+            rowEnd = max(rowStart, int(rowEnd)) if rowEnd.strip() else None
+        except ValueError:
+            self._view.buildInfoBox("Error", "Displayed rows must be whole numbers.")
+            return
+
+        self._view.displayedRowsPopup.destroy()
+        self.loadData(rowStart, rowEnd)
+        self.searchTable()
+
+    def refreshTable(self):
+        '''
+        Re-renders the table after the model has changed, repeating the current search first so that its matches
+        follow the changed rows.
+        '''
+        if self._searchMatches is not None:
+            self.searchTable()
+        self.renderTable()
+
+    def scheduleSearch(self):
+        '''
+        Schedules a search of the table SEARCH_DEBOUNCE_DELAY milliseconds after the last key typed in the search box,
+        so that typing a query runs one search instead of one search per key.
+        '''
+        if self._searchId is not None:
+            self._view.root.after_cancel(self._searchId)
+        self._searchId = self._view.root.after(SEARCH_DEBOUNCE_DELAY, self.searchTable)
+
+    def searchIndex(self):
+        '''
+        Gets the search index of the model, creating it for a new model. The index is built when it is first
+        searched, and follows later changes to the model itself.
+
+        :returns: The SearchIndex of the model, or None if the model does not support indexed search.
+        '''
+        if not isinstance(self._model, columnar.PipelineTable):
+            return None
+
+        if self._searchIndex is None or self._searchIndex.table is not self._model:
+            self._searchIndex = search.SearchIndex(self._model)
+        return self._searchIndex
+
+    def columnHashIndex(self, columnIndex):
+        '''
+        Gets the hash index of a column of the model, creating it for a new model. The index is built when it is
+        first used, and follows later changes to the model itself.
+
+        :param columnIndex: The index of the column.
+        :returns: The ColumnHashIndex of the column, or None if the model does not support hash indexes.
+        '''
+        if not isinstance(self._model, columnar.PipelineTable):
+            return None
+
+        index = self._columnIndexes.get(columnIndex)
+
+        if index is None or index.table is not self._model:
+            index = self._columnIndexes[columnIndex] = hashing.ColumnHashIndex(self._model, columnIndex)
+        return index
+
+    def sortIndex(self):
+        '''
+        Gets the sort index of the model, creating it for a new model. Sort orders are computed when a column is
+        first sorted, and computed again after the model changes. A SQLitePipelineTable sorts its rows itself.
+
+        :returns: The SortIndex of the model, the model itself for a SQLitePipelineTable, or None if the model does
+                  not support sorting.
+        '''
+        if isinstance(self._model, database.SQLitePipelineTable):
+            return self._model
+
+        if not isinstance(self._model, columnar.PipelineTable):
+            return None
+
+        if self._sortIndex is None or self._sortIndex.table is not self._model:
+            self._sortIndex = sorting.SortIndex(self._model)
+        return self._sortIndex
+
+    def sortTable(self, columnIndex):
+        '''
+        Sorts the displayed rows by a column when its heading is clicked. Clicking the heading of the sorted column
+        switches to descending order and then back to model order, and clicking the Row heading displays the rows
+        in model order. The rows of the model are not moved, and the table is scrolled back to the top.
+
+        :param columnIndex: The index of the column whose heading was clicked, or None for the Row heading.
+        '''
+        if columnIndex is not None and self.sortIndex() is None:
+            self._view.buildInfoBox("Error", "Files too large to be loaded in full cannot be sorted.")
+            return
+
+        if columnIndex is None or columnIndex == self._sortColumn and self._sortDescending:
+            self._sortColumn = None
+            self._sortDescending = False
+        elif columnIndex == self._sortColumn:
+            self._sortDescending = True
+        else:
+            self._sortColumn = columnIndex
+            self._sortDescending = False
+
+        self._view.markSortedColumn(self._sortColumn, self._sortDescending)
+        self._view.table.selection_set(())
+        self._viewStart = 0
+        self.renderTable()
+
+    def filterQuery(self, searchQuery):
+        '''
+        Parses the text of the search box as a filter query, such as Throughput > 50 and Product = condensate,
+        reusing the parsed query while the text is unchanged. A text which starts with a column name and an operator
+        is a filter query, and any other text is searched for as text.
+
+        :param searchQuery: The lowercase text of the search box.
+        :returns: The expression tree of the filter query, or None if the text is not a filter query and is searched
+                  for as text instead.
+        :raises ValueError: If the text starts as a filter query but is not a valid one.
+        '''
+        if self._filterQuery[0] != searchQuery:
+            try:
+                self._filterQuery = (searchQuery, filtering.parseSearch(searchQuery))
+            except ValueError as e:
+                self._filterQuery = (searchQuery, e)
+
+        if isinstance(self._filterQuery[1], ValueError):
+            raise self._filterQuery[1]
+        return self._filterQuery[1]
+
+    def findFirst(self, searchQuery, rowEnd):
+        '''
+        Finds the first displayed row matching a query in find first mode: the row whose Row Id is the query, or
+        failing that the first row with a cell equal to the query, ignoring case. Rows are looked up through the
+        row id index of the model and the hash indexes of its columns instead of checking every row, or by an SQL
+        query for a SQLitePipelineTable. Only the columns which can hold the query are indexed, such as the text
+        columns with a cell equal to it and the numeric columns when it is a number.
+
+        :param searchQuery: The lowercase text of the query.
+        :param rowEnd: The index after the last displayed model row.
+        :returns: The index of the matching row, or None if no displayed row matches.
+        '''
+        if searchQuery.isdecimal() and str(int(searchQuery)) == searchQuery:
+            position = self._model.positionOf(int(searchQuery))
+
+            if position is not None and self._rowStart <= position < rowEnd:
+                return position
+
+        if isinstance(self._model, database.SQLitePipelineTable):
+            return self._model.findEqual(searchQuery, self._rowStart, rowEnd)
+
+        firstPosition = None
+
+        for columnIndex in range(len(columnar.COLUMN_NAMES)):
+            index = self.columnHashIndex(columnIndex)
+
+            if index is None:
+                break
+
+            positions = index.positions(searchQuery)
+            first = bisect.bisect_left(positions, self._rowStart)
+
+            if first < len(positions) and positions[first] < rowEnd:
+                if firstPosition is None or positions[first] < firstPosition:
+                    firstPosition = positions[first]
+
+        return firstPosition
+
+    @instrumentation.timed(rows=lambda result, controller: controller.displayCount())
     def searchTable(self):
         '''
-        Searches the table based on the input in the search box and the toggled search mode.
+        Searches the displayed rows of the model based on the input in the search box and the toggled search mode.
+        In find all mode rows which do not match are greyed out, and only the rows whose tags change are re-tagged.
+        A search text which is a filter query is evaluated by FilterQuery, and any other text matches the rows with
+        a cell containing it. The rows of a SQLitePipelineTable are searched by SQL queries, and a filter query over
+        an opened dataset skips the files which cannot match. A filter query which is not valid is shown as an error
+        under the search box, and leaves every row shown.
+        In find first mode the row with a matching Row Id, or else the first row with a cell equal to the query, is
+        scrolled into view.
         '''
+        self._searchId = None
+
+        if not hasattr(self._view, "searchBox"):
+            return
+
         searchQuery = self._view.searchBox.get().lower()
+        rowEnd = self._rowStart + self.displayCount()
+        expression, error = None, None
+
+        if searchQuery and self._searchButtonToggle == False:
+            try:
+                expression = self.filterQuery(searchQuery)
+            except ValueError as e:
+                error = f"Error: {e}"
 
-        if self._searchButtonToggle == False:
-            for value in self._view.table.get_children():
-                values = self._view.table.item(value, "values")
+        self._view.showSearchError(error)
 
-                for searchValue in values:
-                    if searchQuery in str(searchValue).lower():
-                        self._view.table.item(value, tags=())
-                        break 
-                else:
-                    self._view.table.item(value, tags=("hidden"))
+        if not searchQuery or error is not None:
+            self._searchMatches = None
+        elif self._searchButtonToggle == False:
+            index = self.searchIndex()
+
+            if isinstance(self._model, database.SQLitePipelineTable) and expression is not None:
+                self._searchMatches = self._model.filterRows(expression, self._rowStart, rowEnd)
+            elif isinstance(self._model, database.SQLitePipelineTable):
+                self._searchMatches = self._model.search(searchQuery, self._rowStart, rowEnd)
+            elif expression is not None and self._dataset is not None:
+                self._searchMatches = self._dataset.matchingRows(expression, self._model, self._rowStart, rowEnd,
+                                                                 self.sortIndex())
+            elif expression is not None:
+                self._searchMatches = filtering.matchingRows(expression, self._model, self._rowStart, rowEnd, self.sortIndex())
+            elif index is not None:
+                self._searchMatches = index.search(searchQuery, self._rowStart, rowEnd)
+            else:
+                self._searchMatches = set()
+
+                for position in range(self._rowStart, rowEnd):
+                    for searchValue in self.rowValues(position):
+                        if searchQuery in str(searchValue).lower():
+                            self._searchMatches.add(position)
+                            break
         else:
-            for value in self._view.table.get_children():
-                if searchQuery == str(value):
-                    self._view.table.item(value, tags=())
-                    self._view.table.see(value)
-                else:
-                    self._view.table.item(value, tags=("hidden"))
-                    
-            if not searchQuery:
-                for value in self._view.table.get_children():
-                    self._view.table.item(value, tags=())
-        
+            self._searchMatches = set()
+            position = self.findFirst(searchQuery, rowEnd)
+
+            if position is not None:
+                self._searchMatches.add(position)
+                self._viewStart = self.displayIndex(position) - self._view.visibleRowCount() // 2
+
+            self.renderTable()
+            return
+
+        self.retagTable()
+
+    @instrumentation.timed(rows=lambda result, *args: 1)
     def editData(self, event, rowId, columnIndex):
         '''
-        Edits a cell value in the table and updates the model accordingly.
+        Edits a cell value in the table and updates the model accordingly. The model row is found from the
+        Treeview item showing it, and the value is converted by the column of the schema, so an edit costs the
+        same however many rows there are. The edit is recorded in the edit journal, and the item is redrawn from
+        the model, which keeps the old value when the new one is rejected.
 
         :param event: The event triggering the edit.
-        :param rowId: The ID of the row being edited.
+        :param rowId: The ID of the Treeview item being edited.
         :param columnIndex: The index of the column being edited.
         '''
-        index = self._view.table.index(self._view.table.selection()[0])  
-        vals = self._view.table.item(rowId, 'values') 
-        vals = list(vals) 
-        vals[columnIndex] = self._view.textInput.get() 
-        self._view.table.item(rowId, values=vals)  
-        self._view.textInput.destroy() 
-        value = vals[columnIndex]
-        
-        row = int(index)
-        if columnIndex == 0:
-            self._model[row].date = value;
-        elif columnIndex == 1:
-            self._model[row].month = value;
-        elif columnIndex == 2:
-            self._model[row].year = value;
-        elif columnIndex == 3:
-            self._model[row].company = value;
-        elif columnIndex == 4:
-            self._model[row].pipeline = value;
-        elif columnIndex == 5:
-            self._model[row].keyPoint = value;
-        elif columnIndex == 6:
-            self._model[row].latitude = value;
-        elif columnIndex == 7:
-            self._model[row].longitude = value;
-        elif columnIndex == 8:
-            self._model[row].directionOfFlow = value;
-        elif columnIndex == 9:
-            self._model[row].tradeType = value;
-        elif columnIndex == 10:
-            self._model[row].product = value;
-        elif columnIndex == 11:
-            self._model[row].throughput = value;
-        elif columnIndex == 12:
-            self._model[row].committedVolumes = value;
-        elif columnIndex == 13:
-            self._model[row].uncommittedVolumes = value;
-        elif columnIndex == 14:
-            self._model[row].nameplateCapacity = value;
-        elif columnIndex == 15:
-            self._model[row].availableCapacity = value;
-        elif columnIndex == 16:
-            self._model[row].reasonForVariance = value;
+        index = self.slotPosition(rowId)
+        value = self._view.textInput.get()
+        self._view.textInput.destroy()
+
+        self.makeEdit({"op": "set", "position": index, "column": columnIndex,
+                       "old": str(self._model.getValue(index, columnIndex)), "new": value})
+        self._view.table.item(rowId, values=self.rowValues(index))
 
     def addData(self, position):
         '''
-        Adds a new row of data to the table and model.
+        Adds a new row of data to the model and re-renders the table.
 
         :param position: A string indicating whether to add the row 'above' or 'below' the selected row.
         '''
-        index = self._view.table.index(self._view.table.selection()[0])
-        pipeData = model.PipelineData(date="", month="", year="", company="", pipeline="",  keyPoint="", latitude="", 
-                                      longitude="", directionOfFlow="", tradeType="", product="", throughput="", 
-                                      committedVolumes="",uncommittedVolumes="", nameplateCapacity="", availableCapacity="", 
-                                      reasonForVariance="")
-        
-        if position == "above":
-            self._view.table.insert("", index, str(self._highestId), text=str(self._highestId), values=("", "", "", "", "", "", "", "", 
-                                                                                              "", "", "", "", "", "", "", "", ""))
-            self._model.insert(index, pipeData) 
-        elif position == "below":
-            self._view.table.insert("", index + 1, str(self._highestId), text=str(self._highestId), values=("", "", "", "", "", "", "", "", 
-                                                                                              "", "", "", "", "", "", "", "", ""))
-            self._model.insert(index + 1, pipeData)
-            
-        self._highestId += 1
+        index = self.slotPosition(self._view.table.selection()[0])
+
+        if position == "below":
+            index += 1
+
+        self.insertRows([index], [[""] * len(schema.COLUMNS)])
 
     def deleteData(self):
         '''
-        Deletes the selected row from the table and model.
+        Deletes the selected rows from the model and re-renders the table.
         '''
-        rowId = int(self._view.table.selection()[0])
-        index = self._view.table.index(self._view.table.selection()[0])
-        self._model.pop(index)
-        self._view.table.delete(rowId)
-        
+        self.deleteRows(sorted(self.slotPosition(rowId) for rowId in self._view.table.selection()))
+
+    def deleteSearchMatches(self):
+        '''
+        Deletes every row matching the current find all search from the model in one batch and re-renders the table.
+        '''
+        if not self._searchMatches or self._searchButtonToggle:
+            self._view.buildInfoBox("Error", "There are no search matches to delete.")
+            return
+
+        self.deleteRows(sorted(self._searchMatches))
+
+    def insertRows(self, positions, rows):
+        '''
+        Inserts a batch of new rows into the model as one edit, recorded in the edit journal, giving each row the
+        next row id, and re-renders the table once.
+
+        :param positions: The ascending indexes the new rows will have once they are all inserted.
+        :param rows: A list of the cell texts of each new row in column order.
+        '''
+        rowIds = list(range(self._highestId, self._highestId + len(rows)))
+        self.makeEdit({"op": "insert", "positions": positions, "rowIds": rowIds, "values": rows})
+        self.refreshTable()
+
+    def deleteRows(self, positions):
+        '''
+        Deletes a batch of rows from the model as one edit and re-renders the table once. The edit is recorded in
+        the edit journal with the row ids and values of the rows, so it can be undone.
+
+        :param positions: The ascending indexes of the rows to delete.
+        '''
+        if not positions:
+            return
+
+        self.makeEdit({"op": "delete", "positions": positions, "rowIds": [self._model.rowId(position) for position in positions],
+                       "values": engine.rowTexts(self._model, positions)})
+        self.refreshTable()
+
+    def makeEdit(self, edit):
+        '''
+        Applies an edit made by the user to the model and records it in the edit journal. An edit with a value
+        which cannot be converted by its column of the schema is reported and not recorded.
+
+        :param edit: The edit, as a dictionary described by EditJournal.
+        '''
+        try:
+            self.applyEdit(edit)
+        except Exception as e:
+            print(f"Error: {e}")
+            return
+
+        if self._journal is not None:
+            self._journal.record(edit)
+
+    def applyEdit(self, edit):
+        '''
+        Applies a cell edit, or a batch insert or delete of rows, to the model with PipelineEngine.applyEdit, keeping
+        the displayed row range and the next row id in step with the rows.
+
+        :param edit: The edit, as a dictionary described by EditJournal.
+        :raises ValueError: If a value cannot be converted to the type of its column. The model is left unchanged.
+        '''
+        engine.applyEdit(self._model, edit)
+
+        if edit["op"] == "set":
+            return
+
+        positions = edit["positions"]
+
+        if edit["op"] == "insert":
+            self._highestId = max(self._highestId, max(edit["rowIds"], default=-1) + 1)
+
+            if self._rowEnd is not None:
+                for position in positions:
+                    if position < self._rowEnd:
+                        self._rowEnd += 1
+        elif self._rowEnd is not None:
+            self._rowEnd -= sum(position < self._rowEnd for position in positions)
+
+    def undoEdit(self):
+        '''
+        Undoes the last edit recorded in the edit journal and re-renders the table. The undo is recorded in the
+        journal only once the reversing edit is applied to the model; an edit which cannot be applied is reported
+        and stays on the undo stack.
+        '''
+        edit = self._journal.nextUndo() if self._journal is not None else None
+
+        if edit is None:
+            return
+
+        try:
+            self.applyEdit(edit)
+        except Exception as e:
+            print(f"Error: {e}")
+            return
+
+        self._journal.undo()
+        self.refreshTable()
+
+    def redoEdit(self):
+        '''
+        Redoes the last undone edit and re-renders the table. The redo is recorded in the journal only once the edit
+        is applied to the model; an edit which cannot be applied is reported and stays on the redo stack.
+        '''
+        edit = self._journal.nextRedo() if self._journal is not None else None
+
+        if edit is None:
+            return
+
+        try:
+            self.applyEdit(edit)
+        except Exception as e:
+            print(f"Error: {e}")
+            return
+
+        self._journal.redo()
+        self.refreshTable()
+
     def reloadDataFromFile(self):
         '''
         Reloads data from the currently selected CSV file, clearing the in memory data and replacing it with data from the file.
         '''
         if hasattr(self, "_file"):
-            self._highestId = 0
-            self._model.clear()
-            
-            for child in self._view.table.get_children():
-                self._view.table.delete(child)
-                
-            self.startDaemonThread(self._file)
-            self.loadData(0, 354)
-        
+            self.startDaemonThread(self._file, self._dataset is not None)
+            self.renderTable()
+
     def openFile(self):
         '''
-        Opens a CSV file and loads its data into the view.
+        Opens a CSV or columnar file and starts loading its data into the view. The menus which act on the loaded
+        data are enabled once the load has finished.
         '''
-        self._file = tk.filedialog.askopenfilename(title="Open Pipeline Data", filetypes=[('CSV Files', '*.csv')])
-        
-        if not self._file:
+        file = tk.filedialog.askopenfilename(title="Open Pipeline Data", filetypes=columnFile.fileTypes())
+
+        if file:
+            self.openPath(file, asDataset=False)
+
+    def openFolder(self):
+        '''
+        Opens a folder of CSV files as one dataset and starts loading the rows of every file into the view.
+        '''
+        folder = tk.filedialog.askdirectory(title="Open Pipeline Data Folder")
+
+        if not folder:
             return
-        
+
+        if not datasets.datasetFiles(folder):
+            self._view.buildInfoBox("Error", "The folder holds no csv files.")
+            return
+
+        self.openPath(folder, asDataset=True)
+
+    def openPath(self, file, asDataset):
+        '''
+        Builds the table and search box of the view and starts loading a file, or a folder of files, into it.
+
+        :param file: A string representing the path of the file or folder.
+        :param asDataset: Whether the path is a folder of files opened as one dataset.
+        '''
+        self._file = file
         self._view.buildCSVTable()
         self._view.buildSearchBox()
-        self.startDaemonThread(self._file)
-        self.loadData(0, 354)
         self._view.startLabel.pack_forget()
-        self._view.fileMenu.entryconfig(2, state=tk.NORMAL)
-        self._view.fileMenu.entryconfig(3, state=tk.NORMAL)
-        self._view.dataMenu.entryconfig(0, state=tk.NORMAL)
-        self._view.dataMenu.entryconfig(1, state=tk.NORMAL)
-    
+        self._slots = []
+        self._slotTags = {}
+        self.startDaemonThread(self._file, asDataset)
+        self.loadData(0)
+
     def saveFile(self):
         '''
-        Saves the current model data to the opened CSV file.
-        '''
-        if self._file:
-            with open(self._file, 'w', newline='') as saveFile:
-                dataWriter = csv.writer(saveFile, quoting=csv.QUOTE_MINIMAL)
-                headers = ["Date", "Month", "Year", "Company", "Pipeline", "Key Point",
-                           "Latitude", "Longitude", "Direction Of Flow", "Trade Type",
-                           "Product", "Throughput (1000 m3/d)", "Committed Volumes (1000 m3/d)",
-                           "Uncommitted Volumes (1000 m3/d)", "Nameplate Capacity (1000 m3/d)",
-                           "Available Capacity (1000 m3/d)", "Reason For Variance"]
-                dataWriter.writerow(headers)
-           
-                for row in range(len(self._model)):
-                    dataWriter.writerow([self._model[row].date, self._model[row].month, self._model[row].year,
-                                         self._model[row].company, self._model[row].pipeline, self._model[row].keyPoint,
-                                         self._model[row].latitude, self._model[row].longitude, self._model[row].directionOfFlow,
-                                         self._model[row].tradeType, self._model[row].product, self._model[row].throughput,
-                                         self._model[row].committedVolumes, self._model[row].uncommittedVolumes,
-                                         self._model[row].nameplateCapacity, self._model[row].availableCapacity,
-                                         self._model[row].reasonForVariance])
+        Saves the current model data to the opened CSV file on a background thread. When the model reads its rows
+        from the file on demand, the file is reloaded once it has been replaced. An opened dataset cannot be saved over
+        its files, so its rows are saved as a new file instead.
+        '''
+        if self._dataset is not None:
+            self.saveFileAs()
+        elif self._file:
+            self.startSave(self._file)
 
     def saveFileAs(self):
         '''
-        Opens a dialog to save the current model data to a new CSV file.
+        Opens a dialog to save the current model data to a new CSV or columnar file on a background thread. The
+        extension chosen for the file gives its format.
         '''
-        self._saveFile = tk.filedialog.asksaveasfilename(title="Save File As...", defaultextension=".csv", filetypes=[('CSV Files', '*.csv')])
-        
+        self._saveFile = tk.filedialog.asksaveasfilename(title="Save File As...", defaultextension=".csv",
+                                                         filetypes=columnFile.fileTypes()[1:])
+
         if self._saveFile:
-            with open(self._saveFile, 'w', newline='') as saveFile:
-                dataWriter = csv.writer(saveFile, quoting=csv.QUOTE_MINIMAL)
-                headers = ["Date", "Month", "Year", "Company", "Pipeline", "Key Point",
-                           "Latitude", "Longitude", "Direction Of Flow", "Trade Type",
-                           "Product", "Throughput (1000 m3/d)", "Committed Volumes (1000 m3/d)",
-                           "Uncommitted Volumes (1000 m3/d)", "Nameplate Capacity (1000 m3/d)",
-                           "Available Capacity (1000 m3/d)", "Reason For Variance"]
-                dataWriter.writerow(headers)
-           
-                for row in range(len(self._model)):
-                    dataWriter.writerow([self._model[row].date, self._model[row].month, self._model[row].year,
-                                         self._model[row].company, self._model[row].pipeline, self._model[row].keyPoint,
-                                         self._model[row].latitude, self._model[row].longitude, self._model[row].directionOfFlow,
-                                         self._model[row].tradeType, self._model[row].product, self._model[row].throughput,
-                                         self._model[row].committedVolumes, self._model[row].uncommittedVolumes,
-                                         self._model[row].nameplateCapacity, self._model[row].availableCapacity,
-                                         self._model[row].reasonForVariance])
-        
+            self.startSave(self._saveFile)
+
+    def startSave(self, file):
+        '''
+        Starts writing a copy of the model to a CSV file on a daemon thread, so the model can still be browsed and
+        edited while a large file is saved, and starts polling the save queue from the Tk event loop to show the
+        progress of the save. Only one save runs at a time.
+
+        When the file is the opened csv file and has not changed since it was loaded or saved, only the changed
+        rows are written again and the unchanged records are copied from the file. Columnar files are always
+        written in full.
+
+        :param file: A string representing the path of the file to save to.
+        '''
+        if self._savePollId is not None:
+            self._view.buildInfoBox("Error", "A save is already in progress.")
+            return
+
+        unchanged = self.fileState(file) == self._sourceState and not columnFile.isColumnarFile(file)
+        recordCount = self._sourceRecordCount if unchanged else None
+        self._saveTarget = file
+        self._saveVersion = (self._model, self._model.editCount)
+        self._saveCheckpoint = self._journal.checkpoint() if self._journal is not None else 0
+        self._saveQueue = queue.Queue()
+        self._view.buildSaveProgress()
+
+        self._saveThread = threading.Thread(target=self.writeFile,
+                                            args=(self._model.copy(), file, self._saveQueue, recordCount))
+        self._saveThread.daemon = True
+        self._saveThread.start()
+        self._savePollId = self._view.root.after(LOAD_POLL_INTERVAL, self.pollSaveQueue)
+
+    @instrumentation.timed("saveFile", rows=lambda result, controller, table, *args: len(table))
+    def writeFile(self, table, file, saveQueue, recordCount=None):
+        '''
+        Writes the rows of a table to a temporary file next to a CSV file. Runs on the save thread, pushing tuples
+        of the fraction of rows written and the path of the temporary file, which is None until the file is
+        written. A failed save pushes (None, None). A copy of a SQLitePipelineTable is closed once it is written.
+
+        :param table: The copy of the model to write.
+        :param file: A string representing the path of the file to save to.
+        :param saveQueue: The queue the progress of the save is pushed to.
+        :param recordCount: The number of records of the file the rows of the table were read from, when only the
+                            changed rows are to be written again, or None to write every row.
+        '''
+        progress = lambda fraction: saveQueue.put((fraction, None))
+
+        try:
+            if columnFile.isColumnarFile(file):
+                temporaryPath = columnFile.writeTemporaryFile(table, file, progress)
+            elif recordCount is None:
+                temporaryPath = exporter.writeTemporaryFile(table, file, progress)
+            else:
+                boundaries = table.boundaries if isinstance(table, lazy.LazyPipelineTable) else None
+                temporaryPath = exporter.writeSplicedFile(table, file, recordCount, boundaries, progress)
+
+            saveQueue.put((1.0, temporaryPath))
+        except Exception as e:
+            print(f"Error: {e}")
+            saveQueue.put((None, None))
+        finally:
+            if isinstance(table, database.SQLitePipelineTable):
+                table.close()
+
+    def pollSaveQueue(self):
+        '''
+        Drains the progress pushed by the save thread, updating the progress indicator, and finishes the save once
+        the temporary file is written. The poll reschedules itself until then.
+        '''
+        progress = None
+
+        try:
+            while True:
+                progress, temporaryPath = self._saveQueue.get_nowait()
+
+                if progress is None or temporaryPath is not None:
+                    self.finishSave(temporaryPath)
+                    return
+        except queue.Empty:
+            pass
+
+        if progress is not None:
+            self._view.updateSaveProgress(progress)
+
+        self._savePollId = self._view.root.after(LOAD_POLL_INTERVAL, self.pollSaveQueue)
+
+    def finishSave(self, temporaryPath):
+        '''
+        Ends a save by renaming the written temporary file over the saved file, so the saved file is replaced in
+        one step and never left partly written. A model reading its rows from the saved file is closed first and
+        reloaded afterwards. Once the opened file is saved, the saved edits are dropped from the edit journal.
+
+        :param temporaryPath: The path of the written temporary file, or None if the save failed.
+        '''
+        self._savePollId = None
+        self._view.destroySaveProgress()
+
+        if temporaryPath is None:
+            self._view.buildInfoBox("Error", "The file could not be saved.")
+            return
+
+        savedState = self.fileState(self._saveTarget)
+        readsFile = isinstance(self._model, lazy.LazyPipelineTable) and self.fileState(self._model.file) == savedState
+
+        if readsFile:
+            self._model.close()
+
+        try:
+            os.replace(temporaryPath, self._saveTarget)
+        except OSError as e:
+            print(f"Error: {e}")
+            self._view.buildInfoBox("Error", "The file could not be saved.")
+            savedState = None
+
+        if readsFile:
+            if self._journal is not None:
+                self._journal.discard(None, self._journal.checkpoint())
+
+            self._file = self._saveTarget
+            self.reloadDataFromFile()
+        elif savedState is not None and savedState[0] == self.fileState(self._file)[0]:
+            self._sourceState = self.fileState(self._file)
+            self._sourceRecordCount = None
+
+            if self._saveVersion == (self._model, self._model.editCount):
+                self.trackSource()
+
+            if self._journal is not None and self._saveVersion[0] is self._model:
+                self._journal.discard(list(self._sourceState[1:]), self._saveCheckpoint)
+
+    def fileState(self, file):
+        '''
+        Gets the state of a file which tells whether it changed, such as since it was loaded. The state of a folder or
+        glob pattern of files covers all of its files.
+
+        :param file: A string representing the path of the file, or folder or glob pattern of files.
+        :returns: A tuple of the normalized absolute path, size and modification time in nanoseconds of the file,
+                  or a tuple of the path and two Nones if the file does not exist.
+        '''
+        path = os.path.normcase(os.path.abspath(file))
+
+        if datasets.isDatasetPath(file):
+            return (path,) + datasets.datasetState(file)
+
+        try:
+            status = os.stat(path)
+            return path, status.st_size, status.st_mtime_ns
+        except OSError:
+            return path, None, None
+
+    def trackSource(self):
+        '''
+        Marks the rows of the model as the records of the opened file, so that saving to the file copies the
+        unchanged records instead of writing every row. A LazyPipelineTable always knows the records of its rows,
+        while the rows of a SQLitePipelineTable are always written in full.
+        '''
+        if isinstance(self._model, columnar.PipelineTable):
+            self._model.trackSource()
+            self._sourceRecordCount = len(self._model)
+        elif isinstance(self._model, database.SQLitePipelineTable):
+            self._sourceRecordCount = None
+        else:
+            self._sourceRecordCount = len(self._model.boundaries) - 1
+
     def showHideSearchBox(self):
         '''
         Toggles the visibility of the search box.
@@ -370,6 +1088,7 @@ class WindowController:
             else:
                 self._searchOpen = False
                 self._view.searchBox.delete(0, "end")
+                self._view.showSearchError(None)
                 self._view.searchFrame.place_forget()
                       
     def toggleButton(self):
@@ -384,9 +1103,8 @@ class WindowController:
             self._searchButtonToggle = True
             
         self._view.searchBox.delete(0, "end")
-        
-        for value in self._view.table.get_children():
-                    self._view.table.item(value, tags=())
+        self._searchMatches = None
+        self.retagTable()
 
     def openContextMenu(self, event):
         '''
@@ -406,7 +1124,9 @@ class WindowController:
             if not rowId:
                 return
             
-            self._view.table.selection_set(rowId)
+            if rowId not in self._view.table.selection():
+                self._view.table.selection_set(rowId)
+
             self._view.contextMenu.tk_popup(event.x_root, event.y_root)
             
         finally:
@@ -449,84 +1169,286 @@ class WindowController:
                 
     def openRowDetails(self):
         '''
-        Opens a detail view for the currently selected row.
+        Opens a detail view for the currently selected row. The rows of an opened dataset also show their source file.
+        '''
+        index = self.slotPosition(self._view.table.selection()[0])
+        details = "\n".join(f"{heading}: {value}" for heading, value in zip(self._view.table["columns"], self.rowValues(index)))
+
+        if self._dataset is not None:
+            details += f"\nSource File: {os.path.basename(self._dataset.sourceFile(self._model.rowId(index)))}"
+        self._view.buildInfoBox(f"Details For Row: {self._model.rowId(index)}", details)
+
+    def showInstrumentation(self):
+        '''
+        Opens a popup listing the call counts, rows and latencies recorded by the instrumentation, or explains how
+        to turn the instrumentation on when it is off.
+        '''
+        if not instrumentation.RECORDER.enabled:
+            self._view.buildInfoBox("Performance Statistics", "Performance statistics are not being recorded. Set the "
+                                    f"{instrumentation.INSTRUMENT_VARIABLE} environment variable to on and restart the "
+                                    "program to record them.")
+            return
+
+        self._view.buildInstrumentationPopup(instrumentation.RECORDER.summaries())
+
+    def saveInstrumentation(self):
+        '''
+        Opens a dialog to save the recorded performance statistics to a JSON file, which also holds the most
+        recent calls, or to a csv file holding one row per operation.
         '''
-        rowId = int(self._view.table.selection()[0])
-        index = self._view.table.index(self._view.table.selection()[0])
-        self._view.buildInfoBox(f"Details For Row: {rowId}", self._model[index])
+        file = tk.filedialog.asksaveasfilename(title="Save Performance Statistics", defaultextension=".json",
+                                               filetypes=[('JSON Files', '*.json'), ('CSV Files', '*.csv')])
+
+        if not file:
+            return
+
+        try:
+            if file.lower().endswith(".csv"):
+                instrumentation.RECORDER.dumpCSV(file)
+            else:
+                instrumentation.RECORDER.dumpJSON(file)
+        except OSError as e:
+            print(f"Error: {e}")
+            self._view.buildInfoBox("Error", f"The statistics could not be saved: {e}")
         
-    def startDaemonThread(self, file):
+    def startDaemonThread(self, file, asDataset=False):
         '''
-        Starts a daemon thread which will open and parse a CSV file. 
+        Starts a daemon thread which will open and parse a CSV file, and starts polling the load queue from the
+        Tk event loop so that parsed rows are displayed as they arrive. Any load already in progress is cancelled
+        first. The menus which act on the loaded data stay disabled until the load has finished. A model stored in a
+        database is closed, removing its database.
         
-        :param file: The file to be parsed on the daemon thread.
+        :param file: The file, or folder or glob pattern of files, to be parsed on the daemon thread.
+        :param asDataset: Whether the path is a folder or glob pattern of files opened as a PipelineDataset.
         '''
+        self.cancelLoad()
+
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+        if isinstance(self._model, database.SQLitePipelineTable):
+            self._model.close()
+
+        self._model = columnar.PipelineTable()
+        self._dataset = datasets.PipelineDataset(file) if asDataset else None
+        self._highestId = 0
+        self._searchMatches = None
+        self._sortColumn = None
+        self._sortDescending = False
+        self._view.markSortedColumn(None, False)
+        self._loadKey = None
+        self._sourceState = self.fileState(file)
+        self._sourceRecordCount = None
+        self._loadQueue = queue.Queue()
+        self._cancelLoad = threading.Event()
+        self.setDataMenusState(tk.DISABLED)
+        self._view.buildLoadProgress()
+        
         self._daemon = threading.Thread(target=self.parseCSV, args=(file,))
         self._daemon.daemon = True
         self._daemon.start()
-        self._daemon.join()
+        self._pollId = self._view.root.after(LOAD_POLL_INTERVAL, self.pollLoadQueue)
+        
+    def pollLoadQueue(self):
+        '''
+        Drains the batches pushed by the loader thread into the model, renders the table until it is filled with
+        rows and keeps the scrollbar mapped to the rows loaded so far, and updates the progress indicator. Draining stops after LOAD_POLL_BUDGET seconds so
+        the window stays responsive, and the poll reschedules itself until the end of the load is reached.
+        '''
+        deadline = time.perf_counter() + LOAD_POLL_BUDGET
+        progress = None
+        
+        try:
+            while time.perf_counter() < deadline:
+                batch, progress = self._loadQueue.get_nowait()
+                
+                if batch is None:
+                    self.finishLoad()
+                    return
+                
+                self.appendBatch(batch)
+        except queue.Empty:
+            pass
+        
+        if progress is not None:
+            self._view.updateLoadProgress(progress)
+        
+        self._pollId = self._view.root.after(LOAD_POLL_INTERVAL, self.pollLoadQueue)
+        
+    def appendBatch(self, batch):
+        '''
+        Appends a batch of parsed rows to the model, giving each row the next row id. The table is rendered while
+        it is not yet filled with rows; afterwards only the scrollbar needs to follow the growing model. A
+        LazyPipelineTable or SQLitePipelineTable replaces the model instead, keeping the row ids it gives its rows.
+        
+        :param batch: A PipelineTable of parsed rows, a LazyPipelineTable of indexed records, or a SQLitePipelineTable
+                      of loaded rows.
+        '''
+        if not isinstance(batch, columnar.PipelineTable):
+            self._model = batch
+            self._highestId = len(batch)
+        else:
+            self._model.extendTable(batch, self._highestId)
+            self._highestId += len(batch)
+        
+        if len(self._slots) < self._view.visibleRowCount() + OVERSCAN_ROWS:
+            self.renderTable()
+        else:
+            self.updateScrollbar()
+        
+    def finishLoad(self):
+        '''
+        Ends a load once the loader thread has pushed its last batch, removing the progress indicator and enabling
+        the menus which act on the loaded data. A parsed file which was loaded in full is stored in the snapshot cache,
+        its rows are marked as the records of the file unless rows were changed while it was loading, and its edit
+        journal is opened. The partitions of an opened dataset are kept for filter queries if no rows were changed.
+        '''
+        self._pollId = None
+        self._view.destroyLoadProgress()
+        self.setDataMenusState(tk.NORMAL)
+
+        if self._dataset is not None:
+            self._dataset.attach(self._model)
+
+        if not self._cancelLoad.is_set():
+            self.storeSnapshot()
+
+            if self._model.editCount == 0:
+                self.trackSource()
+
+            self.openJournal()
+
+    def openJournal(self):
+        '''
+        Opens the edit journal of the loaded file. When the journal holds edits left by a session which ended
+        without saving them, and the file has not changed since, the user is offered to replay them onto the
+        model, after which they can be undone. Declined or stale edits are removed from the journal. The journal of
+        an opened dataset is named by PipelineDataset.journalFile.
+        '''
+        source = list(self._sourceState[1:])
+        loadedClean = self._model.editCount == 0
+        journalFile = self._dataset.journalFile() if self._dataset is not None else self._file
+        edits = journaling.readJournal(journalFile, source) if loadedClean else []
+        self._journal = journaling.EditJournal(journalFile, source)
+        applied = 0
+
+        if edits and self._view.buildConfirmBox("Recover Edits", f"{len(edits)} unsaved edits to this file were found. "
+                                                "Do you want to restore them?"):
+            try:
+                for edit in edits:
+                    self.applyEdit(edit)
+                    applied += 1
+            except Exception as e:
+                print(f"Error: {e}")
+
+            self._journal.restore(edits[:applied])
+            self.refreshTable()
+
+        if not loadedClean or applied < len(edits):
+            self._journal.discard(source, 0)
+
+    def storeSnapshot(self):
+        '''
+        Stores a snapshot of the model in the snapshot cache on a background thread, if the model was parsed from
+        its file and no rows were edited, added or deleted while it was loading.
+        '''
+        if self._loadKey is not None and isinstance(self._model, columnar.PipelineTable) and self._model.editCount == 0:
+            self._snapshotCache.store(self._loadKey, self._model, background=True)
+
+    def toggleCache(self, enabled):
+        '''
+        Turns the snapshot cache of parsed files on or off.
+
+        :param enabled: Whether files are loaded from and stored in the snapshot cache.
+        '''
+        self._snapshotCache.enabled = enabled
+
+    def toggleDatabase(self, enabled):
+        '''
+        Turns storing the rows of loaded files in a SQLite database on or off. The change applies from the next file
+        loaded or reloaded.
+
+        :param enabled: Whether loaded files are stored in a SQLitePipelineTable.
+        '''
+        self._useDatabase = enabled
         
+    def cancelLoad(self):
+        '''
+        Cancels the load in progress, if any. The loader thread stops at its next batch and the rows loaded so far
+        are kept in the model.
+        '''
+        self._cancelLoad.set()
+        
+        if self._pollId is not None:
+            self._view.root.after_cancel(self._pollId)
+            self._daemon.join()
+            
+            try:
+                while True:
+                    batch, progress = self._loadQueue.get_nowait()
+                    
+                    if batch is not None:
+                        self.appendBatch(batch)
+            except queue.Empty:
+                pass
+            
+            self.finishLoad()
+        
+    def setDataMenusState(self, state):
+        '''
+        Enables or disables the menu entries which act on the loaded data.
+        
+        :param state: tk.NORMAL or tk.DISABLED.
+        '''
+        self._view.fileMenu.entryconfig(3, state=state)
+        self._view.fileMenu.entryconfig(4, state=state)
+        self._view.dataMenu.entryconfig(0, state=state)
+        self._view.dataMenu.entryconfig(1, state=state)
+        self._view.dataMenu.entryconfig(2, state=state)
+        self._view.dataMenu.entryconfig(3, state=state)
+        self._view.dataMenu.entryconfig(4, state=state)
+        
+    @instrumentation.timed(rows=lambda result, controller: controller.displayCount())
     def generatePieChart(self):
         '''
-        Generates a pie chart based on a selected categorical column and numerical column. First, 
-        accesses the view object to obtain the selected columns. Then obtains the data for the selected
-        colums from the view object. Next calls a helper method to filter null values and convert numerical
-        column values to a float, as required by matplotlib. Finally, validates the data lists to ensure that 
-        the filteredCategoricalColumnData list contains only String data, and the filteredNumericalColumnData
-        list is not null (if it is null it means conversion failed in the previous step and the column contains
-        categorical values), and then generates a pie chart using the formatted lists using matplotlib.
-        '''
-        #Uses modified code from the following to iterate over a single column of the treeview.
-        #[1] J. P. User, "How to get all values from a column in Treeview in Tkinter using Python?", 
-        #Stack Overflow, Oct. 12, 2019. [Online]. Available: https://stackoverflow.com/questions/63368776/how-to-get-all-values-from-a-column-in-treeview-in-tkinter-using-python. 
-        #[Accessed: Nov. 6, 2024].
-        categoricalColumnData = [self._view.table.item(item)["values"][self._view.table["columns"].index(self._view.categoricalCol.get())] for item in self._view.table.get_children()]
-        numericalColumnData = [self._view.table.item(item)["values"][self._view.table["columns"].index(self._view.numericalCol.get())] for item in self._view.table.get_children()]
-        filteredCategoricalColumnData, filteredNumericalColumnData = self.formatColumnData(categoricalColumnData, numericalColumnData)
+        Generates a pie chart based on a selected categorical column, numerical column and statistic. First,
+        accesses the view object to obtain the selected columns and statistic. Then groups the displayed rows of the
+        model by the categorical column, summarizing the numerical column over each group, and keeps the groups
+        holding numeric values. Finally, validates the groups to ensure that the categorical column contains only
+        String data, that there is numeric data to chart (if not, the numerical column contains categorical values)
+        and that no slice is negative, and then generates a pie chart with one slice per category using matplotlib.
+        matplotlib is imported on the first chart rather than at startup, as importing it takes longer than opening
+        the window.
+        '''
+        categoricalIndex = self._view.table["columns"].index(self._view.categoricalCol.get())
+        numericalIndex = self._view.table["columns"].index(self._view.numericalCol.get())
+        statistic = self._view.chartStatistic.get().lower()
+        rowEnd = self._rowStart + self.displayCount()
+        summaries = [summary for summary in aggregation.aggregate(self._model, categoricalIndex, numericalIndex,
+                                                                  self._rowStart, rowEnd) if summary.count]
+        labels = [str(summary.label) for summary in summaries]
 
-        try:
-            list(map(float, filteredCategoricalColumnData))
+        if schema.COLUMNS[categoricalIndex].kind in ("int", "float"):
             self._view.buildInfoBox("Error", "Categorical column must contain non-numeric data.")
             return
-        except ValueError:
-            pass 
 
-        if not filteredNumericalColumnData:
+        if not summaries:
             self._view.buildInfoBox("Error", "Numerical column must contain valid numeric data.")
             return
-    
-        plt.pie(filteredNumericalColumnData, labels=filteredCategoricalColumnData, autopct='%1.2f%%')
-        plt.axis('equal')
-        plt.show()
-        
-    def formatColumnData(self, categoricalColumnData, numericalColumnData):
-        '''
-        Iterates through both categorical and numerical columns, removing entries 
-        where either the categorical value is null or empty, or the numerical value is invalid 
-        (non-numeric or null). The numerical values are then converted to floats, and the valid 
-        categorical and numerical data are returned as filtered lists.
 
-        :param categoricalColumnData (list): A list of data from the categorical column.
-        :param numericalColumnData (list): A list of data from the numerical column.
+        sizes = [summary.statistic(statistic) for summary in summaries]
 
-        :returns tuple: A tuple containing two lists:
-            - filteredCategoricalData (list): The list of valid categorical data.
-            - filteredNumericalData (list): The list of valid numerical data (as floats).
-        '''
-        filteredCategoricalData = []
-        filteredNumericalData = []
-        
-        for cat, num in zip(categoricalColumnData, numericalColumnData):
-            if cat not in [None, ''] and num not in [None, '']:
-                try:
-                    float(num)
-                    filteredCategoricalData.append(cat)
-                    filteredNumericalData.append(float(num))
-                except ValueError:
-                    continue
-        return filteredCategoricalData, filteredNumericalData
+        if any(size < 0 for size in sizes):
+            self._view.buildInfoBox("Error", "Chart values must not be negative.")
+            return
+
+        import matplotlib.pyplot as plt
+        plt.pie(sizes, labels=labels, autopct='%1.2f%%')
+        plt.axis('equal')
+        plt.show()
     
 if __name__ == "__main__":
     control = WindowController()
-    control._view.root.mainloop()
+    instrumentation.runProfiled(control._view.root.mainloop)
              
\ No newline at end of file
@@ -0,0 +1,165 @@
+#This module benchmarks the parse throughput of Pipeline Throughput and Capacity Data csv files. A synthetic file is built by
+#repeating the rows of the sample dataset, and the file is parsed by the row by row strptime conversion which parseCSV
+#used before the column converters, by the bulk column converters on one thread, and by the worker processes of
+#ParallelCSVParser. The throughput of each parser is reported in rows per second.
+#Run from the project folder with: python benchmarks/benchParseCSV.py [rows]
+
+#Author: Dan Blais - 040826486
+#Subject: CST8333
+
+import csv
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+import itertools as it
+import syntheticData
+import ColumnConverters as converters
+import ParallelCSVParser as parallel
+import PipelineTable as columnar
+
+#Number of rows in the synthetic file when no row count is given.
+DEFAULT_ROWS = 200000
+#Number of rows in each batch, as in parseCSV.
+BATCH_SIZE = 5000
+#Number of times each parser is run. The best time is reported.
+REPEATS = 3
+
+def buildSyntheticFile(rowCount):
+    '''
+    Writes a synthetic csv file holding the header and the rows of the sample dataset repeated up to the given row count.
+
+    :param rowCount: The number of data rows to write.
+    :returns: The path of the synthetic file.
+    '''
+    with tempfile.NamedTemporaryFile("w", newline='', suffix=".csv", delete=False) as synthetic:
+        syntheticData.writeSyntheticFile(synthetic, rowCount)
+
+    return synthetic.name
+
+def parseRowByRow(file):
+    '''
+    Parses the file with the row by row conversion which parseCSV used before the column converters.
+
+    :param file: The path of the file.
+    :returns: The number of rows parsed.
+    '''
+    table = columnar.PipelineTable()
+
+    with open(file, newline='') as dataset:
+        dataReader = csv.reader(dataset, delimiter=",", quotechar='"')
+        next(dataReader)
+
+        for row in dataReader:
+            date = datetime.strptime(row[0], "%Y-%m-%d").date() if row[0] else ""
+            month = int(row[1]) if row[1] else ""
+            year = int(row[2]) if row[2] else ""
+            latitude = float(row[6]) if row[6] else ""
+            longitude = float(row[7]) if row[7] else ""
+            throughput = float(row[11]) if row[11] else ""
+            committedVolumes = float(row[12]) if row[12] else ""
+            uncommittedVolumes = float(row[13]) if row[13] else ""
+            nameplateCapacity = float(row[14]) if row[14] else ""
+            availableCapacity = float(row[15]) if row[15] else ""
+
+            table.appendRow((date, month, year, row[3], row[4], row[5], latitude, longitude, row[8], row[9], row[10],
+                             throughput, committedVolumes, uncommittedVolumes, nameplateCapacity, availableCapacity,
+                             row[16]), len(table))
+
+    return len(table)
+
+def parseBulk(file):
+    '''
+    Parses the file in batches converted column by column, as parseCSV does.
+
+    :param file: The path of the file.
+    :returns: The number of rows parsed.
+    '''
+    table = columnar.PipelineTable()
+
+    with open(file, newline='') as dataset:
+        dataReader = csv.reader(dataset, delimiter=",", quotechar='"')
+        next(dataReader)
+        rows = list(it.islice(dataReader, BATCH_SIZE))
+
+        while rows:
+            batch = columnar.PipelineTable()
+            batch.extendRows(rows, 0)
+            table.extendTable(batch, len(table))
+            rows = list(it.islice(dataReader, BATCH_SIZE))
+
+    return len(table)
+
+def parseInParallel(file):
+    '''
+    Parses the file with one worker process per CPU, as parseCSV does for large files.
+
+    :param file: The path of the file.
+    :returns: The number of rows parsed.
+    '''
+    table = columnar.PipelineTable()
+
+    for batch, progress in parallel.readBatchesInParallel(file, os.cpu_count() or 1):
+        table.extendTable(batch, len(table))
+
+    return len(table)
+
+def readOnly(file):
+    '''
+    Reads the file with the csv reader without converting the rows, the floor which no parser can beat.
+
+    :param file: The path of the file.
+    :returns: The number of rows read.
+    '''
+    with open(file, newline='') as dataset:
+        dataReader = csv.reader(dataset, delimiter=",", quotechar='"')
+        next(dataReader)
+        return sum(1 for row in dataReader)
+
+def measure(parser, file):
+    '''
+    Runs a parser over the file REPEATS times.
+
+    :param parser: A function taking the path of the file and returning the number of rows parsed.
+    :param file: The path of the file.
+    :returns: A tuple of the number of rows parsed and the best time in seconds.
+    '''
+    best = None
+
+    for repeat in range(REPEATS):
+        converters.parseDate.cache_clear()
+        converters.parseDateOrdinal.cache_clear()
+        start = time.perf_counter()
+        rowCount = parser(file)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return rowCount, best
+
+def main():
+    '''
+    Builds the synthetic file, runs every parser over it and prints the throughput of each.
+    '''
+    rowCount = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS
+    file = buildSyntheticFile(rowCount)
+
+    try:
+        print(f"Parsing {rowCount} rows, best of {REPEATS} runs, {os.cpu_count()} CPUs")
+        baseline = None
+
+        for name, parser in (("csv reader only", readOnly), ("row by row strptime", parseRowByRow),
+                             ("column converters", parseBulk), ("worker processes", parseInParallel)):
+            parsed, elapsed = measure(parser, file)
+            rate = parsed / elapsed
+
+            if parser is parseRowByRow:
+                baseline = rate
+
+            speedup = f"  ({rate / baseline:.2f}x)" if baseline and parser is not parseRowByRow else ""
+            print(f"{name:>22}: {elapsed:7.3f} s  {rate:12,.0f} rows/s{speedup}")
+    finally:
+        os.remove(file)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+#This module benchmarks the construction time and memory of PipelineData objects. The rows of the sample dataset are
+#turned into objects by the row by row strptime conversion and keyword constructor which parseCSV used before the
+#column converters, with the attributes kept in an instance dictionary as PipelineData kept them before it had slots,
+#by the coercing PipelineData constructor, and by the PipelineData.fromRow bulk constructor. The time per row and the
+#memory per object of each are reported.
+#Run from the project folder with: python benchmarks/benchPipelineData.py [rows]
+
+#Author: Dan Blais - 040826486
+#Subject: CST8333
+
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+import syntheticData
+import ColumnConverters as converters
+import KeystonePipelineData as model
+
+#Number of objects built when no row count is given.
+DEFAULT_ROWS = 200000
+#Number of times each constructor is run. The best time is reported.
+REPEATS = 3
+
+class DictPipelineData:
+    '''
+    Defines a row of pipeline data laid out as PipelineData was before it had slots, with its 17 attributes stored
+    unconverted in an instance dictionary.
+    '''
+
+    def __init__(self, date, month, year, company, pipeline, keyPoint, latitude, longitude, directionOfFlow,
+                 tradeType, product, throughput, committedVolumes, uncommittedVolumes, nameplateCapacity,
+                 availableCapacity, reasonForVariance):
+        '''
+        Initializes a DictPipelineData object, storing each value as it is given.
+        '''
+        self._date = date
+        self._month = month
+        self._year = year
+        self._company = company
+        self._pipeline = pipeline
+        self._keyPoint = keyPoint
+        self._latitude = latitude
+        self._longitude = longitude
+        self._directionOfFlow = directionOfFlow
+        self._tradeType = tradeType
+        self._product = product
+        self._throughput = throughput
+        self._committedVolumes = committedVolumes
+        self._uncommittedVolumes = uncommittedVolumes
+        self._nameplateCapacity = nameplateCapacity
+        self._availableCapacity = availableCapacity
+        self._reasonForVariance = reasonForVariance
+
+def readRows(rowCount):
+    '''
+    Reads the rows of the sample dataset repeated up to the given row count.
+
+    :param rowCount: The number of rows.
+    :returns: A list of rows, each a list of cell texts.
+    '''
+    header, rows = syntheticData.repeatedRows(rowCount)
+    return [list(row) for row in rows]
+
+def buildRowByRow(rows):
+    '''
+    Builds the objects with the row by row conversion and keyword constructor which parseCSV used before the
+    column converters.
+
+    :param rows: A list of rows of cell texts.
+    :returns: A list of DictPipelineData objects.
+    '''
+    objects = []
+
+    for row in rows:
+        date = datetime.strptime(row[0], "%Y-%m-%d").date() if row[0] else ""
+        month = int(row[1]) if row[1] else ""
+        year = int(row[2]) if row[2] else ""
+        latitude = float(row[6]) if row[6] else ""
+        longitude = float(row[7]) if row[7] else ""
+        throughput = float(row[11]) if row[11] else ""
+        committedVolumes = float(row[12]) if row[12] else ""
+        uncommittedVolumes = float(row[13]) if row[13] else ""
+        nameplateCapacity = float(row[14]) if row[14] else ""
+        availableCapacity = float(row[15]) if row[15] else ""
+
+        objects.append(DictPipelineData(date=date, month=month, year=year, company=row[3], pipeline=row[4],
+                                        keyPoint=row[5], latitude=latitude, longitude=longitude,
+                                        directionOfFlow=row[8], tradeType=row[9], product=row[10],
+                                        throughput=throughput, committedVolumes=committedVolumes,
+                                        uncommittedVolumes=uncommittedVolumes, nameplateCapacity=nameplateCapacity,
+                                        availableCapacity=availableCapacity, reasonForVariance=row[16]))
+
+    return objects
+
+def buildCoerced(rows):
+    '''
+    Builds the objects with the PipelineData constructor, which coerces the cell texts.
+
+    :param rows: A list of rows of cell texts.
+    :returns: A list of PipelineData objects.
+    '''
+    return [model.PipelineData(*row) for row in rows]
+
+def buildFromRows(rows):
+    '''
+    Builds the objects with the PipelineData.fromRow bulk constructor.
+
+    :param rows: A list of rows of cell texts.
+    :returns: A list of PipelineData objects.
+    '''
+    return list(map(model.PipelineData.fromRow, rows))
+
+def measure(builder, rows):
+    '''
+    Runs a constructor over the rows REPEATS times, then measures the memory held by the objects of one more run.
+
+    :param builder: A function taking the rows and returning a list of objects.
+    :param rows: A list of rows of cell texts.
+    :returns: A tuple of the best time in seconds and the bytes allocated per object.
+    '''
+    best = None
+
+    for repeat in range(REPEATS):
+        converters.parseDate.cache_clear()
+        start = time.perf_counter()
+        objects = builder(rows)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        del objects
+
+    tracemalloc.start()
+    objects = builder(rows)
+    allocated, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return best, allocated / len(objects)
+
+def main():
+    '''
+    Reads the rows, runs every constructor over them and prints the time per row and memory per object of each.
+    '''
+    rowCount = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS
+    rows = readRows(rowCount)
+    print(f"Building {rowCount} objects, best of {REPEATS} runs")
+    baseline = None
+
+    for name, builder in (("row by row strptime", buildRowByRow), ("PipelineData()", buildCoerced),
+                          ("PipelineData.fromRow", buildFromRows)):
+        elapsed, perObject = measure(builder, rows)
+
+        if builder is buildRowByRow:
+            baseline = elapsed
+
+        speedup = f"  ({baseline / elapsed:.2f}x)" if builder is not buildRowByRow else ""
+        print(f"{name:>22}: {elapsed:7.3f} s  {elapsed / rowCount * 1e6:6.2f} us/row  {perObject:6.0f} bytes/object{speedup}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,282 @@
+#This module benchmarks the operations of the program on synthetic Pipeline Throughput and Capacity Data csv files of
+#10 thousand, 1 million and 10 million rows, built by repeating the rows of the sample dataset. Each operation runs the
+#code path of a WindowController method without a window: parseCSV, loadData, searchTable once per keystroke,
+#editData, the aggregation of generatePieChart, and saveFile. Every operation is timed over several rounds, reporting
+#the minimum, mean and standard deviation as pytest-benchmark does, and its peak memory is measured by tracemalloc in a
+#separate round. Memory allocated by worker processes is not traced.
+#Results can be saved as a JSON baseline and later runs compared to it, failing when an operation is slower or uses
+#more memory than its baseline by more than the tolerance. Synthetic files are kept between runs in the temporary
+#directory, as writing the larger ones takes longer than the benchmarks.
+#Run from the project folder with:
+#    python benchmarks/benchSuite.py [--rows 10000 1000000] [--save] [--compare] [--baseline FILE]
+
+#Author: Dan Blais - 040826486
+#Subject: CST8333
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import syntheticData
+import ColumnConverters as converters
+import Aggregation as aggregation
+import CSVExporter as exporter
+import PipelineEngine as engine
+
+#The directory the synthetic files are kept in between runs.
+SYNTHETIC_DIRECTORY = os.path.join(tempfile.gettempdir(), "csvmanager-benchmarks")
+#The default file of the saved baselines.
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+#The row counts of the synthetic files benchmarked when none are given.
+DEFAULT_ROWS = (10000, 1000000)
+#Number of timed rounds of each operation.
+ROUNDS = 3
+#The text typed into the search box one keystroke at a time by the searchTable benchmark.
+SEARCH_TEXT = "domestic heavy"
+#Number of cells edited by the editData benchmark, followed by a batch delete and insert of as many rows.
+EDIT_COUNT = 1000
+#The fraction by which an operation may be slower or use more memory than its baseline before the comparison fails.
+TOLERANCE = 0.25
+
+def syntheticFile(rowCount):
+    '''
+    Gets a synthetic csv file holding the header and the rows of the sample dataset repeated up to the given row
+    count, writing it if it was not written by an earlier run.
+
+    :param rowCount: The number of data rows.
+    :returns: The path of the synthetic file.
+    '''
+    file = os.path.join(SYNTHETIC_DIRECTORY, f"keystone-{rowCount}.csv")
+
+    if os.path.exists(file):
+        return file
+
+    os.makedirs(SYNTHETIC_DIRECTORY, exist_ok=True)
+    temporaryFile = file + ".tmp"
+
+    with open(temporaryFile, "w", newline='') as synthetic:
+        syntheticData.writeSyntheticFile(synthetic, rowCount)
+
+    os.replace(temporaryFile, file)
+    return file
+
+def parseCSV(file, pipeline):
+    '''
+    Reads every batch of the file as parseCSV does on its daemon thread, without assembling the batches.
+
+    :param file: The path of the synthetic file.
+    :param pipeline: The loaded PipelineEngine, unused.
+    '''
+    for batch in engine.readBatches(file):
+        pass
+
+def loadData(file, pipeline):
+    '''
+    Reads the file and appends every batch to one table, as parseCSV and loadData do together.
+
+    :param file: The path of the synthetic file.
+    :param pipeline: The loaded PipelineEngine, unused.
+    '''
+    engine.PipelineEngine().load(file)
+
+def searchTable(file, pipeline):
+    '''
+    Searches the table once per keystroke while SEARCH_TEXT is typed, as searchTable does in find all mode, starting
+    from a new search index.
+
+    :param file: The path of the synthetic file, unused.
+    :param pipeline: The loaded PipelineEngine.
+    '''
+    pipeline.clearIndexes()
+
+    for length in range(1, len(SEARCH_TEXT) + 1):
+        pipeline.matchingRows(SEARCH_TEXT[:length])
+
+def editData(file, pipeline):
+    '''
+    Edits EDIT_COUNT cells spread over the table, then deletes and inserts back a batch of EDIT_COUNT rows, as
+    editData, deleteData and undo do. Every edit is undone before the next round.
+
+    :param file: The path of the synthetic file, unused.
+    :param pipeline: The loaded PipelineEngine.
+    '''
+    throughput = engine.columnIndex("throughput")
+    step = max(1, len(pipeline.table) // EDIT_COUNT)
+    positions = list(range(0, len(pipeline.table), step))[:EDIT_COUNT]
+    edits = [pipeline.setValue(position, throughput, "1.5") for position in positions]
+    deletion = pipeline.deleteRows(positions)
+    pipeline.applyEdit(dict(deletion, op="insert"))
+
+    for edit in reversed(edits):
+        pipeline.applyEdit(dict(edit, old=edit["new"], new=edit["old"]))
+
+def generatePieChart(file, pipeline):
+    '''
+    Summarizes the throughput of every row per product, as generatePieChart does before drawing the chart.
+
+    :param file: The path of the synthetic file, unused.
+    :param pipeline: The loaded PipelineEngine.
+    '''
+    aggregation.aggregate(pipeline.table, engine.columnIndex("product"), engine.columnIndex("throughput"))
+
+def saveFile(file, pipeline):
+    '''
+    Saves every row to a new file, as saveFileAs does on its daemon thread.
+
+    :param file: The path of the synthetic file.
+    :param pipeline: The loaded PipelineEngine.
+    '''
+    copyFile = file + ".saved"
+
+    try:
+        exporter.exportTable(pipeline.table, copyFile)
+    finally:
+        if os.path.exists(copyFile):
+            os.remove(copyFile)
+
+#The benchmarked operations, in the order they are run.
+OPERATIONS = (parseCSV, loadData, searchTable, editData, generatePieChart, saveFile)
+
+def clearCaches():
+    '''
+    Clears the caches of the column converters, so every round parses its dates as a first load does.
+    '''
+    converters.parseDate.cache_clear()
+    converters.parseDateOrdinal.cache_clear()
+
+def measure(operation, file, pipeline, rounds=ROUNDS):
+    '''
+    Times an operation over several rounds, then runs it once more with tracemalloc tracing its allocations.
+
+    :param operation: A function taking the path of the synthetic file and the loaded PipelineEngine.
+    :param file: The path of the synthetic file.
+    :param pipeline: The PipelineEngine holding the rows of the file.
+    :param rounds: The number of timed rounds.
+    :returns: A dictionary of the minimum, mean and standard deviation of the times in seconds, the number of
+              rounds, and the peak of the traced memory in bytes.
+    '''
+    times = []
+
+    for repeat in range(rounds):
+        clearCaches()
+        start = time.perf_counter()
+        operation(file, pipeline)
+        times.append(time.perf_counter() - start)
+
+    clearCaches()
+    tracemalloc.start()
+
+    try:
+        operation(file, pipeline)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"min": min(times), "mean": statistics.fmean(times), "stddev": statistics.pstdev(times),
+            "rounds": rounds, "peakBytes": peak}
+
+def runBenchmarks(rowCounts, rounds=ROUNDS):
+    '''
+    Runs every operation on a synthetic file of each row count, printing each result as it is measured.
+
+    :param rowCounts: An iterable of the row counts of the synthetic files.
+    :param rounds: The number of timed rounds of each operation.
+    :returns: A dictionary of the result of each operation, keyed by the operation name and row count, such as
+              "loadData[10000]".
+    '''
+    results = {}
+    print(f"{'operation':>26} {'min':>10} {'mean':>10} {'stddev':>10} {'peak memory':>14}")
+
+    for rowCount in rowCounts:
+        file = syntheticFile(rowCount)
+        pipeline = engine.PipelineEngine()
+        pipeline.load(file)
+
+        for operation in OPERATIONS:
+            name = f"{operation.__name__}[{rowCount}]"
+            results[name] = measure(operation, file, pipeline, rounds)
+            result = results[name]
+            print(f"{name:>26} {result['min']:9.4f}s {result['mean']:9.4f}s {result['stddev']:9.4f}s "
+                  f"{result['peakBytes'] / 1024 ** 2:11.1f} MB")
+
+    return results
+
+def compareResults(results, baselines, tolerance=TOLERANCE):
+    '''
+    Compares results to their baselines. An operation regresses when its minimum time or its peak memory exceeds
+    its baseline by more than the tolerance. Operations without a baseline are not compared.
+
+    :param results: A dictionary of results, as returned by runBenchmarks.
+    :param baselines: A dictionary of baseline results, as saved by a previous run.
+    :param tolerance: The fraction by which a result may exceed its baseline.
+    :returns: A list of a message per regression.
+    '''
+    regressions = []
+
+    for name, result in results.items():
+        baseline = baselines.get(name)
+
+        if baseline is None:
+            continue
+
+        for key, unit in (("min", "s"), ("peakBytes", " bytes")):
+            if result[key] > baseline[key] * (1 + tolerance):
+                regressions.append(f"{name} {key}: {result[key]:.4g}{unit} exceeds the baseline of "
+                                   f"{baseline[key]:.4g}{unit} by {result[key] / baseline[key] - 1:.0%}")
+
+    return regressions
+
+def main(argv=None):
+    '''
+    Runs the benchmarks, then saves them as the baselines or compares them to the baselines.
+
+    :param argv: The command line arguments after the program name. Defaults to sys.argv[1:].
+    :returns: The exit status: 1 if a comparison found a regression, otherwise 0.
+    '''
+    argumentParser = argparse.ArgumentParser(description="Benchmark the operations of the program on synthetic files.")
+    argumentParser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS,
+                                help="the row counts of the synthetic files, such as 10000 1000000 10000000")
+    argumentParser.add_argument("--rounds", type=int, default=ROUNDS, help="the number of timed rounds")
+    argumentParser.add_argument("--baseline", default=BASELINE_FILE, help="the JSON file of the baselines")
+    argumentParser.add_argument("--save", action="store_true", help="save the results as the baselines")
+    argumentParser.add_argument("--compare", action="store_true", help="fail if a result regresses from its baseline")
+    argumentParser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                                help="the fraction by which a result may exceed its baseline")
+    arguments = argumentParser.parse_args(argv)
+
+    print(f"Benchmarking {', '.join(map(str, arguments.rows))} rows, {arguments.rounds} rounds, "
+          f"{os.cpu_count()} CPUs")
+    results = runBenchmarks(arguments.rows, arguments.rounds)
+
+    if arguments.compare:
+        with open(arguments.baseline) as baselineFile:
+            regressions = compareResults(results, json.load(baselineFile), arguments.tolerance)
+
+        for message in regressions:
+            print(f"Regression: {message}")
+
+        if regressions:
+            return 1
+        print("No regressions from the baselines.")
+
+    if arguments.save:
+        baselines = {}
+
+        if os.path.exists(arguments.baseline):
+            with open(arguments.baseline) as baselineFile:
+                baselines = json.load(baselineFile)
+
+        baselines.update(results)
+
+        with open(arguments.baseline, "w") as baselineFile:
+            json.dump(baselines, baselineFile, indent=2, sort_keys=True)
+        print(f"Saved the baselines to {arguments.baseline}")
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,45 @@
+#This module holds what the benchmarks share: the project folder, which it adds to the module search path so the
+#benchmarks import the modules of the program, the sample dataset, and synthetic Pipeline Throughput and Capacity Data
+#built by repeating the rows of the sample dataset. Import it before any module of the program.
+#Docstring comments in reST style.
+
+#Author: Dan Blais - 040826486
+#Subject: CST8333
+
+import csv
+import os
+import sys
+import itertools as it
+
+#The project folder holding the modules of the program.
+PROJECT_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+#The sample dataset whose rows are repeated to build the synthetic data.
+SAMPLE_FILE = os.path.join(PROJECT_DIRECTORY, "res", "keystone-throughput-and-capacity.csv")
+
+if PROJECT_DIRECTORY not in sys.path:
+    sys.path.insert(0, PROJECT_DIRECTORY)
+
+def repeatedRows(rowCount):
+    '''
+    Reads the sample dataset and repeats its rows up to the given row count.
+
+    :param rowCount: The number of rows.
+    :returns: A tuple of the header row and an iterator of the rows, each a list of cell texts.
+    '''
+    with open(SAMPLE_FILE, newline='') as sample:
+        header, *sampleRows = csv.reader(sample)
+
+    return header, it.islice(it.cycle(sampleRows), rowCount)
+
+def writeSyntheticFile(synthetic, rowCount):
+    '''
+    Writes a synthetic csv file holding the header and the rows of the sample dataset repeated up to the given row
+    count.
+
+    :param synthetic: The file to write to, opened in text mode with newline=''.
+    :param rowCount: The number of data rows to write.
+    '''
+    header, rows = repeatedRows(rowCount)
+    writer = csv.writer(synthetic)
+    writer.writerow(header)
+    writer.writerows(rows)
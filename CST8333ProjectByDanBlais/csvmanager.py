@@ -0,0 +1,166 @@
+#This module is the command line entry point of the program, for converting, filtering and summarizing Pipeline
+#Throughput and Capacity Data csv files without a window, such as in scheduled jobs on servers without a display.
+#Files with a .pcol or .parquet extension are read and written in that columnar format instead of csv. The input can
+#also be a folder, or a quoted glob pattern such as "data/*.csv", whose csv files are read as one dataset.
+#Files are loaded and processed by PipelineEngine, so tkinter and matplotlib are never imported. Run from the project
+#folder with:
+#    python -m csvmanager convert input.csv output.pcol
+#    python -m csvmanager filter input.csv "Throughput > 50 and Product = condensate" [-o output.csv] [--text]
+#    python -m csvmanager stats input.csv --value Throughput [--group Product] [--where QUERY] [--text]
+#A query which is not a valid filter query fails the command, unless --text searches for it as text instead.
+#Docstring comments in reST style.
+
+#Author: Dan Blais - 040826486
+#Subject: CST8333
+
+import argparse
+import csv
+import math
+import sys
+import Aggregation as aggregation
+import CSVExporter as exporter
+import PipelineEngine as engine
+import PipelineTable as columnar
+
+#The help text of the input argument of every command.
+INPUT_HELP = "the csv or columnar file to read, or a folder or glob pattern of csv files read as one dataset"
+#The help text of the --text option of the filter and stats commands.
+TEXT_HELP = "search for the query as text contained in a cell, instead of evaluating it as a filter query"
+#The statistics printed by the stats command, in column order.
+STAT_COLUMNS = ("count", "sum", "mean", "min", "max")
+
+def buildArgumentParser():
+    '''
+    Builds the parser of the command line arguments.
+
+    :returns: An argparse.ArgumentParser with a sub-command per operation.
+    '''
+    argumentParser = argparse.ArgumentParser(prog="csvmanager", description="Convert, filter and summarize Pipeline "
+                                             "Throughput and Capacity Data csv files.")
+    commands = argumentParser.add_subparsers(dest="command", required=True)
+
+    convertCommand = commands.add_parser("convert", help="load a file and save its rows to another file, such as "
+                                         "a csv file to a columnar .pcol file")
+    convertCommand.add_argument("input", help=INPUT_HELP)
+    convertCommand.add_argument("output", help="the file to write, whose extension gives its format")
+
+    filterCommand = commands.add_parser("filter", help="save the rows matching a filter query or search text")
+    filterCommand.add_argument("input", help=INPUT_HELP)
+    filterCommand.add_argument("query", help='a filter query such as "Throughput > 50", or a text to search for '
+                               'with --text')
+    filterCommand.add_argument("-o", "--output", help="the file to write, instead of printing the rows")
+    filterCommand.add_argument("--text", action="store_true", help=TEXT_HELP)
+
+    statsCommand = commands.add_parser("stats", help="summarize a numeric column, optionally per group")
+    statsCommand.add_argument("input", help=INPUT_HELP)
+    statsCommand.add_argument("--value", required=True, help="the numeric column to summarize, such as Throughput")
+    statsCommand.add_argument("--group", help="the column to group the rows by, such as Product")
+    statsCommand.add_argument("--where", help="a filter query selecting the rows to summarize, or a search text "
+                              "with --text")
+    statsCommand.add_argument("--text", action="store_true", help=TEXT_HELP)
+    return argumentParser
+
+def loadEngine(file):
+    '''
+    Loads a csv file, or a folder or glob pattern of csv files, into a PipelineEngine, parsing large files with worker
+    processes.
+
+    :param file: A string representing the path of the file, or a folder or glob pattern of csv files.
+    :returns: The PipelineEngine holding the rows of the file.
+    :raises OSError: If the file cannot be read, or a folder or glob pattern names no csv files.
+    '''
+    pipeline = engine.PipelineEngine()
+    pipeline.load(file)
+    return pipeline
+
+def searchMode(arguments):
+    '''
+    Gets how the query of the filter or stats command is searched, as given to PipelineEngine.matchingRows.
+
+    :param arguments: The parsed command line arguments.
+    :returns: "text" with the --text option, or else "query".
+    '''
+    return "text" if arguments.text else "query"
+
+def convert(arguments):
+    '''
+    Runs the convert command, saving the rows of the input file to the output file.
+
+    :param arguments: The parsed command line arguments.
+    '''
+    pipeline = loadEngine(arguments.input)
+    pipeline.export(arguments.output)
+    print(f"Wrote {len(pipeline.table)} rows to {arguments.output}", file=sys.stderr)
+
+def filterRows(arguments):
+    '''
+    Runs the filter command, saving the rows of the input file matching the query to the output file, or printing
+    them as csv when no output file is given.
+
+    :param arguments: The parsed command line arguments.
+    :raises ValueError: If the query is not a valid filter query, without the --text option.
+    '''
+    matches = loadEngine(arguments.input).filtered(arguments.query, searchMode(arguments))
+
+    if arguments.output:
+        matches.export(arguments.output)
+        print(f"Wrote {len(matches.table)} rows to {arguments.output}", file=sys.stderr)
+        return
+
+    writer = csv.writer(sys.stdout, lineterminator="\n")
+    writer.writerow(exporter.HEADERS)
+
+    for batch in exporter.rowBatches(matches.table):
+        writer.writerows(batch)
+
+def printStats(arguments):
+    '''
+    Runs the stats command, printing the count, sum, mean, minimum and maximum of the numeric column as csv, over
+    every selected row or per group.
+
+    :param arguments: The parsed command line arguments.
+    :raises ValueError: If the value column is not numeric, or the where query is not a valid filter query without
+                        the --text option.
+    '''
+    valueColumn = engine.columnIndex(arguments.value)
+
+    if columnar.COLUMN_KINDS[valueColumn] not in ("int", "float"):
+        raise ValueError(f"{arguments.value} is not a numeric column")
+
+    pipeline = loadEngine(arguments.input)
+
+    if arguments.where:
+        pipeline = pipeline.filtered(arguments.where, searchMode(arguments))
+
+    if arguments.group:
+        summaries = pipeline.aggregate(arguments.group, valueColumn)
+    else:
+        values = aggregation.numericValues(pipeline.table, valueColumn, 0, len(pipeline.table))
+        summaries = [aggregation.GroupSummary("all rows", [value for value in values if not math.isnan(value)])]
+
+    writer = csv.writer(sys.stdout, lineterminator="\n")
+    writer.writerow((arguments.group or "rows",) + STAT_COLUMNS)
+
+    for summary in summaries:
+        writer.writerow([summary.label] + ["" if summary.statistic(name) is None else summary.statistic(name)
+                                           for name in STAT_COLUMNS])
+
+def main(argv=None):
+    '''
+    Runs the command given on the command line.
+
+    :param argv: The command line arguments after the program name. Defaults to sys.argv[1:].
+    :returns: The exit status: 0 on success, or 1 if the command failed.
+    '''
+    arguments = buildArgumentParser().parse_args(argv)
+    commands = {"convert": convert, "filter": filterRows, "stats": printStats}
+
+    try:
+        commands[arguments.command](arguments)
+    except (OSError, KeyError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
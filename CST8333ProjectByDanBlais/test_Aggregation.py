@@ -0,0 +1,98 @@
+#This is a pyTest test class.
+
+#Author: Dan Blais - 040826486
+#Subject: CST8333
+
+import pytest
+import PipelineTable as columnar
+import Aggregation as aggregation
+import CSVExporter as exporter
+import LazyPipelineTable as lazy
+
+ROW = ['2010-07-01', '7', '2010', 'TransCanada Keystone Pipeline GP Ltd.', 'Keystone pipeline',
+       'International boundary at or near Haskett, Manitoba', '48.9989', '-97.9577', 'south', 'export', 'domestic heavy',
+       '15.07', '', '', '', '18.11', 'NEB/REGULATORY DIRECTIVE']
+
+PRODUCT = columnar.COLUMN_NAMES.index('product')
+THROUGHPUT = columnar.COLUMN_NAMES.index('throughput')
+
+@pytest.fixture
+def table():
+    '''
+    Sets up a PipelineTable of 12 rows cycling through three products, with a throughput equal to the row index
+    except for every fourth row, whose throughput is empty.
+    '''
+    rows = []
+
+    for index in range(12):
+        row = list(ROW)
+        row[0] = f'2010-0{1 + index % 2}-01'
+        row[10] = ('domestic heavy', 'domestic light', 'condensate')[index % 3]
+        row[11] = '' if index % 4 == 0 else str(index)
+        rows.append(row)
+
+    table = columnar.PipelineTable()
+    table.extendRows(rows, 0)
+    return table
+
+def summarize(summaries):
+    '''
+    Turns summaries into plain values for comparison.
+
+    :param summaries: A list of GroupSummary objects.
+    :returns: A dictionary of the count, sum, mean, min and max of each group by label.
+    '''
+    return {summary.label: tuple(summary.statistic(name) for name in ("count", "sum", "mean", "min", "max"))
+            for summary in summaries}
+
+def testAggregateSkipsEmptyValuesAndHonoursRowRange(table):
+    '''
+    Tests that each group gets the count, sum, mean, min and max of its numeric values, that empty values are not
+    counted, and that only the rows of the given range are grouped, a group without numeric values having no mean.
+    '''
+    assert summarize(aggregation.aggregate(table, PRODUCT, THROUGHPUT)) == {
+        'domestic heavy': (3, 18.0, 6.0, 3.0, 9.0),
+        'domestic light': (3, 18.0, 6.0, 1.0, 10.0),
+        'condensate': (3, 18.0, 6.0, 2.0, 11.0)}
+
+    assert summarize(aggregation.aggregate(table, PRODUCT, THROUGHPUT, 3, 6)) == {
+        'domestic heavy': (1, 3.0, 3.0, 3.0, 3.0),
+        'domestic light': (0, 0.0, None, None, None),
+        'condensate': (1, 5.0, 5.0, 5.0, 5.0)}
+
+def testAggregateMatchesWithManyGroups(table, monkeypatch):
+    '''
+    Tests that grouping by sorting the rows, used when there are many groups, gives the same summaries as picking
+    out the rows of each group, including when grouping by a date column.
+    '''
+    masked = summarize(aggregation.aggregate(table, 0, THROUGHPUT))
+    monkeypatch.setattr(aggregation, "MASK_GROUP_LIMIT", 0)
+
+    assert summarize(aggregation.aggregate(table, 0, THROUGHPUT)) == masked
+    assert summarize(aggregation.aggregate(table, PRODUCT, THROUGHPUT))['condensate'] == (3, 18.0, 6.0, 2.0, 11.0)
+    assert [str(label) for label in masked] == ['2010-01-01', '2010-02-01']
+
+def testLazyTablesAreSummedAsTheyAreRead(table, tmp_path, monkeypatch):
+    '''
+    Tests that the rows of a LazyPipelineTable are summed into the same summaries as those of a PipelineTable holding
+    the same rows, and that they are copied to a PipelineTable in batches with their positions as row ids.
+    '''
+    file = str(tmp_path / "pipeline.csv")
+    exporter.exportTable(table, file)
+    lazyTable = lazy.LazyPipelineTable(file)
+    list(lazyTable.indexRecords())
+
+    for groupColumn, valueColumn in ((PRODUCT, THROUGHPUT), (0, THROUGHPUT), (PRODUCT, 0), (PRODUCT, PRODUCT)):
+        assert summarize(aggregation.aggregate(lazyTable, groupColumn, valueColumn, 2, 11)) == \
+            summarize(aggregation.aggregate(table, groupColumn, valueColumn, 2, 11))
+
+    monkeypatch.setattr(aggregation, "COPY_BATCH_SIZE", 5)
+    copy = aggregation.copyRows(lazyTable, 1, 12)
+
+    assert [copy.rowValues(position) for position in range(11)] == \
+        [table.rowValues(position) for position in range(1, 12)]
+    assert list(copy.rowIds) == list(range(1, 12))
+    lazyTable.close()
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,116 @@
+#This is a pyTest test class.
+
+#Author: Dan Blais - 040826486
+#Subject: CST8333
+
+import pytest
+import csv
+import os
+import CSVExporter as exporter
+import PipelineTable as columnar
+import LazyPipelineTable as lazy
+
+ROW = ['2010-07-01', '7', '2010', 'TransCanada Keystone Pipeline GP Ltd.', 'Keystone pipeline',
+       'International boundary at or near Haskett, Manitoba', '48.9989', '-97.9577', 'south', 'export', 'domestic heavy',
+       '15.07', '', '', '', '18.11', 'NEB/REGULATORY DIRECTIVE']
+
+def readRows(file):
+    '''
+    Reads a saved csv file.
+
+    :param file: The path of the csv file.
+    :returns: A list of the rows of the file after the header, as lists of cell texts.
+    '''
+    with open(file, newline='') as dataset:
+        rows = list(csv.reader(dataset))
+
+    assert rows[0] == list(exporter.HEADERS)
+    return rows[1:]
+
+def testExportWritesRowsInBatches(tmp_path, monkeypatch):
+    '''
+    Tests that a table spanning several batches is saved with every row in order, that progress is reported after
+    each batch, and that no temporary file is left behind.
+    '''
+    monkeypatch.setattr(exporter, "EXPORT_BATCH_SIZE", 4)
+    rows = [list(ROW) for index in range(10)]
+
+    for index, row in enumerate(rows):
+        row[10] = f'product {index}'
+
+    table = columnar.PipelineTable()
+    table.extendRows(rows, 0)
+    file = str(tmp_path / "saved.csv")
+    progress = []
+    exporter.exportTable(table, file, progress.append)
+
+    assert readRows(file) == rows
+    assert progress == [0.4, 0.8, 1.0]
+    assert os.listdir(tmp_path) == ["saved.csv"]
+
+def testFailedExportKeepsOriginalFile(tmp_path):
+    '''
+    Tests that a save which fails part way through leaves the original file unchanged and removes the temporary
+    file, that each save gets its own temporary file with the permissions of the original file, and that a
+    LazyPipelineTable can be saved over the file it reads once its copy is written.
+    '''
+    file = tmp_path / "pipeline.csv"
+
+    with open(file, "w", newline='') as dataset:
+        csv.writer(dataset).writerows([exporter.HEADERS, ROW, ROW])
+
+    original = file.read_text()
+    table = lazy.LazyPipelineTable(str(file))
+    list(table.indexRecords())
+
+    def failingProgress(fraction):
+        raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        exporter.exportTable(table, str(file), failingProgress)
+
+    assert file.read_text() == original
+    assert os.listdir(tmp_path) == ["pipeline.csv"]
+
+    os.chmod(file, 0o640)
+    temporaryPath = exporter.writeTemporaryFile(table.copy(), str(file))
+    otherPath = exporter.writeTemporaryFile(table.copy(), str(file))
+
+    assert temporaryPath != otherPath
+    assert os.stat(temporaryPath).st_mode == os.stat(otherPath).st_mode == os.stat(file).st_mode
+
+    os.remove(otherPath)
+    table.close()
+    os.replace(temporaryPath, file)
+    assert readRows(str(file)) == [ROW, ROW]
+
+def testSplicedSaveCopiesUnchangedRecords(tmp_path):
+    '''
+    Tests that saving a table over the file it was read from copies the unchanged records byte for byte, writes
+    only the edited and inserted rows again, drops the deleted rows, and splits the rows into the expected runs.
+    '''
+    file = tmp_path / "pipeline.csv"
+    lines = ["header"] + [",".join(ROW).replace("Haskett, Manitoba", f"Key Point {index}").replace("15.07", "15.070")
+                          for index in range(6)]
+    file.write_bytes(("\r\n".join(lines) + "\r\n").encode())
+    table = columnar.PipelineTable()
+    table.extendRows(list(csv.reader(lines[1:])), 0)
+    table.trackSource()
+
+    table.setValue(1, columnar.COLUMN_NAMES.index('product'), 'condensate')
+    table.insert(4, table[0], 10)
+    table.pop(3)
+
+    assert table.sourceRecords().tolist() == [0, -1, 2, -1, 4, 5]
+    assert list(exporter.recordRuns(table.sourceRecords())) == [(0, 1, 0), (1, 2, -1), (2, 3, 2), (3, 4, -1), (4, 6, 4)]
+
+    os.replace(exporter.writeSplicedFile(table, str(file), 6), file)
+    saved = file.read_bytes().decode().split("\r\n")
+
+    assert saved[:2] == lines[:2] and saved[3] == lines[3] and saved[5:7] == lines[5:7]
+    assert saved[2].endswith("condensate,15.07,,,,18.11,NEB/REGULATORY DIRECTIVE")
+    assert saved[4].split(",")[5].endswith("Key Point 0")
+    assert saved[7:] == [""]
+
+if __name__ == '__main__':
+    pytest.main()
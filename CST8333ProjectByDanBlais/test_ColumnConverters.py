@@ -0,0 +1,66 @@
+#This is a pyTest test class.
+
+#Author: Dan Blais - 040826486
+#Subject: CST8333
+
+import pytest
+import math
+from datetime import date
+import ColumnConverters as converters
+import PipelineTable as columnar
+
+ROW = ['2010-07-01', '7', '2010', 'TransCanada Keystone Pipeline GP Ltd.', 'Keystone pipeline',
+       'International boundary at or near Haskett, Manitoba', '48.9989', '-97.9577', 'south', 'export', 'domestic heavy',
+       '15.07', '', '', '', '18.11', 'NEB/REGULATORY DIRECTIVE']
+
+def testConvertersMatchRowByRowParsing():
+    '''
+    Tests that the converters parse cells as parseCSV did row by row, including dates without leading zeros and
+    empty cells, that the bulk encoders store empty cells as the empty markers of their columns, and that dates in
+    other formats and whole numbers which cannot be stored are rejected.
+    '''
+    assert converters.convertRow(ROW) == (date(2010, 7, 1), 7, 2010, 'TransCanada Keystone Pipeline GP Ltd.',
+                                          'Keystone pipeline', 'International boundary at or near Haskett, Manitoba',
+                                          48.9989, -97.9577, 'south', 'export', 'domestic heavy', 15.07, "", "", "",
+                                          18.11, 'NEB/REGULATORY DIRECTIVE')
+    assert converters.parseDate('2010-7-1') == date(2010, 7, 1)
+    assert converters.encodeDates(('2010-07-01', '')).tolist() == [date(2010, 7, 1).toordinal(), 0]
+    assert converters.encodeInts(('7', '')).tolist() == [7, converters.EMPTY_INT]
+    assert converters.encodeInts(('7', '2010')).tolist() == [7, 2010]
+    assert math.isnan(converters.encodeFloats(('', '1.5'))[0])
+    assert converters.KIND_ENCODERS["float"](('15.07', '18.11')).tolist() == [15.07, 18.11]
+
+    for text in ('2010-13-01', '2010-W27-4', '20100701ab'):
+        with pytest.raises(ValueError):
+            converters.parseDateOrdinal(text)
+
+    for texts in (('7', '99999999999'), ('', '99999999999'), ('7', '-2147483648')):
+        with pytest.raises(ValueError):
+            converters.encodeInts(texts)
+
+def testExtendRowsSkipsBadRows():
+    '''
+    Tests that a batch of rows is stored with the same values as rows appended one at a time, and that a batch
+    holding an invalid or short row, or a whole number too large to store, keeps its valid rows and skips the
+    others.
+    '''
+    table = columnar.PipelineTable()
+    assert table.extendRows([ROW, ROW], 5) == 2
+    assert table.rowValues(1) == converters.convertRow(ROW)
+    assert table.rowIds.tolist() == [5, 6]
+
+    badDate = ['July 2010'] + ROW[1:]
+    assert table.extendRows([badDate, ROW, ROW[:5]], 7) == 1
+    assert table.rowIds.tolist() == [5, 6, 7]
+    assert table.categoryValues(columnar.COLUMN_NAMES.index("product")) == ['domestic heavy']
+
+    largeMonth = ROW[:1] + ['99999999999'] + ROW[2:]
+    assert table.extendRows([ROW, largeMonth], 8) == 1
+    assert table.rowIds.tolist() == [5, 6, 7, 8]
+
+    with pytest.raises(ValueError):
+        table.setValue(0, columnar.COLUMN_NAMES.index("month"), 99999999999)
+    assert table.getValue(0, columnar.COLUMN_NAMES.index("month")) == 7
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,106 @@
+#This is a pyTest test class.
+
+#Author: Dan Blais - 040826486
+#Subject: CST8333
+
+import pytest
+import PipelineTable as columnar
+import ColumnHashIndex as hashing
+import KeystonePipelineData as model
+
+ROW = ['2010-07-01', '7', '2010', 'TransCanada Keystone Pipeline GP Ltd.', 'Keystone pipeline',
+       'International boundary at or near Haskett, Manitoba', '48.9989', '-97.9577', 'south', 'export', 'domestic heavy',
+       '15.07', '', '', '', '18.11', 'NEB/REGULATORY DIRECTIVE']
+
+@pytest.fixture
+def table():
+    '''
+    Sets up a PipelineTable of 30 rows whose products, throughputs and dates vary from row to row.
+    '''
+    rows = []
+
+    for index in range(30):
+        row = list(ROW)
+        row[0] = f'2010-0{1 + index % 3}-01'
+        row[10] = ('domestic heavy', 'domestic light', 'condensate')[index % 3]
+        row[11] = str(index / 2)
+        rows.append(row)
+
+    table = columnar.PipelineTable()
+    table.extendRows(rows, 0)
+    return table
+
+def testColumnLookupsFindEqualRows(table):
+    '''
+    Tests that the hash index of a column finds the rows equal to a value in ascending order, matching categories
+    ignoring case, and finds no rows for values which do not occur or cannot be stored in the column.
+    '''
+    product = hashing.ColumnHashIndex(table, columnar.COLUMN_NAMES.index('product'))
+    dates = hashing.ColumnHashIndex(table, columnar.COLUMN_NAMES.index('date'))
+    throughput = hashing.ColumnHashIndex(table, columnar.COLUMN_NAMES.index('throughput'))
+
+    assert list(product.positions('Domestic Light')) == list(range(1, 30, 3))
+    assert list(dates.positions('2010-03-01')) == list(range(2, 30, 3))
+    assert list(throughput.positions('4.5')) == [9]
+    assert list(throughput.positions('')) == []
+    assert list(dates.positions('condensate')) == []
+
+    table.setValue(4, columnar.COLUMN_NAMES.index('product'), 'CONDENSATE')
+    assert 4 in product.positions('condensate')
+    assert 4 not in product.positions('domestic light')
+
+    reason = hashing.ColumnHashIndex(table, columnar.COLUMN_NAMES.index('reasonForVariance'))
+    assert list(reason.positions('keystone')) == [] and reason._groups is None
+
+def testIndexesFollowEditsWithoutRebuilding(table, monkeypatch):
+    '''
+    Tests that edits, inserts, removals and appends made after a column is indexed are replayed into the index,
+    which finds the same rows as an index built afterwards, and that the index is only built once.
+    '''
+    productColumn = columnar.COLUMN_NAMES.index('product')
+    product = hashing.ColumnHashIndex(table, productColumn)
+    builds = []
+    build = hashing.ColumnHashIndex.build
+    monkeypatch.setattr(hashing.ColumnHashIndex, "build", lambda index: builds.append(index) or build(index))
+    product.positions('condensate')
+
+    table.setValue(2, productColumn, 'Domestic Heavy')
+    table.insertRows([0, 5, 6], [ROW, ROW, ROW], [30, 31, 32])
+    table.setValue(7, columnar.COLUMN_NAMES.index('throughput'), '1.5')
+    table.deleteRows([1, 8, 20])
+    table.insert(3, model.PipelineData(*ROW), 33)
+    table.pop(10)
+    table.appendRow(ROW, 34)
+
+    for value in ('condensate', 'domestic heavy', 'domestic light'):
+        assert list(product.positions(value)) == \
+            [position for position in range(len(table)) if table.getValue(position, productColumn).lower() == value]
+    assert builds == [product]
+
+def testRowIdPositionsFollowInsertsAndRemovals(table):
+    '''
+    Tests that rows are found by row id after rows are appended, inserted and removed, and that the row positions
+    are updated instead of being built again.
+    '''
+    assert table.positionOf(12) == 12
+    table.appendRow(ROW, 40)
+    assert table.positionOf(40) == 30
+
+    table.insert(0, model.PipelineData(*ROW), 50)
+    table.pop(6)
+
+    assert table.positionOf(50) == 0
+    assert table.positionOf(12) == 12
+    assert table.positionOf(5) is None
+    assert table.positionOf(40) == 30
+
+    positions = table._positions
+    table.insertRows([2, 3], [ROW, ROW], [60, 61])
+    table.deleteRows([0, 10])
+
+    assert table._positions is positions
+    assert table.positionOf(50) is None and table.positionOf(8) is None
+    assert [table.positionOf(rowId) for rowId in table.rowIds] == list(range(len(table)))
+
+if __name__ == '__main__':
+    pytest.main()
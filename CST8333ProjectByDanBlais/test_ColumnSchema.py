@@ -0,0 +1,51 @@
+#This is a pyTest test class.
+
+#Author: Dan Blais - 040826486
+#Subject: CST8333
+
+import pytest
+from datetime import date
+import ColumnSchema as schema
+import ColumnConverters as converters
+import CSVExporter as exporter
+import KeystonePipelineData as model
+import PipelineTable as columnar
+
+ROW = ['2010-07-01', '7', '2010', 'TransCanada Keystone Pipeline GP Ltd.', 'Keystone pipeline',
+       'International boundary at or near Haskett, Manitoba', '48.9989', '-97.9577', 'south', 'export', 'domestic heavy',
+       '15.07', '', '', '', '18.11', 'NEB/REGULATORY DIRECTIVE']
+
+def testColumnsDriveTablesAndExport():
+    '''
+    Tests that the column names, storage kinds and csv headers of the tables and the exporter are taken from the
+    schema in CSV column order, and that every column names an attribute of PipelineData.
+    '''
+    assert [column.index for column in schema.COLUMNS] == list(range(len(ROW)))
+    assert columnar.COLUMN_NAMES == tuple(column.name for column in schema.COLUMNS)
+    assert exporter.HEADERS == tuple(column.header for column in schema.COLUMNS)
+    assert columnar.COLUMN_KINDS[schema.columnNamed('product').index] == "category"
+    assert columnar.COLUMN_KINDS[schema.columnNamed('throughput').index] == "float"
+
+    data = model.PipelineData.fromRow(ROW)
+
+    for column in schema.COLUMNS:
+        assert getattr(data, column.name) == column.convert(ROW[column.index])
+
+def testColumnsConvertCells():
+    '''
+    Tests that each column converts its cells to its kind of value, that unknown names are rejected, and that a
+    cell which does not fit its column raises ValueError.
+    '''
+    assert schema.columnNamed('date').convert('2010-07-01') == date(2010, 7, 1)
+    assert schema.columnNamed('month').kind == "int"
+    assert schema.columnNamed('latitude').convert('') == ""
+    assert schema.columnNamed('keyPoint').converter is converters.parseText
+
+    with pytest.raises(KeyError):
+        schema.columnNamed('Key Point')
+
+    with pytest.raises(ValueError):
+        schema.columnNamed('year').convert('twenty ten')
+
+if __name__ == '__main__':
+    pytest.main()
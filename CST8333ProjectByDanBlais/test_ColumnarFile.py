@@ -0,0 +1,86 @@
+#This is a pyTest test class.
+
+#Author: Dan Blais - 040826486
+#Subject: CST8333
+
+import os
+import pytest
+import PipelineTable as columnar
+import PipelineEngine as engine
+import CSVExporter as exporter
+import ColumnarFile as columnFile
+
+ROW = ['2010-07-01', '7', '2010', 'TransCanada Keystone Pipeline GP Ltd.', 'Keystone pipeline',
+       'International boundary at or near Haskett, Manitoba', '48.9989', '-97.9577', 'south', 'export', 'domestic heavy',
+       '15.07', '', '', '', '18.11', 'NEB/REGULATORY DIRECTIVE']
+
+@pytest.fixture
+def table():
+    '''
+    Sets up a PipelineTable of 300 rows with varying dates, months, products and throughputs, and empty date, month,
+    product and throughput cells.
+    '''
+    rows = []
+
+    for index in range(300):
+        row = list(ROW)
+        row[0] = '' if index % 50 == 0 else f'{2010 + index % 12}-0{1 + index % 9}-1{index % 10}'
+        row[1] = '' if index % 40 == 0 else str(1 + index % 12)
+        row[10] = ('domestic heavy', 'condensate', '')[index % 3]
+        row[11] = '' if index % 7 == 0 else str(index * 1.25)
+        rows.append(row)
+
+    table = columnar.PipelineTable()
+    table.extendRows(rows, 0)
+    return table
+
+def testNativeFilesRoundTripThroughEngine(table, tmp_path, monkeypatch):
+    '''
+    Tests that a table saved to a .pcol file over several compressed blocks is loaded back by the engine with the
+    same values, including empty cells, with row ids from 0, and that the file is smaller than the csv file.
+    '''
+    monkeypatch.setattr(columnFile, "BLOCK_BYTES", 256)
+    nativeFile = str(tmp_path / "pipeline.pcol")
+    csvFile = str(tmp_path / "pipeline.csv")
+    engine.PipelineEngine(table).export(nativeFile)
+    exporter.exportTable(table, csvFile)
+    loaded = engine.PipelineEngine()
+
+    assert loaded.load(nativeFile) == 300
+    assert [loaded.table.rowValues(position) for position in range(300)] == \
+        [table.rowValues(position) for position in range(300)]
+    assert list(loaded.table.rowIds) == list(range(300))
+    assert os.path.getsize(nativeFile) < os.path.getsize(csvFile)
+    assert sorted(os.listdir(tmp_path)) == ["pipeline.csv", "pipeline.pcol"]
+
+def testInvalidFilesAreRejected(table, tmp_path):
+    '''
+    Tests that files which are not native files, truncated native files and, without pyarrow, Parquet files raise
+    ValueError, and that a failed Parquet save leaves no temporary file behind.
+    '''
+    nativeFile = str(tmp_path / "pipeline.pcol")
+    columnFile.exportTable(table, nativeFile)
+
+    with open(nativeFile, "rb") as saved:
+        data = saved.read()
+
+    for content in (b"Date,Month\n", data[:len(data) // 2], data[:-8] + b"PIPECOLX"):
+        with open(nativeFile, "wb") as damaged:
+            damaged.write(content)
+
+        with pytest.raises(ValueError):
+            columnFile.readTable(nativeFile)
+
+    parquetFile = str(tmp_path / "pipeline.parquet")
+
+    if columnFile.PARQUET_AVAILABLE:
+        columnFile.exportTable(table, parquetFile)
+        assert [columnFile.readTable(parquetFile).rowValues(position) for position in range(300)] == \
+            [table.rowValues(position) for position in range(300)]
+    else:
+        with pytest.raises(ValueError):
+            columnFile.exportTable(table, parquetFile)
+        assert os.listdir(tmp_path) == ["pipeline.pcol"]
+
+if __name__ == '__main__':
+    pytest.main()
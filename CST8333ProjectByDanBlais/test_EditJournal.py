@@ -0,0 +1,68 @@
+#This is a pyTest test class.
+
+#Author: Dan Blais - 040826486
+#Subject: CST8333
+
+import pytest
+import EditJournal as journaling
+
+SOURCE = [1024, 1700000000000000000]
+
+def testJournalRecordsUndoAndRedo(tmp_path):
+    '''
+    Tests that recorded edits, undos and redos are written to the journal file in order, that undoing returns the
+    reversing edit, that the next undo and redo are only recorded once undo and redo are called, and that the
+    journal is read back for a file in the same state.
+    '''
+    file = str(tmp_path / "pipeline.csv")
+    journal = journaling.EditJournal(file, SOURCE)
+    edit = {"op": "set", "position": 3, "column": 10, "old": "condensate", "new": "domestic heavy"}
+    insert = {"op": "insert", "positions": [5, 9], "rowIds": [40, 41], "values": [[""] * 17, [""] * 17]}
+
+    journal.record(edit)
+    journal.record(insert)
+
+    assert journal.nextRedo() is None
+    assert journal.nextUndo() == journal.nextUndo() == dict(insert, op="delete")
+    assert journal.undo() == dict(insert, op="delete")
+    assert journal.nextRedo() == insert
+    assert journal.redo() == insert
+    assert journal.undo() == dict(insert, op="delete")
+    assert journal.undo() == dict(edit, old="domestic heavy", new="condensate")
+    assert journal.undo() is None
+    journal.close()
+
+    edits = journaling.readJournal(file, SOURCE)
+
+    assert len(edits) == 6
+    assert edits[:3] == [edit, insert, dict(insert, op="delete")]
+    assert edits[-1] == dict(edit, old="domestic heavy", new="condensate")
+
+def testStaleOrTruncatedJournal(tmp_path):
+    '''
+    Tests that a line cut short by a crash ends the edits read back, that a journal left for another state of the
+    file is removed, and that discarding saved edits keeps the edits made after the checkpoint.
+    '''
+    file = str(tmp_path / "pipeline.csv")
+    journal = journaling.EditJournal(file, SOURCE)
+    journal.record({"op": "delete", "positions": [0], "rowIds": [0], "values": [[""] * 17]})
+    journal.close()
+
+    with open(journal.path, "a", encoding="utf-8") as journalFile:
+        journalFile.write('{"op": "set", "posi')
+
+    assert len(journaling.readJournal(file, SOURCE)) == 1
+    assert journaling.readJournal(file, [2048, SOURCE[1]]) == []
+    assert not (tmp_path / "pipeline.csv.journal").exists()
+
+    journal = journaling.EditJournal(file, SOURCE)
+    journal.record({"op": "delete", "positions": [0], "rowIds": [0], "values": [[""] * 17]})
+    checkpoint = journal.checkpoint()
+    journal.record({"op": "delete", "positions": [1], "rowIds": [2], "values": [[""] * 17]})
+    journal.discard([2048, SOURCE[1]], checkpoint)
+    journal.close()
+
+    assert journaling.readJournal(file, [2048, SOURCE[1]]) == [{"op": "delete", "positions": [1], "rowIds": [2], "values": [[""] * 17]}]
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,123 @@
+#This is a pyTest test class.
+
+#Author: Dan Blais - 040826486
+#Subject: CST8333
+
+import pytest
+import PipelineTable as columnar
+import LazyPipelineTable as lazy
+import CSVExporter as exporter
+import SortIndex as sorting
+import FilterQuery as filtering
+
+ROW = ['2010-07-01', '7', '2010', 'TransCanada Keystone Pipeline GP Ltd.', 'Keystone pipeline',
+       'International boundary at or near Haskett, Manitoba', '48.9989', '-97.9577', 'south', 'export', 'domestic heavy',
+       '15.07', '', '', '', '18.11', 'NEB/REGULATORY DIRECTIVE']
+
+@pytest.fixture
+def table():
+    '''
+    Sets up a PipelineTable of 40 rows whose dates, products and throughputs vary from row to row, with an empty
+    throughput every tenth row.
+    '''
+    rows = []
+
+    for index in range(40):
+        row = list(ROW)
+        row[0] = f'{2010 + index // 4}-0{1 + index % 4}-01'
+        row[10] = ('domestic heavy', 'Domestic Light', 'condensate', '')[index % 4]
+        row[11] = '' if index % 10 == 0 else str(index * 2.5)
+        rows.append(row)
+
+    table = columnar.PipelineTable()
+    table.extendRows(rows, 0)
+    return table
+
+def expectedRows(table, test):
+    '''
+    Finds the rows of a table matching a test of their values, row by row.
+
+    :param table: The PipelineTable.
+    :param test: A function taking a tuple of the values of a row and returning whether it matches.
+    :returns: A set of the indexes of the matching rows.
+    '''
+    return {position for position in range(len(table)) if test(table.rowValues(position))}
+
+def testQueriesMatchRowByRowEvaluation(table):
+    '''
+    Tests that typed comparisons, between, contains, and, or, not and parentheses match the same rows as testing
+    the values of each row, that empty cells only match empty values, and that a sub-range of rows is filtered.
+    '''
+    throughput = columnar.COLUMN_NAMES.index('throughput')
+    product = columnar.COLUMN_NAMES.index('product')
+    dates = columnar.COLUMN_NAMES.index('date')
+    query = 'Throughput > 50 and Product = "domestic heavy" or Date between 2015-01-01 and 2016-12-31'
+
+    assert filtering.matchingRows(filtering.parseQuery(query), table, 0, 40) == expectedRows(table, lambda values:
+        values[throughput] != '' and values[throughput] > 50 and values[product] == 'domestic heavy'
+        or values[dates] != '' and 2015 <= values[dates].year <= 2016)
+    assert filtering.matchingRows(filtering.parseQuery('throughput <= 20'), table, 0, 40) == expectedRows(table,
+        lambda values: values[throughput] != '' and values[throughput] <= 20)
+    assert filtering.matchingRows(filtering.parseQuery('product != domestic light and not (month = 1)'), table, 0, 40) == \
+        expectedRows(table, lambda values: values[product] not in ('', 'Domestic Light') and values[1] != 1)
+    assert filtering.matchingRows(filtering.parseQuery("Throughput = ''"), table, 0, 40) == {0, 10, 20, 30}
+    assert filtering.matchingRows(filtering.parseQuery('product contains LIGHT'), table, 10, 20) == {13, 17}
+    assert filtering.matchingRows(filtering.parseQuery('date < 2011-01-01'), table, 0, 40) == {0, 1, 2, 3}
+
+def testRangesUseComputedSortOrder(table):
+    '''
+    Tests that a range predicate is answered from the ascending order of its column once the table is sorted by
+    it, matching the rows found by scanning the column.
+    '''
+    index = sorting.SortIndex(table)
+    throughput = columnar.COLUMN_NAMES.index('throughput')
+    expression = filtering.parseQuery('throughput between 10 and 12.5 or throughput > 95')
+    scanned = filtering.matchingRows(expression, table, 0, 40, index)
+
+    assert index.rangePositions(throughput, 10.0, 12.5) is None
+    index.order(throughput)
+
+    assert list(index.rangePositions(throughput, 10.0, 12.5)) == [4, 5]
+    assert list(index.rangePositions(throughput, 95.0, None, lowInclusive=False)) == [39]
+    assert filtering.matchingRows(expression, table, 0, 40, index) == scanned == {4, 5, 39}
+
+def testLazyTablesAreTestedRowByRow(table, tmp_path):
+    '''
+    Tests that the queries evaluated on the values of each row of a LazyPipelineTable match the same rows as the
+    queries evaluated column by column on the PipelineTable the file was saved from.
+    '''
+    exporter.exportTable(table, str(tmp_path / "pipeline.csv"))
+    lazyTable = lazy.LazyPipelineTable(str(tmp_path / "pipeline.csv"))
+    list(lazyTable.indexRecords())
+
+    for query in ('Throughput > 50 and Product = "domestic heavy" or Date between 2015-01-01 and 2016-12-31',
+                  'throughput <= 20', 'product != domestic light and not (month = 1)', "Throughput = ''",
+                  "product != ''", 'product contains LIGHT', 'product between condensate and domestic heavy',
+                  'date < 2011-01-01', 'throughput contains 5'):
+        expression = filtering.parseQuery(query)
+        assert filtering.matchingRows(expression, lazyTable, 0, 40) == filtering.matchingRows(expression, table, 0, 40)
+
+    assert filtering.matchingRows(filtering.parseQuery('date contains -02-'), lazyTable, 10, 20) == {13, 17}
+    lazyTable.close()
+
+def testInvalidQueriesAreRejected():
+    '''
+    Tests that texts which are not filter queries, or whose values cannot be converted to the type of their
+    column, raise ValueError, and that a search text is only rejected when it starts with a column name and an
+    operator.
+    '''
+    for text in ('heavy', 'Throughput', 'Throughput > ', 'Throughput > abc', 'Date between 2015-01-01',
+                 '(Month = 1', 'Product = "heavy', 'Month < ""', 'Month = 99999999999'):
+        with pytest.raises(ValueError):
+            filtering.parseQuery(text)
+
+    for text in ('Throughput > abc', 'not (month = x)', 'Date between 2015-01-01', 'Product = "heavy'):
+        with pytest.raises(ValueError):
+            filtering.parseSearch(text)
+
+    for text in ('heavy', 'Throughput', 'keystone pipeline', "o'brien", 'pipeline gp ltd'):
+        assert filtering.parseSearch(text) is None
+    assert isinstance(filtering.parseSearch('throughput > 5'), filtering.Comparison)
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,74 @@
+#This is a pyTest test class.
+
+#Author: Dan Blais - 040826486
+#Subject: CST8333
+
+import csv
+import json
+import pytest
+from unittest.mock import MagicMock
+import Instrumentation as instrumentation
+
+def countRows(rows):
+    '''
+    A function processing rows, decorated by the tests.
+
+    :param rows: A list of rows.
+    :returns: The number of rows.
+    '''
+    return len(rows)
+
+def testDisabledRecorderLeavesFunctionsUndecorated():
+    '''
+    Tests that a disabled recorder returns decorated functions unchanged, so they run without overhead, and that it
+    does not watch the Tk event loop.
+    '''
+    recorder = instrumentation.Recorder(enabled=False)
+    root = MagicMock()
+
+    assert recorder.timed(rows=lambda result, rows: result)(countRows) is countRows
+    recorder.watchEventLoop(root)
+    assert not root.after.called and recorder.summaries() == []
+
+def testRecorderCountsCallsAndDumpsStatistics(tmp_path):
+    '''
+    Tests that an enabled recorder counts the calls and rows of a decorated function in its latency histogram,
+    including calls which raise, keeps the most recent calls in a bounded ring buffer, records event loop heartbeats
+    without keeping short stalls in the ring buffer, and saves the statistics as JSON and csv.
+    '''
+    recorder = instrumentation.Recorder(enabled=True)
+    timedCount = recorder.timed("count", rows=lambda result, rows: result)(countRows)
+
+    for size in range(instrumentation.EVENT_BUFFER_SIZE + 10):
+        assert timedCount([0] * (size % 3)) == size % 3
+
+    stats = recorder.stats["count"]
+    assert stats.count == instrumentation.EVENT_BUFFER_SIZE + 10 and sum(stats.histogram) == stats.count
+    assert stats.rows == sum(size % 3 for size in range(instrumentation.EVENT_BUFFER_SIZE + 10))
+    assert len(recorder.events) == instrumentation.EVENT_BUFFER_SIZE
+    assert 0 < stats.percentile(0.5) <= stats.percentile(0.95) <= stats.maxSeconds
+
+    with pytest.raises(TypeError):
+        timedCount(None)
+    assert stats.count == instrumentation.EVENT_BUFFER_SIZE + 11 and recorder.events[-1][3] is None
+
+    root = MagicMock()
+    recorder.watchEventLoop(root, interval=10)
+    root.after.call_args[0][1]()
+    assert recorder.stats[instrumentation.STALL_NAME].count == 1 and root.after.call_count == 2
+    assert recorder.events[-1][0] == "count"
+
+    recorder.dumpJSON(str(tmp_path / "stats.json"))
+    recorder.dumpCSV(str(tmp_path / "stats.csv"))
+
+    with open(tmp_path / "stats.json") as saved:
+        dump = json.load(saved)
+    with open(tmp_path / "stats.csv", newline="") as saved:
+        rows = list(csv.reader(saved))
+
+    assert [operation["name"] for operation in dump["operations"]] == ["count", instrumentation.STALL_NAME]
+    assert len(dump["events"]) == instrumentation.EVENT_BUFFER_SIZE
+    assert rows[0] == list(instrumentation.SUMMARY_COLUMNS) and rows[1][:2] == ["count", str(stats.count)]
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,53 @@
+#This is a pyTest test class.
+
+#Author: Dan Blais - 040826486
+#Subject: CST8333
+
+import pytest
+from datetime import date
+import KeystonePipelineData as model
+
+ROW = ['2010-07-01', '7', '2010', 'TransCanada Keystone Pipeline GP Ltd.', 'Keystone pipeline',
+       'International boundary at or near Haskett, Manitoba', '48.9989', '-97.9577', 'south', 'export', 'domestic heavy',
+       '15.07', '', '', '', '18.11', 'NEB/REGULATORY DIRECTIVE']
+
+def testRowRoundTripsWithTypedValues():
+    '''
+    Tests that fromRow and the constructor store typed values, with empty strings for empty cells, and that toRow
+    gives back the cells of the row.
+    '''
+    fromRow = model.PipelineData.fromRow(ROW)
+    constructed = model.PipelineData(*ROW)
+
+    for data in (fromRow, constructed):
+        assert data.date == date(2010, 7, 1)
+        assert data.month == 7 and data.year == 2010
+        assert data.latitude == 48.9989 and data.throughput == 15.07
+        assert data.committedVolumes == ""
+        assert data.toRow() == ROW
+
+    assert not hasattr(fromRow, "__dict__")
+
+def testSettersCoerceOrKeepValue(capsys):
+    '''
+    Tests that the setters coerce text to the type of the attribute, and that a value which cannot be coerced is
+    reported and leaves the attribute unchanged.
+    '''
+    data = model.PipelineData.fromRow(ROW)
+    data.date = '2011-02-03'
+    data.month = '2'
+    data.throughput = '20.5'
+    data.availableCapacity = ''
+
+    assert data.date == date(2011, 2, 3)
+    assert data.month == 2 and data.throughput == 20.5
+    assert data.availableCapacity == ""
+
+    data.latitude = 'north'
+    data.date = '03/02/2011'
+
+    assert data.latitude == 48.9989 and data.date == date(2011, 2, 3)
+    assert capsys.readouterr().out.count("Error:") == 2
+
+if __name__ == '__main__':
+    pytest.main()
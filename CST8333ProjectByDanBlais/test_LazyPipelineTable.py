@@ -0,0 +1,89 @@
+#This is a pyTest test class.
+
+#Author: Dan Blais - 040826486
+#Subject: CST8333
+
+import pytest
+from datetime import date
+import KeystonePipelineData as model
+import LazyPipelineTable as lazy
+
+HEADER = ('Date,Month,Year,Company,Pipeline,Key Point,Latitude,Longitude,Direction Of Flow,Trade Type,Product,'
+          'Throughput (1000 m3/d),Committed Volumes (1000 m3/d),Uncommitted Volumes (1000 m3/d),'
+          'Nameplate Capacity (1000 m3/d),Available Capacity (1000 m3/d),Reason For Variance\n')
+
+def writeRecord(dataset, index, day, reason):
+    '''
+    Writes a record for the tests.
+
+    :param dataset: The open file to write to.
+    :param index: The throughput of the record, used to tell records apart.
+    :param day: The text of the date cell of the record.
+    :param reason: The quoted reason for variance of the record.
+    '''
+    dataset.write(f'{day},7,2010,TransCanada Keystone Pipeline GP Ltd.,Keystone pipeline,'
+                  f'"International boundary at or near Haskett, Manitoba",48.9989,-97.9577,south,export,'
+                  f'domestic heavy,{index},,,,18.11,"{reason}"\n')
+
+@pytest.fixture
+def table(tmp_path, monkeypatch):
+    '''
+    Sets up a LazyPipelineTable over a file of 40 records, one with a line break in a quoted field and one with an
+    invalid date, followed by blank lines. The file is indexed in small blocks so records span block boundaries.
+    '''
+    path = tmp_path / "pipeline.csv"
+
+    with open(path, "w", newline='') as dataset:
+        dataset.write(HEADER)
+
+        for index in range(40):
+            writeRecord(dataset, index, "July 1" if index == 9 else "2010-07-01", "Line one\nline two" if index == 7 else "NEB")
+        dataset.write("\n\n")
+
+    monkeypatch.setattr(lazy, "INDEX_BLOCK_BYTES", 500)
+    table = lazy.LazyPipelineTable(str(path))
+    progress = list(table.indexRecords())
+
+    assert progress[-1] == 1.0
+    yield table
+    table.close()
+
+def testRecordsAreIndexedAndParsedOnDemand(table):
+    '''
+    Tests that every record is indexed, including a record with a line break in a quoted field, that blank lines
+    at the end of the file are not records, and that only the rows read are parsed.
+    '''
+    assert len(table) == 40
+    assert table.recordValues.cache_info().currsize == 0
+    assert table.rowValues(7)[-1] == "Line one\nline two"
+    assert table.rowValues(8)[11] == 8.0
+    assert table.rowValues(9)[0] == ""
+    assert table.rowValues(39)[:3] == (date(2010, 7, 1), 7, 2010)
+    assert table.recordValues.cache_info().currsize == 4
+
+def testEditsInsertsAndRemovalsUseTheOverlay(table):
+    '''
+    Tests that edited and inserted rows are read from the overlay, that row ids stay with their rows, and that
+    an invalid edit leaves the row unchanged.
+    '''
+    table[3].product = "condensate"
+    table[3].month = "not a month"
+    table.insert(0, model.PipelineData(*table.rowValues(5)), 100)
+    removed = table.pop(2)
+
+    assert removed.throughput == 1.0
+    assert len(table) == 40
+    assert table.rowIds.tolist()[:4] == [100, 0, 2, 3]
+    assert table.rowValues(3)[10] == "condensate"
+    assert table.rowValues(3)[1] == 7
+    assert table.rowValues(0)[11] == 5.0
+
+    table.insertRows([1, 2], [table.rowValues(10), table.rowValues(11)], [101, 102])
+    table.deleteRows([0, 3, 41])
+
+    assert table.rowIds.tolist()[:4] == [101, 102, 2, 3]
+    assert table.rowIds.tolist()[-1] == 38
+    assert table.rowValues(1)[11] == 11.0
+
+if __name__ == '__main__':
+    pytest.main()
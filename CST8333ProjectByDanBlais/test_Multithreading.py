@@ -19,7 +19,8 @@ def testStartDaemonThread():
     '''
     Tests the startDaemonThread() method of the WindowController class.
     Uses MagicMock to mock the parseCSV method and checks if the daemon thread is started
-    and that the parseCSV method is called by the daemon thread. If the test passes then
+    and that the parseCSV method is called by the daemon thread. The load no longer blocks
+    the caller, so the test joins the thread before checking the call. If the test passes then
     then daemon is calling the method successfully.
     '''
     
@@ -29,6 +30,7 @@ def testStartDaemonThread():
 
     test_file = "test.csv"
     cont.startDaemonThread(test_file)
+    cont._daemon.join()
 
     cont.parseCSV.assert_called_once_with(test_file)
 
@@ -0,0 +1,74 @@
+#This is a pyTest test class.
+
+#Author: Dan Blais - 040826486
+#Subject: CST8333
+
+import pytest
+import ParallelCSVParser as parser
+import PipelineTable as columnar
+
+HEADER = ('Date,Month,Year,Company,Pipeline,Key Point,Latitude,Longitude,Direction Of Flow,Trade Type,Product,'
+          'Throughput (1000 m3/d),Committed Volumes (1000 m3/d),Uncommitted Volumes (1000 m3/d),'
+          'Nameplate Capacity (1000 m3/d),Available Capacity (1000 m3/d),Reason For Variance\n')
+
+def writeDataset(path, rowCount):
+    '''
+    Writes a csv file for the tests whose rows have quoted fields holding commas, quotes and line breaks.
+
+    :param path: The path of the file to write.
+    :param rowCount: The number of data rows to write.
+    '''
+    with open(path, "w", newline='') as dataset:
+        dataset.write(HEADER)
+
+        for index in range(rowCount):
+            dataset.write(f'2010-07-01,7,2010,TransCanada Keystone Pipeline GP Ltd.,Keystone pipeline,'
+                          f'"International boundary at or near Haskett, Manitoba",48.9989,-97.9577,south,export,'
+                          f'domestic heavy,{index},,,,18.11,"Row {index}\nsaid ""NEB"""\n')
+
+def collect(batches):
+    '''
+    Appends the batches of a parse into one table.
+
+    :param batches: An iterable of tuples holding a PipelineTable and the fraction of the file read.
+    :returns: A PipelineTable of all parsed rows.
+    '''
+    table = columnar.PipelineTable()
+
+    for batch, progress in batches:
+        table.extendTable(batch, len(table))
+    return table
+
+def testRangesEndOnRecordBoundaries(tmp_path):
+    '''
+    Tests that the byte ranges of a file cover every record after the header, and that no range starts inside a
+    quoted field holding a line break.
+    '''
+    path = tmp_path / "pipeline.csv"
+    writeDataset(path, 50)
+    ranges = parser.splitRecordRanges(path, 200)
+    data = path.read_bytes()
+
+    assert len(ranges) > 1
+    assert ranges[0][0] == len(HEADER)
+    assert ranges[-1][1] == len(data)
+    assert all(end == nextStart for (start, end), (nextStart, nextEnd) in zip(ranges, ranges[1:]))
+    assert all(data[start:start + 10] == b'2010-07-01' for start, end in ranges)
+
+def testParallelParseMatchesSerialParse(tmp_path, monkeypatch):
+    '''
+    Tests that parsing a file with worker processes gives the same rows in the same order as parsing it serially.
+    '''
+    path = tmp_path / "pipeline.csv"
+    writeDataset(path, 300)
+    monkeypatch.setattr(parser, "CHUNK_BYTES", 4096)
+
+    serial = collect(parser.readBatchesSerially(path, 100, 5000))
+    parallel = collect(parser.readBatchesInParallel(path, 2))
+
+    assert len(serial) == len(parallel) == 300
+    assert [parallel.rowValues(position) for position in range(300)] == [serial.rowValues(position) for position in range(300)]
+    assert parallel.rowValues(299)[-1] == 'Row 299\nsaid "NEB"'
+
+if __name__ == '__main__':
+    pytest.main()
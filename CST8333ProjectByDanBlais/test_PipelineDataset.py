@@ -0,0 +1,125 @@
+#This is a pyTest test class.
+
+#Author: Dan Blais - 040826486
+#Subject: CST8333
+
+import os
+import shutil
+import pytest
+import PipelineTable as columnar
+import PipelineEngine as engine
+import PipelineDataset as datasets
+import ParallelCSVParser as parser
+import FilterQuery as filtering
+import CSVExporter as exporter
+import csvmanager
+
+ROW = ['2010-07-01', '7', '2010', 'TransCanada Keystone Pipeline GP Ltd.', 'Keystone pipeline',
+       'International boundary at or near Haskett, Manitoba', '48.9989', '-97.9577', 'south', 'export', 'domestic heavy',
+       '15.07', '', '', '', '18.11', 'NEB/REGULATORY DIRECTIVE']
+
+@pytest.fixture
+def folder(tmp_path):
+    '''
+    Sets up a folder of three csv files of 100 rows, one per pipeline, each covering its own range of years, with
+    empty dates in the last file, and a file which is not a csv file.
+    '''
+    for fileIndex, pipeline in enumerate(("Keystone pipeline", "Enbridge Mainline", "Trans Mountain")):
+        rows = []
+
+        for index in range(100):
+            row = list(ROW)
+            year = 2010 + 3 * fileIndex + index % 3
+            row[0] = '' if fileIndex == 2 and index % 10 == 0 else f'{year}-0{1 + index % 9}-01'
+            row[4] = pipeline
+            row[11] = str(fileIndex * 100 + index)
+            rows.append(row)
+
+        table = columnar.PipelineTable()
+        table.extendRows(rows, 0)
+        exporter.exportTable(table, str(tmp_path / f"pipeline{fileIndex}.csv"))
+
+    (tmp_path / "notes.txt").write_text("not pipeline data")
+    return tmp_path
+
+def testFolderLoadsAsOneTable(folder, monkeypatch):
+    '''
+    Tests that the csv files of a folder or glob pattern are loaded as one table in the order of their paths, with
+    the source file of each row, the same rows when parsed by worker processes, and summaries across every file.
+    '''
+    pipeline = engine.PipelineEngine()
+
+    assert pipeline.load(str(folder)) == 300
+    assert [pipeline.table.getValue(position, 11) for position in (0, 150, 299)] == [0.0, 150.0, 299.0]
+    assert [pipeline.dataset.sourceFile(rowId) for rowId in (0, 99, 100, 299, 300)] == \
+        [str(folder / "pipeline0.csv"), str(folder / "pipeline0.csv"), str(folder / "pipeline1.csv"),
+         str(folder / "pipeline2.csv"), ""]
+    assert [summary.count for summary in pipeline.aggregate("pipeline", "throughput")] == [100, 100, 100]
+    assert engine.PipelineEngine().load(str(folder / "pipeline[12].csv")) == 200
+
+    monkeypatch.setattr(parser, "PARALLEL_MIN_BYTES", 0)
+    monkeypatch.setattr(parser, "CHUNK_BYTES", 2048)
+    dataset = datasets.PipelineDataset(str(folder))
+    parallel = columnar.PipelineTable()
+
+    for batch, progress in dataset.readBatches(100, 5000, workerCount=2):
+        parallel.extendTable(batch, len(parallel))
+
+    assert parallel.rowValuesRange(0, 300) == pipeline.table.rowValuesRange(0, 300)
+    assert [partition.rowCount for partition in dataset.partitions] == [100, 100, 100]
+
+    with pytest.raises(FileNotFoundError):
+        engine.PipelineEngine().load(str(folder / "missing*.csv"))
+
+    assert csvmanager.main(["stats", str(folder), "--value", "Throughput", "--where",
+                            "pipeline = 'trans mountain'"]) == 0
+
+def testFilesNamedLikePatternsAreSingleFiles(folder):
+    '''
+    Tests that a file whose name holds the characters of a glob pattern is loaded as a single file, and that the
+    edit journals of a folder and of a glob pattern are named without the characters of a pattern.
+    '''
+    other = folder / "other"
+    other.mkdir()
+    single = str(other / "keystone [2023].csv")
+    shutil.copy(folder / "pipeline0.csv", single)
+    pipeline = engine.PipelineEngine()
+
+    assert not datasets.isDatasetPath(single) and datasets.isDatasetPath(str(other / "*.csv"))
+    assert pipeline.load(single) == 100 and pipeline.dataset is None
+    assert csvmanager.main(["stats", single, "--value", "Throughput"]) == 0
+
+    assert datasets.PipelineDataset(str(folder)).journalFile() == os.path.join(str(folder), datasets.JOURNAL_NAME)
+    journalFile = datasets.PipelineDataset(str(folder / "pipeline[12].csv")).journalFile()
+    assert os.path.dirname(journalFile) == str(folder)
+    assert not any(character in os.path.basename(journalFile) for character in datasets.GLOB_CHARACTERS)
+
+def testFilterQueriesSkipFilesWhichCannotMatch(folder):
+    '''
+    Tests that filter queries on the Date and Pipeline columns are only evaluated over the files which may match,
+    that they find the same rows as evaluating them over the whole table, and that no file is skipped once the
+    table is edited.
+    '''
+    pipeline = engine.PipelineEngine()
+    pipeline.load(str(folder))
+    dataset, table = pipeline.dataset, pipeline.table
+
+    for query, ranges in (('pipeline = "enbridge mainline"', [(100, 200)]),
+                          ('date >= 2016-01-01 or pipeline contains keystone', [(0, 100), (200, 300)]),
+                          ('date between 2012-06-01 and 2013-02-01 and throughput > 0', [(0, 200)]),
+                          ('not pipeline = "enbridge mainline"', [(0, 300)]),
+                          ('date < 2010-01-01', []),
+                          ('date = "" and pipeline != "keystone pipeline"', [(100, 300)])):
+        expression = filtering.parseQuery(query)
+        assert dataset.candidateRanges(expression, table, 0, 300) == ranges
+        assert pipeline.matchingRows(query) == sorted(filtering.matchingRows(expression, table, 0, 300))
+
+    expression = filtering.parseQuery('pipeline = "trans mountain"')
+    assert dataset.candidateRanges(expression, table, 50, 250) == [(200, 250)]
+
+    pipeline.setValue(0, "pipeline", "Trans Mountain")
+    assert dataset.candidateRanges(expression, table, 0, 300) == [(0, 300)]
+    assert pipeline.matchingRows('pipeline = "trans mountain"') == [0] + list(range(200, 300))
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,116 @@
+#This is a pyTest test class.
+
+#Author: Dan Blais - 040826486
+#Subject: CST8333
+
+import csv
+import os
+import subprocess
+import sys
+import pytest
+import CSVExporter as exporter
+import PipelineEngine as engine
+import csvmanager
+
+ROW = ['2010-07-01', '7', '2010', 'TransCanada Keystone Pipeline GP Ltd.', 'Keystone pipeline',
+       'International boundary at or near Haskett, Manitoba', '48.9989', '-97.9577', 'south', 'export', 'domestic heavy',
+       '15.07', '', '', '', '18.11', 'NEB/REGULATORY DIRECTIVE']
+
+@pytest.fixture
+def csvFile(tmp_path):
+    '''
+    Sets up a csv file of 6 rows alternating between two products, with throughputs of 10 to 60.
+    '''
+    file = tmp_path / "pipeline.csv"
+
+    with open(file, "w", newline="") as output:
+        writer = csv.writer(output)
+        writer.writerow(exporter.HEADERS)
+
+        for index in range(6):
+            row = list(ROW)
+            row[10] = ('domestic heavy', 'condensate')[index % 2]
+            row[11] = str((index + 1) * 10)
+            writer.writerow(row)
+    return str(file)
+
+def testImportsWithoutWindowModules():
+    '''
+    Tests that importing the engine and the command line interface does not import tkinter or matplotlib.
+    '''
+    code = ("import sys, PipelineEngine, csvmanager; "
+            "print(sorted(name for name in sys.modules if name.split('.')[0] in ('tkinter', 'matplotlib')))")
+    result = subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(os.path.abspath(__file__)),
+                            capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == "[]"
+
+def testEngineLoadsFiltersEditsAndExports(csvFile, tmp_path):
+    '''
+    Tests that the engine loads a file, filters it with a query, summarizes it, edits cells and rows, and saves
+    the rows it holds.
+    '''
+    pipeline = engine.PipelineEngine()
+
+    assert pipeline.load(csvFile) == 6
+    assert pipeline.matchingRows("throughput >= 30 and product = condensate") == [3, 5]
+    assert pipeline.matchingRows("condensate") == [1, 3, 5]
+    assert {summary.label: summary.sum for summary in pipeline.aggregate("Product", "Throughput")} == \
+        {'domestic heavy': 90.0, 'condensate': 120.0}
+
+    matches = pipeline.filtered("product = condensate")
+    matches.setValue(0, "throughput", "25")
+    matches.deleteRows([1])
+    matches.insertRows([2], [list(ROW)])
+    saveFile = str(tmp_path / "condensate.csv")
+    matches.export(saveFile)
+
+    with open(saveFile, newline="") as saved:
+        rows = list(csv.reader(saved))
+
+    assert [row[11] for row in rows[1:]] == ['25.0', '60.0', '15.07']
+    assert list(matches.table.rowIds) == [1, 5, 6]
+
+    with pytest.raises(KeyError):
+        pipeline.aggregate("Product", "Pressure")
+
+def testCommandLineConvertsFiltersAndSummarizes(csvFile, tmp_path, capsys):
+    '''
+    Tests that the convert, filter and stats commands write the expected rows and statistics, and that an unknown
+    or non-numeric column and an invalid filter query are reported with a failing exit status.
+    '''
+    saveFile = str(tmp_path / "converted.csv")
+
+    assert csvmanager.main(["convert", csvFile, saveFile]) == 0
+    with open(saveFile, newline="") as saved:
+        assert len(list(csv.reader(saved))) == 7
+
+    capsys.readouterr()
+    assert csvmanager.main(["filter", csvFile, "Throughput > 40"]) == 0
+    rows = list(csv.reader(capsys.readouterr().out.splitlines()))
+    assert rows[0] == list(exporter.HEADERS) and [row[11] for row in rows[1:]] == ['50.0', '60.0']
+
+    assert csvmanager.main(["stats", csvFile, "--value", "Throughput", "--group", "product"]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0] == "product,count,sum,mean,min,max"
+    assert sorted(lines[1:]) == ["condensate,3,120.0,40.0,20.0,60.0", "domestic heavy,3,90.0,30.0,10.0,50.0"]
+
+    assert csvmanager.main(["stats", csvFile, "--value", "Throughput", "--where", "product = condensate"]) == 0
+    assert capsys.readouterr().out.splitlines()[1] == "all rows,3,120.0,40.0,20.0,60.0"
+
+    assert csvmanager.main(["stats", csvFile, "--value", "Pressure"]) == 1
+    assert "Error:" in capsys.readouterr().err
+
+    for command in (["filter", csvFile, "Throughput > abc"], ["filter", csvFile, "condensate"],
+                    ["stats", csvFile, "--value", "Throughput", "--where", "product between a"],
+                    ["stats", csvFile, "--value", "Product"]):
+        assert csvmanager.main(command) == 1
+        assert "Error:" in capsys.readouterr().err
+
+    assert csvmanager.main(["filter", csvFile, "CONDENSATE", "--text"]) == 0
+    assert len(capsys.readouterr().out.splitlines()) == 4
+    assert csvmanager.main(["stats", csvFile, "--value", "Throughput", "--where", "heavy", "--text"]) == 0
+    assert capsys.readouterr().out.splitlines()[1] == "all rows,3,90.0,30.0,10.0,50.0"
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,94 @@
+#This is a pyTest test class.
+
+#Author: Dan Blais - 040826486
+#Subject: CST8333
+
+import pytest
+from datetime import date
+import KeystonePipelineData as model
+import PipelineTable as columnar
+
+def makeRow(product, throughput):
+    '''
+    Builds a PipelineData object for the tests, with an empty committed volume.
+
+    :param product: The product of the row.
+    :param throughput: The throughput of the row.
+    :returns: A PipelineData object.
+    '''
+    return model.PipelineData(date=date(2010, 7, 1), month=7, year=2010, company='TransCanada Keystone Pipeline GP Ltd.',
+                              pipeline='Keystone pipeline', keyPoint='International boundary at or near Haskett, Manitoba',
+                              latitude=48.9989, longitude=-97.9577, directionOfFlow='south', tradeType='export',
+                              product=product, throughput=throughput, committedVolumes="", uncommittedVolumes="",
+                              nameplateCapacity="", availableCapacity=18.11, reasonForVariance='NEB/REGULATORY DIRECTIVE')
+
+def testRowValuesRoundTrip():
+    '''
+    Tests that rows stored in a PipelineTable are read back with the values they were stored with, that empty
+    cells read back as empty strings, and that rows can be read through the PipelineData attributes of a view.
+    '''
+    table = columnar.PipelineTable([makeRow('domestic heavy', 15.07), makeRow('domestic light', 3.04)])
+
+    assert len(table) == 2
+    assert table.rowValues(1) == (date(2010, 7, 1), 7, 2010, 'TransCanada Keystone Pipeline GP Ltd.', 'Keystone pipeline',
+                                  'International boundary at or near Haskett, Manitoba', 48.9989, -97.9577, 'south',
+                                  'export', 'domestic light', 3.04, "", "", "", 18.11, 'NEB/REGULATORY DIRECTIVE')
+    assert table[0].product == 'domestic heavy'
+    assert table[0].committedVolumes == ""
+
+    table[0].throughput = "20.5"
+    table[0].month = "not a month"
+    assert table[0].throughput == 20.5
+    assert table[0].month == 7
+
+def testInsertPopAndExtendKeepRowIds():
+    '''
+    Tests that row ids stay with their rows through inserts and removals, and that appending another table
+    translates its category codes to the codes of the receiving table.
+    '''
+    table = columnar.PipelineTable([makeRow('domestic heavy', 1.0), makeRow('domestic light', 2.0)])
+    table.insert(1, makeRow('refined petroleum products', 3.0), 10)
+    removed = table.pop(0)
+
+    assert removed.product == 'domestic heavy'
+    assert table.rowIds.tolist() == [10, 1]
+
+    batch = columnar.PipelineTable([makeRow('domestic light', 4.0), makeRow('condensate', 5.0)])
+    table.extendTable(batch, 11)
+
+    assert table.rowIds.tolist() == [10, 1, 11, 12]
+    assert [row.product for row in table] == ['refined petroleum products', 'domestic light', 'domestic light', 'condensate']
+    assert table.categoryValues(columnar.COLUMN_NAMES.index("product")).count('domestic light') == 1
+
+def testBatchInsertAndDeleteMatchOneRowAtATime():
+    '''
+    Tests that inserting and deleting batches of rows gives the same rows, row ids and source records as inserting
+    and removing the rows one at a time, and that deleting the inserted rows gives back the original rows.
+    '''
+    rows = [makeRow(f'product {index % 3}', float(index)) for index in range(10)]
+    batched = columnar.PipelineTable(rows)
+    single = columnar.PipelineTable(rows)
+    batched.trackSource()
+    single.trackSource()
+    original = [batched.rowValues(position) for position in range(10)]
+    inserted = [batched.rowValues(position)[:10] + ('condensate', '0.5') + batched.rowValues(position)[12:]
+                for position in (2, 7)]
+
+    batched.insertRows([0, 4, 5, 12], [inserted[0], inserted[1], inserted[0], inserted[1]], [20, 21, 22, 23])
+
+    for position, values, rowId in zip([0, 4, 5, 12], [inserted[0], inserted[1], inserted[0], inserted[1]], [20, 21, 22, 23]):
+        single.insert(position, model.PipelineData(*values), rowId)
+
+    assert [batched.rowValues(position) for position in range(14)] == [single.rowValues(position) for position in range(14)]
+    assert batched.rowIds.tolist() == single.rowIds.tolist()
+    assert batched.sourceRecords().tolist() == single.sourceRecords().tolist()
+    assert batched.positionOf(22) == 5
+
+    batched.deleteRows([0, 4, 5, 12])
+
+    assert [batched.rowValues(position) for position in range(10)] == original
+    assert batched.rowIds.tolist() == list(range(10))
+    assert batched.sourceRecords().tolist() == list(range(10))
+
+if __name__ == '__main__':
+    pytest.main()
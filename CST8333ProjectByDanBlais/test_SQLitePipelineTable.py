@@ -0,0 +1,128 @@
+#This is a pyTest test class.
+
+#Author: Dan Blais - 040826486
+#Subject: CST8333
+
+import os
+import pytest
+import PipelineTable as columnar
+import PipelineEngine as engine
+import SortIndex as sorting
+import FilterQuery as filtering
+import Aggregation as aggregation
+import CSVExporter as exporter
+import SQLitePipelineTable as database
+
+ROW = ['2010-07-01', '7', '2010', 'TransCanada Keystone Pipeline GP Ltd.', 'Keystone pipeline',
+       'International boundary at or near Haskett, Manitoba', '48.9989', '-97.9577', 'south', 'export', 'domestic heavy',
+       '15.07', '', '', '', '18.11', 'NEB/REGULATORY DIRECTIVE']
+
+@pytest.fixture
+def tables(tmp_path):
+    '''
+    Sets up a PipelineTable of 300 rows with varying dates, months, products and throughputs, and empty date, month,
+    product and throughput cells, and a SQLitePipelineTable holding the same rows.
+    '''
+    rows = []
+
+    for index in range(300):
+        row = list(ROW)
+        row[0] = '' if index % 50 == 0 else f'{2010 + index % 12}-0{1 + index % 9}-1{index % 10}'
+        row[1] = '' if index % 40 == 0 else str(1 + index % 12)
+        row[10] = ('domestic heavy', 'Condensate', '')[index % 3]
+        row[11] = '' if index % 7 == 0 else str(index * 1.25)
+        rows.append(row)
+
+    table = columnar.PipelineTable()
+    table.extendRows(rows, 0)
+    stored = database.SQLitePipelineTable(str(tmp_path))
+    stored.extendTable(table, 0)
+    stored.finishLoad()
+    yield table, stored
+    stored.close()
+
+def testQueriesMatchPipelineTable(tables):
+    '''
+    Tests that the rows, searches, filter queries, sort orders and group summaries of a SQLitePipelineTable are the
+    same as those of a PipelineTable holding the same rows, over the whole table and over a range of rows, including
+    searches of floats which SQLite writes differently from Python and of accented text in another case.
+    '''
+    table, stored = tables
+
+    for copy in (table, stored):
+        copy.setValue(3, 11, "0.30000000000000004")
+
+        for position in range(0, 300, 13):
+            copy.setValue(position, 3, "\u00c9COLE \u00d6L Ltd.")
+
+    pipeline = engine.PipelineEngine(table)
+
+    assert [stored.rowValues(position) for position in range(300)] == table.rowValuesRange(0, 300)
+
+    for query in ("condensate", "2015", "18.75", "00000", "\u00e9cole"):
+        assert stored.search(query) == set(pipeline.matchingRows(query))
+        assert stored.search(query, 40, 120) == set(pipeline.matchingRows(query, 40, 120))
+
+    for query in ('throughput > 100 and product = condensate', 'date between 2013-01-01 and 2015-12-31',
+                  'not month < 6 or product = ""', 'key point contains haskett and throughput != 0',
+                  'throughput contains 5', 'throughput contains 00000', 'company contains \u00f6l',
+                  'company = "\u00e9cole \u00f6l ltd."'):
+        assert stored.filterRows(filtering.parseQuery(query)) == set(pipeline.matchingRows(query))
+
+    sortIndex = sorting.SortIndex(table)
+
+    for columnIndex in (0, 1, 3, 10, 11):
+        assert list(stored.order(columnIndex)) == list(sortIndex.order(columnIndex))
+        assert list(stored.order(columnIndex, True)) == list(sortIndex.order(columnIndex, True))
+
+    summaries = {summary.label: (summary.count, round(summary.sum, 6), summary.min, summary.max)
+                 for summary in aggregation.aggregate(table, 10, 11, 10, 250)}
+    assert {summary.label: (summary.count, round(summary.sum, 6), summary.min, summary.max)
+            for summary in aggregation.aggregate(stored, 10, 11, 10, 250)} == summaries
+
+def testEditsAreStoredWhileCopiesKeepTheirSnapshot(tables, tmp_path):
+    '''
+    Tests that edits, batch inserts and batch deletes are stored in the database and found by row id, that a copy
+    taken before the edits still reads the rows as they were, and that closing the table removes its database.
+    '''
+    table, stored = tables
+    copy = stored.copy()
+    stored.setValue(5, 11, "99.5")
+    stored.insertRows([0, 4], [ROW, ROW], [300, 301])
+    stored.deleteRows([1, 2])
+
+    with pytest.raises(ValueError):
+        stored.setValue(0, 0, "not a date")
+
+    assert len(stored) == 300 and list(stored.rowIds[:6]) == [300, 2, 301, 3, 4, 5]
+    assert stored.getValue(5, 11) == 99.5 and stored.search("99.5") == {5}
+    assert stored.positionOf(301) == 2 and stored.positionOf(1) is None
+    assert copy.rowValues(5) == table.rowValues(5) and len(copy) == 300
+    copy.close()
+
+    csvFile = str(tmp_path / "stored.csv")
+    exporter.exportTable(stored, csvFile)
+    loaded = engine.PipelineEngine()
+    loaded.load(csvFile)
+    assert loaded.table.rowValuesRange(0, 300) == [stored.rowValues(position) for position in range(300)]
+
+    stored.close()
+    assert not os.path.exists(stored.path)
+
+def testEngineLoadsIntoDatabase(tables, tmp_path):
+    '''
+    Tests that the engine loads a file into a SQLitePipelineTable when asked to, and searches and summarizes it.
+    '''
+    table, stored = tables
+    csvFile = str(tmp_path / "pipeline.csv")
+    exporter.exportTable(table, csvFile)
+    pipeline = engine.PipelineEngine()
+
+    assert pipeline.load(csvFile, useDatabase=True) == 300
+    assert isinstance(pipeline.table, database.SQLitePipelineTable)
+    assert pipeline.matchingRows("throughput > 300") == engine.PipelineEngine(table).matchingRows("throughput > 300")
+    assert [summary.count for summary in pipeline.aggregate("product", "throughput")] == [86, 85]
+    pipeline.table.close()
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,71 @@
+#This is a pyTest test class.
+
+#Author: Dan Blais - 040826486
+#Subject: CST8333
+
+import pytest
+import PipelineTable as columnar
+import SearchIndex as search
+
+ROW = ['2010-07-01', '7', '2010', 'TransCanada Keystone Pipeline GP Ltd.', 'Keystone pipeline',
+       'International boundary at or near Haskett, Manitoba', '48.9989', '-97.9577', 'south', 'export', 'domestic heavy',
+       '15.07', '', '', '', '18.11', 'NEB/REGULATORY DIRECTIVE']
+
+@pytest.fixture
+def table():
+    '''
+    Sets up a PipelineTable of 300 rows whose products, throughputs and dates vary from row to row.
+    '''
+    rows = []
+
+    for index in range(300):
+        row = list(ROW)
+        row[0] = f'{2010 + index % 12}-0{1 + index % 9}-01'
+        row[10] = ('domestic heavy', 'domestic light', 'condensate')[index % 3]
+        row[11] = str(index / 7)
+        row[12] = '' if index % 2 else '1.5'
+        rows.append(row)
+
+    table = columnar.PipelineTable()
+    table.extendRows(rows, 0)
+    return table
+
+def scan(table, query):
+    '''
+    Finds the matching rows the way searchTable did before the index, by formatting every cell of every row.
+
+    :param table: The PipelineTable to search.
+    :param query: The text to search for.
+    :returns: A set of the indexes of the matching rows.
+    '''
+    return {position for position in range(len(table))
+            if any(query.lower() in str(value).lower() for value in table.rowValues(position))}
+
+def testSearchMatchesCellScan(table):
+    '''
+    Tests that indexed searches, including grown queries which narrow the previous matches, find the same rows as
+    formatting and scanning every cell, and that a search can be limited to a range of rows.
+    '''
+    index = search.SearchIndex(table)
+
+    for query in ('d', 'do', 'domestic l', 'Domestic Light', '1.5', '2015-0', '2015-03', '28', 'nothing'):
+        assert index.search(query) == scan(table, query)
+
+    assert index.search('condensate', 10, 20) == {11, 14, 17}
+
+def testSearchFollowsEdits(table):
+    '''
+    Tests that the index is rebuilt after the table is edited, so edited values are found and old values are not.
+    '''
+    index = search.SearchIndex(table)
+    assert index.search('cond') == scan(table, 'cond')
+
+    table.setValue(2, columnar.COLUMN_NAMES.index('product'), 'refined products')
+    table.setValue(5, columnar.COLUMN_NAMES.index('throughput'), '12345.5')
+
+    assert index.search('refined') == {2}
+    assert index.search('12345') == {5}
+    assert 2 not in index.search('cond')
+
+if __name__ == '__main__':
+    pytest.main()
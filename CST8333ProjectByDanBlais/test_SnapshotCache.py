@@ -0,0 +1,88 @@
+#This is a pyTest test class.
+
+#Author: Dan Blais - 040826486
+#Subject: CST8333
+
+import pytest
+import os
+import SnapshotCache as snapshots
+import PipelineTable as columnar
+
+ROW = ['2010-07-01', '7', '2010', 'TransCanada Keystone Pipeline GP Ltd.', 'Keystone pipeline',
+       'International boundary at or near Haskett, Manitoba', '48.9989', '-97.9577', 'south', 'export', 'domestic heavy',
+       '15.07', '', '', '', '18.11', 'NEB/REGULATORY DIRECTIVE']
+
+def buildTable(rowCount):
+    '''
+    Builds a PipelineTable for the tests.
+
+    :param rowCount: The number of rows of the table.
+    :returns: A PipelineTable holding rowCount copies of ROW.
+    '''
+    table = columnar.PipelineTable()
+    table.extendRows([ROW] * rowCount, 0)
+    return table
+
+def testSnapshotRoundTripAndInvalidation(tmp_path):
+    '''
+    Tests that a stored snapshot loads back with the same rows and row ids, that it is not used once the csv file
+    changes, and that a disabled cache neither loads nor stores snapshots.
+    '''
+    csvFile = tmp_path / "pipeline.csv"
+    csvFile.write_text("header\n" + ",".join(ROW) + "\n")
+    cache = snapshots.SnapshotCache(str(tmp_path / "cache"))
+    table = buildTable(3)
+    key = cache.fileKey(csvFile)
+    cache.store(key, table)
+    loaded = cache.load(cache.fileKey(csvFile))
+
+    assert loaded.rowIds.tolist() == [0, 1, 2]
+    assert [loaded.rowValues(position) for position in range(3)] == [table.rowValues(position) for position in range(3)]
+
+    csvFile.write_text("header\n" + ",".join(ROW).replace("south", "north") + "\n")
+    assert cache.load(cache.fileKey(csvFile)) is None
+
+    cache.enabled = False
+    assert cache.load(key) is None
+
+def testLeastRecentlyUsedSnapshotsAreEvicted(tmp_path):
+    '''
+    Tests that storing a snapshot which takes the cache over its size limit removes the least recently used
+    snapshots, and that a snapshot larger than the limit is not stored.
+    '''
+    cache = snapshots.SnapshotCache(str(tmp_path / "cache"))
+    table = buildTable(100)
+    keys = [{"path": f"file{index}.csv", "size": 1, "mtime": 1, "hash": ""} for index in range(3)]
+    cache.store(keys[0], table)
+    snapshotSize = os.path.getsize(cache.snapshotPath(keys[0]))
+    cache.maxBytes = snapshotSize * 2 + 100
+
+    cache.store(keys[1], table)
+    os.utime(cache.snapshotPath(keys[0]), ns=(1, 1))
+    cache.store(keys[2], table)
+
+    assert not os.path.exists(cache.snapshotPath(keys[0]))
+    assert cache.load(keys[1]) is not None
+    assert cache.load(keys[2]) is not None
+
+    cache.maxBytes = snapshotSize // 2
+    cache.store(keys[0], table)
+    assert not os.path.exists(cache.snapshotPath(keys[0]))
+
+def testFailedStoreLeavesNoTemporaryFile(tmp_path, monkeypatch):
+    '''
+    Tests that a snapshot which cannot replace the older snapshot is reported and its temporary file removed.
+    '''
+    cache = snapshots.SnapshotCache(str(tmp_path / "cache"))
+    key = {"path": "file.csv", "size": 1, "mtime": 1, "hash": ""}
+
+    def failingReplace(source, target):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(snapshots.os, "replace", failingReplace)
+    cache.store(key, buildTable(3))
+
+    assert os.listdir(tmp_path / "cache") == []
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,75 @@
+#This is a pyTest test class.
+
+#Author: Dan Blais - 040826486
+#Subject: CST8333
+
+import pytest
+from array import array
+import PipelineTable as columnar
+import SortIndex as sorting
+
+ROW = ['2010-07-01', '7', '2010', 'TransCanada Keystone Pipeline GP Ltd.', 'Keystone pipeline',
+       'International boundary at or near Haskett, Manitoba', '48.9989', '-97.9577', 'south', 'export', 'domestic heavy',
+       '15.07', '', '', '', '18.11', 'NEB/REGULATORY DIRECTIVE']
+
+@pytest.fixture
+def table():
+    '''
+    Sets up a PipelineTable of 8 rows with repeated throughputs and products, and empty throughput, product and
+    date cells.
+    '''
+    rows = []
+
+    for throughput, product, day in (('3.5', 'condensate', '2010-07-03'), ('', 'Domestic light', '2010-07-01'),
+                                     ('1.25', '', ''), ('3.5', 'domestic heavy', '2010-07-02'),
+                                     ('10', 'condensate', '2010-07-01'), ('', 'domestic heavy', '2010-07-04'),
+                                     ('1.25', 'domestic light', '2010-07-02'), ('3.5', '', '')):
+        row = list(ROW)
+        row[0] = day
+        row[10] = product
+        row[11] = throughput
+        rows.append(row)
+
+    table = columnar.PipelineTable()
+    table.extendRows(rows, 0)
+    return table
+
+def testSortsAreStableWithEmptyCellsLast(table):
+    '''
+    Tests that rows are ordered by float, category and date columns in either direction, that rows with equal
+    values keep their table order in both directions, and that empty cells come last in both directions.
+    '''
+    index = sorting.SortIndex(table)
+    throughput = columnar.COLUMN_NAMES.index('throughput')
+    product = columnar.COLUMN_NAMES.index('product')
+    dates = columnar.COLUMN_NAMES.index('date')
+
+    assert list(index.order(throughput)) == [2, 6, 0, 3, 7, 4, 1, 5]
+    assert list(index.order(throughput, descending=True)) == [4, 0, 3, 7, 2, 6, 1, 5]
+    assert list(index.order(product)) == [0, 4, 3, 5, 1, 6, 2, 7]
+    assert list(index.order(product, descending=True)) == [1, 6, 3, 5, 0, 4, 2, 7]
+    assert list(index.order(dates)) == [1, 4, 3, 6, 0, 5, 2, 7]
+    assert list(index.order(dates, descending=True)) == [5, 0, 3, 6, 1, 4, 2, 7]
+    assert list(index.ranks(throughput)) == [2, 6, 0, 3, 5, 7, 1, 4]
+    assert list(sorting.invertOrder(array("I", [4, 2, 3]), 2)) == [1, 2, 0]
+
+def testOrdersAreCachedUntilRowsChange(table):
+    '''
+    Tests that a sort order is computed once while the rows are unchanged, and computed again after a cell is
+    edited or a row is appended.
+    '''
+    index = sorting.SortIndex(table)
+    throughput = columnar.COLUMN_NAMES.index('throughput')
+    order = index.order(throughput)
+
+    assert index.order(throughput) is order
+    assert index.order(throughput, descending=True) is not order
+
+    table.setValue(4, throughput, '0.5')
+    assert list(index.order(throughput))[:3] == [4, 2, 6]
+
+    table.appendRow(ROW, 8)
+    assert list(index.order(throughput, descending=True))[:2] == [8, 0]
+
+if __name__ == '__main__':
+    pytest.main()
@@ -8,20 +8,31 @@
 #[1] Python Software Foundation, "unittest.mock  mock object library," Python 3.10.0 Documentation, 2021. [Online]. 
 #             Available: https://docs.python.org/3/library/unittest.mock.html. [Accessed: 27-Sep-2024].
 
+import os
+import subprocess
+import sys
 import pytest
 from unittest.mock import MagicMock
 import WindowController as controller
 import KeystonePipelineData as model
+import PipelineTable as columnar
+import EditJournal as journaling
 
-def testDeleteRow():
+#The cold start budget for importing the WindowController module and everything it imports, in microseconds.
+IMPORT_TIME_BUDGET = 250000
+
+def testDeleteRow(monkeypatch):
     '''
-    Tests the deleteData() method of the WindowController class. Uses MagicMock from the unittest API to mock the view without
-    needing to instantiate the view class to perform the test. Tests the method by forcing the view to return a selected row
-    index with a value of 1. The function is then called which deletes the row with a value of 1. Finally an assert statement
-    is used to assert that the length of the model list should now be 1, indicating a row was deleted.
+    Tests the deleteData() method of the WindowController class. Uses MagicMock from the unittest API to mock the
+    ProgramWindow class, so the controller is created without building a window or needing a display. Tests the
+    method by forcing the view to return a selected row index with a value of 1. The function is then called which
+    deletes the row with a value of 1. Finally an assert statement is used to assert that the length of the model
+    list should now be 1, indicating a row was deleted, and that the row id of the deleted row was removed along
+    with it.
     '''
+    monkeypatch.setattr(controller.view, "ProgramWindow", MagicMock())
     cont = controller.WindowController()
-    cont._model = [model.PipelineData(date='2024-01-01', month=1, year=2023, company='Company A',
+    cont._model = columnar.PipelineTable([model.PipelineData(date='2024-01-01', month=1, year=2023, company='Company A',
                                            pipeline='Pipeline 1', keyPoint='Key Point 1', latitude=0.0,
                                            longitude=0.0, directionOfFlow='North', tradeType='Type A',
                                            product='Product A', throughput=100, committedVolumes=80,
@@ -32,12 +43,74 @@ def testDeleteRow():
                                            longitude=1.0, directionOfFlow='South', tradeType='Type B',
                                            product='Product B', throughput=200, committedVolumes=150,
                                            uncommittedVolumes=50, nameplateCapacity=250, availableCapacity=100,
-                                           reasonForVariance='None')]
-    cont._view = MagicMock()
+                                           reasonForVariance='None')])
     cont._view.table.selection.return_value = ['1']
+    cont._view.table.index.return_value = 1
+    cont._view.visibleRowCount.return_value = 20
     cont.deleteData()
     assert len(cont._model) == 1
+    assert cont._model.rowIds.tolist() == [0]
+
+def testFailedUndoIsNotRecorded(monkeypatch, tmp_path):
+    '''
+    Tests the undoEdit() and redoEdit() methods of the WindowController class. An undo or redo whose edit cannot be
+    applied to the model is reported and leaves the edit on its stack without logging it, and is recorded once it
+    is applied.
+    '''
+    monkeypatch.setattr(controller.view, "ProgramWindow", MagicMock())
+    cont = controller.WindowController()
+    cont._model = columnar.PipelineTable([model.PipelineData(date='2024-01-01', month=1, year=2023, company='Company A',
+                                           pipeline='Pipeline 1', keyPoint='Key Point 1', latitude=0.0,
+                                           longitude=0.0, directionOfFlow='North', tradeType='Type A',
+                                           product='Product A', throughput=100, committedVolumes=80,
+                                           uncommittedVolumes=20, nameplateCapacity=120, availableCapacity=40,
+                                           reasonForVariance='None')])
+    cont._view.visibleRowCount.return_value = 20
+    cont._journal = journaling.EditJournal(str(tmp_path / "pipeline.csv"), [0, 0])
+    cont.makeEdit({"op": "set", "position": 0, "column": 10, "old": "Product A", "new": "Product B"})
+    applyEdit = controller.engine.applyEdit
+
+    def failingApplyEdit(table, edit):
+        raise ValueError("cannot apply")
+
+    monkeypatch.setattr(controller.engine, "applyEdit", failingApplyEdit)
+    cont.undoEdit()
+    assert cont._journal.checkpoint() == 1
+    assert cont._journal.nextRedo() is None
+
+    monkeypatch.setattr(controller.engine, "applyEdit", applyEdit)
+    cont.undoEdit()
+    assert cont._model.getValue(0, 10) == "Product A"
+    assert cont._journal.checkpoint() == 2
+
+    monkeypatch.setattr(controller.engine, "applyEdit", failingApplyEdit)
+    cont.redoEdit()
+    assert cont._journal.nextRedo()["new"] == "Product B"
+
+    monkeypatch.setattr(controller.engine, "applyEdit", applyEdit)
+    cont.redoEdit()
+    assert cont._model.getValue(0, 10) == "Product B"
+    assert cont._journal.nextRedo() is None
+    cont._journal.close()
     
+def testColdStartImportsWithinBudget():
+    '''
+    Tests the startup time of the program by importing the WindowController module in a new interpreter with
+    -X importtime. Asserts that matplotlib, the worker process pool and tempfile are left to be imported on first use,
+    and that the cumulative import time of the module stays within IMPORT_TIME_BUDGET.
+    '''
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import WindowController"],
+                            cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, check=True)
+    timings = {}
+
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line and "cumulative" not in line:
+            selfTime, cumulativeTime, name = line[len("import time:"):].split("|")
+            timings[name.strip()] = int(cumulativeTime)
+
+    assert not [name for name in timings if name.split(".")[0] in ("matplotlib", "concurrent", "tempfile")]
+    assert timings["WindowController"] < IMPORT_TIME_BUDGET
+
 if __name__ == '__main__':
     pytest.main()
     print("Program By: Dan Blais")
\ No newline at end of file